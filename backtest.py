@@ -0,0 +1,303 @@
+"""
+Bar replay backtest for Future MT5 Pro Trading System
+The Fibonacci strategy's entry rules evaluated over a whole bar history as
+arrays, with the indicators it depends on cached per parameter value so many
+parameter sets and windows of one history share them
+"""
+
+import os
+import sys
+from typing import Dict, Any, Callable, Optional, Tuple
+
+import numpy as np
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import FIBONACCI
+except ImportError:
+    FIBONACCI = {
+        'REVERSAL_ZONE': 0.1
+    }
+
+from fib_levels import level_matrix
+from swings import find_swings, HIGH, LOW
+
+# Exit reasons
+EXIT_SL = 1
+EXIT_TP = 2
+EXIT_END = 3  # still open at the end of the window, closed at its last close
+
+TRADE_DTYPE = np.dtype([
+    ('entry_time', '<i8'),
+    ('exit_time', '<i8'),
+    ('buy', '?'),
+    ('entry', '<f8'),
+    ('exit', '<f8'),
+    ('sl', '<f8'),
+    ('tp', '<f8'),
+    ('r', '<f8'),  # result in multiples of the initial risk, costs included
+    ('reason', 'i1')
+])
+
+MA_PERIOD = 200
+
+
+def wilder_rsi(close: np.ndarray, period: int) -> np.ndarray:
+    """RSI series with Wilder's smoothing, seeded like EstrategiaTrading.calcular_medias_rsi
+
+    ``rsi[i]`` uses closes up to ``i``; the first ``period`` values are NaN.
+    """
+    rsi = np.full(len(close), np.nan)
+    if len(close) <= period:
+        return rsi
+    delta = np.diff(close)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    avg_gain = gain[:period].mean()
+    avg_loss = loss[:period].mean()
+    gains = gain[period:].tolist()
+    losses = loss[period:].tolist()
+    averages = np.empty((len(gains) + 1, 2))
+    averages[0] = avg_gain, avg_loss
+    for i, (g, l) in enumerate(zip(gains, losses), 1):
+        avg_gain = (avg_gain * (period - 1) + g) / period
+        avg_loss = (avg_loss * (period - 1) + l) / period
+        averages[i] = avg_gain, avg_loss
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = np.where(averages[:, 1] != 0, averages[:, 0] / averages[:, 1], 0.0)
+    rsi[period:] = 100 - 100 / (1 + rs)
+    return rsi
+
+
+class Indicators:
+    """Indicator arrays of one bar history, each computed once
+
+    Everything a parameter set needs is derived from arrays cached by the
+    parameter values they depend on: the RSI by period, trend statistics by
+    ``fib_period``, entry signals by the full entry rule. Windows and
+    parameter sets over the same history only slice the cached arrays.
+
+    The price columns are views of ``bars``, so a memory-mapped history is
+    read through the page cache rather than copied into every worker.
+    """
+
+    def __init__(self, bars: np.ndarray, point: float):
+        # asarray keeps the strided field views when the dtypes already match
+        self.time = np.asarray(bars['time'], dtype=np.int64)
+        self.open = np.asarray(bars['open'], dtype=np.float64)
+        self.high = np.asarray(bars['high'], dtype=np.float64)
+        self.low = np.asarray(bars['low'], dtype=np.float64)
+        self.close = np.asarray(bars['close'], dtype=np.float64)
+        if 'spread' in bars.dtype.names:
+            self.cost = np.asarray(bars['spread'], dtype=np.float64) * point
+        else:
+            self.cost = np.zeros(len(self.close))
+        self.point = point
+        self.cache: Dict[Tuple, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def cached(self, key: Tuple, build: Callable[[], Any]):
+        value = self.cache.get(key)
+        if value is None:
+            value = self.cache[key] = build()
+        return value
+
+    def rsi(self, period: int) -> np.ndarray:
+        return self.cached(('rsi', period), lambda: wilder_rsi(self.close, period))
+
+    def ma_side(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(close above MA200, close below MA200) per bar; both False during warm-up"""
+        def build():
+            total = np.concatenate([[0.0], np.cumsum(self.close)])
+            ma = np.full(len(self), np.nan)
+            ma[MA_PERIOD - 1:] = (total[MA_PERIOD:] - total[:-MA_PERIOD]) / MA_PERIOD
+            return self.close > ma, self.close < ma
+        return self.cached(('ma',), build)
+
+    def anchors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Latest confirmed swing high and low known at each bar (NaN before the first)"""
+        def build():
+            swings = find_swings(self.time, self.high, self.low, self.point)
+            result = []
+            for kind in (HIGH, LOW):
+                mine = swings[swings['kind'] == kind]
+                known = np.searchsorted(mine['confirmed'], self.time, side='right') - 1
+                price = np.append(mine['price'], np.nan)  # index -1 -> NaN
+                result.append(price[known])
+            return tuple(result)
+        return self.cached(('anchors',), build)
+
+    def trend(self, period: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Variation %, share of up closes, top and bottom anchor of the last ``period`` bars"""
+        def build():
+            n = len(self)
+            variation = np.full(n, np.nan)
+            strength = np.full(n, np.nan)
+            top = np.full(n, np.nan)
+            bottom = np.full(n, np.nan)
+            if n >= period:
+                start = self.close[:n - period + 1]
+                variation[period - 1:] = (self.close[period - 1:] - start) / start * 100
+                ups = np.concatenate([[0], np.cumsum(self.close[1:] > self.close[:-1])])
+                strength[period - 1:] = (ups[period - 1:] - ups[:n - period + 1]) / (period - 1)
+                windows = np.lib.stride_tricks.sliding_window_view
+                top[period - 1:] = windows(self.high, period).max(axis=1)
+                bottom[period - 1:] = windows(self.low, period).min(axis=1)
+            # Without confirmed swings yet, the live strategy falls back to the window's extremes
+            high, low = self.anchors()
+            known = ~np.isnan(high) & ~np.isnan(low)
+            top[known] = high[known]
+            bottom[known] = low[known]
+            return variation, strength, top, bottom
+        return self.cached(('trend', period), build)
+
+    def signals(self, params: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Bars where the strategy would enter: (index, buy, sl, tp), sorted by index"""
+        entry_ratios = tuple(params['fib_levels'])
+        ratios = entry_ratios + tuple(params['fib_tp_levels'])
+        key = ('signals', params['fib_period'], params['min_trend_percent'], params['rsi_period'],
+               params['rsi_sobrecomprado'], params['rsi_sobrevendido'], params['use_ma200'],
+               params['min_rr_ratio'], ratios)
+        return self.cached(key, lambda: self._signals(params, entry_ratios, ratios))
+
+    def _signals(self, params, entry_ratios, ratios):
+        variation, strength, top, bottom = self.trend(params['fib_period'])
+        minimum = params['min_trend_percent']
+        up = (variation > minimum) & (strength > 0.6)
+        down = (variation < -minimum) & (strength < 0.4)
+        rsi = self.rsi(params['rsi_period'])
+        buy = up & (rsi < params['rsi_sobrevendido'])
+        sell = down & (rsi > params['rsi_sobrecomprado'])
+        if params['use_ma200']:
+            above, below = self.ma_side()
+            buy &= above
+            sell &= below
+        rows = np.flatnonzero((buy | sell) & ~np.isnan(top) & ~np.isnan(bottom))
+        empty = np.zeros(0)
+        if not len(rows):
+            return rows, np.zeros(0, dtype=bool), empty, empty
+
+        is_buy = buy[rows]
+        price = self.close[rows][:, None]
+        levels = level_matrix(top[rows], bottom[rows], is_buy, ratios)
+        entry = levels[:, :len(entry_ratios)]
+        tolerance = FIBONACCI['REVERSAL_ZONE'] / 100
+        near = np.abs(price - entry) <= tolerance * entry
+
+        # processar_entrada: SL on the farthest level beyond the entry level,
+        # TP on the nearest extension level past price (defaults as in the strategy)
+        b = is_buy[:, None]
+        all_levels = levels[:, None, :]
+        level = entry[:, :, None]
+        sl = np.where(b,
+                      np.where(all_levels < level, all_levels, np.inf).min(axis=2),
+                      np.where(all_levels > level, all_levels, -np.inf).max(axis=2))
+        sl = np.where(np.isinf(sl), np.where(b, entry * 0.99, entry * 1.01), sl)
+        ratio = all_levels / level
+        tp = np.where(b,
+                      np.where((all_levels > price[:, :, None]) & (ratio > 1.272), all_levels, np.inf).min(axis=2),
+                      np.where((all_levels < price[:, :, None]) & (ratio < 0.728), all_levels, -np.inf).max(axis=2))
+        tp = np.where(np.isinf(tp), np.where(b, price * 1.272, price * 0.728), tp)
+        risk = np.abs(price - sl)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            valid = near & (risk > 0) & (np.abs(price - tp) / risk >= params['min_rr_ratio'])
+
+        # Levels are tried closest first; the first that passes the RR check is traded
+        distance = np.where(valid, np.abs(price - entry), np.inf)
+        choice = distance.argmin(axis=1)
+        traded = valid.any(axis=1)
+        pick = np.arange(len(rows))
+        return (rows[traded], is_buy[traded], sl[pick, choice][traded], tp[pick, choice][traded])
+
+
+def first_exit(ind: Indicators, i: int, end: int, buy: bool, sl: float, tp: float) -> Tuple[int, float, int]:
+    """(bar, price, reason) where a position opened at the close of bar ``i`` exits
+
+    Bars are scanned in growing chunks; a bar touching both SL and TP counts as
+    a loss, and a stop gapped through fills at the bar's open.
+    """
+    j = i + 1
+    size = 64
+    while j < end:
+        stop = min(end, j + size)
+        low, high = ind.low[j:stop], ind.high[j:stop]
+        sl_hit = low <= sl if buy else high >= sl
+        tp_hit = high >= tp if buy else low <= tp
+        hit = np.flatnonzero(sl_hit | tp_hit)
+        if len(hit):
+            k = j + int(hit[0])
+            if sl_hit[hit[0]]:
+                return k, (min(sl, ind.open[k]) if buy else max(sl, ind.open[k])), EXIT_SL
+            return k, tp, EXIT_TP
+        j = stop
+        size *= 2
+    return end - 1, float(ind.close[end - 1]), EXIT_END
+
+
+def simulate(ind: Indicators, params: Dict[str, Any], start: int = 0, end: Optional[int] = None) -> np.ndarray:
+    """Trades of one parameter set entering in bars ``[start, end)`` (TRADE_DTYPE)
+
+    One position at a time, as with the strategy's default ``max_positions``
+    of 1; entries closer than ``min_time_between_trades`` are skipped and
+    positions still open at ``end`` are closed there.
+    """
+    end = len(ind) if end is None else end
+    rows, buys, sls, tps = ind.signals(params)
+    first, last = np.searchsorted(rows, [start, end])
+    rows, buys, sls, tps = rows[first:last], buys[first:last], sls[first:last], tps[first:last]
+    min_gap = params.get('min_time_between_trades', 0)
+
+    trades = []
+    k = 0
+    last_entry = None
+    while k < len(rows):
+        i = int(rows[k])
+        if last_entry is not None and ind.time[i] - last_entry < min_gap:
+            k += 1
+            continue
+        buy, sl, tp = bool(buys[k]), float(sls[k]), float(tps[k])
+        entry = float(ind.close[i])
+        j, price, reason = first_exit(ind, i, end, buy, sl, tp)
+        pnl = (price - entry if buy else entry - price) - ind.cost[i]
+        trades.append((ind.time[i], ind.time[j], buy, entry, price, sl, tp, pnl / abs(entry - sl), reason))
+        last_entry = ind.time[i]
+        # The position blocks new entries until the bar it exits on has closed
+        k = int(np.searchsorted(rows, j, side='right'))
+    return np.array(trades, dtype=TRADE_DTYPE)
+
+
+def trade_metrics(r: np.ndarray) -> Dict[str, Any]:
+    """Summary of a sequence of trade results in R multiples"""
+    r = np.asarray(r, dtype=np.float64)
+    if not len(r):
+        return {'trades': 0, 'win_rate': None, 'expectancy': None, 'profit_factor': None,
+                'total_r': 0.0, 'max_drawdown_r': 0.0}
+    equity = np.concatenate([[0.0], np.cumsum(r)])
+    wins, losses = r[r > 0].sum(), -r[r < 0].sum()
+    return {
+        'trades': int(len(r)),
+        'win_rate': round(float(np.count_nonzero(r > 0)) / len(r) * 100, 1),
+        'expectancy': round(float(r.mean()), 4),
+        'profit_factor': round(float(wins / losses), 3) if losses else None,
+        'total_r': round(float(r.sum()), 3),
+        'max_drawdown_r': round(float((np.maximum.accumulate(equity) - equity).max()), 3)
+    }
+
+
+__all__ = [
+    'Indicators',
+    'simulate',
+    'first_exit',
+    'trade_metrics',
+    'wilder_rsi',
+    'TRADE_DTYPE',
+    'EXIT_SL',
+    'EXIT_TP',
+    'EXIT_END'
+]
@@ -0,0 +1,282 @@
+"""
+Bar aggregation for Future MT5 Pro Trading System
+Higher-timeframe bars built in memory from one M1 (or tick) feed per symbol,
+so every strategy on a symbol shares one terminal pull whatever its timeframe
+"""
+
+import os
+import sys
+import time
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import MetaTrader5 as mt5
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import BARS
+except ImportError:
+    BARS = {
+        'CAPACITY': 1024,
+        'MAX_AGE': 0.5,
+        'POLL_BARS': 3,
+        'SESSION_OFFSET': 0
+    }
+
+from shared_feed import BAR_DTYPE
+
+# Timeframes with fixed-length bars; bar times are multiples of the length
+# (plus the session offset) in server time, as the terminal aligns them
+TIMEFRAME_SECONDS = {
+    'M1': 60,
+    'M5': 300,
+    'M15': 900,
+    'M30': 1800,
+    'H1': 3600,
+    'H4': 14400,
+    'D1': 86400
+}
+
+
+def aggregate_bars(bars: np.ndarray, seconds: int, offset: int = 0) -> np.ndarray:
+    """Bars of ``seconds`` length from shorter bars in time order
+
+    Only buckets containing at least one source bar are produced, as the
+    terminal leaves no bars for periods without trading. The spread is the
+    bucket's minimum.
+    """
+    if not len(bars):
+        return np.zeros(0, dtype=BAR_DTYPE)
+    bucket = (bars['time'] - offset) // seconds
+    starts = np.flatnonzero(np.concatenate(([True], bucket[1:] != bucket[:-1])))
+    ends = np.append(starts[1:], len(bars)) - 1
+
+    result = np.zeros(len(starts), dtype=BAR_DTYPE)
+    result['time'] = bucket[starts] * seconds + offset
+    result['open'] = bars['open'][starts]
+    result['high'] = np.maximum.reduceat(bars['high'], starts)
+    result['low'] = np.minimum.reduceat(bars['low'], starts)
+    result['close'] = bars['close'][ends]
+    result['tick_volume'] = np.add.reduceat(bars['tick_volume'], starts)
+    result['spread'] = np.minimum.reduceat(bars['spread'], starts)
+    result['real_volume'] = np.add.reduceat(bars['real_volume'], starts)
+    return result
+
+
+class BarAggregator:
+    """M1 bars of one symbol and every timeframe derived from them
+
+    Each timeframe is seeded once with its own history; afterwards new M1
+    bars only recompute the buckets they fall in. The M1 buffer always
+    reaches back to the start of every bucket a poll can still touch, so a
+    forming D1 bar is rebuilt from complete data. Buffers are replaced, never written in
+    place, so views handed out by ``bars`` stay valid.
+    """
+
+    def __init__(self, symbol: str, capacity: int = BARS['CAPACITY'],
+                 offset: int = BARS['SESSION_OFFSET']):
+        self.symbol = symbol
+        self.capacity = capacity
+        self.offset = offset
+        self.m1 = np.zeros(0, dtype=BAR_DTYPE)
+        self.frames: Dict[str, np.ndarray] = {}
+        self.lock = threading.Lock()
+        self.poll_lock = threading.Lock()
+        self.polled_at = 0.0
+
+    def bucket_start(self, timeframe: str, bar_time: int) -> int:
+        seconds = TIMEFRAME_SECONDS[timeframe]
+        return (bar_time - self.offset) // seconds * seconds + self.offset
+
+    def m1_needed(self, timeframe: str) -> int:
+        """M1 bars to request so the buckets a poll can touch are complete"""
+        return max(self.capacity, 2 * TIMEFRAME_SECONDS[timeframe] // 60 + BARS['POLL_BARS'])
+
+    def add_timeframe(self, timeframe: str, history: np.ndarray):
+        """Start maintaining ``timeframe`` from its terminal history"""
+        with self.lock:
+            if timeframe != 'M1':
+                self.frames[timeframe] = np.asarray(history).astype(BAR_DTYPE)[-self.capacity:]
+
+    def seed_m1(self, rates: np.ndarray):
+        """Replace the M1 buffer (first load or after a gap) and rebuild forming buckets"""
+        rates = np.asarray(rates).astype(BAR_DTYPE)
+        with self.lock:
+            self.m1 = rates
+            if len(rates):
+                self._refresh(int(rates['time'][-1]))
+
+    def update_m1(self, rates: np.ndarray) -> bool:
+        """Merge recent M1 bars (the forming one included); False if they leave a gap"""
+        if rates is None or not len(rates):
+            return True
+        rates = np.asarray(rates).astype(BAR_DTYPE)
+        with self.lock:
+            if len(self.m1) and rates['time'][0] > self.m1['time'][-1]:
+                # Our last bar is not in the window, so bars may have been missed
+                return False
+            first = int(rates['time'][0])
+            self.m1 = np.concatenate([self.m1[self.m1['time'] < first], rates])
+            self._refresh(first)
+        return True
+
+    def update_ticks(self, time_msc: np.ndarray, price: np.ndarray,
+                     volume: Optional[np.ndarray] = None):
+        """Fold ticks (time order, e.g. bids from copy_ticks_from) into the M1 bars"""
+        ticks = np.zeros(len(time_msc), dtype=BAR_DTYPE)
+        ticks['time'] = np.asarray(time_msc) // 1000
+        for field in ('open', 'high', 'low', 'close'):
+            ticks[field] = price
+        ticks['tick_volume'] = 1
+        if volume is not None:
+            ticks['real_volume'] = volume
+
+        with self.lock:
+            if len(self.m1):
+                ticks = ticks[ticks['time'] >= self.m1['time'][-1]]
+            minutes = aggregate_bars(ticks, 60)
+            if not len(minutes):
+                return
+            if len(self.m1) and minutes['time'][0] == self.m1['time'][-1]:
+                # Ticks continuing the last minute extend it
+                last = self.m1[-1]
+                first = minutes[0]
+                first['open'] = last['open']
+                first['high'] = max(first['high'], last['high'])
+                first['low'] = min(first['low'], last['low'])
+                first['tick_volume'] += last['tick_volume']
+                first['real_volume'] += last['real_volume']
+            start = int(minutes['time'][0])
+            self.m1 = np.concatenate([self.m1[self.m1['time'] < start], minutes])
+            self._refresh(start)
+
+    def _refresh(self, since: int):
+        """Rebuild every bucket that holds M1 bars from ``since`` on"""
+        for timeframe, frame in self.frames.items():
+            start = self.bucket_start(timeframe, since)
+            source = self.m1[self.m1['time'] >= start]
+            rebuilt = aggregate_bars(source, TIMEFRAME_SECONDS[timeframe], self.offset)
+            self.frames[timeframe] = np.concatenate([frame[frame['time'] < start], rebuilt])[-self.capacity:]
+
+        # Keep the M1 history strategies use and every bucket the next poll can touch
+        if len(self.m1) > self.capacity:
+            revisable = int(self.m1['time'][-min(BARS['POLL_BARS'], len(self.m1))])
+            keep_from = min([self.bucket_start(tf, revisable) for tf in self.frames] + [revisable])
+            oldest = int(np.searchsorted(self.m1['time'], keep_from))
+            self.m1 = self.m1[min(oldest, len(self.m1) - self.capacity):]
+
+    def bars(self, timeframe: str, count: int) -> Optional[np.ndarray]:
+        """View of the last ``count`` bars of a timeframe being maintained"""
+        frame = self.m1 if timeframe == 'M1' else self.frames.get(timeframe)
+        if frame is None or not len(frame):
+            return None
+        return frame[-count:]
+
+
+class BarFeed:
+    """Shared BarAggregators, one M1 pull per symbol for all of its timeframes
+
+    ``bars`` pulls a symbol at most once per ``max_age`` however many
+    strategies and timeframes ask for it. Timeframes without fixed-length
+    bars are not served (the caller falls back to the terminal). The feed lock
+    only guards the symbol table; terminal pulls for a symbol, seeding
+    included, hold that aggregator's ``poll_lock`` so one slow symbol does
+    not stall the others.
+    """
+
+    def __init__(self, capacity: int = BARS['CAPACITY'], max_age: float = BARS['MAX_AGE'],
+                 offset: int = BARS['SESSION_OFFSET']):
+        self.capacity = capacity
+        self.max_age = max_age
+        self.offset = offset
+        self.aggregators: Dict[str, BarAggregator] = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, symbol: str, timeframe: str) -> Optional[BarAggregator]:
+        """Aggregator of ``symbol`` maintaining ``timeframe``, seeding it on first use"""
+        if timeframe not in TIMEFRAME_SECONDS:
+            return None
+        with self.lock:
+            aggregator = self.aggregators.get(symbol)
+            if aggregator is None:
+                aggregator = BarAggregator(symbol, self.capacity, self.offset)
+                self.aggregators[symbol] = aggregator
+        if self.serves(aggregator, timeframe):
+            return aggregator
+
+        with aggregator.poll_lock:
+            if self.serves(aggregator, timeframe):
+                return aggregator
+            if timeframe != 'M1' and timeframe not in aggregator.frames:
+                aggregator.add_timeframe(timeframe, np.zeros(0, dtype=BAR_DTYPE))
+            return aggregator if self.seed(aggregator) else None
+
+    @staticmethod
+    def serves(aggregator: BarAggregator, timeframe: str) -> bool:
+        """Whether ``timeframe`` has been seeded on ``aggregator``"""
+        return bool(len(aggregator.m1)) and (timeframe == 'M1' or bool(len(aggregator.frames.get(timeframe, ()))))
+
+    def seed(self, aggregator: BarAggregator) -> bool:
+        """(Re)load every timeframe's history and the M1 bars its open buckets need
+
+        Called with ``aggregator.poll_lock`` held.
+        """
+        for timeframe in list(aggregator.frames):
+            history = mt5.copy_rates_from_pos(aggregator.symbol, getattr(mt5, f"TIMEFRAME_{timeframe}"),
+                                              0, self.capacity)
+            if history is None or not len(history):
+                return False
+            aggregator.add_timeframe(timeframe, history)
+        count = max([aggregator.m1_needed(tf) for tf in aggregator.frames] + [self.capacity])
+        rates = mt5.copy_rates_from_pos(aggregator.symbol, mt5.TIMEFRAME_M1, 0, count)
+        if rates is None or not len(rates):
+            return False
+        aggregator.seed_m1(rates)
+        aggregator.polled_at = time.monotonic()
+        return True
+
+    def poll(self, symbol: str) -> bool:
+        """Pull the latest M1 bars of a subscribed symbol (``poll_lock`` held)"""
+        aggregator = self.aggregators.get(symbol)
+        if aggregator is None:
+            return False
+        rates = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_M1, 0, BARS['POLL_BARS'])
+        if rates is None:
+            return False
+        if not aggregator.update_m1(rates):
+            # Bars were missed (sleep, disconnection): reload everything
+            return self.seed(aggregator)
+        aggregator.polled_at = time.monotonic()
+        return True
+
+    def poll_all(self):
+        with self.lock:
+            aggregators = list(self.aggregators.values())
+        for aggregator in aggregators:
+            with aggregator.poll_lock:
+                self.poll(aggregator.symbol)
+
+    def ensure_fresh(self, aggregator: BarAggregator):
+        if time.monotonic() - aggregator.polled_at > self.max_age:
+            with aggregator.poll_lock:
+                if time.monotonic() - aggregator.polled_at > self.max_age:
+                    self.poll(aggregator.symbol)
+
+    def bars(self, symbol: str, timeframe: str, count: int) -> Optional[np.ndarray]:
+        """Last ``count`` bars of ``symbol`` on ``timeframe``, or None if not served"""
+        aggregator = self.subscribe(symbol, timeframe)
+        if aggregator is None:
+            return None
+        self.ensure_fresh(aggregator)
+        return aggregator.bars(timeframe, count)
+
+
+# Global feed shared by every strategy in the process
+bar_feed = BarFeed()
+
+__all__ = ['bar_feed', 'BarFeed', 'BarAggregator', 'aggregate_bars', 'TIMEFRAME_SECONDS']
@@ -0,0 +1,211 @@
+"""
+Bar windows for Future MT5 Pro Trading System
+The last bars of a symbol and timeframe in preallocated per-field ring
+buffers, shared by the strategies of a symbol; each strategy copies them into
+its own window under the lock and its indicators read zero-copy views of that
+"""
+
+import os
+import sys
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import BARS
+except ImportError:
+    BARS = {
+        'CAPACITY': 1024
+    }
+
+from shared_feed import BAR_DTYPE
+
+
+class BarView:
+    """Consecutive bars of a BarWindow, without copying
+
+    ``view['close']`` is a contiguous slice of the window's close column and
+    ``view[-20:]`` another BarView, so indicators can keep slicing and reading
+    fields at no cost. Any other index (an integer, a mask) returns a
+    structured copy, as does ``to_array`` / ``np.asarray(view)``.
+
+    Views are live: they show what the window holds when they are read, so
+    take them after the window's update for the cycle.
+    """
+
+    __slots__ = ('window', 'start', 'stop')
+
+    def __init__(self, window: 'BarWindow', start: int, stop: int):
+        self.window = window
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.window.dtype
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.window.columns[key][self.start:self.stop]
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                return BarView(self.window, self.start + start, self.start + max(start, stop))
+        return self.to_array()[key]
+
+    def to_array(self) -> np.ndarray:
+        """Structured copy (BAR_DTYPE by default)"""
+        result = np.empty(len(self), dtype=self.dtype)
+        for name in self.dtype.names:
+            result[name] = self[name]
+        return result
+
+    def __array__(self, dtype=None, copy=None):
+        result = self.to_array()
+        return result if dtype is None else result.astype(dtype)
+
+
+class BarWindow:
+    """Ring of the last ``capacity`` bars, one preallocated array per field
+
+    Like SharedRing, every bar is written twice, at ``i`` and
+    ``i + capacity``, so the newest ``n`` values of any field are a single
+    contiguous slice. Updates overwrite the forming bar and append new ones
+    in place; nothing is allocated per cycle beyond the bars fetched.
+    """
+
+    def __init__(self, capacity: int = BARS['CAPACITY'], dtype: np.dtype = BAR_DTYPE):
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.zeros(2 * capacity, dtype=self.dtype[name]) for name in self.dtype.names
+        }
+        self.count = 0  # bars written since the last load (ring position)
+        self.size = 0  # bars held, at most capacity
+        self.requested = 0  # history length asked for by the last full load
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _end(self) -> int:
+        return (self.count - 1) % self.capacity + 1 + self.capacity if self.count else 0
+
+    def _write(self, records):
+        """Append records (structured array or BarView) after the current last bar"""
+        n = len(records)
+        if not n:
+            return
+        skip = max(0, n - self.capacity)
+        slots = (self.count + skip + np.arange(n - skip)) % self.capacity
+        for name, column in self.columns.items():
+            if name in records.dtype.names:
+                values = records[name][skip:]
+            else:
+                values = 0
+            column[slots] = values
+            column[slots + self.capacity] = values
+        self.count += n
+        self.size = min(self.size + n, self.capacity)
+
+    def clear(self):
+        with self.lock:
+            self.count = self.size = self.requested = 0
+
+    def load(self, records, requested: Optional[int] = None):
+        """Replace the contents with a full history, oldest first"""
+        with self.lock:
+            self.count = self.size = 0
+            if records is not None:
+                self._write(records)
+            self.requested = len(self) if requested is None else requested
+
+    def update(self, records) -> bool:
+        """Merge recent bars (the forming one included); False if they leave a gap
+
+        Bars from the first new bar's time on are replaced, so a revised
+        forming bar overwrites its slot instead of being appended.
+        """
+        if records is None or not len(records):
+            return True
+        with self.lock:
+            if not self.size:
+                return False
+            held = self.columns['time'][self._end() - self.size:self._end()]
+            first = records['time'][0]
+            if first > held[-1]:
+                # Our last bar is not in the update, so bars may have been missed
+                return False
+            keep = int(np.searchsorted(held, first))
+            self.count -= self.size - keep
+            self.size = keep
+            self._write(records)
+        return True
+
+    def latest(self, n: Optional[int] = None) -> BarView:
+        """View of the last ``n`` bars (all held bars by default)"""
+        end = self._end()
+        n = self.size if n is None else min(n, self.size)
+        return BarView(self, end - n, end)
+
+    def copy_latest(self, target: 'BarWindow', n: Optional[int] = None) -> BarView:
+        """Copy the last ``n`` bars into ``target`` under the lock and view them there
+
+        ``target`` is a private window (capacity at least ``n``) whose columns
+        are reused, so a reader gets a consistent BarView without allocating;
+        the view is valid until the next copy into the same target.
+        """
+        with self.lock:
+            end = self._end()
+            n = self.size if n is None else min(n, self.size)
+            for name, column in target.columns.items():
+                values = self.columns[name][end - n:end]
+                column[:n] = values
+                column[target.capacity:target.capacity + n] = values
+            target.count = target.size = target.requested = n
+        return target.latest(n)
+
+    def snapshot(self, n: Optional[int] = None) -> Optional[np.ndarray]:
+        """Structured copy of the last ``n`` bars taken under the lock, or None if empty
+
+        For readers that may run while another strategy updates the window.
+        """
+        with self.lock:
+            if not self.size:
+                return None
+            return self.latest(n).to_array()
+
+
+class BarWindows:
+    """One BarWindow per symbol and timeframe, shared by every strategy using it"""
+
+    def __init__(self):
+        self.windows: Dict[Tuple[str, str], BarWindow] = {}
+        self.lock = threading.Lock()
+
+    def window(self, symbol: str, timeframe: str, capacity: int = BARS['CAPACITY']) -> BarWindow:
+        """Window of a symbol/timeframe holding at least ``capacity`` bars"""
+        with self.lock:
+            window = self.windows.get((symbol, timeframe))
+            if window is None or window.capacity < capacity:
+                grown = BarWindow(max(capacity, BARS['CAPACITY']))
+                if window is not None:
+                    with window.lock:
+                        grown.load(window.latest(), window.requested)
+                window = self.windows[(symbol, timeframe)] = grown
+            return window
+
+
+# Global windows shared by every strategy in the process
+bar_windows = BarWindows()
+
+__all__ = ['bar_windows', 'BarWindows', 'BarWindow', 'BarView']
@@ -0,0 +1,381 @@
+"""
+Candlestick charts for Future MT5 Pro Trading System
+Tk canvas charts of the strategies' shared bar windows with Fibonacci levels,
+MA200 and entries, redrawn incrementally: a tick moves only the last candle
+"""
+
+import os
+import sys
+import time
+import threading
+import tkinter as tk
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple, Callable
+
+import numpy as np
+import MetaTrader5 as mt5
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import CHART, HISTORY
+except ImportError:
+    CHART = {
+        'BARS': 120,
+        'MA_PERIOD': 200,
+        'HEIGHT': 260,
+        'ENTRY_INTERVAL': 1.0,
+        'LOAD_INTERVAL': 5.0
+    }
+    HISTORY = {
+        'MAGIC': 123456
+    }
+
+from config import config
+from bar_aggregator import bar_feed
+from bar_window import bar_windows
+
+PRICE_MARGIN = 64  # pixels right of the candles for the price scale
+Entry = Tuple[int, float, bool]  # (open time in seconds, price, buy)
+
+
+def moving_average(close: np.ndarray, period: int, count: int) -> np.ndarray:
+    """Simple moving average of the last ``count`` closes; NaN where history is short"""
+    result = np.full(count, np.nan)
+    if len(close) < period:
+        return result
+    sums = np.cumsum(np.concatenate([[0.0], close]))
+    values = (sums[period:] - sums[:-period]) / period
+    values = values[-count:]
+    result[count - len(values):] = values
+    return result
+
+
+def strategy_entries(symbol: str, since: int) -> List[Entry]:
+    """Entries of the strategies' open positions and closed trades on a symbol since ``since``"""
+    from risk_service import risk_service
+    from trade_history import trade_history
+
+    entries = [(int(p.time), p.price_open, p.type == mt5.POSITION_TYPE_BUY)
+               for p in list(risk_service.positions.values())
+               if p.symbol == symbol and p.magic == HISTORY['MAGIC'] and p.time >= since]
+    trades = trade_history.closed_trades(datetime.fromtimestamp(since), symbol=symbol)
+    entries.extend(zip((trades['open_time_msc'] // 1000).tolist(), trades['open_price'].tolist(),
+                       trades['buy'].tolist()))
+    return entries
+
+
+class CandleChart:
+    """One symbol/timeframe chart drawn on a Tk canvas
+
+    Every candle is a wick line and a body rectangle that stay on the canvas.
+    ``refresh`` compares the newest bar of the shared window with what is
+    drawn: a changed forming bar only gets new coordinates for its two items
+    and the last-price line; a new bar moves all candles one slot left with a
+    single ``move`` on their tag, recycles the oldest candle's items for it and
+    redraws the MA line. Everything is redrawn only when the price leaves the
+    vertical range, the window is reloaded or the canvas is resized. Must be
+    used from the Tk main thread.
+    """
+
+    def __init__(self, parent: tk.Misc, symbol: str, timeframe: str,
+                 levels: Optional[Callable[[], Optional[Dict[float, float]]]] = None,
+                 entries: Optional[Callable[[str, int], List[Entry]]] = strategy_entries,
+                 bars: int = CHART['BARS'], ma_period: int = CHART['MA_PERIOD'],
+                 height: int = CHART['HEIGHT']):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.levels = levels
+        self.entries = entries
+        self.bars = bars
+        self.ma_period = ma_period
+        self.canvas = tk.Canvas(parent, bg=config.COLORS['bg_dark'], height=height,
+                                highlightthickness=0)
+        self.canvas.bind('<Configure>', lambda e: self.invalidate())
+
+        self.candles: deque = deque()  # (wick, body) item ids, oldest first
+        self.times = np.zeros(0, dtype=np.int64)
+        self.last: Optional[Tuple] = None  # (time, open, high, low, close) drawn last
+        self.low = self.high = 0.0
+        self.drawn_levels: Optional[Dict[float, float]] = None
+        self.entries_at = 0.0
+        self.dirty = True
+        self.redraws = 0  # full redraws
+        self.updates = 0  # last-candle updates
+
+    # Data
+    def window(self):
+        return bar_windows.window(self.symbol, self.timeframe, 1)
+
+    def read(self, n: int) -> Optional[np.ndarray]:
+        """Copy of the last ``n`` bars, taken under the window lock"""
+        return self.window().snapshot(n)
+
+    def newest(self) -> Optional[Tuple]:
+        window = self.window()
+        with window.lock:
+            if not len(window):
+                return None
+            bar = window.latest(1)
+            return (int(bar['time'][0]), float(bar['open'][0]), float(bar['high'][0]),
+                    float(bar['low'][0]), float(bar['close'][0]))
+
+    # Geometry
+    def step(self) -> float:
+        return max(1.0, (self.canvas.winfo_width() - PRICE_MARGIN) / self.bars)
+
+    def x(self, slot: float) -> float:
+        """Center of candle ``slot`` (0 = oldest visible)"""
+        return (slot + 0.5) * self.step()
+
+    def y(self, price: float) -> float:
+        height = self.canvas.winfo_height()
+        return height - 4 - (price - self.low) / (self.high - self.low or 1.0) * (height - 8)
+
+    def candle_coords(self, slot: int, bar) -> Tuple[List[float], List[float]]:
+        _, open_, high, low, close = bar
+        x = self.x(slot)
+        half = max(1.0, self.step() * 0.35)
+        top, bottom = self.y(max(open_, close)), self.y(min(open_, close))
+        return [x, self.y(high), x, self.y(low)], [x - half, top, x + half, max(bottom, top + 1)]
+
+    def draw_candle(self, slot: int, bar, items: Optional[Tuple[int, int]] = None) -> Tuple[int, int]:
+        wick, body = self.candle_coords(slot, bar)
+        color = config.COLORS['success'] if bar[4] >= bar[1] else config.COLORS['danger']
+        if items is None:
+            items = (self.canvas.create_line(*wick, fill=color, tags=('candle',)),
+                     self.canvas.create_rectangle(*body, fill=color, outline=color, tags=('candle',)))
+        else:
+            self.canvas.coords(items[0], *wick)
+            self.canvas.coords(items[1], *body)
+            self.canvas.itemconfigure(items[0], fill=color)
+            self.canvas.itemconfigure(items[1], fill=color, outline=color)
+        return items
+
+    # Drawing
+    def invalidate(self):
+        self.dirty = True
+
+    def redraw(self) -> bool:
+        """Draw everything from the window; False while it is empty"""
+        bars = self.read(self.bars + self.ma_period - 1)
+        if bars is None or self.canvas.winfo_width() <= PRICE_MARGIN:
+            return False
+        shown = bars[-self.bars:]
+        low, high = float(shown['low'].min()), float(shown['high'].max())
+        pad = (high - low) * 0.08 or high * 0.001 or 1.0
+        self.low, self.high = low - pad, high + pad
+
+        self.canvas.delete('all')
+        self.candles.clear()
+        for slot, bar in enumerate(zip(shown['time'].tolist(), shown['open'].tolist(), shown['high'].tolist(),
+                                       shown['low'].tolist(), shown['close'].tolist())):
+            self.candles.append(self.draw_candle(slot, bar))
+        self.times = shown['time'].astype(np.int64)
+        self.last = (int(shown['time'][-1]), float(shown['open'][-1]), float(shown['high'][-1]),
+                     float(shown['low'][-1]), float(shown['close'][-1]))
+
+        for price in (self.high - pad, self.low + pad):
+            self.canvas.create_text(self.canvas.winfo_width() - 4, self.y(price), text=f"{price:.5g}",
+                                    anchor="e", fill=config.COLORS['text_secondary'], font=("Consolas", 8))
+        self.canvas.create_line(0, 0, 0, 0, fill=config.COLORS['accent'], dash=(2, 2), tags=('last',))
+        self.canvas.create_text(0, 0, anchor="e", fill=config.COLORS['accent'], font=("Consolas", 8),
+                                tags=('last_text',))
+        self.canvas.create_text(4, 4, anchor="nw", text=f"{self.symbol} {self.timeframe}",
+                                fill=config.COLORS['text'], font=(config.UI['FONTS']['FAMILY'], 9, "bold"))
+        self.draw_ma(bars['close'])
+        self.drawn_levels = None
+        self.draw_levels()
+        self.draw_entries()
+        self.draw_last()
+        self.dirty = False
+        self.redraws += 1
+        return True
+
+    def draw_last(self):
+        y = self.y(self.last[4])
+        width = self.canvas.winfo_width()
+        self.canvas.coords('last', 0, y, width - PRICE_MARGIN, y)
+        self.canvas.coords('last_text', width - 4, y)
+        self.canvas.itemconfigure('last_text', text=f"{self.last[4]:.5g}")
+
+    def draw_ma(self, close: np.ndarray):
+        ma = moving_average(np.asarray(close, dtype=np.float64), self.ma_period, len(self.candles))
+        valid = np.flatnonzero(np.isfinite(ma))
+        self.canvas.delete('ma')
+        if len(valid) >= 2:
+            points = np.column_stack([[self.x(slot) for slot in valid],
+                                      [self.y(value) for value in ma[valid]]]).ravel().tolist()
+            self.canvas.create_line(*points, fill=config.COLORS['warning'], width=1, tags=('ma',))
+
+    def draw_levels(self):
+        levels = self.levels() if self.levels else None
+        if levels == self.drawn_levels:
+            return
+        self.canvas.delete('fib')
+        width = self.canvas.winfo_width() - PRICE_MARGIN
+        for level, price in (levels or {}).items():
+            if not self.low <= price <= self.high:
+                continue
+            y = self.y(price)
+            self.canvas.create_line(0, y, width, y, fill=config.COLORS['accent_hover'], dash=(4, 4),
+                                    tags=('fib',))
+            self.canvas.create_text(width - 2, y - 1, anchor="se", text=f"{level * 100:.1f}%",
+                                    fill=config.COLORS['accent_hover'], font=("Consolas", 8), tags=('fib',))
+        if self.candles:
+            self.canvas.tag_lower('fib', 'candle')
+        self.drawn_levels = dict(levels) if levels else None
+
+    def draw_entries(self):
+        self.entries_at = time.monotonic()
+        self.canvas.delete('entry')
+        if self.entries is None or not len(self.times):
+            return
+        try:
+            entries = self.entries(self.symbol, int(self.times[0]))
+        except Exception:
+            return
+        size = max(3.0, self.step() * 0.4)
+        for opened, price, buy in entries:
+            slot = int(np.searchsorted(self.times, opened, 'right')) - 1
+            if slot < 0:
+                continue
+            x, y = self.x(slot), self.y(price)
+            tip = y - size if buy else y + size
+            base = y + size if buy else y - size
+            self.canvas.create_polygon(x, tip, x - size, base, x + size, base, tags=('entry',),
+                                       fill=config.COLORS['success'] if buy else config.COLORS['danger'],
+                                       outline=config.COLORS['text'])
+
+    def shift(self, bar: Tuple) -> bool:
+        """Scroll one bar left for a new bar; False if a full redraw is needed instead"""
+        if len(self.times) < 2 or len(self.candles) < self.bars:
+            return False
+        bars = self.read(self.ma_period + self.bars - 1)
+        if bars is None or len(bars) < 2 or int(bars['time'][-2]) != self.last[0]:
+            return False
+        previous = tuple(float(bars[name][-2]) for name in ('open', 'high', 'low', 'close'))
+        if not self.in_range(bar) or not self.in_range((0,) + previous):
+            return False
+        self.canvas.move('candle', -self.step(), 0)
+        self.candles.append(self.candles.popleft())
+        self.times = np.append(self.times[1:], bar[0])
+        # The closed bar's final values, then the new bar in the recycled items
+        self.draw_candle(self.bars - 2, (self.last[0],) + previous, self.candles[-2])
+        self.draw_candle(self.bars - 1, bar, self.candles[-1])
+        self.last = bar
+        self.draw_ma(bars['close'])
+        self.draw_entries()
+        self.draw_last()
+        return True
+
+    def in_range(self, bar: Tuple) -> bool:
+        return self.low <= bar[3] and bar[2] <= self.high
+
+    def refresh(self):
+        """Bring the drawing up to date with the window (main thread, once per frame)"""
+        bar = self.newest()
+        if bar is None:
+            return
+        if self.dirty or self.last is None:
+            self.redraw()
+            return
+        if bar[0] != self.last[0]:
+            if not self.shift(bar):
+                self.redraw()
+                return
+        elif bar != self.last:
+            if not self.in_range(bar):
+                self.redraw()
+                return
+            self.draw_candle(len(self.candles) - 1, bar, self.candles[-1])
+            self.last = bar
+            self.draw_last()
+            self.updates += 1
+        self.draw_levels()
+        if time.monotonic() - self.entries_at >= CHART['ENTRY_INTERVAL']:
+            self.draw_entries()
+
+
+class ChartPanel:
+    """Frame of candlestick charts refreshed together once per UI frame
+
+    Charts read the bar windows the strategies keep up to date. When a window
+    holds fewer bars than a chart needs for its MA, the missing history is
+    loaded once in the background; later delta updates keep it that long.
+    """
+
+    def __init__(self, parent: tk.Misc, columns: int = 1, max_fps: float = config.UI['MAX_FPS']):
+        self.frame = tk.Frame(parent, bg=config.COLORS['bg_medium'])
+        self.columns = columns
+        self.interval_ms = max(1, int(1000 / max_fps))
+        self.charts: List[CandleChart] = []
+        self.loading: Dict[Tuple[str, str], float] = {}
+        self.after_id: Optional[str] = None
+
+    def add(self, symbol: str, timeframe: str, **options: Any) -> CandleChart:
+        chart = CandleChart(self.frame, symbol, timeframe, **options)
+        row, column = divmod(len(self.charts), self.columns)
+        chart.canvas.grid(row=row, column=column, sticky="nsew", padx=2, pady=2)
+        self.frame.grid_columnconfigure(column, weight=1)
+        self.frame.grid_rowconfigure(row, weight=1)
+        self.charts.append(chart)
+        return chart
+
+    def clear(self):
+        for chart in self.charts:
+            chart.canvas.destroy()
+        self.charts.clear()
+
+    def ensure_history(self, chart: CandleChart):
+        """Deepen a window that holds less than the chart needs, in the background"""
+        needed = chart.bars + chart.ma_period
+        window = chart.window()
+        key = (chart.symbol, chart.timeframe)
+        if window.requested >= needed or time.monotonic() - self.loading.get(key, 0) < CHART['LOAD_INTERVAL']:
+            return
+        self.loading[key] = time.monotonic()
+
+        def load():
+            bars = bar_feed.bars(chart.symbol, chart.timeframe, needed)
+            timeframe = getattr(mt5, f"TIMEFRAME_{chart.timeframe}", None)
+            if bars is None and timeframe is not None:
+                bars = mt5.copy_rates_from_pos(chart.symbol, timeframe, 0, needed)
+            if bars is not None and len(bars):
+                target = bar_windows.window(chart.symbol, chart.timeframe, needed)
+                target.load(bars, needed)
+                chart.invalidate()
+
+        threading.Thread(target=load, name='chart-history', daemon=True).start()
+
+    def refresh(self):
+        for chart in self.charts:
+            try:
+                self.ensure_history(chart)
+                chart.refresh()
+            except tk.TclError:
+                continue
+
+    def start(self):
+        """Start the frame loop; must be called from the Tk main thread"""
+        if self.after_id is None:
+            self.after_id = self.frame.after(self.interval_ms, self.run)
+
+    def run(self):
+        self.refresh()
+        self.after_id = self.frame.after(self.interval_ms, self.run)
+
+    def stop(self):
+        if self.after_id is not None:
+            try:
+                self.frame.after_cancel(self.after_id)
+            except tk.TclError:
+                pass  # application destroyed
+            self.after_id = None
+
+
+__all__ = ['ChartPanel', 'CandleChart', 'moving_average', 'strategy_entries']
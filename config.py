@@ -74,7 +74,11 @@ class Config:
         
     def save_user_config(self):
         """Save current configuration as user config"""
+        # Atomic write through the config service, which also hands the new
+        # snapshot to running strategies; unmanaged sections (strategy, symbols) are kept
+        from config_service import config_service
         config = {
+            **self.user_config,
             'trading': self.TRADING,
             'fibonacci': self.FIBONACCI,
             'analysis': self.ANALYSIS,
@@ -83,13 +87,10 @@ class Config:
             'logging': self.LOGGING
         }
         
-        config_path = os.path.join(current_dir, 'user_config.json')
-        try:
-            with open(config_path, 'w') as f:
-                json.dump(config, f, indent=4)
-            return True
-        except:
+        if not config_service.save(config):
             return False
+        self.user_config = config
+        return True
             
     def reset_to_defaults(self):
         """Reset configuration to default values"""
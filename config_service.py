@@ -0,0 +1,240 @@
+"""
+Configuration service for Future MT5 Pro Trading System
+Immutable, versioned snapshots of the defaults merged with user_config.json,
+reloaded by a file watcher and swapped atomically for running strategies
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Tuple, Callable, Mapping, NamedTuple
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from constants import (
+    TRADING, FIBONACCI, ANALYSIS, MARKET_HOURS, UI, LOGGING, STRATEGY
+)
+
+try:
+    from constants import CONFIG_SERVICE
+except ImportError:
+    CONFIG_SERVICE = {
+        'WATCH_INTERVAL': 1.0
+    }
+
+USER_CONFIG_PATH = os.path.join(current_dir, 'user_config.json')
+
+# Sections of user_config.json layered over their defaults
+DEFAULT_SECTIONS = {
+    'trading': TRADING,
+    'fibonacci': FIBONACCI,
+    'analysis': ANALYSIS,
+    'market_hours': MARKET_HOURS,
+    'ui': UI,
+    'logging': LOGGING,
+    'strategy': STRATEGY
+}
+
+
+def freeze(value):
+    """Read-only copy: dicts become mapping proxies and lists tuples"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    """Mutable copy of a frozen value"""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+class ConfigSnapshot(NamedTuple):
+    """One immutable configuration
+
+    ``sections`` maps section name -> read-only settings; ``symbols`` maps a
+    symbol to per-section overrides (``"symbols"`` in user_config.json), e.g.
+    ``{"EURUSD": {"analysis": {"RSI_OVERBOUGHT": 75}}}``.
+    """
+    version: int
+    sections: Mapping[str, Mapping[str, Any]]
+    symbols: Mapping[str, Mapping[str, Mapping[str, Any]]]
+    loaded_at: float
+
+    def section(self, name: str) -> Mapping[str, Any]:
+        return self.sections.get(name, MappingProxyType({}))
+
+    def value(self, section: str, key: str, symbol: Optional[str] = None, default=None):
+        """Setting of ``section``, with the symbol's override if it has one"""
+        if symbol is not None:
+            override = self.symbols.get(symbol, {}).get(section, {})
+            if key in override:
+                return override[key]
+        return self.section(section).get(key, default)
+
+
+def coerce(default, value):
+    """User value in the type of its default (the settings dialog saves numbers as floats)"""
+    if isinstance(default, bool) or isinstance(value, bool) or not isinstance(default, (int, float)):
+        return value
+    try:
+        return type(default)(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def merge_section(name: str, values: Dict[str, Any]) -> Dict[str, Any]:
+    defaults = DEFAULT_SECTIONS.get(name, {})
+    return {key: coerce(defaults.get(key), value) for key, value in values.items()}
+
+
+def build_snapshot(version: int, user_config: Dict[str, Any]) -> ConfigSnapshot:
+    sections = {
+        name: {**defaults, **merge_section(name, user_config.get(name, {}))}
+        for name, defaults in DEFAULT_SECTIONS.items()
+    }
+    symbols = {
+        symbol: {name: merge_section(name, values) for name, values in overrides.items()}
+        for symbol, overrides in user_config.get('symbols', {}).items()
+    }
+    return ConfigSnapshot(version, freeze(sections), freeze(symbols), time.time())
+
+
+def diff(old: ConfigSnapshot, new: ConfigSnapshot) -> List[Tuple[Optional[str], str, str]]:
+    """(symbol, section, key) of every setting that differs; symbol None for the defaults"""
+    changes = []
+    for name in set(old.sections) | set(new.sections):
+        before, after = old.section(name), new.section(name)
+        changes.extend((None, name, key) for key in set(before) | set(after)
+                       if before.get(key) != after.get(key))
+    for symbol in set(old.symbols) | set(new.symbols):
+        before, after = old.symbols.get(symbol, {}), new.symbols.get(symbol, {})
+        for name in set(before) | set(after):
+            keys = set(before.get(name, {})) | set(after.get(name, {}))
+            changes.extend((symbol, name, key) for key in keys
+                           if before.get(name, {}).get(key) != after.get(name, {}).get(key))
+    return sorted(changes, key=lambda c: (c[0] or '', c[1], c[2]))
+
+
+class ConfigService:
+    """Current ConfigSnapshot, reloaded when user_config.json changes
+
+    Readers take ``current`` without locking: a reload builds a complete new
+    snapshot and then replaces the reference in one assignment, so a reader
+    sees either the old or the new configuration, never a mix. A file that
+    fails to parse (e.g. half written by another editor) keeps the current
+    snapshot and is read again on the next check.
+    """
+
+    def __init__(self, path: str = USER_CONFIG_PATH,
+                 interval: float = CONFIG_SERVICE['WATCH_INTERVAL']):
+        self.path = path
+        self.interval = interval
+        self.signature = None
+        self.error: Optional[str] = None
+        self.listeners: List[Callable[[ConfigSnapshot, ConfigSnapshot], None]] = []
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.current = build_snapshot(0, {})
+        self.reload()
+
+    def file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def read(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError("configuration root must be an object")
+        return data
+
+    def reload(self) -> bool:
+        """Load the file into a new snapshot if it changed; True when swapped"""
+        with self.lock:
+            signature = self.file_signature()
+            if signature == self.signature and self.current.version:
+                return False
+            try:
+                user_config = self.read()
+            except (OSError, ValueError) as e:
+                self.error = str(e)
+                return False
+            self.signature = signature
+            self.error = None
+            old = self.current
+            new = build_snapshot(old.version + 1, user_config)
+            if old.version and not diff(old, new):
+                return False
+            self.current = new
+            listeners = list(self.listeners)
+
+        for listener in listeners:
+            try:
+                listener(old, new)
+            except Exception:
+                pass
+        return True
+
+    def save(self, user_config: Dict[str, Any]) -> bool:
+        """Write user_config.json atomically and swap in the new snapshot"""
+        temp = f"{self.path}.tmp"
+        try:
+            with open(temp, 'w') as f:
+                json.dump(user_config, f, indent=4)
+            os.replace(temp, self.path)
+        except OSError:
+            return False
+        self.reload()
+        return True
+
+    def subscribe(self, listener: Callable[[ConfigSnapshot, ConfigSnapshot], None]):
+        """Call ``listener(old, new)`` after every swap"""
+        with self.lock:
+            self.listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[ConfigSnapshot, ConfigSnapshot], None]):
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+
+        def run():
+            while not self.stop_event.wait(self.interval):
+                self.reload()
+
+        self.thread = threading.Thread(target=run, name='config-watcher', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
+
+
+# Global service; the watcher starts with the first strategy
+config_service = ConfigService()
+
+__all__ = ['config_service', 'ConfigService', 'ConfigSnapshot', 'build_snapshot', 'diff', 'freeze', 'thaw']
@@ -110,7 +110,28 @@ FIBONACCI = {
     'MIN_TREND': 2.0,  # minimum trend percentage
     'RETRACEMENT': [0.236, 0.382, 0.5, 0.618, 0.786],
     'EXTENSION': [1.272, 1.618, 2.0, 2.618],
-    'REVERSAL_ZONE': 0.1  # percentage zone around levels
+    'REVERSAL_ZONE': 0.1,  # percentage zone around levels
+    'ANCHORS': 10  # confirmed swing legs whose levels are indexed for confluence
+}
+
+# Per-strategy parameters of EstrategiaTrading; together with FIBONACCI
+# PERIOD/MIN_TREND, ANALYSIS RSI_* and TRADING RISK_PERCENT they are
+# hot-reloaded from user_config.json (also per symbol, under "symbols")
+STRATEGY = {
+    'FIB_LEVELS': [0.382, 0.5, 0.618],  # entry levels
+    'FIB_TP_LEVELS': [1.272, 1.618],  # take-profit levels
+    'USE_MA200': True,  # MA200 trend filter
+    'MAX_POSITIONS': 1,  # open positions per strategy (symbol and magic)
+    'MIN_RR_RATIO': 2.0,  # minimum risk/reward
+    'MIN_TIME_BETWEEN_TRADES': 30  # seconds between entries
+}
+
+# Swing points (ZigZag) used as Fibonacci anchors; same inputs as the terminal's ZigZag
+SWINGS = {
+    'DEPTH': 12,  # a swing must be the highest high / lowest low of this many bars
+    'DEVIATION': 5,  # points price must reverse from an extreme to confirm it
+    'BACKSTEP': 3,  # bars that must close after an extreme before it confirms
+    'HISTORY': 100  # confirmed swings kept per symbol and timeframe
 }
 
 # Market Hours (Brazil)
@@ -166,7 +187,8 @@ UI = {
         'SMALL': 5,
         'MEDIUM': 10,
         'LARGE': 20
-    }
+    },
+    'MAX_FPS': 20  # widget refreshes per second applied from the main loop
 }
 
 # Logging Configuration
@@ -175,6 +197,16 @@ LOGGING = {
     'AUTO_SCROLL': True,
     'TIMESTAMP_FORMAT': '%H:%M:%S.%f',
     'FILE_FORMAT': '%Y%m%d',
+    'BUFFER_LINES': 20000,  # records kept in memory by the log view
+    'INDEX_EVERY': 256,  # spill file index granularity (records)
+    'SPILL_BYTES': 64 * 1024 * 1024,  # spill file size before it is rotated (two generations kept)
+    'REFRESH_MS': 100,  # log view refresh interval
+    'MAX_FILE_BYTES': 10 * 1024 * 1024,  # rotate a log segment past this size
+    'ROTATE_DAILY': True,  # also rotate at midnight
+    'FLUSH_INTERVAL': 2.0,  # seconds between buffered log flushes
+    'BUFFER_BYTES': 64 * 1024,  # write buffer per log file
+    'COMPRESSION': 'zstd',  # closed segments; gzip if zstandard is missing
+    'RETENTION_DAYS': 30,  # delete compressed segments older than this
     'LEVELS': {
         'DEBUG': 10,
         'INFO': 20,
@@ -184,6 +216,153 @@ LOGGING = {
     }
 }
 
+# Headless Daemon
+DAEMON = {
+    'HOST': '127.0.0.1',  # control socket only listens locally
+    'PORT': 8765,
+    'PORTFOLIO': 'config/portfolio.json',
+    'LOG_ID': 'daemon',  # log file / journal id for daemon-level messages
+    'STOP_TIMEOUT': 15.0  # seconds stop waits for a strategy's loop to exit
+}
+
+# Risk Service
+RISK = {
+    'SYNC_INTERVAL': 1.0,  # seconds between positions/orders/account syncs
+    'MAX_AGE': 2.0,  # queries on an older snapshot sync inline first
+    'RETRY_BACKOFF': 1.0  # seconds queries keep the stale snapshot after a failed inline sync
+}
+
+# Trailing stop / break-even engine (distances in TRADING)
+POSITION_MANAGER = {
+    'INTERVAL': 0.5,  # seconds between passes over the open positions
+    'MIN_STEP': 5,  # minimum stop loss improvement in points worth a modification
+    'MAX_MODIFICATIONS_PER_SECOND': 5,  # stay within broker modification limits
+    'MAGIC': 123456,  # only positions opened by the strategies
+    'RETRY_BACKOFF': 5.0,  # seconds before a rejected stop is resent, doubled per rejection
+    'MAX_BACKOFF': 300.0  # longest wait before resending a rejected stop
+}
+
+# Paper trading (simulated fills on live data)
+PAPER = {
+    'BALANCE': 10000.0,  # starting balance of each paper account
+    'EXTRA_SPREAD': 0,  # points added to the live spread
+    'SLIPPAGE': 1.0,  # mean adverse slippage of market fills and stops, in points
+    'LIQUIDITY': 5.0,  # lots filled per request before the rest is cancelled (0 = unlimited)
+    'COMMISSION': 0.0,  # per lot and side, in account currency
+    'SEED': None  # slippage random seed, for reproducible runs
+}
+
+# Walk-forward optimization (walk_forward.py)
+WALK_FORWARD = {
+    'IN_SAMPLE_DAYS': 365,  # optimization window
+    'OUT_SAMPLE_DAYS': 90,  # validation window; windows advance by this much
+    'WINDOWS_PER_TASK': 4,  # windows of one symbol per pool task
+    'MIN_TRADES': 20,  # in-sample trades a parameter set needs to be selected
+    'YEARS': 5,  # history synced from the terminal
+    'GRID': {  # EstrategiaTrading parameters and the values tried
+        'fib_period': [20, 30, 50],
+        'min_trend_percent': [1.0, 2.0, 3.0],
+        'rsi_sobrecomprado': [65, 70, 75],
+        'rsi_sobrevendido': [25, 30, 35],
+        'min_rr_ratio': [1.5, 2.0, 3.0]
+    }
+}
+
+# Monte Carlo risk simulation (monte_carlo.py)
+MONTE_CARLO = {
+    'PATHS': 200000,  # resampled equity paths
+    'CHUNK': 10000,  # paths simulated per matrix (memory: CHUNK x trades floats)
+    'BLOCK': 5,  # trades per block for the block bootstrap
+    'RUIN_DRAWDOWN': 50.0,  # drawdown % counted as ruin
+    'MAX_DRAWDOWN': 20.0,  # drawdown % risk sizing guards against...
+    'PROBABILITY': 0.05,  # ...accepted with at most this probability
+    'RISK_STEPS': [0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 4.0, 5.0]  # risk % values tried when sizing
+}
+
+# Trade history and analytics (trade_history.py)
+HISTORY = {
+    'MAGIC': 123456,  # deals of positions opened with this magic number (None = all)
+    'DAYS': 365,  # history fetched on the first sync
+    'OVERLAP': 86400,  # seconds before the last deal fetched again on each sync
+    'INTERVAL': 60.0  # seconds between syncs
+}
+
+# Streaming export of logs, journal and trades (exporter.py)
+EXPORT = {
+    'CHUNK_ROWS': 50000  # rows held in memory and written per chunk (one Parquet row group)
+}
+
+# Candlestick chart panel (chart.py)
+CHART = {
+    'BARS': 120,  # candles shown per chart
+    'MA_PERIOD': 200,  # moving average drawn over the candles
+    'HEIGHT': 260,  # canvas height in pixels
+    'ENTRY_INTERVAL': 1.0,  # seconds between entry marker refreshes
+    'LOAD_INTERVAL': 5.0  # seconds between history loads for a short bar window
+}
+
+# Cross-symbol correlation exposure limit (correlation.py)
+CORRELATION = {
+    'TIMEFRAME': 'H1',  # bars whose log returns are correlated
+    'WINDOW': 100,  # returns in the rolling window
+    'THRESHOLD': 0.7,  # |correlation| from which two symbols count as correlated
+    'MAX_CORRELATED': 1,  # correlated same-way positions allowed before new entries are blocked
+    'INTERVAL': 5.0  # seconds between checks for newly closed bars
+}
+
+# Bar aggregation (higher timeframes built from one M1 feed per symbol)
+BARS = {
+    'CAPACITY': 1024,  # bars kept per symbol and timeframe
+    'MAX_AGE': 0.5,  # seconds before a symbol's M1 bars are pulled again
+    'POLL_BARS': 3,  # M1 bars requested per pull; more only after a gap
+    'SESSION_OFFSET': 0  # seconds added to bar boundaries (0 = terminal alignment)
+}
+
+# Event bus (change-driven updates)
+EVENTS = {
+    'MIN_INTERVAL': 0.1,  # poller interval while data keeps changing
+    'MAX_INTERVAL': 1.0,  # interval it backs off to while nothing changes
+    'QUEUE_SIZE': 256,  # events queued per subscription before the drop policy applies
+    'BLOCK_TIMEOUT': 0.5  # seconds a publisher waits on a full BLOCK subscription
+}
+
+# MT5 connection manager
+CONNECTION = {
+    'PROBE_INTERVAL': 1.0,  # seconds between terminal liveness probes
+    'BACKOFF_INITIAL': 0.5,  # first delay between reconnection attempts
+    'BACKOFF_MAX': 30.0,  # the delay doubles up to this
+    'HISTORY': 100  # outages kept for the reconnect timing summary
+}
+
+# Configuration hot reload
+CONFIG_SERVICE = {
+    'WATCH_INTERVAL': 1.0  # seconds between user_config.json checks
+}
+
+# Tick statistics (spread filter)
+TICK_STATS = {
+    'HALF_LIFE': 60.0,  # seconds for old ticks to count half
+    'SPREAD_BINS': 1024,  # spread histogram size in points; wider spreads share the last bin
+    'BLOWOUT_FACTOR': 3.0,  # entries wait while spread > factor x recent median
+    'MIN_TICKS': 50,  # ticks needed before the median is trusted
+    'POLL_INTERVAL': 0.25
+}
+
+# Strategy snapshots (warm restart)
+SNAPSHOTS = {
+    'INTERVAL': 30,  # seconds between periodic snapshots of a running strategy
+    'MAX_AGE_HOURS': 24  # older snapshots are ignored
+}
+
+# Startup
+STARTUP = {
+    'WORKERS': 4,  # warm-up tasks running concurrently behind the splash
+    'PREFETCH_SYMBOLS': 8,  # Market Watch symbols whose history is prefetched
+    'PREFETCH_TIMEFRAME': 'M15',
+    'PREFETCH_BARS': 200,  # matches the strategy's first request
+    'TASK_TIMEOUT': 20  # seconds before the splash gives up on a warm-up task
+}
+
 # Ensure all constants are exported
 __all__ = [
     'SYSTEM',
@@ -195,7 +374,26 @@ __all__ = [
     'TIMEFRAMES',
     'ANALYSIS',
     'FIBONACCI',
+    'STRATEGY',
+    'SWINGS',
     'MARKET_HOURS',
     'UI',
-    'LOGGING'
+    'LOGGING',
+    'DAEMON',
+    'RISK',
+    'BARS',
+    'POSITION_MANAGER',
+    'EVENTS',
+    'CONNECTION',
+    'CONFIG_SERVICE',
+    'TICK_STATS',
+    'SNAPSHOTS',
+    'STARTUP',
+    'PAPER',
+    'WALK_FORWARD',
+    'MONTE_CARLO',
+    'CORRELATION',
+    'HISTORY',
+    'EXPORT',
+    'CHART'
 ]
@@ -0,0 +1,288 @@
+"""
+Cross-symbol correlation for Future MT5 Pro Trading System
+Rolling covariance and correlation of bar returns across every active
+symbol, updated incrementally per closed bar, and the correlated-exposure
+check the strategies run before opening a position
+"""
+
+import os
+import sys
+import threading
+from typing import Dict, Any, Optional, List, Tuple, Iterable
+
+import numpy as np
+import MetaTrader5 as mt5
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import CORRELATION
+except ImportError:
+    CORRELATION = {
+        'TIMEFRAME': 'H1',
+        'WINDOW': 100,
+        'THRESHOLD': 0.7,
+        'MAX_CORRELATED': 1,
+        'INTERVAL': 5.0
+    }
+
+from bar_aggregator import bar_feed
+
+
+class RollingCorrelation:
+    """Covariance and correlation of the last ``window`` return vectors
+
+    Returns sit in a (window x symbols) ring, next to the running sums of
+    returns and of their outer products. A new bar adds its vector's outer
+    product and subtracts the one leaving the window, which is O(N^2) for N
+    symbols however long the window. The sums are recomputed exactly from the
+    ring once per ``window`` updates so rounding errors cannot accumulate.
+    A symbol without a bar at a time contributes a zero return.
+    """
+
+    def __init__(self, window: int = CORRELATION['WINDOW']):
+        self.window = window
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.returns = np.zeros((window, 0))
+        self.times = np.zeros(window, dtype=np.int64)
+        self.count = 0  # updates since the last load
+        self.sum = np.zeros(0)
+        self.products = np.zeros((0, 0))
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return min(self.count, self.window)
+
+    @property
+    def last_time(self) -> Optional[int]:
+        return int(self.times[(self.count - 1) % self.window]) if self.count else None
+
+    def ordered_times(self) -> np.ndarray:
+        """Times held, oldest first"""
+        n = len(self)
+        return self.times[(self.count - n + np.arange(n)) % self.window]
+
+    def recompute(self):
+        self.sum = self.returns.sum(axis=0)
+        self.products = self.returns.T @ self.returns
+
+    def load(self, times: np.ndarray, returns: np.ndarray, symbols: List[str]):
+        """Replace everything with a history of return vectors, oldest first"""
+        with self.lock:
+            times, returns = times[-self.window:], np.nan_to_num(returns[-self.window:])
+            self.symbols = list(symbols)
+            self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+            self.returns = np.zeros((self.window, len(self.symbols)))
+            self.times = np.zeros(self.window, dtype=np.int64)
+            self.returns[:len(returns)] = returns
+            self.times[:len(times)] = times
+            self.count = len(times)
+            self.recompute()
+
+    def add_symbol(self, symbol: str, returns: Optional[np.ndarray] = None):
+        """Add a column; ``returns`` are its values at ``ordered_times()``"""
+        with self.lock:
+            if symbol in self.index:
+                return
+            column = np.zeros(self.window)
+            if returns is not None:
+                n = len(self)
+                column[(self.count - n + np.arange(n)) % self.window] = np.nan_to_num(returns)
+            self.index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            self.returns = np.column_stack([self.returns, column])
+            self.recompute()
+
+    def update(self, time: int, returns: np.ndarray):
+        """Add one bar's return vector (in ``symbols`` order), dropping the oldest"""
+        with self.lock:
+            returns = np.nan_to_num(np.asarray(returns, dtype=np.float64))
+            slot = self.count % self.window
+            old = self.returns[slot]
+            self.sum += returns - old
+            self.products += np.outer(returns, returns) - np.outer(old, old)
+            self.returns[slot] = returns
+            self.times[slot] = time
+            self.count += 1
+            if self.count % self.window == 0:
+                self.recompute()
+
+    def covariance(self) -> np.ndarray:
+        with self.lock:
+            n = len(self)
+            if n < 2:
+                return np.full((len(self.symbols),) * 2, np.nan)
+            return (self.products - np.outer(self.sum, self.sum) / n) / (n - 1)
+
+    def correlation_matrix(self) -> np.ndarray:
+        covariance = self.covariance()
+        deviation = np.sqrt(np.clip(np.diag(covariance), 0, None))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return covariance / np.outer(deviation, deviation)
+
+    def correlations(self, symbol: str) -> Dict[str, float]:
+        """Correlation of ``symbol`` with every other symbol, in O(N)"""
+        with self.lock:
+            i = self.index.get(symbol)
+            n = len(self)
+            if i is None or n < 2:
+                return {}
+            mean = self.sum / n
+            covariance = (self.products[i] - n * mean[i] * mean) / (n - 1)
+            variance = (np.diag(self.products) - n * mean * mean) / (n - 1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = covariance / np.sqrt(np.clip(variance * variance[i], 0, None))
+            return {s: float(values[j]) for j, s in enumerate(self.symbols)
+                    if j != i and np.isfinite(values[j])}
+
+
+def bar_returns(bars: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(times, log returns) of a bar array, one per bar after the first"""
+    close = np.asarray(bars['close'], dtype=np.float64)
+    return np.asarray(bars['time'][1:], dtype=np.int64), np.diff(np.log(close))
+
+
+class CorrelationService:
+    """Keeps a RollingCorrelation of the watched symbols' closed bars
+
+    Symbols are added with ``watch`` (strategies watch their own; symbols of
+    open positions are watched when first checked). A background thread
+    backfills new symbols from their history and applies each newly closed
+    ``timeframe`` bar as one return vector across all symbols.
+    """
+
+    def __init__(self, timeframe: str = CORRELATION['TIMEFRAME'], window: int = CORRELATION['WINDOW'],
+                 threshold: float = CORRELATION['THRESHOLD'], max_correlated: int = CORRELATION['MAX_CORRELATED'],
+                 interval: float = CORRELATION['INTERVAL']):
+        self.timeframe = timeframe
+        self.threshold = threshold
+        self.max_correlated = max_correlated
+        self.interval = interval
+        self.matrix = RollingCorrelation(window)
+        self.pending: List[str] = []
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def watch(self, symbol: str):
+        with self.lock:
+            if symbol not in self.matrix.index and symbol not in self.pending:
+                self.pending.append(symbol)
+
+    def fetch(self, symbol: str, count: int) -> Optional[np.ndarray]:
+        """Last ``count`` bars, the forming one included"""
+        bars = bar_feed.bars(symbol, self.timeframe, count)
+        if bars is None:
+            bars = mt5.copy_rates_from_pos(symbol, getattr(mt5, f"TIMEFRAME_{self.timeframe}"), 0, count)
+        return bars
+
+    def backfill(self, symbol: str) -> bool:
+        bars = self.fetch(symbol, self.matrix.window + 2)
+        if bars is None or len(bars) < 3:
+            return False
+        times, returns = bar_returns(bars[:-1])
+        if not self.matrix.symbols:
+            self.matrix.load(times, returns[:, None], [symbol])
+            return True
+        held = self.matrix.ordered_times()
+        position = np.clip(np.searchsorted(times, held), 0, len(times) - 1)
+        aligned = np.where(times[position] == held, returns[position], 0.0)
+        self.matrix.add_symbol(symbol, aligned)
+        return True
+
+    def poll_once(self) -> bool:
+        """Backfill new symbols and apply newly closed bars; True if the matrix changed"""
+        changed = False
+        with self.lock:
+            pending = list(self.pending)
+        for symbol in pending:
+            if self.backfill(symbol):
+                changed = True
+                with self.lock:
+                    self.pending.remove(symbol)
+
+        symbols = list(self.matrix.symbols)
+        last = self.matrix.last_time
+        if not symbols or last is None:
+            return changed
+        new: Dict[int, np.ndarray] = {}
+        for j, symbol in enumerate(symbols):
+            bars = self.fetch(symbol, 4)
+            if bars is None or len(bars) < 3:
+                continue
+            times, returns = bar_returns(bars[:-1])
+            for t, r in zip(times.tolist(), returns.tolist()):
+                if t > last:
+                    new.setdefault(t, np.zeros(len(symbols)))[j] = r
+        for t in sorted(new):
+            self.matrix.update(t, new[t])
+            changed = True
+        return changed
+
+    def correlated(self, symbol: str, buy: bool,
+                   positions: Iterable[Tuple[str, bool]]) -> List[Tuple[str, float]]:
+        """Open positions adding to the risk of a new ``symbol`` position
+
+        A position counts when its return correlation with ``symbol`` is at
+        least ``threshold`` in absolute value and it moves the same way as the
+        new position would: same direction and positive correlation, or
+        opposite directions and negative correlation.
+        """
+        self.watch(symbol)
+        correlations = self.matrix.correlations(symbol)
+        result = []
+        for other, other_buy in positions:
+            if other == symbol:
+                continue
+            self.watch(other)
+            value = correlations.get(other)
+            if value is None or abs(value) < self.threshold:
+                continue
+            if (value > 0) == (other_buy == buy):
+                result.append((other, value))
+        return result
+
+    def allows(self, symbol: str, buy: bool, positions: Iterable[Tuple[str, bool]]) -> Tuple[bool, List[Tuple[str, float]]]:
+        """Whether a new position stays within ``max_correlated`` correlated positions"""
+        correlated = self.correlated(symbol, buy, positions)
+        return len(correlated) < self.max_correlated, correlated
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+
+        def run():
+            while not self.stop_event.is_set():
+                try:
+                    self.poll_once()
+                except Exception:
+                    pass
+                self.stop_event.wait(self.interval)
+
+        self.thread = threading.Thread(target=run, name='correlation', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'symbols': len(self.matrix.symbols),
+            'bars': len(self.matrix),
+            'last_time': self.matrix.last_time,
+            'pending': len(self.pending)
+        }
+
+
+# Global service; strategies watch their symbols and start it
+correlation_service = CorrelationService()
+
+__all__ = ['correlation_service', 'CorrelationService', 'RollingCorrelation', 'bar_returns']
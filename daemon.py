@@ -0,0 +1,484 @@
+"""
+Headless daemon for Future MT5 Pro Trading System
+Runs a portfolio of strategies without Tkinter, logging to files and the journal
+only, and accepts start/stop/status commands over a local socket
+"""
+
+import os
+import sys
+import json
+import socket
+import argparse
+import logging
+import time
+import threading
+import socketserver
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from constants import TIMEFRAMES, DAEMON
+from journal import Journal
+from log_files import LogFileManager, log_files, get_message_type
+
+
+class HeadlessLogSystem:
+    """Log sink for strategies running without a GUI
+
+    Provides the ``logar``/``log`` interface of LogSystem and TradingLogger but
+    writes to the rotating per-asset log files and the journal instead of widgets.
+    The files go through the process-wide ``log_files`` manager by default, so
+    a single writer rotates, compresses and prunes each asset's segments.
+    """
+
+    LEVELS = {
+        'success': logging.INFO,
+        'warning': logging.WARNING,
+        'error': logging.ERROR,
+        'header': logging.INFO,
+        'info': logging.INFO
+    }
+
+    def __init__(self, journal: Optional[Journal] = None, files: LogFileManager = log_files):
+        self.journal = journal
+        self.files = files
+
+    def get_file_logger(self, asset_id: str) -> logging.Logger:
+        """Return the file logger for an asset (one handler per asset)"""
+        return self.files.get_logger(asset_id, prefix='headless')
+
+    def logar(self, mensagem: str, asset: Optional[str] = None):
+        """Log a strategy message to the asset's file and journal"""
+        asset_id = asset or DAEMON['LOG_ID']
+        mensagem = mensagem.strip()
+        if not mensagem:
+            return
+
+        msg_type = get_message_type(mensagem)
+        self.get_file_logger(asset_id).log(self.LEVELS[msg_type], mensagem)
+
+        # Only outcomes go to the journal; analysis chatter stays in the files
+        if self.journal and msg_type in ('success', 'error'):
+            self.journal.record('log', asset, type=msg_type, message=mensagem)
+
+    def log(self, message: str, asset_id: Optional[str] = None, level: str = 'INFO'):
+        """TradingLogger compatible entry point"""
+        self.logar(message, asset_id)
+
+    def cleanup(self):
+        """Flush and close all file handlers"""
+        self.files.close()
+
+
+def load_portfolio(path: str, paper: bool = False) -> List[Dict[str, Any]]:
+    """Load portfolio entries of symbol, timeframe and lot from a JSON file
+
+    The file holds either a list of entries or an object with a
+    ``strategies`` list, e.g. ``[{"symbol": "EURUSD", "timeframe": "M15", "lot": 0.1}]``.
+    Paper entries (``"paper": true``, or all of them with ``paper``) may add a
+    ``variant`` name, fixed strategy ``params`` and a starting ``balance``, so
+    several variants of one symbol and timeframe can run side by side.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    entries = data.get('strategies', []) if isinstance(data, dict) else data
+    portfolio = []
+    seen = set()
+    for i, entry in enumerate(entries):
+        symbol = str(entry.get('symbol', '')).strip()
+        timeframe = str(entry.get('timeframe', 'M15')).strip().upper()
+        try:
+            lot = round(float(entry.get('lot', 0)), 2)
+        except (TypeError, ValueError):
+            lot = 0.0
+
+        if not symbol:
+            raise ValueError(f"Portfolio entry {i}: missing symbol")
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"Portfolio entry {i}: invalid timeframe {timeframe}")
+        if lot <= 0:
+            raise ValueError(f"Portfolio entry {i}: lot must be greater than zero")
+
+        is_paper = paper or bool(entry.get('paper', False))
+        variant = str(entry.get('variant', '')).strip()
+        params = entry.get('params', {})
+        if (variant or params) and not is_paper:
+            raise ValueError(f"Portfolio entry {i}: variant and params are for paper entries")
+        if not isinstance(params, dict):
+            raise ValueError(f"Portfolio entry {i}: params must be an object")
+
+        key = f"{symbol}_{timeframe}" + (f"_{variant}" if variant else '')
+        if key in seen:
+            raise ValueError(f"Portfolio entry {i}: duplicate {key}")
+        seen.add(key)
+        item = {'key': key, 'symbol': symbol, 'timeframe': timeframe, 'lot': lot}
+        if is_paper:
+            item.update(paper=True, params=params, balance=entry.get('balance'))
+        portfolio.append(item)
+    return portfolio
+
+
+class StrategyDaemon:
+    """Runs one EstrategiaTrading thread per portfolio entry"""
+
+    def __init__(self, portfolio: List[Dict[str, Any]], log_system: HeadlessLogSystem,
+                 journal: Optional[Journal] = None):
+        self.entries = {entry['key']: entry for entry in portfolio}
+        self.log_system = log_system
+        self.journal = journal
+        self.strategies: Dict[str, Any] = {}
+        self.threads: Dict[str, threading.Thread] = {}
+        self.started_at: Dict[str, datetime] = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def _select(self, key: Optional[str]) -> List[str]:
+        if key is None:
+            return list(self.entries)
+        if key not in self.entries:
+            raise KeyError(f"Unknown strategy {key}")
+        return [key]
+
+    def start(self, key: Optional[str] = None) -> List[str]:
+        """Start one strategy or every stopped strategy; returns started keys"""
+        from estrategia import EstrategiaTrading
+        from snapshots import snapshot_store
+
+        started = []
+        with self.lock:
+            for k in self._select(key):
+                if k in self.threads and self.threads[k].is_alive():
+                    if k not in self.strategies:
+                        # Stopped, but its loop outlived the stop timeout
+                        self.log_system.logar(f"⚠️ {k} ainda está parando; não foi reiniciado",
+                                              self.entries[k]['symbol'])
+                    continue
+                entry = self.entries[k]
+                if entry.get('paper'):
+                    from paper_trading import paper_broker, PaperEstrategia, VariantLogSystem
+                    try:
+                        estrategia = PaperEstrategia(
+                            entry['symbol'], entry['timeframe'], entry['lot'],
+                            VariantLogSystem(self.log_system, k),
+                            paper_broker.account(k, entry['balance']), entry['params']
+                        )
+                    except ValueError as e:
+                        self.log_system.logar(f"❌ Erro ao iniciar {k}: {e}", entry['symbol'])
+                        continue
+                else:
+                    estrategia = EstrategiaTrading(
+                        entry['symbol'], entry['timeframe'], entry['lot'], self.log_system,
+                        snapshots=snapshot_store
+                    )
+                thread = threading.Thread(target=estrategia.executar, name=k, daemon=True)
+                self.strategies[k] = estrategia
+                self.threads[k] = thread
+                self.started_at[k] = datetime.now()
+                thread.start()
+                started.append(k)
+                if self.journal:
+                    self.journal.record('strategy_started', entry['symbol'],
+                                        timeframe=entry['timeframe'], lot=entry['lot'],
+                                        paper=bool(entry.get('paper')))
+        return started
+
+    def stop(self, key: Optional[str] = None, timeout: float = DAEMON['STOP_TIMEOUT']) -> List[str]:
+        """Stop one strategy or all running strategies; returns stopped keys
+
+        Waits up to ``timeout`` for the strategies' loops to exit, so a start
+        right after (a restart) finds them gone.
+        """
+        stopped = []
+        with self.lock:
+            for k in self._select(key):
+                estrategia = self.strategies.pop(k, None)
+                if estrategia is None:
+                    continue
+                estrategia.parar()
+                self.started_at.pop(k, None)
+                stopped.append(k)
+                if self.journal:
+                    self.journal.record('strategy_stopped', self.entries[k]['symbol'],
+                                        timeframe=self.entries[k]['timeframe'])
+            threads = [self.threads[k] for k in stopped if k in self.threads]
+
+        # Joined outside the lock so status and other commands stay responsive
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        return stopped
+
+    def stopping(self, key: Optional[str] = None) -> List[str]:
+        """Stopped strategies whose loop has not exited yet"""
+        with self.lock:
+            return [k for k in self._select(key)
+                    if k not in self.strategies and k in self.threads and self.threads[k].is_alive()]
+
+    def status(self) -> Dict[str, Any]:
+        """Status of every portfolio entry"""
+        with self.lock:
+            result = {}
+            for k, entry in self.entries.items():
+                thread = self.threads.get(k)
+                running = k in self.strategies and thread is not None and thread.is_alive()
+                result[k] = {
+                    'symbol': entry['symbol'],
+                    'timeframe': entry['timeframe'],
+                    'lot': entry['lot'],
+                    'running': running,
+                    'stopping': k not in self.strategies and thread is not None and thread.is_alive(),
+                    'since': self.started_at[k].isoformat(timespec='seconds') if running else None,
+                    'ticket': getattr(self.strategies.get(k), 'ticket_atual', None)
+                }
+                if entry.get('paper'):
+                    # Report the variant's account without opening one for it
+                    from paper_trading import paper_broker
+                    account = paper_broker.names.get(k)
+                    result[k]['paper'] = account.summary() if account is not None else None
+            return result
+
+    def shutdown(self):
+        """Stop all strategies and release the main loop"""
+        self.stop()
+        self.stopped.set()
+
+    def handle_command(self, line: str) -> Dict[str, Any]:
+        """Execute a control command line such as ``stop EURUSD_M15``"""
+        parts = line.strip().split()
+        if not parts:
+            return {'ok': False, 'error': 'empty command'}
+
+        command = parts[0].lower()
+        key = parts[1] if len(parts) > 1 else None
+        try:
+            if command == 'start':
+                reply = {'ok': True, 'started': self.start(key)}
+                stopping = self.stopping(key)
+                if stopping:
+                    reply['stopping'] = stopping
+                return reply
+            elif command == 'stop':
+                return {'ok': True, 'stopped': self.stop(key)}
+            elif command == 'status':
+                return {'ok': True, 'strategies': self.status()}
+            elif command == 'history':
+                from trade_history import trade_history
+                return {'ok': True, 'stats': trade_history.stats(key or 'strategy'),
+                        'history': trade_history.summary()}
+            elif command == 'shutdown':
+                threading.Thread(target=self.shutdown, daemon=True).start()
+                return {'ok': True}
+            return {'ok': False, 'error': f"unknown command {command}"}
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+
+
+class ControlServer(socketserver.ThreadingTCPServer):
+    """Line-based JSON control socket bound to localhost"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, strategy_daemon: StrategyDaemon, host: str = DAEMON['HOST'],
+                 port: int = DAEMON['PORT']):
+        self.strategy_daemon = strategy_daemon
+        super().__init__((host, port), ControlHandler)
+
+
+class ControlHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw in self.rfile:
+            reply = self.server.strategy_daemon.handle_command(raw.decode('utf-8', 'replace'))
+            self.wfile.write((json.dumps(reply) + '\n').encode('utf-8'))
+
+
+def send_command(command: str, host: str = DAEMON['HOST'], port: int = DAEMON['PORT'],
+                 timeout: float = 5.0) -> Dict[str, Any]:
+    """Send a control command to a running daemon and return its reply"""
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall((command + '\n').encode('utf-8'))
+        reply = sock.makefile('r', encoding='utf-8').readline()
+    return json.loads(reply)
+
+
+def run_daemon(portfolio_path: str, host: str, port: int, autostart: bool = True,
+               processes: bool = False, paper: bool = False) -> int:
+    """Connect to MT5, start the portfolio and serve control commands until shutdown
+
+    With ``processes`` every strategy runs in its own worker process and a
+    single data-feed process owns the MT5 connection. With ``paper`` every
+    strategy trades a simulated account on live data.
+    """
+    from utils import initialize_mt5, cleanup_mt5
+
+    journal = Journal()
+    log_system = HeadlessLogSystem(journal)
+
+    try:
+        portfolio = load_portfolio(portfolio_path, paper)
+        if processes and any(entry.get('paper') for entry in portfolio):
+            raise ValueError("paper entries run in-process; remove --processes")
+    except (OSError, ValueError) as e:
+        log_system.logar(f"❌ Erro ao carregar portfólio {portfolio_path}: {e}")
+        print(f"❌ Error loading portfolio: {e}")
+        return 1
+
+    if processes:
+        from process_workers import MultiProcessDaemon
+        strategy_daemon = MultiProcessDaemon(portfolio, log_system, journal)
+        if not strategy_daemon.start_feed():
+            strategy_daemon.shutdown()
+            return 1
+    else:
+        success, message = initialize_mt5()
+        if not success:
+            log_system.logar(f"❌ {message}")
+            print(f"❌ {message}")
+            return 1
+        from risk_service import risk_service
+        from position_manager import PositionManager
+        from tick_stats import tick_monitor
+        from event_bus import feed_poller
+        from config_service import config_service
+        from correlation import correlation_service
+        from trade_history import trade_history
+        from mt5_connection import connection_manager, CONNECTED
+
+        def on_connection(state, outage=None):
+            if outage is not None:
+                journal.record('mt5_reconnected', downtime=round(outage.downtime, 3),
+                               attempts=outage.attempts, error=outage.error)
+                log_system.logar(f"✅ MT5 reconectado em {outage.downtime:.1f}s ({outage.attempts} tentativas)")
+            elif state != CONNECTED:
+                journal.record('mt5_disconnected')
+                log_system.logar("⚠️ Conexão com o MT5 perdida; estratégias pausadas até reconectar")
+
+        connection_manager.subscribe(on_connection)
+        connection_manager.start()
+        if any(entry.get('paper') for entry in portfolio):
+            from paper_trading import paper_broker
+
+            def on_paper_fill(fill):
+                journal.record('paper_fill', fill.symbol, account=fill.account, ticket=fill.ticket,
+                               buy=fill.buy, volume=fill.volume, price=fill.price,
+                               profit=round(fill.profit, 2), reason=fill.reason)
+
+            paper_broker.subscribe(on_paper_fill)
+            paper_broker.start()
+        risk_service.start()
+        tick_monitor.start()
+        feed_poller.start()
+        config_service.start()
+        trade_history.start()
+        position_manager = PositionManager(log_system=log_system)
+        position_manager.start()
+        strategy_daemon = StrategyDaemon(portfolio, log_system, journal)
+
+    server = None
+    result = 0
+    try:
+        server = ControlServer(strategy_daemon, host, port)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        journal.record('daemon_started', portfolio=portfolio_path, strategies=len(portfolio))
+        log_system.logar(f"✅ Daemon escutando em {host}:{port} com {len(portfolio)} estratégias")
+        if autostart:
+            strategy_daemon.start()
+
+        while not strategy_daemon.stopped.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        log_system.logar(f"❌ Erro ao abrir o socket de controle em {host}:{port}: {e}")
+        print(f"❌ Could not listen on {host}:{port}: {e}")
+        result = 1
+    finally:
+        if not strategy_daemon.stopped.is_set():
+            strategy_daemon.shutdown()
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        journal.record('daemon_stopped')
+        log_system.logar("🛑 Daemon encerrado")
+        if not processes:
+            position_manager.stop()
+            if any(entry.get('paper') for entry in portfolio):
+                paper_broker.stop()
+            feed_poller.stop()
+            config_service.stop()
+            correlation_service.stop()
+            trade_history.stop()
+            tick_monitor.stop()
+            risk_service.stop()
+            cleanup_mt5()
+        log_system.cleanup()
+        journal.close()
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        prog='future-mt5-daemon',
+        description='Run Future MT5 Pro strategies without a GUI'
+    )
+    parser.add_argument('--host', default=DAEMON['HOST'])
+    parser.add_argument('--port', type=int, default=DAEMON['PORT'])
+    commands = parser.add_subparsers(dest='command')
+
+    run_parser = commands.add_parser('run', help='run the daemon in the foreground')
+    run_parser.add_argument('portfolio', nargs='?', default=DAEMON['PORTFOLIO'])
+    run_parser.add_argument('--no-autostart', action='store_true',
+                            help='wait for a start command before trading')
+    run_parser.add_argument('--processes', action='store_true',
+                            help='run each strategy in its own process fed from shared memory')
+    run_parser.add_argument('--paper', action='store_true',
+                            help='fill orders on simulated accounts instead of sending them to MT5')
+
+    for name in ('start', 'stop'):
+        sub = commands.add_parser(name, help=f'{name} one strategy or all of them')
+        sub.add_argument('key', nargs='?', help='strategy key, e.g. EURUSD_M15')
+    commands.add_parser('status', help='show strategy status')
+    history_parser = commands.add_parser('history', help='show closed-trade statistics')
+    history_parser.add_argument('key', nargs='?', metavar='GROUP', choices=['strategy', 'symbol', 'magic'],
+                                help='group by strategy (default), symbol or magic number')
+    commands.add_parser('shutdown', help='stop all strategies and exit the daemon')
+
+    args = parser.parse_args(argv)
+    command = args.command or 'run'
+
+    if command == 'run':
+        portfolio = getattr(args, 'portfolio', DAEMON['PORTFOLIO'])
+        return run_daemon(portfolio, args.host, args.port,
+                          autostart=not getattr(args, 'no_autostart', False),
+                          processes=getattr(args, 'processes', False),
+                          paper=getattr(args, 'paper', False))
+
+    line = command if not getattr(args, 'key', None) else f"{command} {args.key}"
+    try:
+        reply = send_command(line, args.host, args.port)
+    except OSError as e:
+        print(f"❌ Could not reach daemon at {args.host}:{args.port}: {e}")
+        return 1
+    print(json.dumps(reply, indent=4))
+    return 0 if reply.get('ok') else 1
+
+
+__all__ = [
+    'HeadlessLogSystem',
+    'StrategyDaemon',
+    'ControlServer',
+    'load_portfolio',
+    'send_command',
+    'run_daemon',
+    'main'
+]
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,39 +4,105 @@ import time
 import threading
 from datetime import datetime
 
+try:
+    from constants import FIBONACCI, SNAPSHOTS, TRADING, WARNINGS
+except ImportError:
+    FIBONACCI = {
+        'RETRACEMENT': [0.236, 0.382, 0.5, 0.618, 0.786],
+        'EXTENSION': [1.272, 1.618, 2.0, 2.618],
+        'REVERSAL_ZONE': 0.1,
+        'ANCHORS': 10
+    }
+    SNAPSHOTS = {
+        'INTERVAL': 30
+    }
+    TRADING = {
+        'MAX_SPREAD': 50
+    }
+    WARNINGS = {
+        'HIGH_SPREAD': 'High spread detected'
+    }
+
+from bar_aggregator import bar_feed
+from bar_window import BarWindow, bar_windows
+from config_service import config_service, thaw
+from correlation import correlation_service
+from mt5_connection import connection_manager
+from event_bus import event_bus, feed_poller, TickEvent, LATEST
+from fib_levels import FibonacciLevels, level_matrix
+from risk_service import risk_service
+from swings import swing_tracker
+from tick_stats import tick_monitor
+
 
 class EstrategiaTrading:
-    def __init__(self, ativo, timeframe, lote_base, log_system):
+    # Barras pedidas a cada ciclo quando o buffer já está sincronizado
+    barras_delta = 5
+    # Intervalo mínimo entre análises; ticks que chegam nesse meio tempo se fundem
+    intervalo_analise = 1
+    # Espera máxima por um tick antes de reconferir se a estratégia foi parada
+    espera_eventos = 5
+
+    # Parâmetro -> (seção, chave) no snapshot de configuração
+    parametros_config = {
+        'fib_period': ('fibonacci', 'PERIOD'),  # Período para análise Fibonacci
+        'min_trend_percent': ('fibonacci', 'MIN_TREND'),  # Variação mínima para considerar tendência
+        'fib_levels': ('strategy', 'FIB_LEVELS'),  # Níveis de Fibonacci
+        'fib_tp_levels': ('strategy', 'FIB_TP_LEVELS'),  # Níveis para Take Profit
+        'rsi_period': ('analysis', 'RSI_PERIOD'),
+        'rsi_sobrecomprado': ('analysis', 'RSI_OVERBOUGHT'),
+        'rsi_sobrevendido': ('analysis', 'RSI_OVERSOLD'),
+        'use_ma200': ('strategy', 'USE_MA200'),  # Filtro de MM200
+        'risk_percent': ('trading', 'RISK_PERCENT'),  # Risco por operação
+        'max_positions': ('strategy', 'MAX_POSITIONS'),  # Máximo de operações simultâneas
+        'min_rr_ratio': ('strategy', 'MIN_RR_RATIO'),  # Risk/Reward mínimo
+        'min_time_between_trades': ('strategy', 'MIN_TIME_BETWEEN_TRADES')
+    }
+    # Parâmetros fixados pela instância (variantes de paper trading); o snapshot não os altera
+    parametros_fixos = {}
+    # Estado de indicador que deixa de valer quando o parâmetro muda
+    estado_dependente = {
+        'fib_levels': ('niveis_chave',),
+        'fib_tp_levels': ('niveis_chave',),
+        'rsi_period': ('rsi_estado',)
+    }
+
+    def __init__(self, ativo, timeframe, lote_base, log_system, snapshots=None):
         self.ativo = ativo
+        self.timeframe_nome = timeframe
         self.timeframe = self.converter_timeframe(timeframe)
         self.lote_base = float(lote_base)
         self.operando = True
         self.log_system = log_system
         self.ticket_atual = None
+        self.magic = 123456
         self.lock = threading.Lock()
         self.last_analysis_time = None
-        self.min_time_between_trades = 30
-
-        # Parâmetros Fibonacci
-        self.fib_period = 20  # Período para análise Fibonacci
-        self.min_trend_percent = 2.0  # Variação mínima para considerar tendência
-        self.fib_levels = [0.382, 0.5, 0.618]  # Níveis de Fibonacci
-        self.fib_tp_levels = [1.272, 1.618]  # Níveis para Take Profit
-
-        # Parâmetros de Confirmação
-        self.rsi_period = 14
-        self.rsi_sobrecomprado = 70
-        self.rsi_sobrevendido = 30
-        self.use_ma200 = True  # Filtro de MM200
-
-        # Gestão de Risco
-        self.risk_percent = 2.0  # Risco por operação
-        self.max_positions = 1  # Máximo de operações simultâneas
-        self.min_rr_ratio = 2.0  # Risk/Reward mínimo
-
-        self.saldo_inicial = mt5.account_info().balance
+
+        # Parâmetros Fibonacci, de confirmação e de risco vêm do snapshot de configuração
+        self.config_versao = None
+        self.aplicar_config(config_service.current)
+
+        # Sem conta ainda (sincronização falhou, feed do worker sem publicar): definido no primeiro ciclo com conta
+        conta = self.obter_conta()
+        self.saldo_inicial = conta.balance if conta is not None else None
         self.last_fib_data = None
         self.current_fib_levels = None
+        self.swings = None  # SwingDetector compartilhado do ativo/timeframe
+        self.niveis = None  # FibonacciLevels das âncoras atuais
+        self.niveis_chave = None
+
+        # Estado para reinício a quente
+        self.snapshots = snapshots
+        self.janela = None  # BarWindow compartilhada do ativo/timeframe, sincronizada por delta
+        self.espelho = None  # BarWindow própria com a cópia do ciclo, lida sem lock
+        self.rsi_estado = None  # médias de Wilder até a última barra fechada
+        self.ultimo_trade = None
+        self.ultimo_snapshot = 0
+        self.eventos = None
+        self.pausada = False  # sem conexão com o terminal
+        if self.snapshots is not None:
+            self.restaurar_snapshot()
 
     def converter_timeframe(self, tf):
         mapping = {
@@ -50,21 +116,179 @@ class EstrategiaTrading:
         }
         return mapping.get(tf, mt5.TIMEFRAME_M5)
 
+    # Acesso a dados e execução. Subclasses que não falam direto com o
+    # terminal (workers em processos separados) sobrescrevem estes métodos.
+    def aplicar_config(self, snapshot):
+        """Aplica um snapshot de configuração e descarta só o estado afetado pelo que mudou"""
+        mudancas = []
+        for atributo, (secao, chave) in self.parametros_config.items():
+            if atributo in self.parametros_fixos:
+                valor = self.parametros_fixos[atributo]
+            else:
+                valor = thaw(snapshot.value(secao, chave, self.ativo))
+            if self.config_versao is not None and getattr(self, atributo) != valor:
+                mudancas.append((atributo, getattr(self, atributo), valor))
+            setattr(self, atributo, valor)
+        self.config_versao = snapshot.version
+
+        for atributo, antes, depois in mudancas:
+            self.log_system.logar(f"ℹ️ Configuração v{snapshot.version}: {atributo} {antes} → {depois}", self.ativo)
+            for estado in self.estado_dependente.get(atributo, ()):
+                setattr(self, estado, None)
+        return mudancas
+
+    def obter_barras(self, quantidade):
+        """Retorna as últimas barras do ativo/timeframe
+
+        Vêm do agregador compartilhado do ativo, que monta todos os timeframes a
+        partir de um único feed M1; os que ele não atende são pedidos ao terminal.
+        """
+        barras = bar_feed.bars(self.ativo, self.timeframe_nome, quantidade)
+        if barras is None:
+            barras = mt5.copy_rates_from_pos(self.ativo, self.timeframe, 0, quantidade)
+        return barras
+
+    def obter_conta(self):
+        """Retorna as informações da conta (balance, equity), do cache do serviço de risco"""
+        return risk_service.account()
+
+    def obter_tick(self):
+        """Retorna o último tick do ativo"""
+        return mt5.symbol_info_tick(self.ativo)
+
+    def obter_info_simbolo(self):
+        """Retorna as especificações do ativo (point, volume_min)"""
+        return mt5.symbol_info(self.ativo)
+
+    def obter_total_posicoes(self):
+        """Retorna o número de posições abertas desta estratégia (ativo e magic)"""
+        return risk_service.position_count(self.ativo, self.magic)
+
+    def obter_posicoes_abertas(self):
+        """Retorna (ativo, compra) de todas as posições abertas da conta"""
+        return risk_service.open_positions()
+
+    def assinar_eventos(self):
+        """Assinatura dos ticks do ativo no barramento de eventos; None para ciclo fixo"""
+        feed_poller.start()
+        return event_bus.subscribe(TickEvent, symbols=[self.ativo], maxsize=1, policy=LATEST)
+
+    def aguardar_conexao(self):
+        """Pausa enquanto o terminal reconecta; False se a conexão ainda não voltou"""
+        if not connection_manager.wait_connected(timeout=0):
+            if not self.pausada:
+                self.pausada = True
+                self.log_system.logar("⚠️ Conexão com o MT5 perdida. Estratégia pausada até reconectar.", self.ativo)
+            if not connection_manager.wait_connected(timeout=self.espera_eventos):
+                return False
+        if self.pausada:
+            self.pausada = False
+            self.log_system.logar("✅ Conexão com o MT5 restabelecida. Retomando.", self.ativo)
+        return True
+
+    def obter_estatisticas_ticks(self):
+        """Retorna as estatísticas de ticks do ativo (TickStats) ou None se ainda não há"""
+        return tick_monitor.stats(self.ativo)
+
+    def enviar_ordem(self, request):
+        """Envia uma requisição de ordem e retorna o resultado"""
+        return mt5.order_send(request)
+
+    def obter_janela(self, quantidade):
+        """BarWindow do ativo/timeframe com espaço para ``quantidade`` barras"""
+        if self.janela is None or self.janela.capacity < quantidade:
+            self.janela = bar_windows.window(self.ativo, self.timeframe_nome, quantidade)
+        return self.janela
+
+    def copiar_barras(self, janela, quantidade):
+        """BarView das últimas barras copiadas sob o lock da janela para o espelho
+
+        Outras estratégias do mesmo ativo/timeframe escrevem na janela pelas
+        suas próprias threads; o espelho é só desta, reaproveita seus buffers a
+        cada ciclo e a view vale até a próxima cópia.
+        """
+        if self.espelho is None or self.espelho.capacity < quantidade or self.espelho.dtype != janela.dtype:
+            self.espelho = BarWindow(quantidade, janela.dtype)
+        barras = janela.copy_latest(self.espelho, quantidade)
+        return barras if len(barras) else None
+
+    @property
+    def barras(self):
+        """Últimas barras da janela (BarView do espelho) ou None se ainda vazia"""
+        if self.janela is None:
+            return None
+        return self.copiar_barras(self.janela, max(200, self.fib_period))
+
+    @barras.setter
+    def barras(self, barras):
+        if barras is None:
+            # Só desliga esta estratégia: a janela é compartilhada com as outras do ativo
+            self.janela = None
+        else:
+            self.obter_janela(max(200, self.fib_period)).load(barras)
+
+    def atualizar_barras(self):
+        """Sincroniza a janela de barras buscando só o que mudou desde o último ciclo
+
+        Retorna a BarView das barras copiadas para o espelho (ver ``copiar_barras``).
+        """
+        quantidade = max(200, self.fib_period)
+        janela = self.obter_janela(quantidade)
+        if len(janela) and quantidade <= janela.requested:
+            novas = self.obter_barras(self.barras_delta)
+            # Sobrepõe a janela no lugar: troca a barra em formação e anexa as novas
+            if novas is not None and len(novas) and janela.update(novas):
+                return self.copiar_barras(janela, quantidade)
+
+        # Janela vazia, mais curta que o pedido ou com lacuna maior que o delta: carga completa
+        novas = self.obter_barras(quantidade)
+        if novas is None:
+            return None
+        janela.load(novas, quantidade)
+        return self.copiar_barras(janela, quantidade)
+
+    def atualizar_swings(self, barras):
+        """Alimenta o detector de swings com as barras fechadas (a última ainda está em formação)"""
+        if self.swings is None:
+            info = self.obter_info_simbolo()
+            if info is None:
+                return
+            self.swings = swing_tracker.detector(self.ativo, self.timeframe_nome, info.point)
+        if self.swings.update(barras[:-1]):
+            ancoras = self.swings.anchors()
+            if ancoras:
+                self.log_system.logar(f"ℹ️ Novo swing confirmado | Topo: {ancoras[0]:.5f} | Fundo: {ancoras[1]:.5f}", self.ativo)
+
     def calcular_niveis_fibonacci(self, high, low, is_uptrend):
         """Calcula os níveis de Fibonacci"""
-        range_price = high - low
-        levels = {}
-        if is_uptrend:
-            for level in self.fib_levels:
-                levels[level] = high - (range_price * level)
-            for level in self.fib_tp_levels:
-                levels[level] = high + (range_price * (level - 1))
-        else:
-            for level in self.fib_levels:
-                levels[level] = low + (range_price * level)
-            for level in self.fib_tp_levels:
-                levels[level] = low - (range_price * (level - 1))
-        return levels
+        ratios = self.fib_levels + self.fib_tp_levels
+        precos = level_matrix([high], [low], [is_uptrend], ratios)[0]
+        return dict(zip(ratios, precos.tolist()))
+
+    def atualizar_niveis(self, trend, high, low):
+        """Índice de níveis da âncora atual (âncora 0) e das últimas pernas de swing
+
+        Só é reconstruído quando as âncoras mudam; entre uma mudança e outra as
+        consultas de proximidade são buscas binárias no índice.
+        """
+        versao = self.swings.version if self.swings is not None else None
+        chave = (trend, high, low, versao, tuple(self.fib_levels + self.fib_tp_levels))
+        if self.niveis is not None and self.niveis_chave == chave:
+            return self.niveis
+
+        highs, lows, uptrend = [high], [low], [trend == "ALTA"]
+        if self.swings is not None:
+            pernas = self.swings.legs(FIBONACCI['ANCHORS'])
+            highs += pernas[0].tolist()
+            lows += pernas[1].tolist()
+            uptrend += pernas[2].tolist()
+        ratios = sorted(set(FIBONACCI['RETRACEMENT'] + FIBONACCI['EXTENSION'] + self.fib_levels + self.fib_tp_levels))
+        self.niveis = FibonacciLevels(highs, lows, uptrend, ratios)
+        self.niveis_chave = chave
+
+        niveis_atuais = self.niveis.levels(0)
+        self.current_fib_levels = {level: niveis_atuais[level] for level in self.fib_levels + self.fib_tp_levels}
+        return self.niveis
 
     def identificar_tendencia(self, candles):
         """Identifica a tendência com base na variação percentual"""
@@ -76,15 +300,19 @@ class EstrategiaTrading:
         variacao = ((close[-1] - close[0]) / close[0]) * 100
 
         # Verificar direção dos candles
-        uptrend_candles = sum(1 for i in range(1, len(close)) if close[i] > close[i - 1])
+        uptrend_candles = np.count_nonzero(close[1:] > close[:-1])
         trend_strength = uptrend_candles / (len(close) - 1)
 
         self.log_system.logar(f"ℹ️ Variação: {variacao:.2f}% | Força da Tendência: {trend_strength:.2f}", self.ativo)
 
+        # Âncoras: último topo e fundo confirmados; sem swings ainda, extremos da janela
+        ancoras = self.swings.anchors() if self.swings is not None else None
+        topo, fundo = ancoras if ancoras else (high.max(), low.min())
+
         if variacao > self.min_trend_percent and trend_strength > 0.6:
-            return "ALTA", max(high), min(low)
+            return "ALTA", topo, fundo
         elif variacao < -self.min_trend_percent and trend_strength < 0.4:
-            return "BAIXA", max(high), min(low)
+            return "BAIXA", topo, fundo
         return "LATERAL", None, None
 
     def verificar_ma200(self, candles, trend):
@@ -101,26 +329,55 @@ class EstrategiaTrading:
             return close[-1] < ma200
         return False
 
+    def iniciar_servicos(self):
+        """Inicia os serviços do processo usados pela estratégia (config e correlação)"""
+        config_service.start()
+        correlation_service.watch(self.ativo)
+        correlation_service.start()
+
+    def verificar_correlacao(self, tipo):
+        """(permitido, correlacionadas) de uma nova posição frente às posições abertas"""
+        return correlation_service.allows(self.ativo, tipo == "COMPRA", self.obter_posicoes_abertas())
+
     def executar(self):
         self.log_system.logar(f"🚀 Iniciando estratégia Fibonacci para {self.ativo}", self.ativo)
-        while self.operando:
-            try:
-                with self.lock:
-                    self.analisar_e_operar()
-                time.sleep(1)
-            except Exception as e:
-                self.log_system.logar(f"❌ Erro na estratégia: {str(e)}", self.ativo)
-                time.sleep(10)
+        self.eventos = self.assinar_eventos()
+        self.iniciar_servicos()
+        try:
+            while self.operando:
+                try:
+                    # Troca de configuração: leitura sem lock do snapshot atual
+                    snapshot = config_service.current
+                    if snapshot.version != self.config_versao:
+                        with self.lock:
+                            self.aplicar_config(snapshot)
+
+                    if not self.aguardar_conexao():
+                        continue
+
+                    # Só analisa quando o preço muda; sem ticks, espera sem consumir CPU
+                    if self.eventos is not None and self.eventos.get(timeout=self.espera_eventos) is None:
+                        continue
+                    with self.lock:
+                        self.analisar_e_operar()
+                    if time.time() - self.ultimo_snapshot >= SNAPSHOTS['INTERVAL']:
+                        self.salvar_snapshot()
+                    time.sleep(self.intervalo_analise)
+                except Exception as e:
+                    self.log_system.logar(f"❌ Erro na estratégia: {str(e)}", self.ativo)
+                    time.sleep(10)
+        finally:
+            if self.eventos is not None:
+                event_bus.unsubscribe(self.eventos)
 
     def analisar_e_operar(self):
         try:
             # Carregar dados
-            barras = mt5.copy_rates_from_pos(self.ativo, self.timeframe, 0, max(200, self.fib_period))
+            barras = self.atualizar_barras()
             if barras is None or len(barras) < 200:
                 self.log_system.logar(f"❌ Erro: Dados insuficientes para {self.ativo}", self.ativo)
                 return
-
-            barras = np.array(barras)
+            self.atualizar_swings(barras)
 
             # Identificar tendência
             self.log_system.logar("\n=== ℹ️ ANÁLISE DE TENDÊNCIA ===", self.ativo)
@@ -128,7 +385,7 @@ class EstrategiaTrading:
 
             if trend != "LATERAL":
                 # Calcular níveis Fibonacci
-                self.current_fib_levels = self.calcular_niveis_fibonacci(high, low, trend == "ALTA")
+                niveis = self.atualizar_niveis(trend, high, low)
                 self.log_system.logar(f"📈 Tendência: {trend}", self.ativo)
                 self.log_system.logar(f"ℹ️ Níveis Fibonacci:", self.ativo)
                 for level, price in self.current_fib_levels.items():
@@ -137,33 +394,33 @@ class EstrategiaTrading:
                 # Análise de entrada
                 self.log_system.logar("\n=== ℹ️ ANÁLISE DE ENTRADA ===", self.ativo)
                 preco_atual = barras['close'][-1]
-                rsi = self.calcular_rsi(barras['close'])
+                rsi = self.atualizar_rsi(barras)
 
                 # Verificar MA200
                 ma_filter = self.verificar_ma200(barras, trend)
                 self.log_system.logar(f"ℹ️ Filtro MM200: {'✅ Passou' if ma_filter else '❌ Não passou'}", self.ativo)
 
-                # Verificar entradas
-                for level in self.fib_levels:
-                    fib_price = self.current_fib_levels[level]
-                    price_diff_percent = abs((preco_atual - fib_price) / fib_price) * 100
-
-                    if price_diff_percent < 0.1:  # Próximo ao nível (0.1%)
-                        self.log_system.logar(f"🎯 Preço próximo ao nível {level * 100:.1f}%", self.ativo)
-
-                        if trend == "ALTA" and rsi[-1] < self.rsi_sobrevendido and ma_filter:
-                            self.log_system.logar("✅ Condições de COMPRA atendidas:", self.ativo)
-                            self.log_system.logar(f"  - RSI: {rsi[-1]:.2f} (< {self.rsi_sobrevendido})", self.ativo)
-                            self.processar_entrada("COMPRA", preco_atual, fib_price, self.current_fib_levels)
-
-                        elif trend == "BAIXA" and rsi[-1] > self.rsi_sobrecomprado and ma_filter:
-                            self.log_system.logar("✅ Condições de VENDA atendidas:", self.ativo)
-                            self.log_system.logar(f"  - RSI: {rsi[-1]:.2f} (> {self.rsi_sobrecomprado})", self.ativo)
-                            self.processar_entrada("VENDA", preco_atual, fib_price, self.current_fib_levels)
-
-                if not any(
-                        abs((preco_atual - self.current_fib_levels[level]) / self.current_fib_levels[level]) * 100 < 0.1
-                        for level in self.fib_levels):
+                # Verificar entradas: níveis de entrada da âncora atual próximos ao preço
+                proximos = niveis.within(preco_atual, FIBONACCI['REVERSAL_ZONE'], anchor=0, ratios=self.fib_levels)
+                for fib_price, _, level in proximos:
+                    self.log_system.logar(f"🎯 Preço próximo ao nível {level * 100:.1f}%", self.ativo)
+                    zona = niveis.zone_at(fib_price)
+                    if zona is not None:
+                        self.log_system.logar(
+                            f"🎯 Confluência de {zona['anchors']} âncoras entre {zona['low']:.5f} e {zona['high']:.5f}",
+                            self.ativo)
+
+                    if trend == "ALTA" and rsi[-1] < self.rsi_sobrevendido and ma_filter:
+                        self.log_system.logar("✅ Condições de COMPRA atendidas:", self.ativo)
+                        self.log_system.logar(f"  - RSI: {rsi[-1]:.2f} (< {self.rsi_sobrevendido})", self.ativo)
+                        self.processar_entrada("COMPRA", preco_atual, fib_price, self.current_fib_levels)
+
+                    elif trend == "BAIXA" and rsi[-1] > self.rsi_sobrecomprado and ma_filter:
+                        self.log_system.logar("✅ Condições de VENDA atendidas:", self.ativo)
+                        self.log_system.logar(f"  - RSI: {rsi[-1]:.2f} (> {self.rsi_sobrecomprado})", self.ativo)
+                        self.processar_entrada("VENDA", preco_atual, fib_price, self.current_fib_levels)
+
+                if not proximos:
                     self.log_system.logar("⚠️ Aguardando preço atingir nível Fibonacci", self.ativo)
             else:
                 self.log_system.logar("⚠️ Sem tendência definida. Aguardando movimento direcional.", self.ativo)
@@ -173,7 +430,11 @@ class EstrategiaTrading:
 
     def processar_entrada(self, tipo, preco_atual, fib_level, fib_levels):
         """Processa uma entrada de trade"""
-        if not self.verificar_risco_posicao():
+        if self.ultimo_trade is not None and time.time() - self.ultimo_trade < self.min_time_between_trades:
+            self.log_system.logar("⚠️ Aguardando intervalo mínimo entre operações", self.ativo)
+            return
+
+        if not self.verificar_risco_posicao(tipo):
             return
 
         # Calcular SL e TP baseados nos níveis de Fibonacci
@@ -203,8 +464,8 @@ class EstrategiaTrading:
         else:
             self.log_system.logar(f"⚠️ RR muito baixo: {tp_distance / sl_distance:.2f}", self.ativo)
 
-    def calcular_rsi(self, close, period=14):
-        """Calcula o RSI"""
+    def calcular_medias_rsi(self, close, period=14):
+        """Médias de Wilder (ganho, perda) ao fim da série"""
         delta = np.diff(close)
         gain = np.where(delta > 0, delta, 0)
         loss = np.where(delta < 0, -delta, 0)
@@ -216,36 +477,118 @@ class EstrategiaTrading:
             avg_gain = (avg_gain * (period - 1) + gain[i]) / period
             avg_loss = (avg_loss * (period - 1) + loss[i]) / period
 
+        return avg_gain, avg_loss
+
+    @staticmethod
+    def rsi_das_medias(avg_gain, avg_loss):
         rs = avg_gain / avg_loss if avg_loss != 0 else 0
-        rsi = 100 - (100 / (1 + rs))
-        return np.array([rsi])
+        return 100 - (100 / (1 + rs))
+
+    def calcular_rsi(self, close, period=14):
+        """Calcula o RSI"""
+        avg_gain, avg_loss = self.calcular_medias_rsi(close, period)
+        return np.array([self.rsi_das_medias(avg_gain, avg_loss)])
+
+    def atualizar_rsi(self, barras):
+        """RSI incremental: avança as médias só sobre barras fechadas novas
+
+        A última barra ainda está em formação, então entra no cálculo sem
+        alterar o estado guardado.
+        """
+        period = self.rsi_period
+        fechadas = barras[:-1]
+        estado = self.rsi_estado
+        inicio = None
+        if estado is not None:
+            inicio = np.searchsorted(fechadas['time'], estado['time'])
+            if inicio >= len(fechadas) or fechadas['time'][inicio] != estado['time']:
+                inicio = None
+
+        if inicio is None:
+            avg_gain, avg_loss = self.calcular_medias_rsi(fechadas['close'], period)
+        else:
+            avg_gain, avg_loss = estado['avg_gain'], estado['avg_loss']
+            anterior = estado['close']
+            for close in fechadas['close'][inicio + 1:]:
+                delta = close - anterior
+                avg_gain = (avg_gain * (period - 1) + max(delta, 0)) / period
+                avg_loss = (avg_loss * (period - 1) + max(-delta, 0)) / period
+                anterior = close
+
+        self.rsi_estado = {
+            'time': int(fechadas['time'][-1]),
+            'close': float(fechadas['close'][-1]),
+            'avg_gain': float(avg_gain),
+            'avg_loss': float(avg_loss)
+        }
 
-    def verificar_risco_posicao(self):
+        delta = barras['close'][-1] - fechadas['close'][-1]
+        avg_gain = (avg_gain * (period - 1) + max(delta, 0)) / period
+        avg_loss = (avg_loss * (period - 1) + max(-delta, 0)) / period
+        return np.array([self.rsi_das_medias(avg_gain, avg_loss)])
+
+    def verificar_risco_posicao(self, tipo=None):
         """Verifica se pode abrir nova posição"""
-        if mt5.positions_total() >= self.max_positions:
+        if self.obter_total_posicoes() >= self.max_positions:
             self.log_system.logar("⚠️ Máximo de posições atingido", self.ativo)
             return False
 
-        saldo_atual = mt5.account_info().equity
-        drawdown = (self.saldo_inicial - saldo_atual) / self.saldo_inicial * 100
+        conta = self.obter_conta()
+        if conta is None:
+            self.log_system.logar("⚠️ Informações da conta indisponíveis", self.ativo)
+            return False
+        if not self.saldo_inicial:
+            self.saldo_inicial = conta.balance
+        drawdown = (self.saldo_inicial - conta.equity) / self.saldo_inicial * 100
 
         if drawdown > self.risk_percent:
             self.log_system.logar(f"⚠️ Drawdown máximo atingido: {drawdown:.2f}%", self.ativo)
             return False
 
+        if tipo is not None:
+            permitido, correlacionadas = self.verificar_correlacao(tipo)
+            if not permitido:
+                ativos = ", ".join(f"{ativo} ({corr:+.2f})" for ativo, corr in correlacionadas)
+                self.log_system.logar(f"⚠️ Exposição correlacionada máxima atingida: {ativos}", self.ativo)
+                return False
+
+        return True
+
+    def verificar_spread(self, spread):
+        """Bloqueia entradas com spread acima do máximo ou em disparo"""
+        if spread > TRADING['MAX_SPREAD']:
+            self.log_system.logar(
+                f"⚠️ {WARNINGS['HIGH_SPREAD']}: {spread:.0f} pontos (máximo {TRADING['MAX_SPREAD']})", self.ativo)
+            return False
+
+        stats = self.obter_estatisticas_ticks()
+        if stats is not None and stats.is_blowout(spread):
+            self.log_system.logar(
+                f"⚠️ {WARNINGS['HIGH_SPREAD']}: {spread:.0f} pontos, mediana recente "
+                f"{stats.spread_quantile(0.5):.0f}. Entrada adiada", self.ativo)
+            return False
+
         return True
 
     def abrir_ordem(self, tipo_ordem, sl_distance, tp_distance):
         """Abre uma ordem no mercado"""
-        tick = mt5.symbol_info_tick(self.ativo)
+        tick = self.obter_tick()
         preco = tick.ask if tipo_ordem == mt5.ORDER_TYPE_BUY else tick.bid
-        point = mt5.symbol_info(self.ativo).point
+        info = self.obter_info_simbolo()
+        point = info.point
+
+        if not self.verificar_spread((tick.ask - tick.bid) / point):
+            return
 
         # Calcular volume baseado no risco percentual
-        saldo = mt5.account_info().equity
+        conta = self.obter_conta()
+        if conta is None:
+            self.log_system.logar("⚠️ Informações da conta indisponíveis", self.ativo)
+            return
+        saldo = conta.equity
         risco_valor = saldo * (self.risk_percent / 100)
         volume = risco_valor / (sl_distance * point)
-        volume = round(max(mt5.symbol_info(self.ativo).volume_min, volume), 2)
+        volume = round(max(info.volume_min, volume), 2)
 
         sl = preco - sl_distance * point if tipo_ordem == mt5.ORDER_TYPE_BUY else preco + sl_distance * point
         tp = preco + tp_distance * point if tipo_ordem == mt5.ORDER_TYPE_BUY else preco - tp_distance * point
@@ -259,22 +602,86 @@ class EstrategiaTrading:
             "sl": sl,
             "tp": tp,
             "deviation": 10,
-            "magic": 123456,
+            "magic": self.magic,
             "comment": "Fibonacci Strategy",
             "type_time": mt5.ORDER_TIME_GTC,
             "type_filling": mt5.ORDER_FILLING_IOC,
         }
 
-        resultado = mt5.order_send(request)
+        resultado = self.enviar_ordem(request)
 
-        if resultado.retcode != mt5.TRADE_RETCODE_DONE:
+        if resultado.retcode not in (mt5.TRADE_RETCODE_DONE, mt5.TRADE_RETCODE_DONE_PARTIAL):
             self.log_system.logar(f"❌ Erro ao enviar ordem: {resultado.comment}", self.ativo)
         else:
             self.ticket_atual = resultado.order
-            self.log_system.logar(f"✅ Ordem executada: {volume} lotes", self.ativo)
+            self.ultimo_trade = time.time()
+            risk_service.invalidate()
+            # Preenchimento parcial (IOC): o restante foi cancelado
+            executado = resultado.volume if resultado.retcode == mt5.TRADE_RETCODE_DONE_PARTIAL else volume
+            self.log_system.logar(f"✅ Ordem executada: {executado} lotes", self.ativo)
+            self.salvar_snapshot()
+
+    # Reinício a quente
+    def chave_snapshot(self):
+        return f"{self.ativo}_{self.timeframe_nome}"
+
+    def exportar_estado(self):
+        """Estado necessário para retomar a estratégia sem recomeçar do zero"""
+        estado = {
+            'ativo': self.ativo,
+            'timeframe': self.timeframe_nome,
+            'rsi_estado': self.rsi_estado,
+            'rsi_period': self.rsi_period,
+            'fib_levels': [[nivel, preco] for nivel, preco in (self.current_fib_levels or {}).items()],
+            'ticket_atual': self.ticket_atual,
+            'saldo_inicial': self.saldo_inicial,
+            'ultimo_trade': self.ultimo_trade
+        }
+        barras = self.barras
+        if barras is not None:
+            estado['barras'] = barras.to_array()
+        return estado
+
+    def restaurar_estado(self, estado):
+        """Aplica um estado exportado; o saldo inicial só vale no mesmo dia"""
+        self.barras = estado.get('barras')
+        self.rsi_estado = estado.get('rsi_estado')
+        if estado.get('rsi_period', self.rsi_period) != self.rsi_period:
+            # Médias salvas com outro período não servem
+            self.rsi_estado = None
+        self.current_fib_levels = {float(n): float(p) for n, p in estado.get('fib_levels', [])} or None
+        self.ticket_atual = estado.get('ticket_atual')
+        self.ultimo_trade = estado.get('ultimo_trade')
+
+        salvo_em = datetime.fromtimestamp(estado.get('_saved_at', 0))
+        if salvo_em.date() == datetime.now().date() and estado.get('saldo_inicial'):
+            self.saldo_inicial = estado['saldo_inicial']
+
+    def salvar_snapshot(self):
+        if self.snapshots is None:
+            return
+        try:
+            self.snapshots.save(self.chave_snapshot(), self.exportar_estado())
+            self.ultimo_snapshot = time.time()
+        except OSError as e:
+            self.log_system.logar(f"⚠️ Falha ao salvar snapshot: {str(e)}", self.ativo)
+
+    def restaurar_snapshot(self):
+        estado = self.snapshots.load(self.chave_snapshot())
+        if estado is None:
+            return False
+        self.restaurar_estado(estado)
+        barras = 0 if self.barras is None else len(self.barras)
+        saldo = "indisponível" if self.saldo_inicial is None else f"{self.saldo_inicial:.2f}"
+        self.log_system.logar(f"ℹ️ Estado restaurado: {barras} barras, saldo inicial {saldo}", self.ativo)
+        return True
 
     def parar(self):
         """Para a execução da estratégia"""
         with self.lock:
             self.operando = False
             self.log_system.logar(f"🛑 Parando estratégia para {self.ativo}", self.ativo)
+            self.salvar_snapshot()
+        if self.eventos is not None:
+            # Acorda o laço que espera por ticks
+            self.eventos.close()
@@ -0,0 +1,355 @@
+"""
+Event bus for Future MT5 Pro Trading System
+In-process publish/subscribe of market and account changes: one poller
+detects what changed and subscribers block on bounded queues until it does
+"""
+
+import os
+import sys
+import threading
+from collections import deque, OrderedDict
+from typing import Dict, Any, Optional, List, Tuple, NamedTuple, Iterable
+
+import MetaTrader5 as mt5
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import EVENTS
+except ImportError:
+    EVENTS = {
+        'MIN_INTERVAL': 0.1,
+        'MAX_INTERVAL': 1.0,
+        'QUEUE_SIZE': 256,
+        'BLOCK_TIMEOUT': 0.5
+    }
+
+from risk_service import risk_service
+
+
+# Events
+class TickEvent(NamedTuple):
+    symbol: str
+    time_msc: int
+    bid: float
+    ask: float
+    last: float
+    volume: int
+
+
+class BarEvent(NamedTuple):
+    """A new bar opened; the bar at ``closed_time`` is final"""
+    symbol: str
+    timeframe: str
+    time: int
+    closed_time: int
+
+
+class AccountEvent(NamedTuple):
+    balance: float
+    equity: float
+    margin: float
+    margin_free: float
+    profit: float
+
+
+class PositionsEvent(NamedTuple):
+    """Positions were opened, closed or had volume/SL/TP changed"""
+    count: int
+    tickets: Tuple[int, ...]
+
+
+class ConnectionEvent(NamedTuple):
+    connected: bool
+
+
+class MarketHoursEvent(NamedTuple):
+    open: bool
+
+
+# Drop policies of a full subscription queue
+DROP_OLDEST = 'drop_oldest'  # discard the oldest queued event
+DROP_NEWEST = 'drop_newest'  # discard the event being published
+LATEST = 'latest'  # keep only the newest event per key (symbol/timeframe/type)
+BLOCK = 'block'  # make the publisher wait up to BLOCK_TIMEOUT, then drop it
+
+
+def event_key(event) -> Tuple:
+    """What a LATEST subscription coalesces on"""
+    return (type(event),) + tuple(getattr(event, field) for field in ('symbol', 'timeframe')
+                                   if hasattr(event, field))
+
+
+class Subscription:
+    """Bounded queue of events for one consumer
+
+    ``get`` blocks until an event arrives, so an idle consumer costs nothing.
+    ``dropped`` counts what the drop policy discarded.
+    """
+
+    def __init__(self, types: Tuple[type, ...], symbols: Optional[Iterable[str]] = None,
+                 maxsize: int = EVENTS['QUEUE_SIZE'], policy: str = DROP_OLDEST,
+                 block_timeout: float = EVENTS['BLOCK_TIMEOUT']):
+        self.types = types
+        self.symbols = set(symbols) if symbols is not None else None
+        self.maxsize = maxsize
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.events = OrderedDict() if policy == LATEST else deque()
+        self.condition = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def watch(self, symbols: Optional[Iterable[str]]):
+        """Replace the symbols this subscription receives (None for every symbol)"""
+        self.symbols = set(symbols) if symbols is not None else None
+
+    def accepts(self, event) -> bool:
+        if self.symbols is None:
+            return True
+        symbol = getattr(event, 'symbol', None)
+        return symbol is None or symbol in self.symbols
+
+    def put(self, event) -> bool:
+        """Queue an event according to the drop policy; False if it was dropped"""
+        with self.condition:
+            if self.closed:
+                return False
+            if self.policy == LATEST:
+                key = event_key(event)
+                self.events.pop(key, None)
+                self.events[key] = event
+                if len(self.events) > self.maxsize:
+                    self.events.popitem(last=False)
+                    self.dropped += 1
+            elif len(self.events) < self.maxsize:
+                self.events.append(event)
+            elif self.policy == DROP_OLDEST:
+                self.events.popleft()
+                self.events.append(event)
+                self.dropped += 1
+            elif self.policy == BLOCK and self.condition.wait_for(
+                    lambda: len(self.events) < self.maxsize or self.closed, self.block_timeout) and not self.closed:
+                self.events.append(event)
+            else:
+                self.dropped += 1
+                return False
+            self.condition.notify_all()
+            return True
+
+    def get(self, timeout: Optional[float] = None):
+        """Next event, or None on timeout or once closed"""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.events or self.closed, timeout) or not self.events:
+                return None
+            if self.policy == LATEST:
+                event = self.events.popitem(last=False)[1]
+            else:
+                event = self.events.popleft()
+            self.condition.notify_all()
+            return event
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class EventBus:
+    """Routes published events to the subscriptions of their type and symbol"""
+
+    def __init__(self):
+        self.subscriptions: Dict[type, List[Subscription]] = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, *types: type, symbols: Optional[Iterable[str]] = None,
+                  maxsize: int = EVENTS['QUEUE_SIZE'], policy: str = DROP_OLDEST) -> Subscription:
+        subscription = Subscription(types, symbols, maxsize, policy)
+        with self.lock:
+            for event_type in types:
+                # Copy on write: publish iterates without the lock
+                self.subscriptions[event_type] = self.subscriptions.get(event_type, []) + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.close()
+        with self.lock:
+            for event_type in subscription.types:
+                self.subscriptions[event_type] = [
+                    s for s in self.subscriptions.get(event_type, []) if s is not subscription
+                ]
+
+    def has_subscribers(self, event_type: type) -> bool:
+        return bool(self.subscriptions.get(event_type))
+
+    def symbols(self, event_type: type) -> set:
+        """Symbols named by the subscriptions to ``event_type``"""
+        symbols = set()
+        for subscription in self.subscriptions.get(event_type, []):
+            symbols |= subscription.symbols or set()
+        return symbols
+
+    def publish(self, event) -> int:
+        """Deliver to every matching subscription; returns how many queued it"""
+        delivered = 0
+        for subscription in self.subscriptions.get(type(event), []):
+            if subscription.accepts(event) and subscription.put(event):
+                delivered += 1
+        return delivered
+
+
+class FeedPoller:
+    """The single poller feeding the bus
+
+    Each cycle reads only what has subscribers: the last tick of the symbols
+    named by TickEvent subscriptions, the last bar of the pairs registered
+    with ``watch_bars``, the risk service's cached account and positions, and
+    the market-hours clock.
+    Events are published only when a value changed. The interval doubles up
+    to ``max_interval`` while nothing changes and drops back on a change.
+    """
+
+    def __init__(self, bus: EventBus, min_interval: float = EVENTS['MIN_INTERVAL'],
+                 max_interval: float = EVENTS['MAX_INTERVAL']):
+        self.bus = bus
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.bar_timeframes: Dict[str, set] = {}  # symbol -> timeframes for BarEvent
+        self.last: Dict[Any, Any] = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def watch_bars(self, symbol: str, timeframe: str):
+        """Publish BarEvent for ``timeframe`` bars of ``symbol``"""
+        with self.lock:
+            self.bar_timeframes.setdefault(symbol, set()).add(timeframe)
+
+    def changed(self, key, value) -> bool:
+        if self.last.get(key) == value:
+            return False
+        self.last[key] = value
+        return True
+
+    def poll_ticks(self) -> bool:
+        changed = False
+        for symbol in self.bus.symbols(TickEvent):
+            tick = mt5.symbol_info_tick(symbol)
+            if tick is None or not self.changed(('tick', symbol), tick.time_msc):
+                continue
+            self.bus.publish(TickEvent(symbol, tick.time_msc, tick.bid, tick.ask, tick.last, tick.volume))
+            changed = True
+        return changed
+
+    def poll_bars(self) -> bool:
+        if not self.bus.has_subscribers(BarEvent):
+            return False
+        from bar_aggregator import bar_feed
+        changed = False
+        with self.lock:
+            watched = [(symbol, tf) for symbol, tfs in self.bar_timeframes.items() for tf in tfs]
+        for symbol, timeframe in watched:
+            bars = bar_feed.bars(symbol, timeframe, 2)
+            if bars is None or not len(bars):
+                continue
+            opened = int(bars['time'][-1])
+            previous = self.last.get(('bar', symbol, timeframe))
+            if self.changed(('bar', symbol, timeframe), opened) and previous is not None:
+                closed = int(bars['time'][-2]) if len(bars) > 1 else previous
+                self.bus.publish(BarEvent(symbol, timeframe, opened, closed))
+                changed = True
+        return changed
+
+    def poll_account(self) -> bool:
+        wanted = (AccountEvent, PositionsEvent, ConnectionEvent)
+        if not any(self.bus.has_subscribers(t) for t in wanted):
+            return False
+        account = risk_service.account()
+        changed = False
+        if self.changed('connected', account is not None):
+            self.bus.publish(ConnectionEvent(account is not None))
+            changed = True
+        if account is None:
+            return changed
+
+        event = AccountEvent(account.balance, account.equity, account.margin,
+                             account.margin_free, account.profit)
+        if self.changed('account', event):
+            self.bus.publish(event)
+            changed = True
+
+        with risk_service.lock:
+            signature = tuple(sorted((p.ticket, p.volume, p.sl, p.tp) for p in risk_service.positions.values()))
+        if self.changed('positions', signature):
+            self.bus.publish(PositionsEvent(len(signature), tuple(s[0] for s in signature)))
+            changed = True
+        return changed
+
+    def poll_market_hours(self) -> bool:
+        if not self.bus.has_subscribers(MarketHoursEvent):
+            return False
+        from utils import check_market_hours
+        is_open = check_market_hours()
+        if self.changed('market_open', is_open):
+            self.bus.publish(MarketHoursEvent(is_open))
+            return True
+        return False
+
+    def poll_once(self) -> bool:
+        """One cycle over everything subscribed; True if anything changed"""
+        changed = False
+        for poll in (self.poll_ticks, self.poll_bars, self.poll_account, self.poll_market_hours):
+            try:
+                changed = poll() or changed
+            except Exception:
+                pass
+        return changed
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+
+        def run():
+            while not self.stop_event.is_set():
+                if self.poll_once():
+                    self.interval = self.min_interval
+                else:
+                    self.interval = min(self.interval * 2, self.max_interval)
+                self.stop_event.wait(self.interval)
+
+        self.thread = threading.Thread(target=run, name='feed-poller', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
+
+
+# Global bus and its poller
+event_bus = EventBus()
+feed_poller = FeedPoller(event_bus)
+
+__all__ = [
+    'event_bus',
+    'feed_poller',
+    'EventBus',
+    'FeedPoller',
+    'Subscription',
+    'TickEvent',
+    'BarEvent',
+    'AccountEvent',
+    'PositionsEvent',
+    'ConnectionEvent',
+    'MarketHoursEvent',
+    'DROP_OLDEST',
+    'DROP_NEWEST',
+    'LATEST',
+    'BLOCK'
+]
@@ -0,0 +1,171 @@
+"""
+Export dialog for Future MT5 Pro Trading System
+Runs an ExportJob of logs, journal or trades in the background with a progress bar
+"""
+
+import os
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from typing import List
+
+from config import config
+from exporter import ExportJob, FORMATS, SOURCES
+from log_files import log_files
+from log_search import parse_time
+from ui_refresh import UIRefresher
+
+
+class ExportDialog:
+    def __init__(self, parent: tk.Tk, ui: UIRefresher, symbols: List[str]):
+        self.ui = ui
+        self.job = None
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Export")
+        self.dialog.transient(parent)
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
+
+        # Configure window
+        self.dialog.configure(bg=config.COLORS['bg_dark'])
+
+        # Center dialog
+        width = 520
+        height = 260
+        x = parent.winfo_x() + (parent.winfo_width() - width) // 2
+        y = parent.winfo_y() + (parent.winfo_height() - height) // 2
+        self.dialog.geometry(f"{width}x{height}+{x}+{y}")
+
+        # Export variables
+        self.source_var = tk.StringVar(value=SOURCES[0])
+        self.format_var = tk.StringVar(value='csv')
+        self.symbol_var = tk.StringVar()
+        self.start_var = tk.StringVar()
+        self.end_var = tk.StringVar()
+        self.status_var = tk.StringVar(value="Choose what to export")
+
+        self.setup_ui(symbols)
+
+    def setup_ui(self, symbols: List[str]):
+        """Setup the export dialog UI"""
+        main_frame = tk.Frame(
+            self.dialog,
+            bg=config.COLORS['bg_dark'],
+            highlightbackground=config.COLORS['accent'],
+            highlightthickness=1
+        )
+        main_frame.pack(expand=True, fill="both", padx=2, pady=2)
+
+        form = tk.Frame(main_frame, bg=config.COLORS['bg_dark'])
+        form.pack(fill="x", padx=10, pady=10)
+
+        fields = [
+            ("Source:", ttk.Combobox(form, textvariable=self.source_var, width=12,
+                                     values=SOURCES, state="readonly")),
+            ("Format:", ttk.Combobox(form, textvariable=self.format_var, width=12,
+                                     values=FORMATS, state="readonly")),
+            ("Symbol:", ttk.Combobox(form, textvariable=self.symbol_var, width=12,
+                                     values=[''] + symbols)),
+            ("From:", ttk.Entry(form, textvariable=self.start_var, width=20)),
+            ("To:", ttk.Entry(form, textvariable=self.end_var, width=20))
+        ]
+        for row, (label, widget) in enumerate(fields):
+            tk.Label(
+                form,
+                text=label,
+                bg=config.COLORS['bg_dark'],
+                fg=config.COLORS['text']
+            ).grid(row=row, column=0, sticky="w", padx=(5, 2), pady=2)
+            widget.grid(row=row, column=1, sticky="w", pady=2)
+
+        self.progress = ttk.Progressbar(main_frame, orient="horizontal", mode="determinate", maximum=1.0)
+        self.progress.pack(fill="x", padx=10)
+
+        buttons = tk.Frame(main_frame, bg=config.COLORS['bg_dark'])
+        buttons.pack(fill="x", padx=10, pady=5)
+        tk.Label(
+            buttons,
+            textvariable=self.status_var,
+            bg=config.COLORS['bg_dark'],
+            fg=config.COLORS['text'],
+            anchor="w"
+        ).pack(side="left", fill="x", expand=True)
+        for text, command in (("Cancel", self.cancel), ("Export", self.export)):
+            tk.Button(
+                buttons,
+                text=text,
+                command=command,
+                bg=config.COLORS['accent'],
+                fg=config.COLORS['text'],
+                font=(config.UI['FONTS']['FAMILY'], 10, "bold"),
+                cursor="hand2"
+            ).pack(side="right", padx=5)
+
+    def export(self):
+        """Ask for the output file and start the export in the background"""
+        if self.job is not None and not self.job.done.is_set():
+            return
+        try:
+            start = parse_time(self.start_var.get())
+            end = parse_time(self.end_var.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e), parent=self.dialog)
+            return
+
+        fmt = self.format_var.get()
+        source = self.source_var.get()
+        filepath = filedialog.asksaveasfilename(
+            parent=self.dialog,
+            defaultextension=f".{fmt}",
+            initialfile=f"{source}.{fmt}",
+            filetypes=[(f"{fmt.upper()} files", f"*.{fmt}"), ("All files", "*.*")]
+        )
+        if not filepath:
+            return
+
+        if source == 'logs':
+            log_files.flush()
+        symbol = self.symbol_var.get().strip().upper()
+        self.job = ExportJob(source, filepath, fmt, [symbol] if symbol else None, start, end,
+                             progress=self.on_progress)
+        self.progress['value'] = 0
+        self.status_var.set("Exporting...")
+        self.job.start()
+        self.dialog.after(200, self.check_done)
+
+    def on_progress(self, rows: int, fraction: float):
+        # Export thread: hand the widget changes to the main loop
+        self.ui.call(self, self.show_progress, rows, fraction)
+
+    def show_progress(self, rows: int, fraction: float):
+        self.progress['value'] = fraction
+        self.status_var.set(f"{rows} rows ({fraction * 100:.0f}%)")
+
+    def check_done(self):
+        job = self.job
+        if job is None or not self.dialog.winfo_exists():
+            return
+        if not job.done.is_set():
+            self.dialog.after(200, self.check_done)
+        elif job.error:
+            self.status_var.set("Export failed")
+            messagebox.showerror("Error", f"Export failed: {job.error}", parent=self.dialog)
+        elif job.cancel_event.is_set():
+            self.status_var.set("Export cancelled")
+        else:
+            self.progress['value'] = 1.0
+            self.status_var.set(f"{job.rows} rows written to {os.path.basename(job.path)}")
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancel()
+
+    def close(self):
+        """Cancel a running export and close the dialog"""
+        self.cancel()
+        self.dialog.destroy()
+
+
+def show_export(parent: tk.Tk, ui: UIRefresher, symbols: List[str]):
+    """Show export dialog"""
+    dialog = ExportDialog(parent, ui, symbols)
+    return dialog
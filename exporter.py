@@ -0,0 +1,367 @@
+"""
+Data export for Future MT5 Pro Trading System
+Streams the on-disk logs, the journal and the trade history to CSV, JSON Lines
+or Parquet in fixed-size chunks, filtered by time range and symbol, from a
+background thread with progress
+"""
+
+import os
+import sys
+import csv
+import json
+import argparse
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Iterator, Tuple, Callable, Sequence
+
+import numpy as np
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import PATHS, EXPORT
+except ImportError:
+    PATHS = {
+        'LOGS': 'logs/',
+        'DATA': 'data/'
+    }
+    EXPORT = {
+        'CHUNK_ROWS': 50000
+    }
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+from log_archive import LINE_PATTERN
+from log_files import open_segment, parse_segment_name, get_message_type
+
+CSV, JSONL, PARQUET = 'csv', 'jsonl', 'parquet'
+FORMATS = (CSV, JSONL, PARQUET)
+SOURCES = ('logs', 'journal', 'trades')
+
+# (name, type) of each source's rows; 'str', 'int', 'float' or 'bool'
+COLUMNS = {
+    'logs': [('time', 'str'), ('asset', 'str'), ('type', 'str'), ('level', 'str'), ('message', 'str')],
+    'journal': [('time', 'str'), ('event', 'str'), ('asset', 'str'), ('details', 'str')],
+    'trades': [('position_id', 'int'), ('magic', 'int'), ('symbol', 'str'), ('buy', 'bool'),
+               ('volume', 'float'), ('open_time', 'str'), ('close_time', 'str'),
+               ('open_price', 'float'), ('close_price', 'float'), ('sl', 'float'), ('tp', 'float'),
+               ('profit', 'float'), ('mae', 'float'), ('mfe', 'float'),
+               ('mae_points', 'float'), ('mfe_points', 'float')]
+}
+
+# A source yields (rows, fraction done) chunks
+Chunks = Iterator[Tuple[List[Tuple], float]]
+
+
+def format_for(path: str, default: str = JSONL) -> str:
+    """Export format implied by a file extension"""
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    return extension if extension in FORMATS else default
+
+
+def log_segments(log_dir: str, symbols: Optional[Sequence[str]], start: Optional[datetime],
+                 end: Optional[datetime]) -> List[Tuple[str, str]]:
+    """(path, asset) of the log files that may hold lines in range, oldest first per asset
+
+    A closed segment holds the lines written after the previous segment of
+    its asset was closed and up to its own close time, so segments entirely
+    outside [start, end] are skipped without being opened.
+    """
+    if not os.path.isdir(log_dir):
+        return []
+    by_asset: Dict[str, List[Tuple[datetime, str]]] = {}
+    for name in os.listdir(log_dir):
+        parsed = parse_segment_name(name)
+        if parsed is None or not os.path.isfile(os.path.join(log_dir, name)):
+            continue
+        asset, closed_at = parsed
+        if symbols and asset not in symbols:
+            continue
+        by_asset.setdefault(asset, []).append((closed_at or datetime.max, name))
+
+    result = []
+    for asset in sorted(by_asset):
+        previous = datetime.min
+        for closed_at, name in sorted(by_asset[asset]):
+            if (start is None or closed_at >= start) and (end is None or previous <= end):
+                result.append((os.path.join(log_dir, name), asset))
+            previous = closed_at
+    return result
+
+
+def log_chunks(log_dir: str = PATHS['LOGS'], symbols: Optional[Sequence[str]] = None,
+               start: Optional[datetime] = None, end: Optional[datetime] = None,
+               chunk_rows: int = EXPORT['CHUNK_ROWS']) -> Chunks:
+    """Parsed log lines of every asset, read segment by segment
+
+    Timestamps are compared as text, which orders like the times themselves.
+    Progress is measured in bytes of the selected files on disk.
+    """
+    first = start.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3] if start else None
+    last = end.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3] if end else None
+    segments = log_segments(log_dir, symbols, start, end)
+    sizes = [os.path.getsize(path) for path, _ in segments]
+    total = sum(sizes) or 1
+    done = 0
+    rows: List[Tuple] = []
+
+    def add(current):
+        if (first is None or current[0] >= first) and (last is None or current[0] <= last):
+            current[2] = get_message_type(current[4])
+            rows.append(tuple(current))
+
+    for (path, asset), size in zip(segments, sizes):
+        current = None
+        read = 0
+        try:
+            with open_segment(path) as f:
+                for line in f:
+                    read += len(line)
+                    line = line.rstrip('\r\n')
+                    match = LINE_PATTERN.match(line)
+                    if match:
+                        if current:
+                            add(current)
+                        stamp, level, message = match.groups()
+                        current = [stamp, asset, '', level, message]
+                    elif current and line.strip():
+                        # Lines without a timestamp continue the previous message
+                        current[4] += '\n' + line
+                    if len(rows) >= chunk_rows:
+                        yield rows, (done + min(read, size)) / total
+                        rows = []
+        except (OSError, EOFError, RuntimeError):
+            pass
+        if current:
+            add(current)
+        done += size
+    yield rows, 1.0
+
+
+def journal_chunks(directory: Optional[str] = None, symbols: Optional[Sequence[str]] = None,
+                   start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   chunk_rows: int = EXPORT['CHUNK_ROWS']) -> Chunks:
+    """Journal events; fields beyond time, event and asset go to ``details`` as JSON
+
+    Progress is measured in daily journal files.
+    """
+    from journal import Journal
+
+    journal = Journal(directory)
+    days = sorted(name[len('journal_'):-len('.jsonl')] for name in os.listdir(journal.directory)
+                  if name.startswith('journal_') and name.endswith('.jsonl'))
+    position = {day: i for i, day in enumerate(days)}
+    total = len(days) or 1
+    rows: List[Tuple] = []
+    for entry in journal.read(start, end):
+        asset = entry.pop('asset', None)
+        if symbols and asset not in symbols:
+            continue
+        event_time = entry.pop('time')
+        event = entry.pop('event', '')
+        rows.append((event_time, event, asset or '', json.dumps(entry, ensure_ascii=False, default=str)))
+        if len(rows) >= chunk_rows:
+            yield rows, position.get(event_time[:10].replace('-', ''), 0) / total
+            rows = []
+    yield rows, 1.0
+
+
+def trade_chunks(symbols: Optional[Sequence[str]] = None, start: Optional[datetime] = None,
+                 end: Optional[datetime] = None, chunk_rows: int = EXPORT['CHUNK_ROWS'],
+                 history=None) -> Chunks:
+    """Closed trades of the trade history store, by close time"""
+    if history is None:
+        from trade_history import trade_history as history
+
+    trades = history.closed_trades(start, end)
+    if symbols:
+        trades = trades[np.isin(trades['symbol'], list(symbols))]
+    names = [name for name, _ in COLUMNS['trades']]
+    total = len(trades) or 1
+    for offset in range(0, len(trades), chunk_rows):
+        chunk = trades[offset:offset + chunk_rows]
+        columns = {name: chunk[name].tolist() for name in chunk.dtype.names}
+        for name in ('open_time', 'close_time'):
+            columns[name] = [datetime.fromtimestamp(msc / 1000).isoformat(timespec='milliseconds')
+                             for msc in columns.pop(f"{name}_msc")]
+        yield list(zip(*(columns[name] for name in names))), (offset + len(chunk)) / total
+    yield [], 1.0
+
+
+class ChunkWriter:
+    """Writes row chunks of fixed columns to one file format"""
+
+    def __init__(self, path: str, fmt: str, columns: List[Tuple[str, str]]):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format {fmt}; use one of {', '.join(FORMATS)}")
+        if fmt == PARQUET and pyarrow is None:
+            raise RuntimeError("pyarrow is required for Parquet export")
+        self.fmt = fmt
+        self.names = [name for name, _ in columns]
+        self.file = None
+        self.writer = None
+        if fmt == PARQUET:
+            types = {'str': pyarrow.string(), 'int': pyarrow.int64(),
+                     'float': pyarrow.float64(), 'bool': pyarrow.bool_()}
+            self.schema = pyarrow.schema([(name, types[kind]) for name, kind in columns])
+            self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+        else:
+            self.file = open(path, 'w', encoding='utf-8', newline='')
+            if fmt == CSV:
+                self.writer = csv.writer(self.file)
+                self.writer.writerow(self.names)
+
+    def write(self, rows: List[Tuple]):
+        if not rows:
+            return
+        if self.fmt == PARQUET:
+            # One row group per chunk
+            self.writer.write_table(pyarrow.Table.from_arrays(
+                [pyarrow.array(column, type=self.schema.field(i).type)
+                 for i, column in enumerate(zip(*rows))], schema=self.schema))
+        elif self.fmt == CSV:
+            self.writer.writerows(rows)
+        else:
+            self.file.write(''.join(json.dumps(dict(zip(self.names, row)), ensure_ascii=False) + '\n'
+                                    for row in rows))
+
+    def close(self):
+        if self.fmt == PARQUET:
+            self.writer.close()
+        else:
+            self.file.close()
+
+
+class ExportJob:
+    """One export running in a background thread
+
+    The output is written to ``path + '.part'`` one chunk at a time and renamed
+    when complete, so memory stays at one chunk whatever the row count and a
+    cancelled or failed export leaves no partial file. ``progress`` is called
+    from the export thread with (rows written, fraction done).
+    """
+
+    def __init__(self, source: str, path: str, fmt: Optional[str] = None,
+                 symbols: Optional[Sequence[str]] = None, start: Optional[datetime] = None,
+                 end: Optional[datetime] = None, chunk_rows: int = EXPORT['CHUNK_ROWS'],
+                 progress: Optional[Callable[[int, float], None]] = None, **options: Any):
+        if source not in SOURCES:
+            raise ValueError(f"Unknown export source {source}; use one of {', '.join(SOURCES)}")
+        self.source = source
+        self.path = path
+        self.fmt = fmt or format_for(path)
+        self.symbols = [s for s in (symbols or []) if s] or None
+        self.start_time = start
+        self.end_time = end
+        self.chunk_rows = chunk_rows
+        self.progress = progress
+        self.options = options
+        self.rows = 0
+        self.fraction = 0.0
+        self.error: Optional[str] = None
+        self.cancel_event = threading.Event()
+        self.done = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def chunks(self) -> Chunks:
+        if self.source == 'logs':
+            return log_chunks(symbols=self.symbols, start=self.start_time, end=self.end_time,
+                              chunk_rows=self.chunk_rows, **self.options)
+        if self.source == 'journal':
+            return journal_chunks(symbols=self.symbols, start=self.start_time, end=self.end_time,
+                                  chunk_rows=self.chunk_rows, **self.options)
+        return trade_chunks(self.symbols, self.start_time, self.end_time, self.chunk_rows, **self.options)
+
+    def run(self) -> bool:
+        """Export in the calling thread; True when the file was written"""
+        temp = f"{self.path}.part"
+        try:
+            writer = ChunkWriter(temp, self.fmt, COLUMNS[self.source])
+            try:
+                for rows, fraction in self.chunks():
+                    if self.cancel_event.is_set():
+                        break
+                    writer.write(rows)
+                    self.rows += len(rows)
+                    self.fraction = fraction
+                    if self.progress:
+                        self.progress(self.rows, fraction)
+            finally:
+                writer.close()
+            if self.cancel_event.is_set():
+                os.remove(temp)
+                return False
+            os.replace(temp, self.path)
+            return True
+        except Exception as e:
+            self.error = str(e)
+            if os.path.exists(temp):
+                os.remove(temp)
+            return False
+        finally:
+            self.done.set()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='export', daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self.done.wait(timeout)
+
+
+def parse_time(text: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(text) if text else None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        prog='future-mt5-export',
+        description='Export logs, journal or trade history to CSV, JSONL or Parquet'
+    )
+    parser.add_argument('source', choices=SOURCES)
+    parser.add_argument('output', help='output file; the format follows its extension')
+    parser.add_argument('--format', choices=FORMATS, help='override the format implied by the extension')
+    parser.add_argument('--symbol', action='append', dest='symbols', help='only this symbol (repeatable)')
+    parser.add_argument('--from', dest='start', type=parse_time, help='start time, ISO format')
+    parser.add_argument('--to', dest='end', type=parse_time, help='end time, ISO format')
+    args = parser.parse_args(argv)
+
+    def progress(rows, fraction):
+        print(f"\r{fraction * 100:5.1f}% {rows} rows", end='', flush=True)
+
+    job = ExportJob(args.source, args.output, args.format, args.symbols, args.start, args.end,
+                    progress=progress)
+    ok = job.run()
+    print()
+    if not ok:
+        print(f"❌ Export failed: {job.error}")
+        return 1
+    print(f"✅ {job.rows} rows written to {args.output}")
+    return 0
+
+
+__all__ = [
+    'ExportJob',
+    'ChunkWriter',
+    'log_chunks',
+    'journal_chunks',
+    'trade_chunks',
+    'format_for',
+    'FORMATS',
+    'SOURCES',
+    'main'
+]
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Fibonacci levels for Future MT5 Pro Trading System
+Retracement and extension levels for many anchor pairs at once as a NumPy
+matrix, with a sorted level index for binary-search lookups and confluence
+zones where levels of different anchors cluster
+"""
+
+import os
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import FIBONACCI
+except ImportError:
+    FIBONACCI = {
+        'RETRACEMENT': [0.236, 0.382, 0.5, 0.618, 0.786],
+        'EXTENSION': [1.272, 1.618, 2.0, 2.618],
+        'REVERSAL_ZONE': 0.1
+    }
+
+DEFAULT_RATIOS = tuple(sorted(set(FIBONACCI['RETRACEMENT']) | set(FIBONACCI['EXTENSION'])))
+
+ZONE_DTYPE = np.dtype([
+    ('low', '<f8'),
+    ('high', '<f8'),
+    ('center', '<f8'),
+    ('levels', '<i4'),
+    ('anchors', '<i4')  # distinct anchor pairs with a level in the zone
+])
+
+
+def level_matrix(highs: Sequence[float], lows: Sequence[float], uptrend: Sequence[bool],
+                 ratios: Sequence[float] = DEFAULT_RATIOS) -> np.ndarray:
+    """Level prices, one row per anchor pair and one column per ratio
+
+    Ratios below 1 are retracements measured back from the end of the leg
+    (the high of an up leg); ratios above 1 are extensions beyond it.
+    """
+    highs = np.asarray(highs, dtype=np.float64)[:, None]
+    lows = np.asarray(lows, dtype=np.float64)[:, None]
+    uptrend = np.asarray(uptrend, dtype=bool)[:, None]
+    ratios = np.asarray(ratios, dtype=np.float64)[None, :]
+
+    range_price = highs - lows
+    retracement = ratios < 1
+    up = np.where(retracement, highs - range_price * ratios, lows + range_price * ratios)
+    down = np.where(retracement, lows + range_price * ratios, highs - range_price * ratios)
+    return np.where(uptrend, up, down)
+
+
+class FibonacciLevels:
+    """Every level of a set of anchor pairs behind one sorted index
+
+    Built once per anchor change; queries are binary searches over the sorted
+    prices, so their cost grows with log(anchors x ratios) and nothing is
+    rebuilt while the anchors stay the same.
+    """
+
+    def __init__(self, highs: Sequence[float], lows: Sequence[float], uptrend: Sequence[bool],
+                 ratios: Sequence[float] = DEFAULT_RATIOS):
+        self.ratios = np.asarray(ratios, dtype=np.float64)
+        self.matrix = level_matrix(highs, lows, uptrend, self.ratios)
+        flat = self.matrix.ravel()
+        self.order = np.argsort(flat, kind='stable')
+        self.prices = flat[self.order]
+        self.anchor = self.order // len(self.ratios)
+        self.ratio = self.ratios[self.order % len(self.ratios)]
+        self._zones = {}
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def levels(self, anchor: int = 0) -> Dict[float, float]:
+        """Ratio -> price for one anchor pair"""
+        return dict(zip(self.ratios.tolist(), self.matrix[anchor].tolist()))
+
+    def nearest(self, price):
+        """Index of the level closest to ``price`` (scalar or array of prices)"""
+        prices = np.asarray(price, dtype=np.float64)
+        right = np.minimum(np.searchsorted(self.prices, prices), len(self.prices) - 1)
+        left = np.maximum(right - 1, 0)
+        closer_left = np.abs(prices - self.prices[left]) <= np.abs(self.prices[right] - prices)
+        index = np.where(closer_left, left, right)
+        return int(index) if index.ndim == 0 else index
+
+    def level(self, index: int) -> Tuple[float, int, float]:
+        """(price, anchor, ratio) of an index position"""
+        return float(self.prices[index]), int(self.anchor[index]), float(self.ratio[index])
+
+    def within(self, price: float, tolerance_percent: float = FIBONACCI['REVERSAL_ZONE'],
+               anchor: Optional[int] = None,
+               ratios: Optional[Sequence[float]] = None) -> List[Tuple[float, int, float]]:
+        """Levels within ``tolerance_percent`` of ``price``, closest first
+
+        The tolerance is relative to each level, as ``|price - level| / level``.
+        """
+        tolerance = tolerance_percent / 100.0
+        # |price - level| <= tolerance * level, for positive prices
+        start = np.searchsorted(self.prices, price / (1 + tolerance), side='left')
+        end = np.searchsorted(self.prices, price / (1 - tolerance), side='right') if tolerance < 1 else len(self)
+        index = np.arange(start, end)
+        if anchor is not None:
+            index = index[self.anchor[index] == anchor]
+        if ratios is not None:
+            index = index[np.isin(self.ratio[index], ratios)]
+        index = index[np.argsort(np.abs(self.prices[index] - price), kind='stable')]
+        return [self.level(i) for i in index.tolist()]
+
+    def confluence(self, tolerance_percent: float = FIBONACCI['REVERSAL_ZONE'],
+                   min_anchors: int = 2) -> np.ndarray:
+        """Zones where levels of at least ``min_anchors`` anchor pairs cluster
+
+        Adjacent levels closer than ``tolerance_percent`` of their price chain
+        into one zone. Returns a ZONE_DTYPE array sorted by price.
+        """
+        key = (tolerance_percent, min_anchors)
+        zones = self._zones.get(key)
+        if zones is not None:
+            return zones
+        if not len(self):
+            return np.zeros(0, dtype=ZONE_DTYPE)
+
+        gaps = np.diff(self.prices) > self.prices[1:] * (tolerance_percent / 100.0)
+        group = np.concatenate(([0], np.cumsum(gaps)))
+        starts = np.flatnonzero(np.concatenate(([True], gaps)))
+        ends = np.concatenate((starts[1:], [len(self)])) - 1
+        levels = np.bincount(group)
+        pairs = np.unique(group * (int(self.anchor.max()) + 1) + self.anchor)
+        anchors = np.bincount(pairs // (int(self.anchor.max()) + 1), minlength=len(starts))
+
+        zones = np.zeros(len(starts), dtype=ZONE_DTYPE)
+        zones['low'] = self.prices[starts]
+        zones['high'] = self.prices[ends]
+        zones['center'] = np.bincount(group, weights=self.prices) / levels
+        zones['levels'] = levels
+        zones['anchors'] = anchors
+        zones = zones[zones['anchors'] >= min_anchors]
+        self._zones[key] = zones
+        return zones
+
+    def zone_at(self, price: float, tolerance_percent: float = FIBONACCI['REVERSAL_ZONE'],
+                min_anchors: int = 2) -> Optional[np.void]:
+        """Confluence zone containing ``price``, if any"""
+        zones = self.confluence(tolerance_percent, min_anchors)
+        i = np.searchsorted(zones['high'], price)
+        if i < len(zones) and zones['low'][i] <= price:
+            return zones[i]
+        return None
+
+
+__all__ = ['FibonacciLevels', 'level_matrix', 'DEFAULT_RATIOS', 'ZONE_DTYPE']
@@ -0,0 +1,103 @@
+"""
+Trading journal for Future MT5 Pro Trading System
+Append-only JSON Lines record of strategy lifecycle events, signals and orders
+"""
+
+import os
+import sys
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional, Iterator
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import PATHS
+except ImportError:
+    PATHS = {
+        'DATA': 'data/'
+    }
+
+
+class Journal:
+    """Daily JSON Lines journal, one event per line"""
+
+    FILE_FORMAT = '%Y%m%d'
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.path.join(PATHS['DATA'], 'journal')
+        self.lock = threading.Lock()
+        self.current_day: Optional[str] = None
+        self.file = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get_path(self, day: str) -> str:
+        """Journal file path for a day in FILE_FORMAT"""
+        return os.path.join(self.directory, f"journal_{day}.jsonl")
+
+    def _open_for(self, now: datetime):
+        day = now.strftime(self.FILE_FORMAT)
+        if day != self.current_day:
+            if self.file:
+                self.file.close()
+            # Line buffered: every event reaches the OS as soon as it is written
+            self.file = open(self.get_path(day), 'a', encoding='utf-8', buffering=1)
+            self.current_day = day
+        return self.file
+
+    def record(self, event: str, asset: Optional[str] = None, **fields: Any):
+        """Append an event to today's journal"""
+        now = datetime.now()
+        entry = {'time': now.isoformat(timespec='milliseconds'), 'event': event}
+        if asset:
+            entry['asset'] = asset
+        entry.update(fields)
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+
+        with self.lock:
+            self._open_for(now).write(line + '\n')
+
+    def read(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+             asset: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Iterate journal entries, oldest first, filtered by time range and asset"""
+        files = sorted(
+            name for name in os.listdir(self.directory)
+            if name.startswith('journal_') and name.endswith('.jsonl')
+        )
+        for name in files:
+            day = name[len('journal_'):-len('.jsonl')]
+            if start and day < start.strftime(self.FILE_FORMAT):
+                continue
+            if end and day > end.strftime(self.FILE_FORMAT):
+                continue
+
+            with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if asset and entry.get('asset') != asset:
+                        continue
+                    if start or end:
+                        entry_time = datetime.fromisoformat(entry['time'])
+                        if start and entry_time < start:
+                            continue
+                        if end and entry_time > end:
+                            continue
+                    yield entry
+
+    def close(self):
+        """Close the current journal file"""
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+                self.current_day = None
+
+
+__all__ = ['Journal']
@@ -0,0 +1,323 @@
+"""
+Log archive for Future MT5 Pro Trading System
+Incrementally indexes the per-asset log segments under PATHS['LOGS'] into a
+SQLite store with a time index, asset/type indexes and a full-text inverted
+index over messages
+"""
+
+import os
+import re
+import sys
+import time
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import PATHS
+except ImportError:
+    PATHS = {
+        'LOGS': 'logs/',
+        'DATA': 'data/'
+    }
+
+from log_files import open_segment, parse_segment_name, get_message_type
+
+LINE_PATTERN = re.compile(
+    r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3}) - ([A-Z]+) - (.*)$'
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lines (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    asset TEXT NOT NULL,
+    type TEXT NOT NULL,
+    level TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lines_time ON lines(time);
+CREATE INDEX IF NOT EXISTS idx_lines_asset_time ON lines(asset, time);
+CREATE INDEX IF NOT EXISTS idx_lines_type_time ON lines(type, time);
+CREATE VIRTUAL TABLE IF NOT EXISTS lines_fts USING fts5(
+    message, content='lines', content_rowid='id', tokenize='unicode61'
+);
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    asset TEXT NOT NULL,
+    head TEXT,
+    offset INTEGER NOT NULL DEFAULT 0,
+    done INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def segment_key(name: str) -> str:
+    """Segment name without extension, stable across compression"""
+    return name.split('.log')[0]
+
+
+class LogArchive:
+    """Searchable archive of historical strategy logs
+
+    ``update`` ingests closed segments once and the active segment of each
+    asset incrementally from the last indexed byte, so re-indexing cost is
+    proportional to new log volume only.
+    """
+
+    def __init__(self, log_dir: str = PATHS['LOGS'], db_path: Optional[str] = None):
+        self.log_dir = log_dir
+        self.db_path = db_path or os.path.join(PATHS['DATA'], 'log_archive.sqlite')
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.stop_event = threading.Event()
+        self.indexer: Optional[threading.Thread] = None
+
+    # Ingestion
+    @staticmethod
+    def parse_lines(lines: Iterable[bytes], asset: str) -> List[Tuple[float, str, str, str, str]]:
+        """Parse raw log lines into (time, asset, type, level, message) rows
+
+        Lines that do not start with a timestamp continue the previous message.
+        """
+        rows = []
+        current = None
+        for raw in lines:
+            line = raw.decode('utf-8', 'replace').rstrip('\r\n')
+            match = LINE_PATTERN.match(line)
+            if match:
+                if current:
+                    rows.append(current)
+                stamp, level, message = match.groups()
+                when = datetime.strptime(stamp, '%Y-%m-%d %H:%M:%S.%f').timestamp()
+                current = [when, asset, get_message_type(message), level, message]
+            elif current and line.strip():
+                current[4] += '\n' + line
+                current[2] = get_message_type(current[4])
+        if current:
+            rows.append(current)
+        return [tuple(row) for row in rows]
+
+    def _insert(self, rows: List[Tuple]):
+        if not rows:
+            return
+        cursor = self.conn.cursor()
+        for row in rows:
+            cursor.execute(
+                'INSERT INTO lines(time, asset, type, level, message) VALUES (?, ?, ?, ?, ?)', row
+            )
+            cursor.execute('INSERT INTO lines_fts(rowid, message) VALUES (?, ?)',
+                           (cursor.lastrowid, row[4]))
+
+    def _ingest_segment(self, name: str, asset: str) -> int:
+        path = os.path.join(self.log_dir, name)
+        active_name = f"{asset}.log"
+        active = self.conn.execute(
+            'SELECT head, offset FROM files WHERE name = ?', (active_name,)
+        ).fetchone()
+
+        with open_segment(path, text=False) as f:
+            data = f.read()
+
+        skip = 0
+        head = data[:data.find(b'\n') + 1].decode('utf-8', 'replace')
+        if active and active[0] is not None and head == active[0]:
+            # This segment used to be the active file: skip what was indexed then
+            skip = active[1]
+
+        rows = self.parse_lines(data[skip:].splitlines(keepends=True), asset)
+        self._insert(rows)
+        self.conn.execute(
+            'INSERT OR REPLACE INTO files(name, asset, head, offset, done) VALUES (?, ?, NULL, 0, 1)',
+            (segment_key(name), asset)
+        )
+        if skip:
+            self.conn.execute('DELETE FROM files WHERE name = ?', (active_name,))
+        return len(rows)
+
+    def _ingest_active(self, name: str, asset: str) -> int:
+        path = os.path.join(self.log_dir, name)
+        state = self.conn.execute(
+            'SELECT head, offset FROM files WHERE name = ?', (name,)
+        ).fetchone()
+
+        with open(path, 'rb') as f:
+            head = f.readline()
+            if not head.endswith(b'\n'):
+                return 0
+            head_text = head.decode('utf-8', 'replace')
+            offset = state[1] if state and state[0] == head_text else 0
+            f.seek(offset)
+            data = f.read()
+
+        # Only complete lines; the writer may be in the middle of one
+        end = data.rfind(b'\n') + 1
+        if end <= 0:
+            return 0
+        rows = self.parse_lines(data[:end].splitlines(keepends=True), asset)
+        self._insert(rows)
+        self.conn.execute(
+            'INSERT OR REPLACE INTO files(name, asset, head, offset, done) VALUES (?, ?, ?, ?, 0)',
+            (name, asset, head_text, offset + end)
+        )
+        return len(rows)
+
+    def update(self) -> int:
+        """Index new log data; returns the number of lines added"""
+        if not os.path.isdir(self.log_dir):
+            return 0
+
+        segments, actives = [], []
+        for name in os.listdir(self.log_dir):
+            if not os.path.isfile(os.path.join(self.log_dir, name)):
+                continue
+            parsed = parse_segment_name(name)
+            if parsed is None:
+                continue
+            asset, closed_at = parsed
+            if closed_at is None:
+                actives.append((name, asset))
+            else:
+                segments.append((closed_at, name, asset))
+
+        added = 0
+        with self.lock:
+            done = {row[0] for row in self.conn.execute('SELECT name FROM files WHERE done = 1')}
+            # Closed segments first so a just-rotated active file is recognised
+            for _, name, asset in sorted(segments):
+                if segment_key(name) in done:
+                    continue
+                try:
+                    added += self._ingest_segment(name, asset)
+                except (OSError, EOFError, RuntimeError):
+                    continue
+            for name, asset in actives:
+                try:
+                    added += self._ingest_active(name, asset)
+                except OSError:
+                    continue
+            self.conn.commit()
+        return added
+
+    def start(self, interval: float = 30.0):
+        """Index in the background every ``interval`` seconds"""
+        if self.indexer is not None and self.indexer.is_alive():
+            return
+        self.stop_event.clear()
+
+        def run():
+            while not self.stop_event.is_set():
+                try:
+                    self.update()
+                except sqlite3.Error:
+                    pass
+                self.stop_event.wait(interval)
+
+        self.indexer = threading.Thread(target=run, name='log-archive', daemon=True)
+        self.indexer.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.indexer is not None:
+            self.indexer.join(timeout=5)
+            self.indexer = None
+
+    # Queries
+    @staticmethod
+    def build_match(text: str) -> str:
+        """FTS query requiring every word; a trailing * keeps prefix matching"""
+        terms = []
+        for word in re.findall(r'[\w\*]+', text, flags=re.UNICODE):
+            prefix = word.endswith('*')
+            word = word.strip('*')
+            if word:
+                terms.append(f'"{word}"' + ('*' if prefix else ''))
+        return ' '.join(terms)
+
+    def search(self, text: Optional[str] = None, assets: Optional[Iterable[str]] = None,
+               types: Optional[Iterable[str]] = None, start: Optional[datetime] = None,
+               end: Optional[datetime] = None, limit: int = 200,
+               newest_first: bool = True) -> List[Dict[str, Any]]:
+        """Find log lines by keywords, assets, message types and time range"""
+        clauses, params = [], []
+        source = 'lines l'
+
+        match = self.build_match(text) if text else ''
+        if match:
+            source = 'lines_fts f JOIN lines l ON l.id = f.rowid'
+            clauses.append('lines_fts MATCH ?')
+            params.append(match)
+        if assets:
+            assets = list(assets)
+            clauses.append(f"l.asset IN ({','.join('?' * len(assets))})")
+            params.extend(assets)
+        if types:
+            types = list(types)
+            clauses.append(f"l.type IN ({','.join('?' * len(types))})")
+            params.extend(types)
+        if start:
+            clauses.append('l.time >= ?')
+            params.append(start.timestamp())
+        if end:
+            clauses.append('l.time <= ?')
+            params.append(end.timestamp())
+
+        sql = f"SELECT l.id, l.time, l.asset, l.type, l.level, l.message FROM {source}"
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += f" ORDER BY l.time {'DESC' if newest_first else 'ASC'} LIMIT ?"
+        params.append(limit)
+
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [self._row(row) for row in rows]
+
+    def context(self, asset: str, when: datetime, before: int = 50,
+                after: int = 50) -> List[Dict[str, Any]]:
+        """Lines of one asset around a moment, oldest first"""
+        timestamp = when.timestamp()
+        with self.lock:
+            older = self.conn.execute(
+                'SELECT id, time, asset, type, level, message FROM lines '
+                'WHERE asset = ? AND time < ? ORDER BY time DESC LIMIT ?',
+                (asset, timestamp, before)
+            ).fetchall()
+            newer = self.conn.execute(
+                'SELECT id, time, asset, type, level, message FROM lines '
+                'WHERE asset = ? AND time >= ? ORDER BY time ASC LIMIT ?',
+                (asset, timestamp, after)
+            ).fetchall()
+        return [self._row(row) for row in reversed(older)] + [self._row(row) for row in newer]
+
+    def assets(self) -> List[str]:
+        with self.lock:
+            return [row[0] for row in self.conn.execute('SELECT DISTINCT asset FROM lines ORDER BY asset')]
+
+    @staticmethod
+    def _row(row) -> Dict[str, Any]:
+        return {
+            'id': row[0],
+            'time': datetime.fromtimestamp(row[1]),
+            'asset': row[2],
+            'type': row[3],
+            'level': row[4],
+            'message': row[5]
+        }
+
+    def close(self):
+        self.stop()
+        with self.lock:
+            self.conn.close()
+
+
+__all__ = ['LogArchive']
@@ -0,0 +1,368 @@
+"""
+Log file subsystem for Future MT5 Pro Trading System
+One buffered, rotating file handler per asset. Closed segments are compressed
+in the background (zstd when available, gzip otherwise) and pruned after the
+retention period
+"""
+
+import io
+import os
+import sys
+import gzip
+import time
+import queue
+import shutil
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import LOGGING, PATHS
+except ImportError:
+    LOGGING = {
+        'MAX_FILE_BYTES': 10 * 1024 * 1024,
+        'ROTATE_DAILY': True,
+        'FLUSH_INTERVAL': 2.0,
+        'BUFFER_BYTES': 64 * 1024,
+        'COMPRESSION': 'zstd',
+        'RETENTION_DAYS': 30
+    }
+    PATHS = {
+        'LOGS': 'logs/'
+    }
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+LINE_FORMAT = '%(asctime)s.%(msecs)03d - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+SEGMENT_TIME_FORMAT = '%Y%m%d_%H%M%S%f'
+COMPRESSED_SUFFIXES = ('.log.zst', '.log.gz')
+
+
+def get_message_type(message: str) -> str:
+    """Classify a log message by its markers (success, warning, error, header, info)"""
+    if any(x in message for x in ['✅', 'SUCESSO', '🎯 SINAL']):
+        return 'success'
+    elif any(x in message for x in ['⚠️', 'AVISO', '⏳']):
+        return 'warning'
+    elif any(x in message for x in ['❌', 'ERRO']):
+        return 'error'
+    elif any(x in message for x in ['===', '📊', '📈']):
+        return 'header'
+    return 'info'
+
+
+def compression_suffix(method: str = LOGGING['COMPRESSION']) -> str:
+    """File suffix for the configured compression, falling back to gzip"""
+    if method == 'zstd' and zstandard is not None:
+        return '.log.zst'
+    return '.log.gz'
+
+
+def compress_file(path: str, method: str = LOGGING['COMPRESSION']) -> str:
+    """Compress a closed segment next to itself and remove the original"""
+    target = path[:-len('.log')] + compression_suffix(method)
+    tmp = target + '.tmp'
+    with open(path, 'rb') as src:
+        if target.endswith('.zst'):
+            with open(tmp, 'wb') as dst:
+                zstandard.ZstdCompressor(level=3).copy_stream(src, dst)
+        else:
+            with gzip.open(tmp, 'wb', compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst)
+    os.replace(tmp, target)
+    os.remove(path)
+    return target
+
+
+def open_segment(path: str, text: bool = True):
+    """Open a plain or compressed segment for reading (text lines or bytes)"""
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst log segments")
+        stream = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb')))
+    elif path.endswith('.gz'):
+        stream = gzip.open(path, 'rb')
+    else:
+        stream = open(path, 'rb')
+    if text:
+        return io.TextIOWrapper(stream, encoding='utf-8', errors='replace')
+    return stream
+
+
+def parse_segment_name(filename: str) -> Optional[Tuple[str, Optional[datetime]]]:
+    """Split a log file name into asset id and segment close time
+
+    ``EURUSD.log`` is the active segment (time None); closed segments are
+    ``EURUSD_20240120_143200123456.log[.gz|.zst]``.
+    """
+    for suffix in COMPRESSED_SUFFIXES + ('.log',):
+        if filename.endswith(suffix):
+            stem = filename[:-len(suffix)]
+            break
+    else:
+        return None
+
+    parts = stem.rsplit('_', 2)
+    if len(parts) == 3:
+        try:
+            return parts[0], datetime.strptime(f"{parts[1]}_{parts[2]}", SEGMENT_TIME_FORMAT)
+        except ValueError:
+            pass
+    if suffix != '.log':
+        return None
+    return stem, None
+
+
+class RotatingAssetHandler(logging.Handler):
+    """Buffered file handler for one asset with size and daily rotation
+
+    Writes go through a large user-space buffer. The buffer is flushed when a
+    record at ``flush_level`` or above arrives, and periodically by the
+    LogFileManager; rotation closes the segment and hands it off for compression.
+    """
+
+    def __init__(self, directory: str, asset_id: str, manager: 'LogFileManager',
+                 max_bytes: int = LOGGING['MAX_FILE_BYTES'],
+                 rotate_daily: bool = LOGGING['ROTATE_DAILY'],
+                 buffer_bytes: int = LOGGING['BUFFER_BYTES'],
+                 flush_level: int = logging.ERROR):
+        super().__init__(logging.DEBUG)
+        self.directory = directory
+        self.asset_id = asset_id
+        self.manager = manager
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.buffer_bytes = buffer_bytes
+        self.flush_level = flush_level
+        self.path = os.path.join(directory, f"{asset_id}.log")
+        self.stream = None
+        self.size = 0
+        self.day = None
+        self.setFormatter(logging.Formatter(LINE_FORMAT, datefmt=DATE_FORMAT))
+
+    def _open(self):
+        if os.path.exists(self.path):
+            opened = datetime.fromtimestamp(os.path.getmtime(self.path)).date()
+            if self.rotate_daily and opened != datetime.now().date():
+                # Leftover active segment from an earlier day
+                self._close_segment(datetime.fromtimestamp(os.path.getmtime(self.path)))
+        self.stream = open(self.path, 'a', encoding='utf-8', buffering=self.buffer_bytes)
+        self.size = self.stream.tell()
+        self.day = datetime.now().date()
+
+    def _close_segment(self, closed_at: datetime):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        segment = os.path.join(
+            self.directory, f"{self.asset_id}_{closed_at.strftime(SEGMENT_TIME_FORMAT)}.log"
+        )
+        while os.path.exists(segment) or any(
+                os.path.exists(segment[:-len('.log')] + s) for s in COMPRESSED_SUFFIXES):
+            closed_at += timedelta(microseconds=1)
+            segment = os.path.join(
+                self.directory, f"{self.asset_id}_{closed_at.strftime(SEGMENT_TIME_FORMAT)}.log"
+            )
+        os.replace(self.path, segment)
+        self.manager.schedule_compression(segment)
+
+    def should_rollover(self, now: datetime) -> bool:
+        if self.size >= self.max_bytes:
+            return True
+        return self.rotate_daily and self.day is not None and now.date() != self.day
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            line = self.format(record) + '\n'
+            self.acquire()
+            try:
+                now = datetime.now()
+                if self.stream is None:
+                    self._open()
+                elif self.should_rollover(now):
+                    self._close_segment(now)
+                    self._open()
+                self.stream.write(line)
+                self.size += len(line.encode('utf-8'))
+                if record.levelno >= self.flush_level:
+                    self.stream.flush()
+            finally:
+                self.release()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self.stream:
+                self.stream.flush()
+        finally:
+            self.release()
+
+    def rollover(self):
+        """Close the active segment now"""
+        self.acquire()
+        try:
+            self._close_segment(datetime.now())
+        finally:
+            self.release()
+
+    def close(self):
+        self.acquire()
+        try:
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+        finally:
+            self.release()
+        super().close()
+
+
+class LogFileManager:
+    """Owns every per-asset handler plus the flush and compression worker
+
+    ``get_logger`` always returns the same logger with exactly one handler for
+    an asset, no matter how many widgets or strategies ask for it.
+    """
+
+    def __init__(self, directory: str = PATHS['LOGS'],
+                 flush_interval: float = LOGGING['FLUSH_INTERVAL'],
+                 retention_days: int = LOGGING['RETENTION_DAYS'],
+                 compression: str = LOGGING['COMPRESSION']):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.compression = compression
+        self.handlers: Dict[str, RotatingAssetHandler] = {}
+        self.lock = threading.Lock()
+        self.compress_queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self.stop_event = threading.Event()
+        self.worker: Optional[threading.Thread] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _ensure_worker(self):
+        if self.worker is None or not self.worker.is_alive():
+            self.stop_event.clear()
+            self.worker = threading.Thread(target=self._run, name='log-files', daemon=True)
+            self.worker.start()
+
+    def get_logger(self, asset_id: str, prefix: str = 'trading') -> logging.Logger:
+        """Logger for an asset with exactly one rotating handler"""
+        with self.lock:
+            file_logger = logging.getLogger(f"{prefix}_{asset_id}")
+            file_logger.setLevel(logging.DEBUG)
+            file_logger.propagate = False
+
+            handler = self.handlers.get(asset_id)
+            if handler is None:
+                handler = RotatingAssetHandler(self.directory, asset_id, self)
+                self.handlers[asset_id] = handler
+            if handler not in file_logger.handlers:
+                file_logger.addHandler(handler)
+
+            self._ensure_worker()
+            return file_logger
+
+    def schedule_compression(self, path: str):
+        self.compress_queue.put(path)
+
+    def flush(self):
+        with self.lock:
+            handlers = list(self.handlers.values())
+        for handler in handlers:
+            handler.flush()
+
+    def prune(self):
+        """Delete compressed segments older than the retention period"""
+        if not self.retention_days:
+            return
+        cutoff = datetime.now() - timedelta(days=self.retention_days)
+        for name in os.listdir(self.directory):
+            parsed = parse_segment_name(name)
+            if parsed and parsed[1] is not None and parsed[1] < cutoff \
+                    and name.endswith(COMPRESSED_SUFFIXES):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def compress_pending(self):
+        """Compress closed segments left uncompressed by an earlier run"""
+        for name in os.listdir(self.directory):
+            parsed = parse_segment_name(name)
+            if parsed and parsed[1] is not None and name.endswith('.log'):
+                self.schedule_compression(os.path.join(self.directory, name))
+
+    def _run(self):
+        self.compress_pending()
+        self.prune()
+        last_prune = time.monotonic()
+        while not self.stop_event.is_set():
+            try:
+                path = self.compress_queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                path = None
+
+            if path:
+                try:
+                    compress_file(path, self.compression)
+                except OSError:
+                    pass
+            self.flush()
+
+            if time.monotonic() - last_prune > 3600:
+                self.prune()
+                last_prune = time.monotonic()
+
+    def close(self):
+        """Flush and close all handlers, then finish pending compressions"""
+        with self.lock:
+            handlers = list(self.handlers.items())
+            self.handlers.clear()
+        for asset_id, handler in handlers:
+            for name in list(logging.Logger.manager.loggerDict):
+                file_logger = logging.Logger.manager.loggerDict[name]
+                if isinstance(file_logger, logging.Logger) and handler in file_logger.handlers:
+                    file_logger.removeHandler(handler)
+            handler.close()
+
+        self.stop_event.set()
+        if self.worker is not None:
+            self.worker.join(timeout=5)
+            self.worker = None
+        while True:
+            try:
+                path = self.compress_queue.get_nowait()
+            except queue.Empty:
+                break
+            if path and os.path.exists(path):
+                try:
+                    compress_file(path, self.compression)
+                except OSError:
+                    pass
+
+
+# Global manager for the application's log directory
+log_files = LogFileManager()
+
+__all__ = [
+    'log_files',
+    'LogFileManager',
+    'RotatingAssetHandler',
+    'compress_file',
+    'get_message_type',
+    'open_segment',
+    'parse_segment_name'
+]
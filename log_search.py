@@ -0,0 +1,199 @@
+"""
+Log search dialog for Future MT5 Pro Trading System
+Queries the indexed log archive by keywords, symbol, message type and time range
+"""
+
+import time
+import tkinter as tk
+from tkinter import ttk, messagebox
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from config import config
+from log_archive import LogArchive
+
+TIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d')
+TYPES = ('all', 'success', 'warning', 'error', 'header', 'info')
+
+
+def parse_time(text: str) -> Optional[datetime]:
+    """Parse an optional date/time field; empty means unbounded"""
+    text = text.strip()
+    if not text:
+        return None
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid time: {text} (use YYYY-MM-DD HH:MM[:SS])")
+
+
+class LogSearchDialog:
+    def __init__(self, parent: tk.Tk, archive: LogArchive):
+        self.archive = archive
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Search Logs")
+        self.dialog.transient(parent)
+
+        # Configure window
+        self.dialog.configure(bg=config.COLORS['bg_dark'])
+
+        # Center dialog
+        width = 900
+        height = 600
+        x = parent.winfo_x() + (parent.winfo_width() - width) // 2
+        y = parent.winfo_y() + (parent.winfo_height() - height) // 2
+        self.dialog.geometry(f"{width}x{height}+{x}+{y}")
+
+        # Search variables
+        self.text_var = tk.StringVar()
+        self.asset_var = tk.StringVar()
+        self.type_var = tk.StringVar(value='all')
+        self.start_var = tk.StringVar()
+        self.end_var = tk.StringVar()
+        self.status_var = tk.StringVar(value="Type keywords and press Enter")
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        """Setup the search dialog UI"""
+        main_frame = tk.Frame(
+            self.dialog,
+            bg=config.COLORS['bg_dark'],
+            highlightbackground=config.COLORS['accent'],
+            highlightthickness=1
+        )
+        main_frame.pack(expand=True, fill="both", padx=2, pady=2)
+
+        # Filters
+        filter_frame = tk.Frame(main_frame, bg=config.COLORS['bg_dark'])
+        filter_frame.pack(fill="x", padx=10, pady=10)
+
+        fields = [
+            ("Search:", ttk.Entry(filter_frame, textvariable=self.text_var, width=30)),
+            ("Symbol:", ttk.Combobox(filter_frame, textvariable=self.asset_var, width=12,
+                                     values=[''] + self.archive.assets())),
+            ("Type:", ttk.Combobox(filter_frame, textvariable=self.type_var, width=9,
+                                   values=TYPES, state="readonly")),
+            ("From:", ttk.Entry(filter_frame, textvariable=self.start_var, width=17)),
+            ("To:", ttk.Entry(filter_frame, textvariable=self.end_var, width=17))
+        ]
+        for label, widget in fields:
+            tk.Label(
+                filter_frame,
+                text=label,
+                bg=config.COLORS['bg_dark'],
+                fg=config.COLORS['text']
+            ).pack(side="left", padx=(5, 2))
+            widget.pack(side="left")
+            if isinstance(widget, ttk.Entry):
+                widget.bind('<Return>', lambda e: self.search())
+
+        tk.Button(
+            filter_frame,
+            text="Search",
+            command=self.search,
+            bg=config.COLORS['accent'],
+            fg=config.COLORS['text'],
+            font=(config.UI['FONTS']['FAMILY'], 10, "bold"),
+            cursor="hand2"
+        ).pack(side="right", padx=5)
+
+        # Results
+        tree_frame = tk.Frame(main_frame, bg=config.COLORS['bg_dark'])
+        tree_frame.pack(expand=True, fill="both", padx=10)
+
+        self.tree = ttk.Treeview(
+            tree_frame,
+            columns=("time", "asset", "type", "message"),
+            show="headings"
+        )
+        for column, title, width in (("time", "Time", 160), ("asset", "Symbol", 90),
+                                     ("type", "Type", 70), ("message", "Message", 520)):
+            self.tree.heading(column, text=title)
+            self.tree.column(column, width=width, stretch=(column == "message"))
+        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side="left", expand=True, fill="both")
+        scrollbar.pack(side="right", fill="y")
+        self.tree.bind('<Double-1>', self.show_context)
+
+        # Status
+        tk.Label(
+            main_frame,
+            textvariable=self.status_var,
+            bg=config.COLORS['bg_dark'],
+            fg=config.COLORS['text'],
+            anchor="w"
+        ).pack(fill="x", padx=10, pady=5)
+
+    def search(self):
+        """Run the query against the archive and show the results"""
+        try:
+            start = parse_time(self.start_var.get())
+            end = parse_time(self.end_var.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e), parent=self.dialog)
+            return
+
+        asset = self.asset_var.get().strip().upper()
+        log_type = self.type_var.get()
+
+        started = time.perf_counter()
+        results = self.archive.search(
+            text=self.text_var.get(),
+            assets=[asset] if asset else None,
+            types=None if log_type == 'all' else [log_type],
+            start=start,
+            end=end
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+        self.show_results(results)
+        self.status_var.set(f"{len(results)} results in {elapsed:.1f} ms - double-click for context")
+
+    def show_results(self, results: List[Dict[str, Any]]):
+        self.tree.delete(*self.tree.get_children())
+        self.results.clear()
+        for row in results:
+            item = self.tree.insert('', 'end', values=(
+                row['time'].strftime('%Y-%m-%d %H:%M:%S'),
+                row['asset'],
+                row['type'],
+                row['message'].replace('\n', ' ')
+            ))
+            self.results[item] = row
+
+    def show_context(self, event=None):
+        """Show the lines around the selected result"""
+        selection = self.tree.selection()
+        if not selection:
+            return
+        row = self.results[selection[0]]
+        lines = self.archive.context(row['asset'], row['time'], before=50, after=50)
+
+        window = tk.Toplevel(self.dialog)
+        window.title(f"{row['asset']} - {row['time'].strftime('%Y-%m-%d %H:%M:%S')}")
+        window.geometry("900x500")
+        text = tk.Text(
+            window,
+            bg=config.COLORS['bg_dark'],
+            fg=config.COLORS['text'],
+            font=("Consolas", 10),
+            wrap="none"
+        )
+        text.pack(expand=True, fill="both")
+        text.tag_configure('match', background=config.COLORS['accent'])
+        for line in lines:
+            tag = 'match' if line['id'] == row['id'] else ''
+            text.insert('end', f"[{line['time'].strftime('%H:%M:%S')}] {line['message']}\n", tag)
+        text.see('match.first' if text.tag_ranges('match') else 'end')
+        text.config(state='disabled')
+
+
+def show_log_search(parent: tk.Tk, archive: LogArchive):
+    """Show log search dialog"""
+    dialog = LogSearchDialog(parent, archive)
+    return dialog
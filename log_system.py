@@ -2,10 +2,13 @@ import time
 from datetime import datetime
 import tkinter as tk
 
+from log_view import LogBuffer, default_spill_path
+
 
 class LogSystem:
     def __init__(self):
-        self.log_widgets = {}  # Dictionary to store text widgets for each asset
+        self.log_widgets = {}  # Dictionary to store log views for each asset
+        self.buffer = LogBuffer(spill_path=default_spill_path('painel'))
         self.colors = {
             'success': '#2ecc71',
             'warning': '#f1c40f',
@@ -14,14 +17,12 @@ class LogSystem:
             'default': '#ecf0f1'
         }
 
-    def add_log_widget(self, asset, text_widget):
-        """Add a text widget for a specific asset"""
-        self.log_widgets[asset] = text_widget
-        self.log_widgets[asset].tag_configure('success', foreground=self.colors['success'])
-        self.log_widgets[asset].tag_configure('warning', foreground=self.colors['warning'])
-        self.log_widgets[asset].tag_configure('error', foreground=self.colors['error'])
-        self.log_widgets[asset].tag_configure('info', foreground=self.colors['info'])
-        self.log_widgets[asset].tag_configure('default', foreground=self.colors['default'])
+    def add_log_widget(self, asset, log_view):
+        """Add a VirtualLogView for a specific asset ("main" shows every asset)"""
+        self.log_widgets[asset] = log_view
+        log_view.attach(self.buffer, None if asset == 'main' else asset)
+        for msg_type in ('success', 'warning', 'error', 'info', 'default'):
+            log_view.text.tag_configure(msg_type, foreground=self.colors[msg_type])
 
     def remove_log_widget(self, asset):
         """Remove a text widget for a specific asset"""
@@ -45,34 +46,14 @@ class LogSystem:
         return 'default'
 
     def logar(self, mensagem, asset=None):
-        """Log a message to a specific asset's widget or all widgets if asset is None"""
-        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+        """Log a message for an asset (or for all if asset is None); safe from any thread"""
         msg_type = self.get_message_type(mensagem)
-        texto_final = f"[{timestamp}] {mensagem}\n"
-
-        if asset and asset in self.log_widgets:
-            # Log to specific asset widget
-            widget = self.log_widgets[asset]
-            widget.insert('end', texto_final, msg_type)
-            widget.see('end')
-
-            # Limit log size to prevent memory issues
-            if float(widget.index('end')) > 1000:  # Keep last 1000 lines
-                widget.delete('1.0', '500.0')
-        elif not asset:
-            # Log to all widgets if no specific asset
-            for widget in self.log_widgets.values():
-                widget.insert('end', texto_final, msg_type)
-                widget.see('end')
-
-                # Limit log size
-                if float(widget.index('end')) > 1000:
-                    widget.delete('1.0', '500.0')
+        self.buffer.append(mensagem.strip('\n'), asset, msg_type)
 
     def clear_logs(self, asset=None):
         """Clear logs for a specific asset or all assets"""
         if asset and asset in self.log_widgets:
-            self.log_widgets[asset].delete('1.0', 'end')
+            self.log_widgets[asset].clear()
         elif not asset:
             for widget in self.log_widgets.values():
-                widget.delete('1.0', 'end')
+                widget.clear()
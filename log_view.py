@@ -0,0 +1,521 @@
+"""
+Virtualized log view for Future MT5 Pro Trading System
+Log records live in a bounded in-memory ring that spills to an indexed file on
+disk; the view renders only the visible lines and refreshes from the Tk main loop
+"""
+
+import os
+import re
+import sys
+import json
+import bisect
+import threading
+import tkinter as tk
+from tkinter import ttk
+from datetime import datetime
+from typing import Dict, List, Optional, NamedTuple, Iterable, Set, Tuple
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import LOGGING, PATHS
+except ImportError:
+    LOGGING = {
+        'AUTO_SCROLL': True,
+        'BUFFER_LINES': 20000,
+        'INDEX_EVERY': 256,
+        'SPILL_BYTES': 64 * 1024 * 1024,
+        'REFRESH_MS': 100
+    }
+    PATHS = {
+        'LOGS': 'logs/'
+    }
+
+
+class LogRecord(NamedTuple):
+    seq: int
+    time: float
+    type: str
+    asset: Optional[str]
+    message: str
+
+    def format(self) -> str:
+        stamp = datetime.fromtimestamp(self.time).strftime('%H:%M:%S.%f')[:-3]
+        return f"[{stamp}] {self.message}"
+
+
+SPILL_NAME = re.compile(r'^\w+_\d{8}_\d{6}_(\d+)\.jsonl(\.1)?$')
+
+
+def remove_stale_spills(directory: str):
+    """Delete spill files left behind by processes that are no longer running"""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    for name in names:
+        match = SPILL_NAME.match(name)
+        if match is None or int(match.group(1)) == os.getpid():
+            continue
+        if os.name != 'nt':
+            try:
+                os.kill(int(match.group(1)), 0)
+                continue  # still running
+            except ProcessLookupError:
+                pass
+            except (PermissionError, OverflowError):
+                continue
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass  # Windows: still held open by its process
+
+
+class LogBuffer:
+    """Thread-safe ring of the most recent log records, backed by a spill file
+
+    Every record gets a sequence number. The newest ``capacity`` records stay in
+    memory; records pushed out of the ring are appended to the spill file, with
+    a sparse time -> offset index every ``index_every`` records so older history
+    can be reloaded by timestamp. The file is only created on the first
+    eviction, and past ``spill_bytes`` it is rotated to ``<path>.1`` so at most
+    two generations are kept. Spill files of dead processes are removed when a
+    buffer is created.
+    """
+
+    def __init__(self, capacity: int = LOGGING['BUFFER_LINES'],
+                 spill_path: Optional[str] = None,
+                 index_every: int = LOGGING['INDEX_EVERY'],
+                 spill_bytes: int = LOGGING['SPILL_BYTES']):
+        self.capacity = capacity
+        self.items: List[Optional[LogRecord]] = [None] * capacity
+        self.first_seq = 0
+        self.next_seq = 0
+        self.lock = threading.Lock()
+
+        self.index_every = index_every
+        self.spill_bytes = spill_bytes
+        self.index_times: List[float] = []
+        self.index_offsets: List[int] = []
+        self.spill_path = spill_path
+        self.spill = None
+        # Rotated generation: open handle and its index
+        self.previous = None
+        self.previous_index: Tuple[List[float], List[int]] = ([], [])
+        if spill_path:
+            remove_stale_spills(os.path.dirname(spill_path) or '.')
+
+    def _spill(self, record: LogRecord):
+        """Append an evicted record to the spill file (lock held)"""
+        if self.spill is None:
+            os.makedirs(os.path.dirname(self.spill_path) or '.', exist_ok=True)
+            self.spill = open(self.spill_path, 'w+b')
+        elif self.spill.tell() >= self.spill_bytes:
+            self._rotate()
+        if record.seq % self.index_every == 0:
+            self.index_times.append(record.time)
+            self.index_offsets.append(self.spill.tell())
+        line = json.dumps([record.seq, record.time, record.type, record.asset, record.message],
+                          ensure_ascii=False)
+        self.spill.write(line.encode('utf-8') + b'\n')
+
+    def _rotate(self):
+        """Keep the current spill as the previous generation and start a new one"""
+        if self.previous:
+            self.previous.close()
+        self.spill.close()
+        os.replace(self.spill_path, self.spill_path + '.1')
+        self.previous = open(self.spill_path + '.1', 'rb')
+        self.previous_index = (self.index_times, self.index_offsets)
+        self.index_times, self.index_offsets = [], []
+        self.spill = open(self.spill_path, 'w+b')
+
+    def append(self, message: str, asset: Optional[str] = None, msg_type: str = 'info',
+               timestamp: Optional[float] = None) -> LogRecord:
+        """Add a record; safe to call from any thread"""
+        if timestamp is None:
+            timestamp = datetime.now().timestamp()
+
+        with self.lock:
+            record = LogRecord(self.next_seq, timestamp, msg_type, asset, message)
+            evicted = self.items[record.seq % self.capacity]
+            if evicted is not None and self.spill_path:
+                self._spill(evicted)
+            self.items[record.seq % self.capacity] = record
+            self.next_seq += 1
+            if self.next_seq - self.first_seq > self.capacity:
+                self.first_seq = self.next_seq - self.capacity
+        return record
+
+    def get(self, seq: int) -> Optional[LogRecord]:
+        """Record by sequence number if it is still in memory"""
+        if self.first_seq <= seq < self.next_seq:
+            record = self.items[seq % self.capacity]
+            if record is not None and record.seq == seq:
+                return record
+        return None
+
+    def range(self, start: int, end: int) -> List[LogRecord]:
+        """Records with start <= seq < end that are still in memory"""
+        with self.lock:
+            start = max(start, self.first_seq)
+            end = min(end, self.next_seq)
+            return [self.items[seq % self.capacity] for seq in range(start, end)]
+
+    def seq_at(self, timestamp: float) -> int:
+        """First in-memory sequence at or after a timestamp (binary search)"""
+        with self.lock:
+            lo, hi = self.first_seq, self.next_seq
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self.items[mid % self.capacity].time < timestamp:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            return lo
+
+    def oldest_time(self) -> Optional[float]:
+        with self.lock:
+            if self.next_seq == self.first_seq:
+                return None
+            return self.items[self.first_seq % self.capacity].time
+
+    @staticmethod
+    def _read_spill(f, index: Tuple[List[float], List[int]], timestamp: float,
+                    limit: int, records: List[LogRecord]):
+        pos = bisect.bisect_right(index[0], timestamp) - 1
+        f.seek(index[1][pos] if pos >= 0 else 0)
+        for line in f:
+            if len(records) >= limit:
+                return
+            try:
+                seq, time_, msg_type, asset, message = json.loads(line)
+            except ValueError:
+                continue
+            if time_ >= timestamp:
+                records.append(LogRecord(seq, time_, msg_type, asset, message))
+
+    def read_history(self, timestamp: float, limit: int) -> List[LogRecord]:
+        """Load up to ``limit`` records at or after ``timestamp``
+
+        Evicted records come from the spill files, then the page is completed
+        with the records still in memory.
+        """
+        records: List[LogRecord] = []
+        with self.lock:
+            if self.previous:
+                self._read_spill(self.previous, self.previous_index, timestamp, limit, records)
+            if self.spill:
+                self.spill.flush()
+                with open(self.spill_path, 'rb') as f:
+                    self._read_spill(f, (self.index_times, self.index_offsets), timestamp, limit, records)
+        if len(records) < limit:
+            after = records[-1].seq + 1 if records else 0
+            start = max(self.seq_at(timestamp), after)
+            records.extend(self.range(start, start + limit - len(records)))
+        return records
+
+    def close(self, remove_spill: bool = True):
+        """Close the spill files"""
+        with self.lock:
+            for f in (self.spill, self.previous):
+                if f:
+                    f.close()
+            self.spill = self.previous = None
+            if remove_spill and self.spill_path:
+                for path in (self.spill_path, self.spill_path + '.1'):
+                    if os.path.exists(path):
+                        os.remove(path)
+
+
+def default_spill_path(name: str) -> str:
+    """Spill file for a buffer, unique per process"""
+    return os.path.join(
+        PATHS['LOGS'], 'view',
+        f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.jsonl"
+    )
+
+
+class VirtualLogView(tk.Frame):
+    """Log widget that renders only the visible slice of a LogBuffer
+
+    Producers never touch the widget: they append to the buffer from any
+    thread, and the view polls it with ``after`` and redraws only when new
+    records arrived or the user scrolled. Filtering by type and asset keeps an
+    incrementally maintained list of matching sequence numbers.
+    """
+
+    HISTORY_PAGE = 2000
+
+    def __init__(self, parent: tk.Widget, buffer: Optional[LogBuffer] = None,
+                 asset: Optional[str] = None, colors: Optional[Dict[str, str]] = None,
+                 bg: str = '#000000', fg: str = '#FFFFFF', font=("Consolas", 12),
+                 refresh_ms: int = LOGGING['REFRESH_MS'], show_toolbar: bool = True, **kwargs):
+        super().__init__(parent, bg=bg, **kwargs)
+        self.buffer = buffer
+        self.colors = colors or {}
+        self.refresh_ms = refresh_ms
+        self.auto_scroll = LOGGING['AUTO_SCROLL']
+
+        # Filtering state
+        self.levels: Optional[Set[str]] = None
+        self.assets: Optional[Set[str]] = {asset} if asset else None
+        self.matches: List[int] = []
+        self.scanned_seq = 0
+        self.cleared_seq = 0
+
+        # Viewport state: index of the first visible row among matches
+        self.top = 0
+        self.visible_rows = 20
+        self.following = True
+        self.history: Optional[List[LogRecord]] = None
+        self.dirty = True
+        self.rendered = None
+
+        if show_toolbar:
+            self.setup_toolbar(bg, fg)
+
+        body = tk.Frame(self, bg=bg)
+        body.pack(fill="both", expand=True)
+
+        self.text = tk.Text(body, bg=bg, fg=fg, font=font, wrap="none",
+                            padx=10, pady=10, height=20, width=60, cursor="arrow")
+        self.text.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ttk.Scrollbar(body, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        for msg_type, color in self.colors.items():
+            self.text.tag_configure(msg_type, foreground=color)
+
+        self.text.bind('<Configure>', self.on_resize)
+        self.text.bind('<MouseWheel>', self.on_mousewheel)
+        self.text.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.text.bind('<Button-5>', lambda e: self.scroll(3))
+        self.text.configure(state="disabled")
+
+        self.after(self.refresh_ms, self.refresh)
+
+    def setup_toolbar(self, bg: str, fg: str):
+        bar = tk.Frame(self, bg=bg)
+        bar.pack(fill="x", pady=(0, 4))
+
+        tk.Label(bar, text="Level", bg=bg, fg=fg).pack(side="left", padx=(0, 4))
+        self.level_var = tk.StringVar(value="all")
+        level_combo = ttk.Combobox(
+            bar, textvariable=self.level_var, width=8, state="readonly",
+            values=["all", "success", "warning", "error", "header", "info", "default"]
+        )
+        level_combo.pack(side="left")
+        level_combo.bind('<<ComboboxSelected>>', lambda e: self.apply_toolbar_filter())
+
+        tk.Label(bar, text="Symbol", bg=bg, fg=fg).pack(side="left", padx=(10, 4))
+        self.symbol_var = tk.StringVar()
+        symbol_entry = ttk.Entry(bar, textvariable=self.symbol_var, width=10)
+        symbol_entry.pack(side="left")
+        symbol_entry.bind('<Return>', lambda e: self.apply_toolbar_filter())
+
+        tk.Label(bar, text="Time", bg=bg, fg=fg).pack(side="left", padx=(10, 4))
+        self.time_var = tk.StringVar()
+        time_entry = ttk.Entry(bar, textvariable=self.time_var, width=9)
+        time_entry.pack(side="left")
+        time_entry.bind('<Return>', lambda e: self.jump_to_text(self.time_var.get()))
+
+        ttk.Button(bar, text="Live", width=5, command=self.follow_tail).pack(side="right")
+
+    # Data / filtering
+    def attach(self, buffer: LogBuffer, asset: Optional[str] = None):
+        """Show records from a buffer, optionally only one asset's"""
+        self.buffer = buffer
+        if asset:
+            self.assets = {asset}
+        self.reset_matches()
+
+    def is_filtered(self) -> bool:
+        return self.levels is not None or self.assets is not None
+
+    def matches_record(self, record: LogRecord) -> bool:
+        if self.levels is not None and record.type not in self.levels:
+            return False
+        if self.assets is not None and record.asset is not None and record.asset not in self.assets:
+            return False
+        return True
+
+    def set_filter(self, levels: Optional[Iterable[str]] = None,
+                   assets: Optional[Iterable[str]] = None):
+        """Restrict the view to message types and/or assets; None shows everything"""
+        self.levels = set(levels) if levels else None
+        self.assets = set(assets) if assets else None
+        self.reset_matches()
+
+    def apply_toolbar_filter(self):
+        level = self.level_var.get()
+        symbol = self.symbol_var.get().strip()
+        self.set_filter(
+            levels=None if level == "all" else [level],
+            assets=[s.strip() for s in symbol.split(',') if s.strip()] or None
+        )
+
+    def reset_matches(self):
+        self.matches = []
+        self.scanned_seq = self.cleared_seq
+        self.top = 0
+        self.following = True
+        self.dirty = True
+
+    def update_matches(self) -> bool:
+        """Scan records appended since the last refresh; True if anything changed"""
+        if self.buffer is None:
+            return False
+        next_seq = self.buffer.next_seq
+        first_seq = max(self.buffer.first_seq, self.cleared_seq)
+        changed = next_seq != self.scanned_seq
+
+        if self.is_filtered():
+            if self.scanned_seq < first_seq:
+                self.scanned_seq = first_seq
+            for record in self.buffer.range(self.scanned_seq, next_seq):
+                if self.matches_record(record):
+                    self.matches.append(record.seq)
+
+            # Forget matches that fell out of the ring
+            drop = bisect.bisect_left(self.matches, first_seq)
+            if drop:
+                del self.matches[:drop]
+                self.top = max(0, self.top - drop)
+        self.scanned_seq = next_seq
+        return changed
+
+    def match_count(self) -> int:
+        if self.history is not None:
+            return len(self.history)
+        if self.buffer is None:
+            return 0
+        if self.is_filtered():
+            return len(self.matches)
+        return self.buffer.next_seq - max(self.buffer.first_seq, self.cleared_seq)
+
+    def visible_records(self) -> List[LogRecord]:
+        end = self.top + self.visible_rows
+        if self.history is not None:
+            return self.history[self.top:end]
+        if self.is_filtered():
+            records = [self.buffer.get(seq) for seq in self.matches[self.top:end]]
+            return [r for r in records if r is not None]
+        first = max(self.buffer.first_seq, self.cleared_seq)
+        return self.buffer.range(first + self.top, first + end)
+
+    # Rendering
+    def refresh(self):
+        """Periodic refresh from the Tk main loop"""
+        try:
+            if self.history is None and self.update_matches():
+                self.dirty = True
+            if self.dirty:
+                self.render()
+        finally:
+            try:
+                if self.winfo_exists():
+                    self.after(self.refresh_ms, self.refresh)
+            except tk.TclError:
+                pass  # application destroyed
+
+    def render(self):
+        self.dirty = False
+        total = self.match_count()
+        if self.following and self.auto_scroll and self.history is None:
+            self.top = max(0, total - self.visible_rows)
+        self.top = max(0, min(self.top, max(0, total - self.visible_rows)))
+
+        records = self.visible_records() if self.buffer is not None or self.history else []
+        key = (self.top, total, tuple(r.seq for r in records))
+        if key != self.rendered:
+            self.rendered = key
+            self.text.configure(state="normal")
+            self.text.delete('1.0', 'end')
+            for record in records:
+                self.text.insert('end', record.format() + '\n', record.type)
+            self.text.configure(state="disabled")
+
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # Navigation
+    def scroll(self, rows: int):
+        self.top = max(0, self.top + rows)
+        self.following = self.top + self.visible_rows >= self.match_count()
+        self.dirty = True
+
+    def on_scrollbar(self, *args):
+        if args[0] == 'moveto':
+            self.top = int(float(args[1]) * self.match_count())
+            self.following = self.top + self.visible_rows >= self.match_count()
+            self.dirty = True
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            self.scroll(amount * self.visible_rows if args[2] == 'pages' else amount)
+
+    def on_mousewheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+
+    def on_resize(self, event):
+        linespace = self.text.tk.call('font', 'metrics', self.text.cget('font'), '-linespace')
+        self.visible_rows = max(1, int((event.height - 20) // max(1, int(linespace))))
+        self.dirty = True
+
+    def jump_to(self, when: datetime):
+        """Scroll to the first record at or after ``when``
+
+        Records already evicted from memory are reloaded from the spill file
+        and shown as a history page until ``follow_tail`` is called.
+        """
+        if self.buffer is None:
+            return
+        timestamp = when.timestamp()
+        oldest = self.buffer.oldest_time()
+
+        if oldest is not None and timestamp >= oldest:
+            self.history = None
+            seq = self.buffer.seq_at(timestamp)
+            if self.is_filtered():
+                self.top = bisect.bisect_left(self.matches, seq)
+            else:
+                self.top = seq - max(self.buffer.first_seq, self.cleared_seq)
+        else:
+            records = self.buffer.read_history(timestamp, self.HISTORY_PAGE)
+            self.history = [r for r in records if self.matches_record(r)]
+            self.top = 0
+        self.following = False
+        self.dirty = True
+
+    def jump_to_text(self, value: str):
+        """Jump to a HH:MM[:SS] time of today"""
+        for fmt in ('%H:%M:%S', '%H:%M'):
+            try:
+                parsed = datetime.strptime(value.strip(), fmt)
+            except ValueError:
+                continue
+            self.jump_to(datetime.now().replace(
+                hour=parsed.hour, minute=parsed.minute, second=parsed.second, microsecond=0
+            ))
+            return
+
+    def follow_tail(self):
+        """Leave history mode and follow new records"""
+        self.history = None
+        self.following = True
+        self.dirty = True
+
+    def clear(self):
+        """Hide everything logged so far"""
+        if self.buffer is not None:
+            self.cleared_seq = self.buffer.next_seq
+        self.history = None
+        self.reset_matches()
+
+
+__all__ = ['LogRecord', 'LogBuffer', 'VirtualLogView', 'default_spill_path']
@@ -9,7 +9,6 @@ import os
 import sys
 import logging
 from typing import Optional, Dict, Any
-import json
 
 # Add current directory to Python path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -27,6 +26,9 @@ except ImportError:
         'AUTO_SCROLL': True,
         'TIMESTAMP_FORMAT': '%H:%M:%S.%f',
         'FILE_FORMAT': '%Y%m%d',
+        'BUFFER_LINES': 20000,
+        'INDEX_EVERY': 256,
+        'REFRESH_MS': 100,
         'LEVELS': {
             'DEBUG': 10,
             'INFO': 20,
@@ -39,21 +41,30 @@ except ImportError:
         'LOGS': 'logs/'
     }
 
+from log_view import LogBuffer, VirtualLogView, default_spill_path
+from log_files import LogFileManager, log_files, get_message_type
+
 class TradingLogger:
-    def __init__(self):
-        self.log_widgets: Dict[str, tk.Text] = {}
+    def __init__(self, files: LogFileManager = log_files):
+        self.log_widgets: Dict[str, VirtualLogView] = {}
         self.file_loggers: Dict[str, logging.Logger] = {}
+        self.files = files
         self.setup_log_directory()
+        # Shared by every view; views filter by asset and render on their own
+        self.buffer = LogBuffer(spill_path=default_spill_path('trading'))
         
     def setup_log_directory(self):
         """Create logs directory if it doesn't exist"""
         os.makedirs(PATHS['LOGS'], exist_ok=True)
         
-    def add_log_widget(self, asset_id: str, text_widget: tk.Text):
-        """Add a text widget for a specific asset"""
-        self.log_widgets[asset_id] = text_widget
-        self.setup_widget_tags(text_widget)
-        self.setup_file_logger(asset_id)
+    def add_log_widget(self, asset_id: str, log_view: VirtualLogView):
+        """Add a log view for a specific asset
+
+        The "main" view shows every asset; it can be narrowed with its filters.
+        """
+        self.log_widgets[asset_id] = log_view
+        log_view.attach(self.buffer, None if asset_id == 'main' else asset_id)
+        self.setup_widget_tags(log_view.text)
         
     def setup_widget_tags(self, widget: tk.Text):
         """Setup color tags for the text widget"""
@@ -63,113 +74,63 @@ class TradingLogger:
         widget.tag_configure('info', foreground=config.COLORS['TEXT_SECONDARY'])
         widget.tag_configure('header', foreground=config.COLORS['ACCENT'])
         
-    def setup_file_logger(self, asset_id: str):
-        """Setup file logger for an asset"""
-        logger = logging.getLogger(f"trading_{asset_id}")
-        logger.setLevel(logging.DEBUG)
-        
-        # Create file handler
-        log_file = os.path.join(
-            PATHS['LOGS'],
-            f"{asset_id}_{datetime.now().strftime(LOGGING['FILE_FORMAT'])}.log"
-        )
-        handler = logging.FileHandler(log_file)
-        handler.setLevel(logging.DEBUG)
-        
-        # Create formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(levelname)s - %(message)s',
-            datefmt=LOGGING['TIMESTAMP_FORMAT']
-        )
-        handler.setFormatter(formatter)
-        
-        # Add handler to logger
-        logger.addHandler(handler)
-        self.file_loggers[asset_id] = logger
+    def get_file_logger(self, asset_id: str) -> logging.Logger:
+        """File logger for an asset (one rotating handler per asset), with or without a view"""
+        file_logger = self.file_loggers.get(asset_id)
+        if file_logger is None:
+            file_logger = self.file_loggers[asset_id] = self.files.get_logger(asset_id)
+        return file_logger
         
     def get_message_type(self, message: str) -> str:
         """Determine message type and corresponding color tag"""
-        if any(x in message for x in ['✅', 'SUCESSO', '🎯 SINAL']):
-            return 'success'
-        elif any(x in message for x in ['⚠️', 'AVISO', '⏳']):
-            return 'warning'
-        elif any(x in message for x in ['❌', 'ERRO']):
-            return 'error'
-        elif any(x in message for x in ['===', '📊', '📈']):
-            return 'header'
-        return 'info'
+        return get_message_type(message)
         
     def log(self, message: str, asset_id: Optional[str] = None, level: str = 'INFO'):
-        """Log a message to UI and file"""
-        timestamp = datetime.now().strftime(LOGGING['TIMESTAMP_FORMAT'])
-        formatted_message = f"[{timestamp}] {message}\n"
+        """Log a message to UI and file; safe to call from any thread"""
         msg_type = self.get_message_type(message)
         
-        # Log to UI
-        if asset_id and asset_id in self.log_widgets:
-            widget = self.log_widgets[asset_id]
-            widget.insert('end', formatted_message, msg_type)
-            if LOGGING['AUTO_SCROLL']:
-                widget.see('end')
-                
-            # Limit log size
-            if float(widget.index('end')) > LOGGING['MAX_LINES']:
-                widget.delete('1.0', f"{LOGGING['MAX_LINES'] // 2}.0")
-        elif not asset_id:
-            # Log to all widgets
-            for widget in self.log_widgets.values():
-                widget.insert('end', formatted_message, msg_type)
-                if LOGGING['AUTO_SCROLL']:
-                    widget.see('end')
-                    
-                # Limit log size
-                if float(widget.index('end')) > LOGGING['MAX_LINES']:
-                    widget.delete('1.0', f"{LOGGING['MAX_LINES'] // 2}.0")
+        # Log to UI: views pick new records up on their next refresh
+        self.buffer.append(message.strip('\n'), asset_id, msg_type)
                     
-        # Log to file
-        if asset_id and asset_id in self.file_loggers:
-            logger = self.file_loggers[asset_id]
-            log_level = LOGGING['LEVELS'].get(level.upper(), LOGGING['LEVELS']['INFO'])
-            logger.log(log_level, message)
+        # Log to file: every asset, untagged messages under "main"
+        log_level = LOGGING['LEVELS'].get(level.upper(), LOGGING['LEVELS']['INFO'])
+        self.get_file_logger(asset_id or 'main').log(log_level, message)
             
+    def logar(self, mensagem: str, asset: Optional[str] = None):
+        """LogSystem compatible entry point used by EstrategiaTrading"""
+        self.log(mensagem, asset)
+
     def clear_logs(self, asset_id: Optional[str] = None):
         """Clear logs for specific asset or all assets"""
         if asset_id and asset_id in self.log_widgets:
-            self.log_widgets[asset_id].delete('1.0', 'end')
+            self.log_widgets[asset_id].clear()
         elif not asset_id:
             for widget in self.log_widgets.values():
-                widget.delete('1.0', 'end')
+                widget.clear()
                 
     def export_logs(self, asset_id: str, filepath: str) -> bool:
-        """Export logs for an asset to JSON file"""
-        if asset_id not in self.log_widgets:
-            return False
-            
-        try:
-            widget = self.log_widgets[asset_id]
-            logs = widget.get('1.0', 'end').splitlines()
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(logs, f, indent=4, ensure_ascii=False)
-            return True
-        except:
-            return False
+        """Export the on-disk logs of an asset ('main' for all) to CSV, JSONL or Parquet
+
+        The format follows the file extension (JSONL otherwise). Runs in the
+        calling thread; use ExportJob.start for a background export.
+        """
+        from exporter import ExportJob
+
+        self.files.flush()
+        job = ExportJob('logs', filepath, symbols=None if asset_id == 'main' else [asset_id])
+        return job.run()
             
     def remove_log_widget(self, asset_id: str):
         """Remove a log widget"""
         if asset_id in self.log_widgets:
             del self.log_widgets[asset_id]
-        if asset_id in self.file_loggers:
-            del self.file_loggers[asset_id]
             
     def cleanup(self):
         """Cleanup logging system"""
-        for logger in self.file_loggers.values():
-            for handler in logger.handlers[:]:
-                handler.close()
-                logger.removeHandler(handler)
+        self.files.close()
         self.log_widgets.clear()
         self.file_loggers.clear()
+        self.buffer.close()
 
 # Create global logger instance
 logger = TradingLogger()
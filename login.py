@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import MetaTrader5 as mt5
+from mt5_connection import connection_manager
 
 
 class LoginWindow:
@@ -120,21 +121,11 @@ class LoginWindow:
             return
 
         try:
-            # Inicializar MT5
-            if not mt5.initialize():
-                messagebox.showerror("Erro", "Falha ao inicializar o MetaTrader 5.\nVerifique se está instalado.")
-                return
-
-            # Tentar login
-            if not mt5.login(int(login), senha, servidor):
-                messagebox.showerror("Erro", "Falha ao fazer login.\nVerifique suas credenciais.")
-                mt5.shutdown()
-                return
-
-            # Verificar conexão
-            if mt5.account_info() is None:
-                messagebox.showerror("Erro", "Não foi possível conectar à conta.")
-                mt5.shutdown()
+            # Inicializar, fazer login e verificar a conta; as credenciais
+            # ficam em memória para reconexões
+            sucesso, mensagem = connection_manager.connect(int(login), senha, servidor)
+            if not sucesso:
+                messagebox.showerror("Erro", f"Falha ao conectar ao MetaTrader 5.\n{mensagem}")
                 return
 
             messagebox.showinfo("Sucesso", "Login realizado com sucesso!")
@@ -142,7 +133,7 @@ class LoginWindow:
 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao conectar: {str(e)}")
-            mt5.shutdown()
+            connection_manager.disconnect()
 
     def mostrar(self):
         """Mostra a janela de login"""
@@ -1,9 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import MetaTrader5 as mt5
 import sys
 import os
 import threading
+from mt5_connection import connection_manager
 
 # Add current directory to Python path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -238,21 +238,11 @@ class LoginWindow:
         
     def connect_mt5(self, login, senha, servidor):
         try:
-            # Initialize MT5
-            if not mt5.initialize():
-                self.show_status("Failed to initialize MetaTrader 5.\nPlease make sure it's installed.", "error")
-                return
-                
-            # Try login
-            if not mt5.login(int(login), senha, servidor):
-                self.show_status("Login failed.\nPlease check your credentials.", "error")
-                mt5.shutdown()
-                return
-                
-            # Verify connection
-            if mt5.account_info() is None:
-                self.show_status("Could not connect to trading account.", "error")
-                mt5.shutdown()
+            # Initialize, log in and verify the account; the credentials stay
+            # in memory for reconnections
+            success, message = connection_manager.connect(int(login), senha, servidor)
+            if not success:
+                self.show_status(message, "error")
                 return
                 
             # Success
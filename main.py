@@ -4,25 +4,23 @@ Main entry point for Future MT5 Pro Trading System
 
 import tkinter as tk
 from tkinter import messagebox
-import MetaTrader5 as mt5
 import sys
 import traceback
 import os
-from typing import Tuple
+from typing import Tuple, Optional
 
 # Add current directory to Python path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
-# Import local modules
+# Import local modules; MetaTrader5, the strategy and the main window are
+# imported later, concurrently with the splash screen (see startup.py)
 try:
+    from startup import startup_timer, Warmup
     from config import config
     from logger import logger
     from splash import show_splash
-    from login_window import show_login
-    from trading_app import TradingApp
-    from utils import initialize_mt5, get_account_info, format_currency
 except ImportError as e:
     print(f"\n❌ Error importing modules: {str(e)}")
     print("Please ensure all required files are in the same directory.")
@@ -38,14 +36,21 @@ def handle_exception(exc_type, exc_value, exc_traceback):
     logger.log(f"Uncaught exception:\n{error_msg}", level='ERROR')
     sys.exit(1)
 
-def setup_mt5() -> Tuple[bool, str]:
+def setup_mt5(warmup: Optional[Warmup] = None) -> Tuple[bool, str]:
     """Initialize MT5 and verify connection"""
-    success, message = initialize_mt5()
-    if not success:
-        return False, message
+    from login_window import show_login
+    from utils import initialize_mt5, get_account_info, format_currency
+
+    # The splash normally initialized MT5 already
+    if warmup is None or not warmup.ok('mt5'):
+        success, message = initialize_mt5()
+        if not success:
+            return False, message
         
     # Show login window if needed
-    if not show_login():
+    with startup_timer.phase("login (user input)"):
+        logged_in = show_login()
+    if not logged_in:
         return False, "Login failed or cancelled"
         
     # Get account info
@@ -62,6 +67,15 @@ def setup_mt5() -> Tuple[bool, str]:
     
     return True, "Connected successfully"
 
+def report_startup(warmup: Warmup):
+    """Log how long each startup phase took once the main window is interactive"""
+    startup_timer.mark("main window interactive")
+    for name, error in warmup.errors.items():
+        logger.log(f"⚠️ Warm-up {name} failed: {error}", level='WARNING')
+    report = startup_timer.report()
+    print(f"\n{report}")
+    logger.log(report)
+
 def main():
     """Main application entry point"""
     # Set exception handler
@@ -72,19 +86,22 @@ def main():
     print("\nInitializing system...")
     
     try:
-        # Show splash screen
-        show_splash()
+        # Show splash screen while warming up
+        warmup = show_splash()
         
         # Setup MT5
-        success, message = setup_mt5()
+        success, message = setup_mt5(warmup)
         if not success:
             print(f"\n❌ {message}")
             sys.exit(1)
         
         # Create and run main application
         print("\n🚀 Launching trading interface...")
-        root = tk.Tk()
-        app = TradingApp(root)
+        from trading_app import TradingApp
+        with startup_timer.phase("main window"):
+            root = tk.Tk()
+            app = TradingApp(root, symbols=warmup.results.get('symbols'))
+        root.after_idle(report_startup, warmup)
         root.mainloop()
         
     except Exception as e:
@@ -97,7 +114,10 @@ def main():
     finally:
         # Cleanup
         print("\n👋 Shutting down...")
-        mt5.shutdown()
+        # Stops the connection monitor and tells listeners before shutting MT5 down
+        connection = sys.modules.get('mt5_connection')
+        if connection is not None:
+            connection.connection_manager.disconnect()
         logger.cleanup()
         print("✅ Connection closed")
 
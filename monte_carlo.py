@@ -0,0 +1,221 @@
+"""
+Monte Carlo risk simulation for Future MT5 Pro Trading System
+Resamples trade results (in R multiples) into many equity paths with the
+bootstrap or the block bootstrap, and reports the drawdown and ruin
+probabilities of a risk per trade so it can be sized from data
+"""
+
+import os
+import sys
+import json
+import argparse
+import multiprocessing as mp
+from typing import Dict, Any, Optional, List, Sequence
+
+import numpy as np
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import MONTE_CARLO, TRADING
+except ImportError:
+    MONTE_CARLO = {
+        'PATHS': 200000,
+        'CHUNK': 10000,
+        'BLOCK': 5,
+        'RUIN_DRAWDOWN': 50.0,
+        'MAX_DRAWDOWN': 20.0,
+        'PROBABILITY': 0.05,
+        'RISK_STEPS': [0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 4.0, 5.0]
+    }
+    TRADING = {
+        'RISK_PERCENT': 2.0
+    }
+
+BOOTSTRAP = 'bootstrap'  # trades drawn independently
+BLOCK_BOOTSTRAP = 'block'  # runs of consecutive trades drawn together, keeping streaks
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+def resample_indices(rng: np.random.Generator, n: int, paths: int, trades: int,
+                     method: str = BOOTSTRAP, block: int = MONTE_CARLO['BLOCK']) -> np.ndarray:
+    """(paths, trades) matrix of indices into a sample of ``n`` trades
+
+    The block bootstrap draws block starts and takes ``block`` consecutive
+    trades from each, wrapping around the end of the sample.
+    """
+    if method == BOOTSTRAP or block <= 1:
+        return rng.integers(0, n, size=(paths, trades))
+    if method != BLOCK_BOOTSTRAP:
+        raise ValueError(f"Unknown resampling method {method}")
+    blocks = -(-trades // block)
+    starts = rng.integers(0, n, size=(paths, blocks, 1))
+    return ((starts + np.arange(block)) % n).reshape(paths, blocks * block)[:, :trades]
+
+
+def simulate_paths(r: np.ndarray, risk_percent: float, paths: int, trades: int,
+                   method: str = BOOTSTRAP, block: int = MONTE_CARLO['BLOCK'],
+                   seed=None) -> Dict[str, np.ndarray]:
+    """Max drawdown % and final equity (1.0 = start) of each resampled path
+
+    Every trade risks ``risk_percent`` of current equity, so a trade of ``R``
+    multiplies equity by ``1 + risk * R``; a path is computed as a cumulative
+    sum of log growth over one row of the matrix.
+    """
+    rng = np.random.default_rng(seed)
+    growth = np.log1p(np.maximum(np.asarray(r, dtype=np.float64) * (risk_percent / 100), -1 + 1e-12))
+    log_equity = np.cumsum(growth[resample_indices(rng, len(growth), paths, trades, method, block)], axis=1)
+    peak = np.maximum(np.maximum.accumulate(log_equity, axis=1), 0.0)
+    max_drawdown = (1 - np.exp(log_equity - peak).min(axis=1)) * 100
+    return {'max_drawdown': max_drawdown, 'final': np.exp(log_equity[:, -1])}
+
+
+def _run_chunk(args) -> Dict[str, np.ndarray]:
+    return simulate_paths(*args)
+
+
+class MonteCarlo:
+    """Drawdown and ruin distribution of a trade sample over many paths
+
+    Paths are simulated in chunks of ``chunk`` rows, so memory stays at one
+    (chunk x trades) matrix per worker; with ``processes`` above 1 chunks run
+    in a process pool, each with an independent seed from one SeedSequence,
+    so results are reproducible for a given ``seed`` and chunking.
+    """
+
+    def __init__(self, r: Sequence[float], paths: int = MONTE_CARLO['PATHS'],
+                 trades: Optional[int] = None, method: str = BOOTSTRAP,
+                 block: int = MONTE_CARLO['BLOCK'], chunk: int = MONTE_CARLO['CHUNK'],
+                 processes: int = 1, seed: Optional[int] = None):
+        self.r = np.asarray(r, dtype=np.float64)
+        if not len(self.r):
+            raise ValueError("No trades to resample")
+        self.paths = paths
+        self.trades = trades or len(self.r)
+        self.method = method
+        self.block = block
+        self.chunk = chunk
+        self.processes = processes
+        self.seed = seed
+
+    def simulate(self, risk_percent: float) -> Dict[str, np.ndarray]:
+        sizes = [min(self.chunk, self.paths - start) for start in range(0, self.paths, self.chunk)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+        jobs = [(self.r, risk_percent, size, self.trades, self.method, self.block, seed)
+                for size, seed in zip(sizes, seeds)]
+        if self.processes > 1 and len(jobs) > 1:
+            with mp.get_context('spawn').Pool(min(self.processes, len(jobs))) as pool:
+                results = pool.map(_run_chunk, jobs)
+        else:
+            results = [_run_chunk(job) for job in jobs]
+        return {key: np.concatenate([result[key] for result in results]) for key in results[0]}
+
+    def report(self, risk_percent: float, ruin_drawdown: float = MONTE_CARLO['RUIN_DRAWDOWN'],
+               thresholds: Sequence[float] = (10, 20, 30)) -> Dict[str, Any]:
+        """Drawdown quantiles, probabilities of exceeding drawdowns and of ruin"""
+        result = self.simulate(risk_percent)
+        drawdown, final = result['max_drawdown'], result['final']
+        return {
+            'risk_percent': risk_percent,
+            'paths': len(drawdown),
+            'trades': self.trades,
+            'method': self.method,
+            'max_drawdown': {f"p{int(q * 100)}": round(float(v), 2)
+                             for q, v in zip(QUANTILES, np.quantile(drawdown, QUANTILES))},
+            'drawdown_probability': {f"{t:g}%": round(float(np.mean(drawdown >= t)), 4) for t in thresholds},
+            'ruin_probability': round(float(np.mean(drawdown >= ruin_drawdown)), 4),
+            'return': {f"p{int(q * 100)}": round(float(v - 1) * 100, 2)
+                       for q, v in zip((0.05, 0.5, 0.95), np.quantile(final, (0.05, 0.5, 0.95)))}
+        }
+
+    def size_risk(self, max_drawdown: float = MONTE_CARLO['MAX_DRAWDOWN'],
+                  probability: float = MONTE_CARLO['PROBABILITY'],
+                  steps: Sequence[float] = MONTE_CARLO['RISK_STEPS']) -> Dict[str, Any]:
+        """Largest risk per trade whose chance of a ``max_drawdown`` % drawdown stays under ``probability``"""
+        chosen, reports = None, []
+        for risk in sorted(steps):
+            report = self.report(risk, thresholds=(max_drawdown,))
+            reports.append(report)
+            if report['drawdown_probability'][f"{max_drawdown:g}%"] > probability:
+                break
+            chosen = risk
+        return {'risk_percent': chosen, 'max_drawdown': max_drawdown, 'probability': probability,
+                'reports': reports}
+
+
+def load_walk_forward(path: str, symbol: Optional[str] = None) -> np.ndarray:
+    """Out-of-sample trade results of a walk-forward JSONL file, in window order"""
+    rows = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            row = json.loads(line)
+            if row.get('out_sample_r') and (symbol is None or row['symbol'] == symbol):
+                rows.append((row['symbol'], row['window'], row['out_sample_r']))
+    rows.sort(key=lambda row: (row[0], row[1]))
+    return np.array([r for _, _, values in rows for r in values], dtype=np.float64)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        prog='future-mt5-monte-carlo',
+        description='Drawdown and ruin probabilities of a risk per trade'
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--walk-forward', help='walk-forward JSONL: resample its out-of-sample trades')
+    source.add_argument('--backtest', metavar='SYMBOL', help='backtest the stored history of a symbol')
+    parser.add_argument('--symbol', help='only this symbol of the walk-forward file')
+    parser.add_argument('--timeframe', default='M15')
+    parser.add_argument('--risk', type=float, default=TRADING['RISK_PERCENT'], help='risk per trade, %%')
+    parser.add_argument('--paths', type=int, default=MONTE_CARLO['PATHS'])
+    parser.add_argument('--trades', type=int, help='trades per path (default: sample size)')
+    parser.add_argument('--method', choices=[BOOTSTRAP, BLOCK_BOOTSTRAP], default=BOOTSTRAP)
+    parser.add_argument('--block', type=int, default=MONTE_CARLO['BLOCK'])
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--size', action='store_true',
+                        help='find the largest risk within MONTE_CARLO MAX_DRAWDOWN/PROBABILITY')
+    args = parser.parse_args(argv)
+
+    if args.walk_forward:
+        r = load_walk_forward(args.walk_forward, args.symbol)
+    else:
+        from backtest import Indicators, simulate
+        from walk_forward import HistoryStore, strategy_defaults
+        store = HistoryStore()
+        history = store.load(args.backtest, args.timeframe)
+        if history is None:
+            print(f"❌ No stored history for {args.backtest} {args.timeframe}")
+            return 1
+        point = store.point(args.backtest, args.timeframe)
+        if point is None:
+            print(f"❌ No stored point for {args.backtest} {args.timeframe}; sync the history again")
+            return 1
+        r = simulate(Indicators(history, point), strategy_defaults())['r']
+    if not len(r):
+        print("❌ No trades to resample")
+        return 1
+
+    mc = MonteCarlo(r, args.paths, args.trades, args.method, args.block,
+                    processes=args.processes, seed=args.seed)
+    result = mc.size_risk() if args.size else mc.report(args.risk)
+    print(json.dumps(result, indent=4))
+    return 0
+
+
+__all__ = [
+    'MonteCarlo',
+    'simulate_paths',
+    'resample_indices',
+    'load_walk_forward',
+    'BOOTSTRAP',
+    'BLOCK_BOOTSTRAP',
+    'main'
+]
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""
+MT5 connection manager for Future MT5 Pro Trading System
+One owner of the terminal connection: initialization and login, a periodic
+liveness probe, reconnection with exponential backoff using the credentials
+kept in memory, and a connection state that loops wait on instead of spinning
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import deque
+from typing import Dict, Any, Optional, List, Tuple, Callable, NamedTuple
+
+import MetaTrader5 as mt5
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import CONNECTION, ERRORS
+except ImportError:
+    CONNECTION = {
+        'PROBE_INTERVAL': 1.0,
+        'BACKOFF_INITIAL': 0.5,
+        'BACKOFF_MAX': 30.0,
+        'HISTORY': 100
+    }
+    ERRORS = {
+        'MT5_NOT_INITIALIZED': 'MetaTrader 5 is not initialized',
+        'MT5_LOGIN_FAILED': 'Login to MetaTrader 5 failed',
+        'MT5_NO_ACCOUNT': 'Could not get account information'
+    }
+
+# Connection states
+DISCONNECTED = 'disconnected'  # never connected, or disconnected on purpose
+CONNECTED = 'connected'
+RECONNECTING = 'reconnecting'  # the probe failed; reconnection in progress
+
+
+class Outage(NamedTuple):
+    """One loss of connection and its recovery"""
+    lost_at: float  # wall-clock time the probe failed
+    downtime: float  # seconds until the connection was back
+    attempts: int  # reconnection attempts it took
+    error: str  # last error seen while reconnecting
+
+
+class ConnectionManager:
+    """Owns initialize/login/shutdown of the terminal
+
+    ``connect`` keeps the credentials that worked in memory (never on disk).
+    Once ``start`` is called a monitor thread probes ``terminal_info`` every
+    ``probe_interval``; on failure the state turns RECONNECTING and it retries
+    with a doubling delay up to ``backoff_max``: first by letting the
+    terminal's own server reconnect finish (or forcing it with ``login``),
+    then by re-initializing the terminal. Every recovery is recorded as an
+    Outage.
+    """
+
+    def __init__(self, probe_interval: float = CONNECTION['PROBE_INTERVAL'],
+                 backoff_initial: float = CONNECTION['BACKOFF_INITIAL'],
+                 backoff_max: float = CONNECTION['BACKOFF_MAX'],
+                 history: int = CONNECTION['HISTORY']):
+        self.probe_interval = probe_interval
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.state = DISCONNECTED
+        self.credentials: Optional[Tuple[int, str, str]] = None
+        self.last_error = ''
+        self.attempts = 0  # attempts of the reconnection in progress
+        self.outages = deque(maxlen=history)
+        self.listeners: List[Callable[[str, Optional[Outage]], None]] = []
+        self.condition = threading.Condition()
+        self.terminal_lock = threading.Lock()  # initialize/login/shutdown are not reentrant
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    # State
+    @property
+    def connected(self) -> bool:
+        return self.state == CONNECTED
+
+    @property
+    def monitoring(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def set_state(self, state: str, outage: Optional[Outage] = None):
+        with self.condition:
+            changed = state != self.state
+            self.state = state
+            self.condition.notify_all()
+            listeners = list(self.listeners)
+        if changed or outage is not None:
+            for listener in listeners:
+                try:
+                    listener(state, outage)
+                except Exception:
+                    pass
+
+    def subscribe(self, listener: Callable[[str, Optional[Outage]], None]):
+        """Call ``listener(state, outage)`` on every state change; ``outage`` is set on recovery"""
+        with self.condition:
+            self.listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[str, Optional[Outage]], None]):
+        with self.condition:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+    def wait_connected(self, timeout: Optional[float] = None) -> bool:
+        """Block until connected; True at once while nothing is monitoring the connection"""
+        with self.condition:
+            return self.condition.wait_for(
+                lambda: self.state == CONNECTED or not self.monitoring, timeout)
+
+    # Terminal
+    def connect(self, login: Optional[int] = None, password: Optional[str] = None,
+                server: Optional[str] = None) -> Tuple[bool, str]:
+        """Initialize the terminal (and log in if credentials are given)"""
+        if login is not None:
+            self.credentials = (int(login), password, server)
+        success, message = self._connect()
+        if success:
+            self.set_state(CONNECTED)
+        elif login is not None:
+            self.credentials = None
+        return success, message
+
+    def _connect(self) -> Tuple[bool, str]:
+        try:
+            with self.terminal_lock:
+                if not mt5.initialize():
+                    return self._fail("MetaTrader 5 initialization failed")
+                if self.credentials is not None:
+                    # Without credentials the terminal may not be logged in
+                    # yet: the login window runs after initialization
+                    if not mt5.login(*self.credentials):
+                        mt5.shutdown()
+                        return self._fail(ERRORS['MT5_LOGIN_FAILED'])
+                    if mt5.account_info() is None:
+                        mt5.shutdown()
+                        return self._fail(ERRORS['MT5_NO_ACCOUNT'])
+            self.last_error = ''
+            return True, "MetaTrader 5 initialized successfully"
+        except Exception as e:
+            return self._fail(f"Error initializing MetaTrader 5: {str(e)}")
+
+    def _fail(self, message: str) -> Tuple[bool, str]:
+        self.last_error = message
+        return False, message
+
+    def probe(self) -> bool:
+        """Whether the terminal answers and is connected to its trade server (one IPC call)"""
+        try:
+            info = mt5.terminal_info()
+        except Exception:
+            return False
+        return info is not None and bool(getattr(info, 'connected', True))
+
+    def verify(self) -> Tuple[bool, str]:
+        """Check the connection, reconnecting once if it is down"""
+        if self.probe():
+            return True, "Connected to MetaTrader 5"
+        success, message = self._connect()
+        if success:
+            self.set_state(CONNECTED)
+            return True, "Connected to MetaTrader 5"
+        return False, message
+
+    def disconnect(self):
+        self.stop()
+        with self.terminal_lock:
+            try:
+                mt5.shutdown()
+            except Exception:
+                pass
+        self.set_state(DISCONNECTED)
+
+    # Monitoring
+    def reconnect_once(self) -> bool:
+        """One reconnection attempt"""
+        self.attempts += 1
+        info = None
+        try:
+            info = mt5.terminal_info()
+        except Exception:
+            pass
+        if info is not None:
+            if getattr(info, 'connected', True):
+                return True
+            # The terminal is up but lost its trade server: nudge it with a login
+            if self.credentials is not None:
+                with self.terminal_lock:
+                    mt5.login(*self.credentials)
+                if self.probe():
+                    return True
+            self.last_error = "Terminal not connected to the trade server"
+            if self.attempts < 3:
+                return False  # give the terminal's own reconnect a chance first
+
+        with self.terminal_lock:
+            try:
+                mt5.shutdown()
+            except Exception:
+                pass
+        return self._connect()[0] and self.probe()
+
+    def recover(self):
+        """Reconnect with exponential backoff until connected or stopped"""
+        lost_at = time.time()
+        started = time.monotonic()
+        self.attempts = 0
+        self.set_state(RECONNECTING)
+        delay = self.backoff_initial
+        while not self.stop_event.is_set():
+            if self.reconnect_once():
+                outage = Outage(lost_at, time.monotonic() - started, self.attempts, self.last_error)
+                self.outages.append(outage)
+                self.last_error = ''
+                self.set_state(CONNECTED, outage)
+                return
+            self.stop_event.wait(delay)
+            delay = min(delay * 2, self.backoff_max)
+
+    def start(self):
+        """Start probing; the terminal must have been connected with ``connect``"""
+        if self.monitoring:
+            return
+        self.stop_event.clear()
+        if self.state == DISCONNECTED and self.probe():
+            self.set_state(CONNECTED)
+
+        def run():
+            while not self.stop_event.wait(self.probe_interval):
+                if not self.probe():
+                    self.recover()
+
+        self.thread = threading.Thread(target=run, name='mt5-connection', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
+        with self.condition:
+            self.condition.notify_all()
+
+    def summary(self) -> Dict[str, Any]:
+        downtimes = [outage.downtime for outage in self.outages]
+        return {
+            'state': self.state,
+            'reconnects': len(downtimes),
+            'last_downtime': downtimes[-1] if downtimes else None,
+            'mean_downtime': sum(downtimes) / len(downtimes) if downtimes else None,
+            'max_downtime': max(downtimes) if downtimes else None,
+            'attempts': self.attempts if self.state == RECONNECTING else 0,
+            'last_error': self.last_error
+        }
+
+
+# Global manager of this process's terminal connection
+connection_manager = ConnectionManager()
+
+__all__ = ['connection_manager', 'ConnectionManager', 'Outage', 'DISCONNECTED', 'CONNECTED', 'RECONNECTING']
@@ -2,8 +2,13 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import MetaTrader5 as mt5
 from utils import obter_saldo
+from event_bus import event_bus, feed_poller, AccountEvent, LATEST
 from estrategia import EstrategiaTrading
+from correlation import correlation_service
+from snapshots import snapshot_store
 from log_system import LogSystem
+from log_view import VirtualLogView
+from ui_refresh import UIRefresher
 import threading
 import time
 from datetime import datetime
@@ -39,8 +44,11 @@ class PainelApp:
         self.operando = False
         self.estrategia = None
         self.log_system = LogSystem()
+        # Threads postam as mudanças de widgets aqui; só o loop principal as aplica
+        self.ui = UIRefresher(self.root)
 
         self.setup_ui()
+        self.ui.start()
 
     def centralizar_janela(self, largura, altura):
         largura_tela = self.root.winfo_screenwidth()
@@ -188,21 +196,13 @@ class PainelApp:
         log_frame = tk.Frame(main_container, bg=self.colors['bg_light'], padx=20, pady=20)
         log_frame.pack(fill="both", expand=True)
 
-        self.text_log = tk.Text(
+        self.text_log = VirtualLogView(
             log_frame,
-            height=20,
-            width=80,
             bg=self.colors['bg_medium'],
             fg=self.colors['text'],
-            font=("Consolas", 12),
-            padx=10,
-            pady=10
+            font=("Consolas", 12)
         )
-        self.text_log.pack(side="left", fill="both", expand=True)
-
-        scrollbar = ttk.Scrollbar(log_frame, command=self.text_log.yview)
-        scrollbar.pack(side="right", fill="y")
-        self.text_log.config(yscrollcommand=scrollbar.set)
+        self.text_log.pack(fill="both", expand=True)
 
         # Add log widget to log system
         self.log_system.add_log_widget("main", self.text_log)
@@ -211,26 +211,34 @@ class PainelApp:
         self.start_update_threads()
 
     def start_update_threads(self):
+        self.eventos_conta = event_bus.subscribe(AccountEvent, policy=LATEST)
+        feed_poller.start()
         threading.Thread(target=self.atualizar_saldo_loop, daemon=True).start()
         threading.Thread(target=self.carregar_ativos, daemon=True).start()
 
     def atualizar_saldo_loop(self):
+        self.ui.update(self.saldo_label, text=f"R$ {obter_saldo():.2f}")
         while True:
-            saldo = obter_saldo()
-            self.saldo_label.config(text=f"R$ {saldo:.2f}")
-            time.sleep(1)
+            evento = self.eventos_conta.get()
+            if evento is None:
+                return
+            # Saldo repetido é descartado pelo coordenador sem redesenhar
+            self.ui.update(self.saldo_label, text=f"R$ {evento.balance:.2f}")
 
     def carregar_ativos(self):
         try:
             symbols = mt5.symbols_get()
             lista_ativos = [symbol.name for symbol in symbols if symbol.visible]
-            self.combo_ativo['values'] = lista_ativos
-            if lista_ativos:
-                self.combo_ativo.current(0)
+            self.ui.call('ativos', self.mostrar_ativos, lista_ativos)
             self.log_system.logar(f"✅ {len(lista_ativos)} ativos disponíveis carregados")
         except Exception as e:
             self.log_system.logar(f"❌ Erro ao carregar ativos: {e}")
 
+    def mostrar_ativos(self, lista_ativos):
+        self.combo_ativo['values'] = lista_ativos
+        if lista_ativos:
+            self.combo_ativo.current(0)
+
     def iniciar_robo(self):
         ativo = self.ativo_selecionado.get().strip()
         timeframe = self.timeframe_selecionado.get().strip()
@@ -268,7 +276,8 @@ class PainelApp:
         self.entry_lote.config(state="disabled")
 
         # Criar e iniciar estratégia
-        self.estrategia = EstrategiaTrading(ativo, timeframe, lote_float, self.log_system)
+        self.estrategia = EstrategiaTrading(ativo, timeframe, lote_float, self.log_system,
+                                            snapshots=snapshot_store)
         threading.Thread(target=self.estrategia.executar, daemon=True).start()
 
     def parar_robo(self):
@@ -287,6 +296,14 @@ class PainelApp:
         if self.operando:
             if messagebox.askokcancel("Sair", "O robô está em execução. Deseja realmente sair?"):
                 self.parar_robo()
+                self.encerrar_servicos()
                 self.root.destroy()
         else:
+            self.encerrar_servicos()
             self.root.destroy()
+
+    def encerrar_servicos(self):
+        self.ui.stop()
+        event_bus.unsubscribe(self.eventos_conta)
+        feed_poller.stop()
+        correlation_service.stop()
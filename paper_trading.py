@@ -0,0 +1,522 @@
+"""
+Paper trading for Future MT5 Pro Trading System
+Strategies run on live data while their order requests are filled by a
+simulated broker: live quotes plus spread, slippage and liquidity models,
+virtual positions with SL/TP and per-account equity, for any number of
+parameter variants sharing one tick stream
+"""
+
+import os
+import sys
+import time
+import threading
+from itertools import count
+from types import SimpleNamespace
+from typing import Dict, Any, Optional, List, Callable, NamedTuple, Tuple
+
+import numpy as np
+import MetaTrader5 as mt5
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import PAPER
+except ImportError:
+    PAPER = {
+        'BALANCE': 10000.0,
+        'EXTRA_SPREAD': 0,
+        'SLIPPAGE': 1.0,
+        'LIQUIDITY': 5.0,
+        'COMMISSION': 0.0,
+        'SEED': None
+    }
+
+from estrategia import EstrategiaTrading
+from event_bus import event_bus, TickEvent, DROP_OLDEST
+
+PAPER_POSITION_DTYPE = np.dtype([
+    ('ticket', '<i8'),
+    ('account', '<i4'),  # index into PaperBroker.accounts
+    ('symbol', '<i4'),  # index into PaperBroker.symbols
+    ('buy', '?'),
+    ('volume', '<f8'),
+    ('price_open', '<f8'),
+    ('sl', '<f8'),
+    ('tp', '<f8'),
+    ('time', '<f8')
+])
+
+
+class PaperFill(NamedTuple):
+    """One simulated deal"""
+    account: str
+    ticket: int  # position ticket
+    symbol: str
+    buy: bool  # direction of the position
+    volume: float
+    price: float
+    profit: float  # realized on exits, 0 on entries
+    reason: str  # 'open', 'close', 'sl' or 'tp'
+    time: float
+
+
+class FillModel:
+    """How a request is filled against the live quote
+
+    ``extra_spread`` points widen the quote around the mid, market fills and
+    triggered stops slip against the trader by an exponential amount with mean
+    ``slippage`` points, and at most ``liquidity`` lots fill per request
+    (0 = unlimited); take profits are limit orders and fill at their price.
+    """
+
+    def __init__(self, extra_spread: float = PAPER['EXTRA_SPREAD'],
+                 slippage: float = PAPER['SLIPPAGE'], liquidity: float = PAPER['LIQUIDITY'],
+                 seed: Optional[int] = PAPER['SEED']):
+        self.extra_spread = extra_spread
+        self.slippage = slippage
+        self.liquidity = liquidity
+        self.rng = np.random.default_rng(seed)
+
+    def quote(self, bid: float, ask: float, point: float):
+        half = self.extra_spread * point / 2
+        return bid - half, ask + half
+
+    def slip(self, point: float, size: Optional[int] = None):
+        """Adverse slippage in price units (an array when ``size`` is given)"""
+        if not self.slippage:
+            return 0.0 if size is None else np.zeros(size)
+        return self.rng.exponential(self.slippage, size) * point
+
+    def fill_volume(self, volume: float) -> float:
+        return min(volume, self.liquidity) if self.liquidity else volume
+
+
+class PaperAccount:
+    """Handle on one virtual account of a PaperBroker
+
+    Provides what EstrategiaTrading reads from the terminal: ``info`` in the
+    shape of ``mt5.account_info``, the position count and ``order_send``.
+    """
+
+    def __init__(self, broker: 'PaperBroker', name: str, index: int):
+        self.broker = broker
+        self.name = name
+        self.index = index
+
+    @property
+    def balance(self) -> float:
+        return float(self.broker.balance[self.index])
+
+    @property
+    def equity(self) -> float:
+        return float(self.broker.equity[self.index])
+
+    def info(self) -> SimpleNamespace:
+        equity = self.equity
+        return SimpleNamespace(balance=self.balance, equity=equity, margin=0.0,
+                               margin_free=equity, profit=equity - self.balance)
+
+    def positions_total(self, symbol: Optional[str] = None) -> int:
+        return self.broker.positions_total(self.index, symbol)
+
+    def open_positions(self) -> List[Tuple[str, bool]]:
+        return self.broker.open_positions(self.index)
+
+    def order_send(self, request: Dict[str, Any]) -> SimpleNamespace:
+        return self.broker.order_send(self.index, request)
+
+    def summary(self) -> Dict[str, Any]:
+        return self.broker.summary(self.index)
+
+
+class PaperBroker:
+    """Simulated execution shared by every paper account
+
+    Positions of all accounts live in one structured array, so each tick
+    checks SL/TP and revalues equity for every variant with a few array
+    operations; 50 variants on a symbol cost one tick read and one pass.
+    The broker consumes the event bus's ticks (the same ones that wake the
+    strategies), so paper accounts add no terminal calls of their own; its
+    subscription names the symbols with open paper positions, so the poller
+    samples those even when no strategy on them is running.
+    """
+
+    def __init__(self, model: Optional[FillModel] = None,
+                 commission: float = PAPER['COMMISSION']):
+        self.model = model or FillModel()
+        self.commission = commission
+        self.accounts: List[PaperAccount] = []
+        self.names: Dict[str, PaperAccount] = {}
+        self.balance = np.zeros(0)
+        self.equity = np.zeros(0)
+        self.peak = np.zeros(0)
+        self.max_drawdown = np.zeros(0)  # percent of the equity peak
+        self.realized = np.zeros(0)
+        self.trades = np.zeros(0, dtype=np.int64)
+        self.wins = np.zeros(0, dtype=np.int64)
+
+        self.symbols: List[str] = []
+        self.symbol_index: Dict[str, int] = {}
+        self.point = np.zeros(0)
+        self.value = np.zeros(0)  # account currency per 1.0 price move per lot
+        self.bid = np.full(0, np.nan)
+        self.ask = np.full(0, np.nan)
+
+        self.positions = np.zeros(0, dtype=PAPER_POSITION_DTYPE)
+        self.tickets = count(1)
+        self.listeners: List[Callable[[PaperFill], None]] = []
+        self.lock = threading.RLock()
+        self.subscription = None
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    # Accounts and symbols
+    def account(self, name: str, balance: Optional[float] = None) -> PaperAccount:
+        """Account of a variant, opened with ``balance`` the first time"""
+        with self.lock:
+            account = self.names.get(name)
+            if account is None:
+                balance = PAPER['BALANCE'] if balance is None else float(balance)
+                account = PaperAccount(self, name, len(self.accounts))
+                self.accounts.append(account)
+                self.names[name] = account
+                self.balance = np.append(self.balance, balance)
+                self.equity = np.append(self.equity, balance)
+                self.peak = np.append(self.peak, balance)
+                self.max_drawdown = np.append(self.max_drawdown, 0.0)
+                self.realized = np.append(self.realized, 0.0)
+                self.trades = np.append(self.trades, 0)
+                self.wins = np.append(self.wins, 0)
+            return account
+
+    def symbol(self, symbol: str) -> Optional[int]:
+        """Index of a symbol, registering its specification on first use"""
+        index = self.symbol_index.get(symbol)
+        if index is not None:
+            return index
+        info = mt5.symbol_info(symbol)
+        if info is None:
+            return None
+        tick_size = getattr(info, 'trade_tick_size', 0) or 0
+        tick_value = getattr(info, 'trade_tick_value', 0) or 0
+        value = tick_value / tick_size if tick_size and tick_value else getattr(info, 'trade_contract_size', 100000)
+        index = len(self.symbols)
+        self.symbols.append(symbol)
+        self.symbol_index[symbol] = index
+        self.point = np.append(self.point, info.point)
+        self.value = np.append(self.value, value)
+        self.bid = np.append(self.bid, np.nan)
+        self.ask = np.append(self.ask, np.nan)
+        return index
+
+    def positions_total(self, account: int, symbol: Optional[str] = None) -> int:
+        with self.lock:
+            mask = self.positions['account'] == account
+            if symbol is not None:
+                mask &= self.positions['symbol'] == self.symbol_index.get(symbol, -1)
+            return int(np.count_nonzero(mask))
+
+    def open_positions(self, account: int) -> List[Tuple[str, bool]]:
+        """(symbol, buy) of every open position of an account"""
+        with self.lock:
+            p = self.positions[self.positions['account'] == account]
+            return [(self.symbols[symbol], bool(buy)) for symbol, buy in zip(p['symbol'], p['buy'])]
+
+    def subscribe(self, listener: Callable[[PaperFill], None]):
+        """Call ``listener(fill)`` for every simulated deal"""
+        with self.lock:
+            self.listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[PaperFill], None]):
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+    def notify(self, fills: List[PaperFill]):
+        for fill in fills:
+            for listener in list(self.listeners):
+                try:
+                    listener(fill)
+                except Exception:
+                    pass
+
+    # Orders
+    def order_send(self, account: int, request: Dict[str, Any]) -> SimpleNamespace:
+        """Fill a trade request like ``mt5.order_send`` would, against the live quote"""
+        with self.lock:
+            result, fills = self._execute(account, request)
+            if fills:
+                self.watch_positions()
+        self.notify(fills)
+        return result
+
+    def _result(self, retcode: int, comment: str, request, **fields) -> SimpleNamespace:
+        values = {'retcode': retcode, 'order': 0, 'deal': 0, 'volume': 0.0, 'price': 0.0,
+                  'bid': 0.0, 'ask': 0.0, 'comment': comment, 'request': request}
+        values.update(fields)
+        return SimpleNamespace(**values)
+
+    def _execute(self, account: int, request: Dict[str, Any]):
+        action = request.get('action')
+        if action == mt5.TRADE_ACTION_SLTP:
+            rows = np.flatnonzero((self.positions['ticket'] == request.get('position', 0))
+                                  & (self.positions['account'] == account))
+            if not len(rows):
+                return self._result(mt5.TRADE_RETCODE_INVALID, "Position not found", request), []
+            self.positions['sl'][rows] = request.get('sl', 0.0)
+            self.positions['tp'][rows] = request.get('tp', 0.0)
+            return self._result(mt5.TRADE_RETCODE_DONE, "Paper SL/TP modified", request), []
+        if action != mt5.TRADE_ACTION_DEAL:
+            return self._result(mt5.TRADE_RETCODE_INVALID, "Paper trading fills market deals only", request), []
+
+        symbol = self.symbol(request['symbol'])
+        if symbol is None or not self._refresh_quote(symbol):
+            return self._result(mt5.TRADE_RETCODE_INVALID, "No quote for symbol", request), []
+        if self.equity[account] <= 0:
+            return self._result(mt5.TRADE_RETCODE_NO_MONEY, "Paper account has no equity", request), []
+
+        buy = request['type'] == mt5.ORDER_TYPE_BUY
+        point = self.point[symbol]
+        bid, ask = self.model.quote(self.bid[symbol], self.ask[symbol], point)
+        slippage = float(self.model.slip(point))
+        if slippage > request.get('deviation', 0) * point > 0:
+            return self._result(mt5.TRADE_RETCODE_REQUOTE, "Requote", request, bid=bid, ask=ask), []
+        price = ask + slippage if buy else bid - slippage
+
+        volume = float(request['volume'])
+        filled = self.model.fill_volume(volume)
+        if filled < volume and request.get('type_filling') == mt5.ORDER_FILLING_FOK:
+            return self._result(mt5.TRADE_RETCODE_REJECT, "Not enough liquidity to fill or kill",
+                                request, bid=bid, ask=ask), []
+        retcode = mt5.TRADE_RETCODE_DONE if filled >= volume else mt5.TRADE_RETCODE_DONE_PARTIAL
+
+        if request.get('position'):
+            fill = self._close_request(account, int(request['position']), filled, price)
+            if fill is None:
+                return self._result(mt5.TRADE_RETCODE_INVALID, "Position not found", request), []
+            return self._result(retcode, "Paper close", request, order=fill.ticket, deal=fill.ticket,
+                                volume=fill.volume, price=price, bid=bid, ask=ask), [fill]
+
+        ticket = next(self.tickets)
+        now = time.time()
+        row = np.array([(ticket, account, symbol, buy, filled, price, request.get('sl', 0.0),
+                         request.get('tp', 0.0), now)], dtype=PAPER_POSITION_DTYPE)
+        self.positions = np.concatenate([self.positions, row])
+        self.balance[account] -= self.commission * filled
+        self._revalue()
+        fill = PaperFill(self.accounts[account].name, ticket, self.symbols[symbol], buy, filled,
+                         price, 0.0, 'open', now)
+        return self._result(retcode, "Paper fill", request, order=ticket, deal=ticket, volume=filled,
+                            price=price, bid=bid, ask=ask), [fill]
+
+    def _refresh_quote(self, symbol: int) -> bool:
+        if np.isnan(self.bid[symbol]):
+            tick = mt5.symbol_info_tick(self.symbols[symbol])
+            if tick is None:
+                return False
+            self.bid[symbol], self.ask[symbol] = tick.bid, tick.ask
+        return True
+
+    def _close_request(self, account: int, ticket: int, volume: float, price: float) -> Optional[PaperFill]:
+        rows = np.flatnonzero((self.positions['ticket'] == ticket) & (self.positions['account'] == account))
+        if not len(rows):
+            return None
+        row = rows[0]
+        volume = min(volume, float(self.positions['volume'][row]))
+        if volume < self.positions['volume'][row] - 1e-9:
+            # Partial close: realize the closed part and keep the rest open
+            self.positions['volume'][row] -= volume
+            closing = self.positions[[row]].copy()
+            closing['volume'] = volume
+            return self._close(closing, np.array([price]), np.array(['close']), remove=False)[0]
+        return self._close(self.positions[[row]], np.array([price]), np.array(['close']))[0]
+
+    def _close(self, closing: np.ndarray, prices: np.ndarray, reasons: np.ndarray,
+               remove: bool = True) -> List[PaperFill]:
+        """Realize positions at ``prices`` and drop them from the book"""
+        direction = np.where(closing['buy'], 1.0, -1.0)
+        profit = (prices - closing['price_open']) * direction * closing['volume'] * self.value[closing['symbol']]
+        profit -= self.commission * closing['volume']
+        np.add.at(self.balance, closing['account'], profit)
+        np.add.at(self.realized, closing['account'], profit)
+        np.add.at(self.trades, closing['account'], 1)
+        np.add.at(self.wins, closing['account'], (profit > 0).astype(np.int64))
+        if remove:
+            self.positions = self.positions[~np.isin(self.positions['ticket'], closing['ticket'])]
+        self._revalue()
+
+        now = time.time()
+        return [
+            PaperFill(self.accounts[a].name, int(t), self.symbols[s], bool(b), float(v), float(p), float(pl), str(r), now)
+            for a, t, s, b, v, p, pl, r in zip(closing['account'], closing['ticket'], closing['symbol'],
+                                               closing['buy'], closing['volume'], prices, profit, reasons)
+        ]
+
+    # Ticks
+    def on_tick(self, symbol: str, bid: float, ask: float):
+        """Update the quote, fill triggered SL/TP and revalue every account"""
+        with self.lock:
+            index = self.symbol_index.get(symbol)
+            if index is None:
+                return
+            self.bid[index], self.ask[index] = bid, ask
+            fills = self._check_stops(index)
+            if fills:
+                self.watch_positions()
+        self.notify(fills)
+
+    def _check_stops(self, symbol: int) -> List[PaperFill]:
+        p = self.positions
+        mine = p['symbol'] == symbol
+        if not mine.any():
+            return []
+        point = self.point[symbol]
+        bid, ask = self.model.quote(self.bid[symbol], self.ask[symbol], point)
+        buy = p['buy']
+        # Longs close at the bid, shorts at the ask
+        exit_price = np.where(buy, bid, ask)
+        has_sl, has_tp = p['sl'] > 0, p['tp'] > 0
+        sl_hit = mine & has_sl & np.where(buy, exit_price <= p['sl'], exit_price >= p['sl'])
+        tp_hit = mine & has_tp & ~sl_hit & np.where(buy, exit_price >= p['tp'], exit_price <= p['tp'])
+        hit = sl_hit | tp_hit
+        if not hit.any():
+            self._revalue()
+            return []
+
+        rows = np.flatnonzero(hit)
+        # Stops become market orders and slip; take profits are limits filled at their price or better
+        slipped = exit_price[rows] - np.where(buy[rows], 1.0, -1.0) * self.model.slip(point, len(rows))
+        limit = np.where(buy[rows], np.maximum(p['tp'][rows], exit_price[rows]),
+                         np.minimum(p['tp'][rows], exit_price[rows]))
+        prices = np.where(sl_hit[rows], slipped, limit)
+        reasons = np.where(sl_hit[rows], 'sl', 'tp')
+        return self._close(p[rows].copy(), prices, reasons)
+
+    def _revalue(self):
+        """Equity, peak and max drawdown of every account from the last quotes"""
+        p = self.positions
+        floating = np.zeros(len(self.accounts))
+        if len(p):
+            exit_price = np.where(p['buy'], self.bid[p['symbol']], self.ask[p['symbol']])
+            pnl = (exit_price - p['price_open']) * np.where(p['buy'], 1.0, -1.0) * p['volume'] * self.value[p['symbol']]
+            np.add.at(floating, p['account'], np.nan_to_num(pnl))
+        self.equity = self.balance + floating
+        self.peak = np.maximum(self.peak, self.equity)
+        drawdown = np.where(self.peak > 0, (self.peak - self.equity) / self.peak * 100, 0.0)
+        self.max_drawdown = np.maximum(self.max_drawdown, drawdown)
+
+    def summary(self, account: Optional[int] = None) -> Dict[str, Any]:
+        """Results of one account, or of every account by name"""
+        with self.lock:
+            if account is None:
+                return {a.name: self.summary(a.index) for a in self.accounts}
+            trades = int(self.trades[account])
+            return {
+                'balance': round(float(self.balance[account]), 2),
+                'equity': round(float(self.equity[account]), 2),
+                'profit': round(float(self.realized[account]), 2),
+                'positions': self.positions_total(account),
+                'trades': trades,
+                'win_rate': round(float(self.wins[account]) / trades * 100, 1) if trades else None,
+                'max_drawdown': round(float(self.max_drawdown[account]), 2)
+            }
+
+    # Feed
+    def watch_positions(self):
+        """Subscribe to ticks of exactly the symbols with open paper positions"""
+        if self.subscription is not None:
+            self.subscription.watch(self.symbols[index] for index in np.unique(self.positions['symbol']))
+
+    def start(self):
+        """Consume ticks from the event bus until stopped"""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        # Stops are checked on the quotes the poller samples (every MIN_INTERVAL
+        # to MAX_INTERVAL seconds), not on every terminal tick: queue each
+        # sample instead of keeping only the latest
+        self.subscription = event_bus.subscribe(TickEvent, symbols=(), policy=DROP_OLDEST)
+        with self.lock:
+            self.watch_positions()
+
+        def run():
+            while not self.stop_event.is_set():
+                event = self.subscription.get(timeout=1)
+                if event is not None:
+                    self.on_tick(event.symbol, event.bid, event.ask)
+
+        self.thread = threading.Thread(target=run, name='paper-broker', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.subscription is not None:
+            event_bus.unsubscribe(self.subscription)
+            self.subscription = None
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
+
+
+class VariantLogSystem:
+    """Sends a variant's log messages to its own log id instead of the symbol's"""
+
+    def __init__(self, log_system, key: str):
+        self.log_system = log_system
+        self.key = key
+
+    def logar(self, mensagem: str, asset: Optional[str] = None):
+        self.log_system.logar(mensagem, self.key)
+
+    def log(self, message: str, asset_id: Optional[str] = None, level: str = 'INFO'):
+        self.logar(message)
+
+
+class PaperEstrategia(EstrategiaTrading):
+    """EstrategiaTrading com dados ao vivo e ordens preenchidas numa conta paper
+
+    ``parametros`` fixa parâmetros da variante (nomes de
+    ``EstrategiaTrading.parametros_config``) por cima do snapshot de configuração.
+    """
+
+    def __init__(self, ativo, timeframe, lote_base, log_system, conta: PaperAccount,
+                 parametros: Optional[Dict[str, Any]] = None):
+        desconhecidos = set(parametros or {}) - set(self.parametros_config)
+        if desconhecidos:
+            raise ValueError(f"Parâmetros desconhecidos: {', '.join(sorted(desconhecidos))}")
+        self.conta = conta
+        self.parametros_fixos = dict(parametros or {})
+        super().__init__(ativo, timeframe, lote_base, log_system)
+
+    def obter_conta(self):
+        return self.conta.info()
+
+    def obter_total_posicoes(self):
+        return self.conta.positions_total(self.ativo)
+
+    def obter_posicoes_abertas(self):
+        return self.conta.open_positions()
+
+    def enviar_ordem(self, request):
+        return self.conta.order_send(request)
+
+    def chave_snapshot(self):
+        return f"{super().chave_snapshot()}_paper_{self.conta.name}"
+
+
+# Global broker of every paper account in the process
+paper_broker = PaperBroker()
+
+__all__ = [
+    'paper_broker',
+    'PaperBroker',
+    'PaperAccount',
+    'PaperEstrategia',
+    'PaperFill',
+    'FillModel',
+    'VariantLogSystem',
+    'PAPER_POSITION_DTYPE'
+]
@@ -0,0 +1,284 @@
+"""
+Position manager for Future MT5 Pro Trading System
+Trailing stop and break-even for every open position, evaluated in one
+vectorized pass per tick batch over the risk service's position snapshot
+"""
+
+import os
+import sys
+import time
+import threading
+from typing import Dict, Any, Optional, List, Tuple
+
+import numpy as np
+import MetaTrader5 as mt5
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import TRADING, POSITION_MANAGER
+except ImportError:
+    TRADING = {
+        'TRAILING_STOP': 30,
+        'BREAK_EVEN': 20
+    }
+    POSITION_MANAGER = {
+        'INTERVAL': 0.5,
+        'MIN_STEP': 5,
+        'MAX_MODIFICATIONS_PER_SECOND': 5,
+        'MAGIC': 123456,
+        'RETRY_BACKOFF': 5.0,
+        'MAX_BACKOFF': 300.0
+    }
+
+from risk_service import risk_service, RiskService
+
+POSITION_DTYPE = np.dtype([
+    ('ticket', '<i8'),
+    ('symbol', '<i4'),  # index into PositionManager.symbols
+    ('buy', '?'),
+    ('price_open', '<f8'),
+    ('sl', '<f8'),
+    ('tp', '<f8')
+])
+
+
+class RateLimiter:
+    """Token bucket: ``rate`` operations per second with bursts up to ``rate``"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def available(self) -> int:
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return int(self.tokens)
+
+    def consume(self, count: int = 1):
+        self.tokens -= count
+
+
+class PositionManager:
+    """Moves stop losses to break-even and trails them behind price
+
+    Positions are rebuilt into a structured array only when the risk service
+    snapshot changes; each pass then looks up one tick per symbol and computes
+    the new stops for all positions with array operations. A modification is
+    sent only if it improves the stop by at least ``min_step`` points and is
+    outside the symbol's stops level, at most ``max_rate`` per second with the
+    largest improvements first. A rejected stop is not resent for the same
+    ticket and price until a backoff that doubles with each rejection expires;
+    a different target is tried right away.
+    """
+
+    def __init__(self, risk: Optional[RiskService] = None,
+                 trailing_points: float = TRADING['TRAILING_STOP'],
+                 break_even_points: float = TRADING['BREAK_EVEN'],
+                 min_step: float = POSITION_MANAGER['MIN_STEP'],
+                 max_rate: float = POSITION_MANAGER['MAX_MODIFICATIONS_PER_SECOND'],
+                 magic: Optional[int] = POSITION_MANAGER['MAGIC'],
+                 retry_backoff: float = POSITION_MANAGER['RETRY_BACKOFF'],
+                 max_backoff: float = POSITION_MANAGER['MAX_BACKOFF'],
+                 log_system=None):
+        self.risk = risk or risk_service
+        self.trailing_points = trailing_points
+        self.break_even_points = break_even_points
+        self.min_step = min_step
+        self.magic = magic
+        self.log_system = log_system
+        self.limiter = RateLimiter(max_rate)
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+
+        self.symbols: List[str] = []
+        self.specs: Dict[str, Any] = {}  # symbol -> (point, digits, stops_level)
+        self.positions = np.zeros(0, dtype=POSITION_DTYPE)
+        self.snapshot_time = None
+        self.pending: Dict[int, float] = {}  # ticket -> stop loss already requested
+        self.failed: Dict[int, Tuple[float, float, int]] = {}  # ticket -> (rejected sl, retry at, rejections)
+
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def symbol_spec(self, symbol: str):
+        spec = self.specs.get(symbol)
+        if spec is None:
+            info = mt5.symbol_info(symbol)
+            if info is None:
+                return None
+            spec = (info.point, info.digits, info.trade_stops_level)
+            self.specs[symbol] = spec
+        return spec
+
+    def refresh_positions(self):
+        """Rebuild the positions array when the risk snapshot changed"""
+        self.risk.ensure_fresh()
+        if self.risk.synced_at == self.snapshot_time:
+            return
+        with self.risk.lock:
+            positions = [p for p in self.risk.positions.values()
+                         if self.magic is None or p.magic == self.magic]
+            self.snapshot_time = self.risk.synced_at
+
+        self.symbols = sorted({p.symbol for p in positions})
+        index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.positions = np.fromiter(
+            ((p.ticket, index[p.symbol], p.type == mt5.POSITION_TYPE_BUY, p.price_open, p.sl, p.tp)
+             for p in positions),
+            dtype=POSITION_DTYPE, count=len(positions)
+        )
+        # Requests the terminal has applied (or positions that closed) are done
+        current = dict(zip(self.positions['ticket'].tolist(), self.positions['sl'].tolist()))
+        self.pending = {ticket: sl for ticket, sl in self.pending.items()
+                        if ticket in current and current[ticket] != sl}
+        self.failed = {ticket: failure for ticket, failure in self.failed.items() if ticket in current}
+        if self.pending:
+            # The others count as applied until the snapshot catches up
+            tickets = self.positions['ticket']
+            mask = np.isin(tickets, list(self.pending))
+            self.positions['sl'][mask] = [self.pending[t] for t in tickets[mask].tolist()]
+
+    def market_arrays(self):
+        """Per-symbol bid, ask, point and stops level (NaN where unknown)"""
+        count = len(self.symbols)
+        bid = np.full(count, np.nan)
+        ask = np.full(count, np.nan)
+        point = np.full(count, np.nan)
+        stops = np.zeros(count)
+        for i, symbol in enumerate(self.symbols):
+            spec = self.symbol_spec(symbol)
+            tick = mt5.symbol_info_tick(symbol)
+            if spec is None or tick is None:
+                continue
+            bid[i], ask[i] = tick.bid, tick.ask
+            point[i], stops[i] = spec[0], spec[2]
+        return bid, ask, point, stops
+
+    def compute(self, bid: np.ndarray, ask: np.ndarray, point: np.ndarray,
+                stops: np.ndarray) -> np.ndarray:
+        """New stop loss per position, NaN where no modification is due"""
+        p = self.positions
+        buy = p['buy']
+        sym = p['symbol']
+        pt = point[sym]
+        # Positions close at bid (buys) or ask (sells)
+        price = np.where(buy, bid[sym], ask[sym])
+        direction = np.where(buy, 1.0, -1.0)
+        # Rounded so that exactly N points of profit is not 19.99999
+        profit_points = np.round((price - p['price_open']) * direction / pt, 6)
+
+        target = np.full(len(p), np.nan)
+        if self.break_even_points:
+            target = np.where(profit_points >= self.break_even_points, p['price_open'], target)
+        if self.trailing_points:
+            trail = price - direction * self.trailing_points * pt
+            trailing = profit_points >= self.trailing_points
+            # The better of break-even and trailing for the position's side
+            better = np.isnan(target) | ((trail - target) * direction > 0)
+            target = np.where(trailing & better, trail, target)
+
+        # Only tighten, by at least min_step, and keep clear of the stops level
+        current = np.where(p['sl'] > 0, p['sl'], np.where(buy, -np.inf, np.inf))
+        improves = (target - current) * direction >= self.min_step * pt
+        clear = (price - target) * direction >= stops[sym] * pt
+        return np.where(improves & clear, target, np.nan)
+
+    def run_once(self) -> int:
+        """Evaluate every position once; returns the number of modifications sent"""
+        self.refresh_positions()
+        if not len(self.positions):
+            return 0
+
+        bid, ask, point, stops = self.market_arrays()
+        targets = self.compute(bid, ask, point, stops)
+        due = np.flatnonzero(~np.isnan(targets))
+        if not len(due):
+            return 0
+
+        # Largest improvement first when the rate limit cuts the batch
+        sym = self.positions['symbol'][due]
+        gain = np.abs(targets[due] - self.positions['sl'][due]) / point[sym]
+        due = due[np.argsort(-np.nan_to_num(gain, posinf=np.finfo(float).max))]
+
+        sent = 0
+        for i in due:
+            if not self.limiter.available():
+                break
+            position = self.positions[i]
+            symbol = self.symbols[position['symbol']]
+            sl = round(float(targets[i]), self.specs[symbol][1])
+            ticket = int(position['ticket'])
+            if self.pending.get(ticket) == sl or self.backing_off(ticket, sl):
+                continue
+            self.limiter.consume()
+            if self.modify(ticket, symbol, sl, float(position['tp'])):
+                self.failed.pop(ticket, None)
+                self.pending[ticket] = sl
+                self.positions['sl'][i] = sl
+                sent += 1
+            else:
+                self.record_failure(ticket, sl)
+        return sent
+
+    def backing_off(self, ticket: int, sl: float) -> bool:
+        """True while the same stop was rejected for the ticket and its backoff runs"""
+        failure = self.failed.get(ticket)
+        return failure is not None and failure[0] == sl and time.monotonic() < failure[1]
+
+    def record_failure(self, ticket: int, sl: float):
+        failure = self.failed.get(ticket)
+        rejections = failure[2] + 1 if failure is not None and failure[0] == sl else 1
+        delay = min(self.max_backoff, self.retry_backoff * 2 ** (rejections - 1))
+        self.failed[ticket] = (sl, time.monotonic() + delay, rejections)
+
+    def modify(self, ticket: int, symbol: str, sl: float, tp: float) -> bool:
+        request = {
+            "action": mt5.TRADE_ACTION_SLTP,
+            "position": ticket,
+            "symbol": symbol,
+            "sl": sl,
+            "tp": tp
+        }
+        result = mt5.order_send(request)
+        if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+            comment = mt5.last_error() if result is None else result.comment
+            self.log(f"❌ Erro ao mover stop da posição {ticket}: {comment}", symbol)
+            return False
+        self.log(f"ℹ️ Stop da posição {ticket} movido para {sl}", symbol)
+        return True
+
+    def log(self, message: str, symbol: str):
+        if self.log_system is not None:
+            self.log_system.logar(message, symbol)
+
+    def start(self, interval: float = POSITION_MANAGER['INTERVAL']):
+        """Evaluate positions every ``interval`` seconds in a background thread"""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+
+        def run():
+            while not self.stop_event.is_set():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    self.log(f"❌ Erro no gerenciador de posições: {str(e)}", None)
+                self.stop_event.wait(interval)
+
+        self.thread = threading.Thread(target=run, name='position-manager', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
+
+
+__all__ = ['PositionManager', 'RateLimiter', 'POSITION_DTYPE']
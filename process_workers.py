@@ -0,0 +1,346 @@
+"""
+Process-isolated strategy workers for Future MT5 Pro Trading System
+Each strategy runs in its own process, reads market data zero-copy from the
+shared rings published by the data feed and sends order intents back to it
+"""
+
+import os
+import sys
+import time
+import queue
+import threading
+import multiprocessing as mp
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Dict, Any, List, Optional
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from shared_feed import (
+    BAR_DTYPE, TICK_DTYPE, ACCOUNT_DTYPE, POSITIONS_DTYPE, SharedRing, ring_name, run_data_feed
+)
+from daemon import StrategyDaemon
+
+BAR_CAPACITY = 1024
+TICK_CAPACITY = 4096
+ORDER_TIMEOUT = 15  # seconds an intent may wait in the feed's queue before it is dropped
+ORDER_GRACE = 10  # extra seconds to wait for the reply of an intent sent just before its deadline
+
+
+class QueueLogSystem:
+    """Forwards strategy log messages to the parent process"""
+
+    def __init__(self, log_queue):
+        self.log_queue = log_queue
+
+    def logar(self, mensagem: str, asset: Optional[str] = None):
+        self.log_queue.put((mensagem, asset))
+
+    def log(self, message: str, asset_id: Optional[str] = None, level: str = 'INFO'):
+        self.logar(message, asset_id)
+
+
+def create_worker_strategy(key: str, symbol: str, timeframe: str, lot: float,
+                           names: Dict[str, Any], spec: Dict[str, float],
+                           order_queue, result_queue, log_system):
+    """Build an EstrategiaTrading whose data and order hooks use the shared rings"""
+    from config_service import config_service
+    from estrategia import EstrategiaTrading
+    from snapshots import snapshot_store
+    from tick_stats import TickStats
+
+    bars = SharedRing(names['bars'][key], BAR_DTYPE, BAR_CAPACITY)
+    ticks = SharedRing(names['ticks'][symbol], TICK_DTYPE, TICK_CAPACITY)
+    account = SharedRing(names['account'], ACCOUNT_DTYPE, 1)
+    positions = SharedRing(names['positions'], POSITIONS_DTYPE, 1)
+    symbol_info = SimpleNamespace(**spec)
+
+    class SharedMemoryEstrategia(EstrategiaTrading):
+        order_id = 0
+        tick_stats = None
+        ticks_lidos = 0  # contador do ring de ticks na última consulta
+
+        def obter_barras(self, quantidade):
+            # Cópia consistente: o feed sobrescreve a barra em formação no lugar
+            barras = bars.snapshot(quantidade)
+            return barras if len(barras) else None
+
+        def obter_conta(self):
+            record = account.last()
+            if record is None:
+                return None
+            return SimpleNamespace(**{name: record[name].item() for name in ACCOUNT_DTYPE.names})
+
+        def obter_tick(self):
+            record = ticks.last()
+            if record is None:
+                return None
+            return SimpleNamespace(**{name: record[name].item() for name in TICK_DTYPE.names})
+
+        def obter_info_simbolo(self):
+            return symbol_info
+
+        def posicoes(self):
+            """(ativo, magic, compra) das posições abertas publicadas pelo feed"""
+            record = positions.last()
+            if record is None:
+                return []
+            n = int(record['count'])
+            return list(zip(record['symbol'][:n].tolist(), record['magic'][:n].tolist(),
+                            record['buy'][:n].tolist()))
+
+        def obter_total_posicoes(self):
+            return sum(1 for ativo, magic, _ in self.posicoes() if ativo == self.ativo and magic == self.magic)
+
+        def obter_posicoes_abertas(self):
+            return [(ativo, compra) for ativo, _, compra in self.posicoes()]
+
+        def assinar_eventos(self):
+            # Sem MT5 no worker: o ciclo é fixo, lendo os rings do feed
+            return None
+
+        def aguardar_conexao(self):
+            # A conexão é do processo do feed, que pausa o gateway de ordens
+            return True
+
+        def iniciar_servicos(self):
+            # Só o watcher de configuração, que lê o arquivo; a correlação
+            # busca barras no MT5, que não é inicializado no worker
+            config_service.start()
+            self.log_system.logar("ℹ️ Filtro de correlação desativado no modo de processos", self.ativo)
+
+        def verificar_correlacao(self, tipo):
+            return True, []
+
+        def obter_estatisticas_ticks(self):
+            # Alimentadas só com os ticks publicados desde a última consulta,
+            # pelo contador do ring; se o feed publicar durante a cópia, lê de
+            # novo (ticks já vistos são descartados pelo time_msc)
+            if self.tick_stats is None:
+                self.tick_stats = TickStats(symbol_info.point)
+            for _ in range(3):
+                total = ticks.count
+                lidos = self.ticks_lidos if total >= self.ticks_lidos else 0  # ring recriado
+                novos = min(total - lidos, TICK_CAPACITY)
+                if novos <= 0:
+                    return self.tick_stats
+                registros = ticks.snapshot(novos)
+                if ticks.count == total:
+                    break
+            self.tick_stats.update_batch(registros['time_msc'], registros['bid'], registros['ask'])
+            self.ticks_lidos = total
+            return self.tick_stats
+
+        def enviar_ordem(self, request):
+            # O feed descarta a intenção vencida sem enviá-la, então uma ordem
+            # dada como falha aqui não é executada depois de uma reconexão
+            self.order_id += 1
+            deadline = time.time() + ORDER_TIMEOUT
+            order_queue.put({'worker': key, 'id': self.order_id, 'request': request, 'deadline': deadline})
+            try:
+                while True:
+                    reply = result_queue.get(timeout=max(0.0, deadline + ORDER_GRACE - time.time()))
+                    if reply['id'] == self.order_id:
+                        return SimpleNamespace(**reply)
+            except queue.Empty:
+                return SimpleNamespace(id=self.order_id, retcode=-1, order=0,
+                                       comment='Sem resposta do feed de dados')
+
+        def liberar(self):
+            for ring in (bars, ticks, account, positions):
+                ring.close()
+
+    return SharedMemoryEstrategia(symbol, timeframe, lot, log_system, snapshots=snapshot_store)
+
+
+def run_worker(key: str, symbol: str, timeframe: str, lot: float, names: Dict[str, Any],
+               spec: Dict[str, float], order_queue, result_queue, log_queue, stop_event):
+    """Process entry point of a strategy worker"""
+    log_system = QueueLogSystem(log_queue)
+    try:
+        estrategia = create_worker_strategy(key, symbol, timeframe, lot, names, spec,
+                                            order_queue, result_queue, log_system)
+    except Exception as e:
+        log_system.logar(f"❌ Erro ao iniciar worker {key}: {str(e)}", symbol)
+        return
+
+    def watch_stop():
+        stop_event.wait()
+        estrategia.parar()
+
+    threading.Thread(target=watch_stop, daemon=True).start()
+    try:
+        estrategia.executar()
+    finally:
+        estrategia.liberar()
+
+
+class MultiProcessDaemon(StrategyDaemon):
+    """StrategyDaemon running one worker process per strategy plus one data-feed process
+
+    The parent process never talks to MT5; it creates the shared rings, relays
+    logs from workers and manages their lifecycle.
+    """
+
+    def __init__(self, portfolio: List[Dict[str, Any]], log_system, journal=None,
+                 feed_interval: float = 0.25):
+        super().__init__(portfolio, log_system, journal)
+        self.feed_interval = feed_interval
+        self.ctx = mp.get_context('spawn')
+        self.order_queue = self.ctx.Queue()
+        self.log_queue = self.ctx.Queue()
+        self.result_queues = {key: self.ctx.Queue() for key in self.entries}
+        self.feed_stop = self.ctx.Event()
+        self.worker_stops: Dict[str, Any] = {}
+        self.processes: Dict[str, mp.Process] = {}
+        self.feed_process: Optional[mp.Process] = None
+        self.specs: Dict[str, Dict[str, float]] = {}
+        self.rings: List[SharedRing] = []
+        self.names = self._create_rings()
+
+    def _create_rings(self) -> Dict[str, Any]:
+        prefix = f"fm{os.getpid()}"
+        names = {'bars': {}, 'ticks': {}, 'tick_capacity': TICK_CAPACITY,
+                 'account': ring_name(prefix, 'acc'), 'positions': ring_name(prefix, 'pos')}
+
+        for i, (key, entry) in enumerate(self.entries.items()):
+            names['bars'][key] = ring_name(prefix, 'b', i)
+            self.rings.append(SharedRing(names['bars'][key], BAR_DTYPE, BAR_CAPACITY, create=True))
+        for i, symbol in enumerate(sorted({e['symbol'] for e in self.entries.values()})):
+            names['ticks'][symbol] = ring_name(prefix, 't', i)
+            self.rings.append(SharedRing(names['ticks'][symbol], TICK_DTYPE, TICK_CAPACITY,
+                                         create=True))
+        self.rings.append(SharedRing(names['account'], ACCOUNT_DTYPE, 1, create=True))
+        self.rings.append(SharedRing(names['positions'], POSITIONS_DTYPE, 1, create=True))
+        return names
+
+    def start_feed(self, timeout: float = 60) -> bool:
+        """Start the data-feed process and wait until it has published initial data"""
+        threading.Thread(target=self._relay_logs, daemon=True).start()
+
+        subscriptions = [
+            {'key': key, 'symbol': e['symbol'], 'timeframe': e['timeframe'],
+             'capacity': BAR_CAPACITY}
+            for key, e in self.entries.items()
+        ]
+        ready_queue = self.ctx.Queue()
+        self.feed_process = self.ctx.Process(
+            target=run_data_feed,
+            args=(subscriptions, self.names, self.order_queue, self.result_queues,
+                  self.log_queue, self.feed_stop, ready_queue, self.feed_interval),
+            name='data-feed',
+            daemon=True
+        )
+        self.feed_process.start()
+
+        try:
+            ready = ready_queue.get(timeout=timeout)
+        except queue.Empty:
+            ready = {'ok': False, 'error': 'timeout waiting for data feed'}
+        if not ready['ok']:
+            self.log_system.logar(f"❌ Feed de dados falhou: {ready['error']}")
+            return False
+        self.specs = ready['symbols']
+        self.log_system.logar(f"✅ Feed de dados ativo (pid {self.feed_process.pid})")
+        return True
+
+    def _relay_logs(self):
+        while True:
+            item = self.log_queue.get()
+            if item is None:
+                return
+            mensagem, asset = item
+            self.log_system.logar(mensagem, asset)
+
+    def start(self, key: Optional[str] = None) -> List[str]:
+        started = []
+        with self.lock:
+            for k in self._select(key):
+                process = self.processes.get(k)
+                if process is not None and process.is_alive():
+                    continue
+                entry = self.entries[k]
+                if entry['symbol'] not in self.specs:
+                    self.log_system.logar(f"❌ Sem dados para {entry['symbol']}", entry['symbol'])
+                    continue
+
+                stop_event = self.ctx.Event()
+                process = self.ctx.Process(
+                    target=run_worker,
+                    args=(k, entry['symbol'], entry['timeframe'], entry['lot'], self.names,
+                          self.specs[entry['symbol']], self.order_queue, self.result_queues[k],
+                          self.log_queue, stop_event),
+                    name=k,
+                    daemon=True
+                )
+                process.start()
+                self.worker_stops[k] = stop_event
+                self.processes[k] = process
+                self.started_at[k] = datetime.now()
+                started.append(k)
+                if self.journal:
+                    self.journal.record('strategy_started', entry['symbol'], timeframe=entry['timeframe'],
+                                        lot=entry['lot'], pid=process.pid)
+        return started
+
+    def stop(self, key: Optional[str] = None, timeout: float = 15) -> List[str]:
+        stopped = []
+        with self.lock:
+            for k in self._select(key):
+                process = self.processes.pop(k, None)
+                if process is None:
+                    continue
+                self.worker_stops.pop(k).set()
+                process.join(timeout)
+                if process.is_alive():
+                    process.terminate()
+                self.started_at.pop(k, None)
+                stopped.append(k)
+                if self.journal:
+                    self.journal.record('strategy_stopped', self.entries[k]['symbol'],
+                                        timeframe=self.entries[k]['timeframe'])
+        return stopped
+
+    def status(self) -> Dict[str, Any]:
+        with self.lock:
+            result = {}
+            for k, entry in self.entries.items():
+                process = self.processes.get(k)
+                running = process is not None and process.is_alive()
+                result[k] = {
+                    'symbol': entry['symbol'],
+                    'timeframe': entry['timeframe'],
+                    'lot': entry['lot'],
+                    'running': running,
+                    'pid': process.pid if running else None,
+                    'since': self.started_at[k].isoformat(timespec='seconds') if running else None
+                }
+            result['_feed'] = {
+                'running': bool(self.feed_process and self.feed_process.is_alive()),
+                'pid': self.feed_process.pid if self.feed_process else None
+            }
+            return result
+
+    def shutdown(self):
+        self.stop()
+        self.feed_stop.set()
+        if self.feed_process is not None:
+            self.feed_process.join(15)
+            if self.feed_process.is_alive():
+                self.feed_process.terminate()
+        self.log_queue.put(None)
+        for ring in self.rings:
+            ring.close()
+        self.rings.clear()
+        self.stopped.set()
+
+
+__all__ = [
+    'QueueLogSystem',
+    'MultiProcessDaemon',
+    'create_worker_strategy',
+    'run_worker'
+]
@@ -0,0 +1,253 @@
+"""
+Risk service for Future MT5 Pro Trading System
+One periodic positions/orders/account sync shared by every strategy, with
+per-symbol and per-magic exposure, margin and drawdown answered from cache
+"""
+
+import os
+import sys
+import time
+import threading
+from typing import Dict, Any, Optional, List, Tuple
+
+import MetaTrader5 as mt5
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import RISK
+except ImportError:
+    RISK = {
+        'SYNC_INTERVAL': 1.0,
+        'MAX_AGE': 2.0,
+        'RETRY_BACKOFF': 1.0
+    }
+
+
+class Exposure:
+    """Aggregated open positions and pending orders for one key"""
+
+    __slots__ = ('positions', 'orders', 'buy_volume', 'sell_volume', 'profit', 'margin')
+
+    def __init__(self):
+        self.positions = 0
+        self.orders = 0
+        self.buy_volume = 0.0
+        self.sell_volume = 0.0
+        self.profit = 0.0
+        self.margin = 0.0
+
+    @property
+    def net_volume(self) -> float:
+        return self.buy_volume - self.sell_volume
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'positions': self.positions,
+            'orders': self.orders,
+            'buy_volume': self.buy_volume,
+            'sell_volume': self.sell_volume,
+            'net_volume': self.net_volume,
+            'profit': self.profit,
+            'margin': self.margin
+        }
+
+
+EMPTY = Exposure()
+
+
+class RiskService:
+    """Cached view of the account's positions, orders and equity
+
+    ``sync`` pulls ``positions_get``/``orders_get``/``account_info`` once and
+    rebuilds the per-symbol, per-magic and per-(symbol, magic) aggregates, so
+    every query afterwards is a dictionary lookup. Margin is computed once per
+    ticket with ``order_calc_margin`` when the position first appears.
+
+    Queries sync inline when the cache is older than ``max_age``; the
+    background thread started by ``start`` keeps it fresh so they normally
+    don't have to. After a failed inline sync queries answer from the stale
+    cache (None before the first sync) for ``retry_backoff`` seconds instead
+    of asking a dead terminal again on every call.
+    """
+
+    def __init__(self, interval: float = RISK['SYNC_INTERVAL'], max_age: float = RISK['MAX_AGE'],
+                 retry_backoff: float = RISK['RETRY_BACKOFF']):
+        self.interval = interval
+        self.max_age = max_age
+        self.retry_backoff = retry_backoff
+        self.retry_at = 0.0  # no inline sync before this (monotonic) after a failure
+        self.lock = threading.RLock()
+        self.positions: Dict[int, Any] = {}
+        self.orders: Dict[int, Any] = {}
+        self.account_info = None
+        self.margins: Dict[int, float] = {}
+        self.by_symbol: Dict[str, Exposure] = {}
+        self.by_magic: Dict[int, Exposure] = {}
+        self.by_strategy: Dict[Tuple[str, int], Exposure] = {}
+        self.total = Exposure()
+        self.synced_at = 0.0
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def position_margin(self, position) -> float:
+        margin = self.margins.get(position.ticket)
+        if margin is None:
+            order_type = mt5.ORDER_TYPE_BUY if position.type == mt5.POSITION_TYPE_BUY else mt5.ORDER_TYPE_SELL
+            margin = mt5.order_calc_margin(order_type, position.symbol, position.volume, position.price_open)
+            margin = margin or 0.0
+            self.margins[position.ticket] = margin
+        return margin
+
+    def sync(self) -> bool:
+        """Refresh the snapshot from the terminal; False if MT5 did not answer"""
+        positions = mt5.positions_get()
+        orders = mt5.orders_get()
+        account = mt5.account_info()
+        if positions is None or orders is None or account is None:
+            return False
+
+        by_symbol: Dict[str, Exposure] = {}
+        by_magic: Dict[int, Exposure] = {}
+        by_strategy: Dict[Tuple[str, int], Exposure] = {}
+        total = Exposure()
+
+        with self.lock:
+            current = {position.ticket: position for position in positions}
+            # Forget margins of closed positions; new tickets get theirs below
+            for ticket in set(self.margins) - set(current):
+                del self.margins[ticket]
+
+            for position in positions:
+                margin = self.position_margin(position)
+                buy = position.type == mt5.POSITION_TYPE_BUY
+                for exposure in (by_symbol.setdefault(position.symbol, Exposure()),
+                                 by_magic.setdefault(position.magic, Exposure()),
+                                 by_strategy.setdefault((position.symbol, position.magic), Exposure()),
+                                 total):
+                    exposure.positions += 1
+                    if buy:
+                        exposure.buy_volume += position.volume
+                    else:
+                        exposure.sell_volume += position.volume
+                    exposure.profit += position.profit
+                    exposure.margin += margin
+
+            for order in orders:
+                for exposure in (by_symbol.setdefault(order.symbol, Exposure()),
+                                 by_magic.setdefault(order.magic, Exposure()),
+                                 by_strategy.setdefault((order.symbol, order.magic), Exposure()),
+                                 total):
+                    exposure.orders += 1
+
+            self.positions = current
+            self.orders = {order.ticket: order for order in orders}
+            self.account_info = account
+            self.by_symbol = by_symbol
+            self.by_magic = by_magic
+            self.by_strategy = by_strategy
+            self.total = total
+            self.synced_at = time.monotonic()
+        return True
+
+    def invalidate(self):
+        """Force the next query to sync, e.g. right after an order was sent"""
+        with self.lock:
+            self.synced_at = 0.0
+
+    def ensure_fresh(self):
+        now = time.monotonic()
+        if now - self.synced_at > self.max_age and now >= self.retry_at:
+            with self.lock:
+                now = time.monotonic()
+                if now - self.synced_at > self.max_age and now >= self.retry_at:
+                    if not self.sync():
+                        self.retry_at = time.monotonic() + self.retry_backoff
+
+    # Queries
+    def exposure(self, symbol: Optional[str] = None, magic: Optional[int] = None) -> Exposure:
+        """Exposure of a symbol, a magic number, both, or the whole account"""
+        self.ensure_fresh()
+        if symbol is not None and magic is not None:
+            return self.by_strategy.get((symbol, magic), EMPTY)
+        if symbol is not None:
+            return self.by_symbol.get(symbol, EMPTY)
+        if magic is not None:
+            return self.by_magic.get(magic, EMPTY)
+        return self.total
+
+    def position_count(self, symbol: Optional[str] = None, magic: Optional[int] = None) -> int:
+        return self.exposure(symbol, magic).positions
+
+    def margin(self, symbol: Optional[str] = None, magic: Optional[int] = None) -> float:
+        return self.exposure(symbol, magic).margin
+
+    def open_positions(self) -> List[Tuple[str, bool]]:
+        """(symbol, buy) of every open position of the account"""
+        self.ensure_fresh()
+        with self.lock:
+            return [(position.symbol, position.type == mt5.POSITION_TYPE_BUY)
+                    for position in self.positions.values()]
+
+    def account(self):
+        """Last account_info() result"""
+        self.ensure_fresh()
+        return self.account_info
+
+    def drawdown(self, baseline: float, symbol: Optional[str] = None,
+                 magic: Optional[int] = None) -> float:
+        """Drawdown in percent of ``baseline``
+
+        For the whole account it is measured on equity; for a symbol or magic
+        number it is that key's floating loss.
+        """
+        if not baseline:
+            return 0.0
+        if symbol is None and magic is None:
+            account = self.account()
+            if account is None:
+                return 0.0
+            return (baseline - account.equity) / baseline * 100
+        return -self.exposure(symbol, magic).profit / baseline * 100
+
+    def summary(self) -> Dict[str, Any]:
+        self.ensure_fresh()
+        with self.lock:
+            return {
+                'total': self.total.to_dict(),
+                'symbols': {symbol: e.to_dict() for symbol, e in self.by_symbol.items()},
+                'magics': {magic: e.to_dict() for magic, e in self.by_magic.items()}
+            }
+
+    # Background sync
+    def start(self):
+        """Keep the snapshot fresh from a background thread"""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+
+        def run():
+            while not self.stop_event.is_set():
+                try:
+                    self.sync()
+                except Exception:
+                    pass
+                self.stop_event.wait(self.interval)
+
+        self.thread = threading.Thread(target=run, name='risk-service', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
+
+
+# Global risk service shared by every strategy in the process
+risk_service = RiskService()
+
+__all__ = ['risk_service', 'RiskService', 'Exposure']
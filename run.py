@@ -9,6 +9,9 @@ import sys
 import traceback
 from typing import Optional, Tuple
 
+# Imported first: starts the startup clock and checks packages without importing them
+from startup import missing_packages
+
 def check_python_version() -> Tuple[bool, Optional[str]]:
     """Check if Python version meets requirements"""
     required_version = (3, 8)
@@ -18,7 +21,7 @@ def check_python_version() -> Tuple[bool, Optional[str]]:
         return False, f"Python {required_version[0]}.{required_version[1]} or higher is required"
     return True, None
 
-def check_dependencies() -> Tuple[bool, Optional[str]]:
+def check_dependencies(headless: bool = False) -> Tuple[bool, Optional[str]]:
     """Check if all required packages are installed"""
     required_packages = {
         'MetaTrader5': 'MetaTrader5',
@@ -26,14 +29,11 @@ def check_dependencies() -> Tuple[bool, Optional[str]]:
         'pandas': 'pandas',
         'Pillow': 'PIL'
     }
+    if headless:
+        # The daemon never builds a window
+        del required_packages['Pillow']
     
-    missing = []
-    for package, import_name in required_packages.items():
-        try:
-            __import__(import_name)
-        except ImportError:
-            missing.append(package)
-            
+    missing = missing_packages(required_packages)
     if missing:
         return False, f"Missing required packages: {', '.join(missing)}"
     return True, None
@@ -56,7 +56,15 @@ def setup_environment() -> Tuple[bool, Optional[str]]:
         return False, f"Failed to setup environment: {str(e)}"
 
 def main():
-    """Main entry point"""
+    """Main entry point
+
+    ``run.py --headless [daemon args]`` runs the strategy daemon instead of the GUI.
+    """
+    args = sys.argv[1:]
+    headless = '--headless' in args
+    if headless:
+        args.remove('--headless')
+
     print("\nFuture MT5 Pro Trading System")
     print("Initializing...\n")
     
@@ -68,7 +76,7 @@ def main():
     print("✅ Python version check passed")
     
     # Check dependencies
-    success, message = check_dependencies()
+    success, message = check_dependencies(headless)
     if not success:
         print(f"❌ Error: {message}")
         print("\nPlease install required packages:")
@@ -83,6 +91,11 @@ def main():
         sys.exit(1)
     print("✅ Environment setup complete")
     
+    if headless:
+        from daemon import main as run_daemon
+        print("\n🚀 Launching headless daemon...\n")
+        sys.exit(run_daemon(args))
+
     try:
         # Import and run application
         from main import main as run_app
@@ -48,6 +48,10 @@ setup(
     entry_points={
         'console_scripts': [
             'future-mt5=run:main',
+            'future-mt5-daemon=daemon:main',
+            'future-mt5-walk-forward=walk_forward:main',
+            'future-mt5-monte-carlo=monte_carlo:main',
+            'future-mt5-export=exporter:main',
         ],
     },
     include_package_data=True,
@@ -0,0 +1,422 @@
+"""
+Shared-memory market data for Future MT5 Pro Trading System
+A single data-feed process owns the MT5 connection and publishes bars, ticks
+and account state into shared-memory ring buffers that strategy worker
+processes read without copying
+"""
+
+import os
+import sys
+import time
+import queue
+from multiprocessing import shared_memory
+from typing import Dict, Any, Optional, Tuple, List
+
+import numpy as np
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+# Same layout as the structured array returned by mt5.copy_rates_from_pos
+BAR_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('tick_volume', '<u8'),
+    ('spread', '<i4'),
+    ('real_volume', '<u8')
+])
+
+TICK_DTYPE = np.dtype([
+    ('time_msc', '<i8'),
+    ('bid', '<f8'),
+    ('ask', '<f8'),
+    ('last', '<f8'),
+    ('volume', '<u8')
+])
+
+ACCOUNT_DTYPE = np.dtype([
+    ('time', '<f8'),
+    ('balance', '<f8'),
+    ('equity', '<f8'),
+    ('margin', '<f8'),
+    ('margin_free', '<f8'),
+    ('profit', '<f8'),
+    ('positions_total', '<i8')
+])
+
+MAX_POSITIONS = 256  # open positions published per snapshot
+
+# Open positions of the account, one snapshot per record
+POSITIONS_DTYPE = np.dtype([
+    ('time', '<f8'),
+    ('count', '<i8'),
+    ('symbol', 'U32', (MAX_POSITIONS,)),
+    ('magic', '<i8', (MAX_POSITIONS,)),
+    ('buy', '?', (MAX_POSITIONS,))
+])
+
+# Header: write sequence (odd while a write is in progress) and record count
+HEADER_DTYPE = np.dtype([('seq', '<i8'), ('count', '<i8')])
+
+
+class SharedRing:
+    """Single-writer, multi-reader ring buffer of structured records in shared memory
+
+    Every record is stored twice, at ``i`` and ``i + capacity``, so the last
+    ``n`` records are always one contiguous slice and readers get plain NumPy
+    views instead of copies. A sequence counter lets readers detect writes
+    that happened while they were reading.
+    """
+
+    def __init__(self, name: str, dtype: np.dtype, capacity: int, create: bool = False):
+        self.name = name
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+        size = HEADER_DTYPE.itemsize + self.dtype.itemsize * capacity * 2
+
+        if create:
+            try:
+                # Leftover segment from a crashed run
+                stale = shared_memory.SharedMemory(name=name)
+                stale.close()
+                stale.unlink()
+            except FileNotFoundError:
+                pass
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.owner = create
+
+        self.header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=self.shm.buf)
+        self.data = np.ndarray(
+            (capacity * 2,), dtype=self.dtype, buffer=self.shm.buf, offset=HEADER_DTYPE.itemsize
+        )
+        if create:
+            self.header[0] = (0, 0)
+
+    @property
+    def seq(self) -> int:
+        return int(self.header['seq'][0])
+
+    @property
+    def count(self) -> int:
+        return int(self.header['count'][0])
+
+    def _begin(self):
+        self.header['seq'][0] += 1
+
+    def _end(self):
+        self.header['seq'][0] += 1
+
+    def _store(self, index: int, record):
+        slot = index % self.capacity
+        self.data[slot] = record
+        self.data[slot + self.capacity] = record
+
+    def append(self, records: np.ndarray):
+        """Append records in order"""
+        if len(records) == 0:
+            return
+        self._begin()
+        count = self.count
+        for record in records[-self.capacity:]:
+            self._store(count, record)
+            count += 1
+        self.header['count'][0] = count
+        self._end()
+
+    def upsert(self, records: np.ndarray, key: str = 'time'):
+        """Append records newer than the last one and overwrite records with a known key
+
+        Used for bars, where the forming bar keeps changing until the next opens.
+        """
+        if len(records) == 0:
+            return
+        self._begin()
+        for record in records:
+            count = self.count
+            if count:
+                last = self.data[(count - 1) % self.capacity][key]
+                if record[key] == last:
+                    self._store(count - 1, record)
+                    continue
+                if record[key] < last:
+                    # Late update of an older bar still inside the buffer
+                    window = self.latest_unsafe(self.capacity)
+                    pos = int(np.searchsorted(window[key], record[key]))
+                    if pos < len(window) and window[pos][key] == record[key]:
+                        self._store(count - len(window) + pos, record)
+                    continue
+            self._store(count, record)
+            self.header['count'][0] = count + 1
+        self._end()
+
+    def latest_unsafe(self, n: int) -> np.ndarray:
+        """View of the last ``n`` records without write detection"""
+        count = self.count
+        n = min(n, count, self.capacity)
+        end = (count - 1) % self.capacity + 1 + self.capacity if count else 0
+        return self.data[end - n:end]
+
+    def latest(self, n: int, retries: int = 100) -> Tuple[np.ndarray, int]:
+        """Zero-copy view of the last ``n`` records and the sequence it was taken at
+
+        Retries while a write is in progress. The view stays live: compare the
+        returned sequence with ``seq`` after use to know if it changed underneath.
+        """
+        for _ in range(retries):
+            seq = self.seq
+            if seq % 2 == 0:
+                view = self.latest_unsafe(n)
+                if self.seq == seq:
+                    return view, seq
+            time.sleep(0)
+        return self.latest_unsafe(n), self.seq
+
+    def snapshot(self, n: int, retries: int = 100) -> np.ndarray:
+        """Copy of the last ``n`` records, retried while a write overlaps the copy"""
+        for _ in range(retries):
+            view, seq = self.latest(n)
+            records = view.copy()
+            if self.seq == seq:
+                break
+        return records
+
+    def last(self) -> Optional[np.void]:
+        """Copy of the most recent record, or None if empty"""
+        records = self.snapshot(1)
+        return records[0] if len(records) else None
+
+    def close(self):
+        """Detach from the segment; the creator also removes it"""
+        self.header = None
+        self.data = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def ring_name(prefix: str, *parts: Any) -> str:
+    """Shared memory segment name; kept short for the 31-char macOS limit"""
+    name = '_'.join([prefix] + [str(p) for p in parts])
+    return ''.join(c if c.isalnum() or c == '_' else '_' for c in name)[:30]
+
+
+class DataFeed:
+    """Owns the MT5 connection and publishes market data to shared rings
+
+    Runs inside its own process (see ``run_data_feed``); also executes the
+    order intents that worker processes send back.
+    """
+
+    def __init__(self, subscriptions: List[Dict[str, Any]], names: Dict[str, Any],
+                 order_queue, result_queues: Dict[str, Any], log_queue, stop_event,
+                 interval: float = 0.25):
+        self.subscriptions = subscriptions
+        self.names = names
+        self.order_queue = order_queue
+        self.result_queues = result_queues
+        self.log_queue = log_queue
+        self.stop_event = stop_event
+        self.interval = interval
+        self.bar_rings: Dict[str, SharedRing] = {}
+        self.tick_rings: Dict[str, SharedRing] = {}
+        self.account_ring: Optional[SharedRing] = None
+        self.positions_ring: Optional[SharedRing] = None
+        self.last_tick_msc: Dict[str, int] = {}
+        self.bar_feed = None
+
+    def logar(self, mensagem: str, asset: Optional[str] = None):
+        self.log_queue.put((mensagem, asset))
+
+    def on_connection(self, state: str, outage=None):
+        from mt5_connection import CONNECTED
+        if outage is not None:
+            self.logar(f"✅ MT5 reconectado em {outage.downtime:.1f}s ({outage.attempts} tentativas); "
+                       f"gateway de ordens retomado")
+        elif state != CONNECTED:
+            self.logar("⚠️ Conexão com o MT5 perdida; feed e gateway de ordens pausados até reconectar")
+
+    def attach(self):
+        for sub in self.subscriptions:
+            self.bar_rings[sub['key']] = SharedRing(self.names['bars'][sub['key']], BAR_DTYPE,
+                                                    sub['capacity'])
+        for symbol, name in self.names['ticks'].items():
+            self.tick_rings[symbol] = SharedRing(name, TICK_DTYPE, self.names['tick_capacity'])
+        self.account_ring = SharedRing(self.names['account'], ACCOUNT_DTYPE, 1)
+        self.positions_ring = SharedRing(self.names['positions'], POSITIONS_DTYPE, 1)
+
+    def symbol_specs(self, mt5) -> Dict[str, Dict[str, float]]:
+        """Static symbol specifications workers need for sizing orders"""
+        specs = {}
+        for symbol in self.tick_rings:
+            info = mt5.symbol_info(symbol)
+            if info is None:
+                self.logar(f"❌ Ativo {symbol} não encontrado", symbol)
+                continue
+            if not info.visible:
+                mt5.symbol_select(symbol, True)
+            specs[symbol] = {
+                'point': info.point,
+                'digits': info.digits,
+                'volume_min': info.volume_min,
+                'volume_max': info.volume_max,
+                'volume_step': info.volume_step
+            }
+        return specs
+
+    def fetch_bars(self, mt5, sub: Dict[str, Any], count: int):
+        rates = self.bar_feed.bars(sub['symbol'], sub['timeframe'], count)
+        if rates is None:
+            timeframe = getattr(mt5, f"TIMEFRAME_{sub['timeframe']}", mt5.TIMEFRAME_M5)
+            rates = mt5.copy_rates_from_pos(sub['symbol'], timeframe, 0, count)
+        return rates
+
+    def publish_bars(self, mt5, full: bool = False):
+        # One M1 pull per symbol; every subscribed timeframe is built from it
+        if not full:
+            self.bar_feed.poll_all()
+        for sub in self.subscriptions:
+            ring = self.bar_rings[sub['key']]
+            count = sub['capacity'] if full or not ring.count else 2
+            last_time = ring.latest_unsafe(1)['time'][0] if ring.count else None
+            while True:
+                rates = self.fetch_bars(mt5, sub, count)
+                if rates is None or len(rates) == 0:
+                    break
+                # Every bar since the last published one, so a stall leaves no gap
+                if last_time is None or rates['time'][0] <= last_time or count >= sub['capacity']:
+                    break
+                count = min(sub['capacity'], count * 8)
+            if rates is None or len(rates) == 0:
+                continue
+            ring.upsert(np.asarray(rates).astype(BAR_DTYPE, copy=False))
+
+    def publish_ticks(self, mt5):
+        for symbol, ring in self.tick_rings.items():
+            tick = mt5.symbol_info_tick(symbol)
+            if tick is None or tick.time_msc == self.last_tick_msc.get(symbol):
+                continue
+            self.last_tick_msc[symbol] = tick.time_msc
+            record = np.array([(tick.time_msc, tick.bid, tick.ask, tick.last, tick.volume)],
+                              dtype=TICK_DTYPE)
+            ring.append(record)
+
+    def publish_account(self, mt5):
+        info = mt5.account_info()
+        if info is None:
+            return
+        now = time.time()
+        positions = mt5.positions_get()
+        total = len(positions) if positions is not None else mt5.positions_total()
+        record = np.array([(now, info.balance, info.equity, info.margin,
+                            info.margin_free, info.profit, total)],
+                          dtype=ACCOUNT_DTYPE)
+        self.account_ring.append(record)
+        if positions is not None:
+            self.publish_positions(mt5, positions, now)
+
+    def publish_positions(self, mt5, positions, now: float):
+        # Per-position symbol, magic and side, so workers count only their own
+        record = np.zeros(1, dtype=POSITIONS_DTYPE)
+        shown = positions[:MAX_POSITIONS]
+        record['time'] = now
+        record['count'] = len(shown)
+        record['symbol'][0, :len(shown)] = [p.symbol for p in shown]
+        record['magic'][0, :len(shown)] = [p.magic for p in shown]
+        record['buy'][0, :len(shown)] = [p.type == mt5.POSITION_TYPE_BUY for p in shown]
+        self.positions_ring.append(record)
+
+    def execute_orders(self, mt5):
+        while True:
+            try:
+                intent = self.order_queue.get_nowait()
+            except queue.Empty:
+                return
+            if time.time() > intent.get('deadline', float('inf')):
+                # The worker already reported this order as failed; never send it late
+                self.logar(f"⚠️ Ordem {intent['id']} de {intent['worker']} expirou na fila e foi descartada")
+                reply = {'id': intent['id'], 'retcode': -1, 'order': 0,
+                         'comment': 'Intenção expirada antes do envio'}
+            else:
+                result = mt5.order_send(intent['request'])
+                reply = {
+                    'id': intent['id'],
+                    'retcode': result.retcode if result is not None else -1,
+                    'order': result.order if result is not None else 0,
+                    'comment': result.comment if result is not None else str(mt5.last_error())
+                }
+            result_queue = self.result_queues.get(intent['worker'])
+            if result_queue is not None:
+                result_queue.put(reply)
+
+    def run(self, ready_queue):
+        import MetaTrader5 as mt5
+        from utils import initialize_mt5
+        from bar_aggregator import BarFeed
+        from mt5_connection import connection_manager
+
+        success, message = initialize_mt5()
+        if not success:
+            ready_queue.put({'ok': False, 'error': message})
+            return
+        connection_manager.subscribe(self.on_connection)
+        connection_manager.start()
+
+        try:
+            self.attach()
+            self.bar_feed = BarFeed(capacity=max((sub['capacity'] for sub in self.subscriptions), default=1),
+                                    max_age=self.interval)
+            specs = self.symbol_specs(mt5)
+            self.publish_account(mt5)
+            self.publish_ticks(mt5)
+            self.publish_bars(mt5, full=True)
+            ready_queue.put({'ok': True, 'symbols': specs})
+
+            while not self.stop_event.is_set():
+                # While the terminal reconnects, order intents stay queued
+                if not connection_manager.wait_connected(self.interval):
+                    continue
+                try:
+                    self.execute_orders(mt5)
+                    self.publish_ticks(mt5)
+                    self.publish_bars(mt5)
+                    self.publish_account(mt5)
+                except Exception as e:
+                    self.logar(f"❌ Erro no feed de dados: {str(e)}")
+                self.stop_event.wait(self.interval)
+        finally:
+            for ring in list(self.bar_rings.values()) + list(self.tick_rings.values()):
+                ring.close()
+            for ring in (self.account_ring, self.positions_ring):
+                if ring:
+                    ring.close()
+            connection_manager.disconnect()
+
+
+def run_data_feed(subscriptions, names, order_queue, result_queues, log_queue,
+                  stop_event, ready_queue, interval=0.25):
+    """Process entry point of the data feed"""
+    feed = DataFeed(subscriptions, names, order_queue, result_queues, log_queue,
+                    stop_event, interval)
+    feed.run(ready_queue)
+
+
+__all__ = [
+    'BAR_DTYPE',
+    'TICK_DTYPE',
+    'ACCOUNT_DTYPE',
+    'POSITIONS_DTYPE',
+    'SharedRing',
+    'DataFeed',
+    'ring_name',
+    'run_data_feed'
+]
@@ -0,0 +1,98 @@
+"""
+Strategy snapshots for Future MT5 Pro Trading System
+Atomic, compact on-disk snapshots of strategy state for warm restarts
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import PATHS, SNAPSHOTS
+except ImportError:
+    PATHS = {
+        'DATA': 'data/'
+    }
+    SNAPSHOTS = {
+        'INTERVAL': 30,
+        'MAX_AGE_HOURS': 24
+    }
+
+FORMAT_VERSION = 1
+
+
+class SnapshotStore:
+    """One snapshot file per strategy key
+
+    A snapshot is an uncompressed ``.npz`` archive: structured arrays (the bar
+    buffer) are stored as raw binary, everything else as one JSON document.
+    No pickling is involved, and a file is replaced atomically so a crash
+    mid-write leaves the previous snapshot intact.
+    """
+
+    def __init__(self, directory: Optional[str] = None,
+                 max_age_hours: float = SNAPSHOTS['MAX_AGE_HOURS']):
+        self.directory = directory or os.path.join(PATHS['DATA'], 'snapshots')
+        self.max_age = max_age_hours * 3600
+        self.lock = threading.Lock()
+
+    def get_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def save(self, key: str, state: Dict[str, Any]):
+        """Write a snapshot; numpy arrays in ``state`` are stored as arrays"""
+        arrays = {name: value for name, value in state.items() if isinstance(value, np.ndarray)}
+        meta = {name: value for name, value in state.items() if name not in arrays}
+        meta['_version'] = FORMAT_VERSION
+        meta['_saved_at'] = time.time()
+        arrays['_meta'] = np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8)
+
+        path = self.get_path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with self.lock:
+            # Created on first save: importing the module must not touch the disk
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, 'wb') as f:
+                np.savez(f, **arrays)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Latest snapshot for ``key``, or None if missing, unreadable or too old"""
+        path = self.get_path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                state = json.loads(data['_meta'].tobytes().decode('utf-8'))
+                if state.get('_version') != FORMAT_VERSION:
+                    return None
+                if self.max_age and time.time() - state['_saved_at'] > self.max_age:
+                    return None
+                for name in data.files:
+                    if name != '_meta':
+                        state[name] = data[name]
+            return state
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def remove(self, key: str):
+        try:
+            os.remove(self.get_path(key))
+        except OSError:
+            pass
+
+
+# Global store for the application's data directory
+snapshot_store = SnapshotStore()
+
+__all__ = ['snapshot_store', 'SnapshotStore']
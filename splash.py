@@ -1,15 +1,17 @@
 import tkinter as tk
 from tkinter import ttk
-import threading
 import time
 import sys
 import os
+from typing import Optional
 
 # Add current directory to Python path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
+from startup import STARTUP, Warmup, default_tasks, startup_timer
+
 # Default values in case import fails
 DEFAULT_CONFIG = {
     'APP_NAME': "Future MT5 Pro Trading",
@@ -37,7 +39,8 @@ except ImportError:
     AUTHOR = DEFAULT_CONFIG['AUTHOR']
 
 class SplashScreen:
-    def __init__(self):
+    def __init__(self, warmup: Optional[Warmup] = None):
+        self.warmup = warmup or Warmup(default_tasks())
         self.root = tk.Tk()
         self.root.title("Loading...")
         
@@ -151,7 +154,7 @@ class SplashScreen:
         )
         self.progress.pack(pady=10)
         
-        # Start loading simulation
+        # Start warm-up
         self.start_loading()
         
     def fade_in(self):
@@ -177,43 +180,42 @@ class SplashScreen:
         self.status_label.config(text=message)
         
     def start_loading(self):
-        """Start loading simulation"""
-        self.loading_steps = [
-            ("Initializing system...", 10),
-            ("Loading configurations...", 20),
-            ("Connecting to MetaTrader 5...", 40),
-            ("Preparing trading environment...", 60),
-            ("Loading market data...", 80),
-            ("Starting trading system...", 90),
-            ("Ready to launch...", 100)
-        ]
-        threading.Thread(target=self.loading_simulation, daemon=True).start()
-        
-    def loading_simulation(self):
-        """Simulate loading process"""
-        for message, progress in self.loading_steps:
-            time.sleep(0.5)  # Simulate work being done
-            self.root.after(0, self.update_status, message)
-            self.root.after(0, self.progress.configure, {'value': progress})
-            
-        # Complete loading
-        time.sleep(0.5)
-        self.root.after(0, self.loading_complete)
+        """Start the warm-up tasks and follow their progress"""
+        self.started = time.monotonic()
+        self.warmup.start()
+        self.root.after(50, self.poll_loading)
+        
+    def poll_loading(self):
+        """Show warm-up progress; runs on the Tk thread"""
+        progress, message = self.warmup.progress()
+        self.update_status(message)
+        self.progress.configure(value=progress)
+        
+        timed_out = time.monotonic() - self.started > STARTUP['TASK_TIMEOUT']
+        if self.warmup.done.is_set() or timed_out:
+            self.loading_complete()
+        else:
+            self.root.after(50, self.poll_loading)
         
     def loading_complete(self):
         """Handle completion of loading"""
-        self.update_status("Launch complete!")
-        time.sleep(1)
-        self.fade_out()
+        if self.warmup.errors:
+            self.update_status(f"Launch complete ({len(self.warmup.errors)} warnings)")
+        else:
+            self.update_status("Launch complete!")
+        self.progress.configure(value=100)
+        self.root.after(150, self.fade_out)
         
     def start(self):
         """Start the splash screen"""
         self.root.mainloop()
 
-def show_splash():
-    """Show splash screen and return when complete"""
-    splash = SplashScreen()
-    splash.start()
+def show_splash(warmup: Optional[Warmup] = None) -> Warmup:
+    """Show splash screen while warming up; return the warm-up when complete"""
+    splash = SplashScreen(warmup)
+    with startup_timer.phase("splash"):
+        splash.start()
+    return splash.warmup
 
 if __name__ == "__main__":
     show_splash()
@@ -1,7 +1,7 @@
 import tkinter as tk
-import threading
 import time
-import random
+
+from startup import STARTUP, Warmup, default_tasks
 
 
 class SplashScreen:
@@ -33,7 +33,9 @@ class SplashScreen:
         self.centralizar_janela(450, 350)
 
         self.setup_ui()
-        threading.Thread(target=self.simular_carregamento, daemon=True).start()
+        self.warmup = Warmup(default_tasks())
+        self.inicio = time.monotonic()
+        self.iniciar_carregamento()
 
     def centralizar_janela(self, largura, altura):
         largura_tela = self.root.winfo_screenwidth()
@@ -114,48 +116,25 @@ class SplashScreen:
         gradient_bottom = self.create_gradient_frame(main_container, self.colors['bg_dark'], self.colors['success'])
         gradient_bottom.pack(fill="x", pady=(20, 0))
 
-    def simular_carregamento(self):
-        progresso = 0
-        mensagens = [
-            "Initializing modules...",
-            "Connecting to MetaTrader 5...",
-            "Loading Future MT5 robot...",
-            "Preparing market analysis...",
-            "Warming up trading engines...",
-            "Finalizing startup...",
-            "Almost there..."
-        ]
-
-        # Smooth progress animation
-        while progresso <= 100:
-            if not self.root.winfo_exists():
-                return
-
-            # Smooth progress bar animation
-            self.progress_bar.config(width=int((self.root.winfo_width() - 60) * (progresso / 100)))
-
-            # Update message periodically
-            if progresso % 15 == 0:
-                new_message = random.choice(mensagens)
-                self.label_mensagem.config(text=new_message)
-
-            # Slower at start and end for better effect
-            if progresso < 20:
-                delay = 0.1
-            elif progresso > 80:
-                delay = 0.08
-            else:
-                delay = 0.05
-
-            progresso += 1
-            time.sleep(delay)
-
-        # Ensure we show 100% before transitioning
-        self.progress_bar.config(width=self.root.winfo_width() - 60)
-        time.sleep(0.5)
-
-        if self.root.winfo_exists():
+    def iniciar_carregamento(self):
+        self.warmup.start()
+        self.root.after(50, self.acompanhar_carregamento)
+
+    def acompanhar_carregamento(self):
+        """Mostra o progresso real do aquecimento (thread do Tk)"""
+        if not self.root.winfo_exists():
+            return
+
+        progresso, mensagem = self.warmup.progress()
+        self.progress_bar.config(width=int((self.root.winfo_width() - 60) * (progresso / 100)))
+        self.label_mensagem.config(text=mensagem)
+
+        tempo_esgotado = time.monotonic() - self.inicio > STARTUP['TASK_TIMEOUT']
+        if self.warmup.done.is_set() or tempo_esgotado:
+            self.progress_bar.config(width=self.root.winfo_width() - 60)
             self.root.after(100, self.abrir_login)
+        else:
+            self.root.after(50, self.acompanhar_carregamento)
 
     def abrir_login(self):
         from login import LoginApp
@@ -0,0 +1,245 @@
+"""
+Startup pipeline for Future MT5 Pro Trading System
+Dependency checks by module spec, concurrent warm-up tasks behind the splash
+screen and a per-phase startup-time report
+
+Keep this module's imports light: it is loaded before anything else so its
+clock starts as close to process start as possible.
+"""
+
+import os
+import sys
+import time
+import threading
+import importlib.util
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Optional, Callable, NamedTuple, Tuple, Sequence
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+PROCESS_START = time.perf_counter()
+
+try:
+    from constants import STARTUP
+except ImportError:
+    STARTUP = {
+        'WORKERS': 4,
+        'PREFETCH_SYMBOLS': 8,
+        'PREFETCH_TIMEFRAME': 'M15',
+        'PREFETCH_BARS': 200,
+        'TASK_TIMEOUT': 20
+    }
+
+
+def missing_packages(packages: Dict[str, str]) -> List[str]:
+    """Packages whose module cannot be found, checked without importing them"""
+    missing = []
+    for package, import_name in packages.items():
+        try:
+            if importlib.util.find_spec(import_name) is None:
+                missing.append(package)
+        except (ImportError, ValueError):
+            missing.append(package)
+    return missing
+
+
+class StartupTimer:
+    """Records when each startup phase ran, relative to process start
+
+    Phases may overlap (warm-up tasks run concurrently), so the report shows
+    each phase's start offset as well as its duration.
+    """
+
+    def __init__(self, origin: float = PROCESS_START):
+        self.origin = origin
+        self.phases: List[Tuple[str, float, float]] = []
+        self.lock = threading.Lock()
+
+    def record(self, name: str, start: float, end: float):
+        with self.lock:
+            self.phases.append((name, start - self.origin, end - start))
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def mark(self, name: str):
+        """Record a milestone (zero-length phase) at the current time"""
+        now = time.perf_counter()
+        self.record(name, now, now)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.origin
+
+    def report(self) -> str:
+        with self.lock:
+            phases = sorted(self.phases, key=lambda p: p[1])
+        lines = ["=== Startup time ==="]
+        for name, offset, duration in phases:
+            if duration:
+                lines.append(f"{name:<28} at {offset:7.3f}s  took {duration * 1000:8.1f} ms")
+            else:
+                lines.append(f"{name:<28} at {offset:7.3f}s")
+        return '\n'.join(lines)
+
+
+# Shared timer for the GUI startup
+startup_timer = StartupTimer()
+
+
+class WarmupTask(NamedTuple):
+    name: str
+    label: str
+    func: Callable[[Dict[str, Any]], Any]
+    requires: Tuple[str, ...] = ()
+    weight: int = 1
+
+
+class Warmup:
+    """Runs warm-up tasks concurrently, honouring their dependencies
+
+    Each task receives the results of the tasks it requires. A failed task
+    skips its dependants; the application decides what is fatal. Progress is
+    read by polling (``progress``) so no Tk call ever happens off the main
+    thread.
+    """
+
+    def __init__(self, tasks: Sequence[WarmupTask], timer: Optional[StartupTimer] = None,
+                 workers: int = STARTUP['WORKERS']):
+        self.tasks = {task.name: task for task in tasks}
+        self.timer = timer or startup_timer
+        self.workers = workers
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self.running: Dict[str, str] = {}
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def _execute(self, task: WarmupTask) -> Any:
+        with self.lock:
+            self.running[task.name] = task.label
+        start = time.perf_counter()
+        try:
+            return task.func({name: self.results[name] for name in task.requires})
+        finally:
+            self.timer.record(f"warm-up: {task.name}", start, time.perf_counter())
+            with self.lock:
+                self.running.pop(task.name, None)
+
+    def run(self):
+        """Run every task to completion (blocking)"""
+        pending = dict(self.tasks)
+        futures = {}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='warmup') as pool:
+            while pending or futures:
+                for name, task in list(pending.items()):
+                    failed = [req for req in task.requires if req in self.errors]
+                    if failed:
+                        with self.lock:
+                            self.errors[name] = f"skipped: {failed[0]} failed"
+                        del pending[name]
+                    elif all(req in self.results for req in task.requires):
+                        futures[pool.submit(self._execute, task)] = name
+                        del pending[name]
+                if not futures:
+                    # Requirements that are not tasks can never be met
+                    with self.lock:
+                        for name in pending:
+                            self.errors[name] = "skipped: unknown requirement"
+                    break
+
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = futures.pop(future)
+                    with self.lock:
+                        try:
+                            self.results[name] = future.result()
+                        except Exception as e:
+                            self.errors[name] = str(e)
+        self.done.set()
+
+    def start(self):
+        """Run the tasks in a background thread"""
+        self.thread = threading.Thread(target=self.run, name='warmup', daemon=True)
+        self.thread.start()
+
+    def progress(self) -> Tuple[float, str]:
+        """Percent of task weight finished and a label for what is running"""
+        with self.lock:
+            total = sum(task.weight for task in self.tasks.values()) or 1
+            finished = sum(self.tasks[name].weight for name in list(self.results) + list(self.errors))
+            running = list(self.running.values())
+        message = running[0] if running else ("Ready to launch..." if self.done.is_set() else "Initializing system...")
+        return finished * 100.0 / total, message
+
+    def ok(self, name: str) -> bool:
+        return name in self.results
+
+
+# Default warm-up tasks
+def load_config(_: Dict[str, Any]):
+    from config import config
+    return config
+
+
+def connect_mt5(_: Dict[str, Any]):
+    from utils import initialize_mt5
+    success, message = initialize_mt5()
+    if not success:
+        raise RuntimeError(message)
+    return message
+
+
+def load_symbols(_: Dict[str, Any]) -> List[str]:
+    import MetaTrader5 as mt5
+    symbols = mt5.symbols_get()
+    if symbols is None:
+        raise RuntimeError(f"symbols_get failed: {mt5.last_error()}")
+    return [symbol.name for symbol in symbols if symbol.visible]
+
+
+def prefetch_history(results: Dict[str, Any]) -> Dict[str, int]:
+    """Ask the terminal for recent bars so its history is synced before the strategy starts"""
+    import MetaTrader5 as mt5
+    timeframe = getattr(mt5, f"TIMEFRAME_{STARTUP['PREFETCH_TIMEFRAME']}")
+    counts = {}
+    for symbol in results['symbols'][:STARTUP['PREFETCH_SYMBOLS']]:
+        rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, STARTUP['PREFETCH_BARS'])
+        counts[symbol] = 0 if rates is None else len(rates)
+    return counts
+
+
+def import_interface(_: Dict[str, Any]):
+    import login_window
+    import trading_app
+    return trading_app.TradingApp
+
+
+def default_tasks() -> List[WarmupTask]:
+    return [
+        WarmupTask('config', "Loading configurations...", load_config),
+        WarmupTask('interface', "Preparing trading environment...", import_interface, weight=2),
+        WarmupTask('mt5', "Connecting to MetaTrader 5...", connect_mt5, weight=3),
+        WarmupTask('symbols', "Loading symbol catalogue...", load_symbols, ('mt5',), weight=2),
+        WarmupTask('history', "Loading market data...", prefetch_history, ('symbols',), weight=2)
+    ]
+
+
+__all__ = [
+    'PROCESS_START',
+    'StartupTimer',
+    'startup_timer',
+    'Warmup',
+    'WarmupTask',
+    'default_tasks',
+    'missing_packages'
+]
@@ -0,0 +1,244 @@
+"""
+Swing points for Future MT5 Pro Trading System
+ZigZag swing detection with a stack of confirmed swings per symbol, used to
+anchor Fibonacci levels; the same detector runs incrementally on live bars
+and in batch over a whole history for backtests
+"""
+
+import os
+import sys
+import threading
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import SWINGS
+except ImportError:
+    SWINGS = {
+        'DEPTH': 12,
+        'DEVIATION': 5,
+        'BACKSTEP': 3,
+        'HISTORY': 100
+    }
+
+HIGH = 1
+LOW = -1
+
+SWING_DTYPE = np.dtype([
+    ('kind', 'i1'),  # HIGH or LOW
+    ('time', '<i8'),  # open time of the swing bar
+    ('price', '<f8'),
+    ('confirmed', '<i8')  # open time of the bar that confirmed it
+])
+
+
+class SwingDetector:
+    """ZigZag over closed bars with confirmed swings kept on a stack
+
+    The detector follows one leg at a time. The leg's extreme (the pivot) only
+    moves to bars that are the highest high (lowest low) of the last ``depth``
+    bars. It is confirmed, and never changes again, once price has reversed
+    at least ``deviation`` points from it and ``backstep`` bars have closed
+    after it; the reversal extreme then becomes the next leg's pivot.
+
+    Every bar is processed once, so a full history is linear and a live
+    update costs only the bars that closed since the last one.
+    """
+
+    def __init__(self, point: float = 1.0, depth: int = SWINGS['DEPTH'],
+                 deviation: float = SWINGS['DEVIATION'], backstep: int = SWINGS['BACKSTEP'],
+                 history: Optional[int] = SWINGS['HISTORY']):
+        self.depth = max(1, int(depth))
+        self.threshold = deviation * point
+        self.backstep = int(backstep)
+        self.swings = deque(maxlen=history)  # (kind, time, price, confirmed)
+        self.version = 0  # swings confirmed so far; changes whenever the stack does
+        self.lock = threading.Lock()
+
+        # Highs/lows of the bars preceding the next update, for the depth window
+        self.tail_high = np.full(self.depth - 1, -np.inf)
+        self.tail_low = np.full(self.depth - 1, np.inf)
+        self.last_time = None
+        self.count = 0  # bars processed
+
+        # Current leg: direction of the pivot (0 until the first swing), and
+        # (index, time, price) of the pivot, of the opposite extreme after it
+        # and of the next extreme after that
+        self.direction = 0
+        self.pivot = None
+        self.counter = None
+        self.rebound = None
+        self.first_high = None
+        self.first_low = None
+
+    def update(self, bars: np.ndarray) -> int:
+        """Process closed bars (structured array with time/high/low); returns new swings"""
+        if bars is None or not len(bars):
+            return 0
+        return self.update_arrays(bars['time'], bars['high'], bars['low'])
+
+    def update_arrays(self, time: np.ndarray, high: np.ndarray, low: np.ndarray) -> int:
+        """Process bars given as arrays, oldest first; returns new swings
+
+        Bars not newer than the last one processed are skipped, so callers may
+        pass overlapping windows.
+        """
+        if not len(time):
+            return 0
+        time = np.asarray(time)
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+
+        with self.lock:
+            # Trim under the lock so concurrent updates cannot both process a bar
+            if self.last_time is not None:
+                start = int(np.searchsorted(time, self.last_time, side='right'))
+                time, high, low = time[start:], high[start:], low[start:]
+                if not len(time):
+                    return 0
+
+            # Which bars may become a pivot, for the whole batch at once
+            highs = np.concatenate([self.tail_high, high])
+            lows = np.concatenate([self.tail_low, low])
+            top = high >= sliding_window_view(highs, self.depth).max(axis=1)
+            bottom = low <= sliding_window_view(lows, self.depth).min(axis=1)
+            if self.depth > 1:
+                self.tail_high = highs[-(self.depth - 1):]
+                self.tail_low = lows[-(self.depth - 1):]
+
+            confirmed = 0
+            for offset, (t, h, l, is_top, is_bottom) in enumerate(zip(
+                    np.asarray(time).tolist(), high.tolist(), low.tolist(), top.tolist(), bottom.tolist())):
+                confirmed += self._step(self.count + offset, t, h, l, is_top, is_bottom)
+            self.count += len(time)
+            self.last_time = int(time[-1])
+        return confirmed
+
+    def _step(self, index: int, time: int, high: float, low: float,
+              is_top: bool, is_bottom: bool) -> int:
+        if self.direction == 0:
+            return self._first_swing(index, time, high, low)
+
+        if self.direction == HIGH:
+            if is_top and high > self.pivot[2]:
+                self.pivot, self.counter, self.rebound = (index, time, high), None, None
+            elif is_bottom and (self.counter is None or low < self.counter[2]):
+                self.counter, self.rebound = (index, time, low), None
+            elif is_top and self.counter is not None and (self.rebound is None or high > self.rebound[2]):
+                self.rebound = (index, time, high)
+        else:
+            if is_bottom and low < self.pivot[2]:
+                self.pivot, self.counter, self.rebound = (index, time, low), None, None
+            elif is_top and (self.counter is None or high > self.counter[2]):
+                self.counter, self.rebound = (index, time, high), None
+            elif is_bottom and self.counter is not None and (self.rebound is None or low < self.rebound[2]):
+                self.rebound = (index, time, low)
+
+        confirmed = 0
+        while (self.counter is not None
+               and (self.pivot[2] - self.counter[2]) * self.direction >= self.threshold
+               and index - self.pivot[0] >= self.backstep):
+            self.swings.append((self.direction, self.pivot[1], self.pivot[2], time))
+            self.version += 1
+            self.direction = -self.direction
+            self.pivot, self.counter, self.rebound = self.counter, self.rebound, None
+            confirmed += 1
+        return confirmed
+
+    def _first_swing(self, index: int, time: int, high: float, low: float) -> int:
+        """Before any swing: wait for a range of ``deviation`` and confirm its older end"""
+        if self.first_high is None or high > self.first_high[2]:
+            self.first_high = (index, time, high)
+        if self.first_low is None or low < self.first_low[2]:
+            self.first_low = (index, time, low)
+        if self.first_high[2] - self.first_low[2] < self.threshold or self.first_high[0] == self.first_low[0]:
+            return 0
+
+        if self.first_high[0] < self.first_low[0]:
+            older, self.pivot, kind = self.first_high, self.first_low, HIGH
+        else:
+            older, self.pivot, kind = self.first_low, self.first_high, LOW
+        if index - older[0] < self.backstep:
+            return 0
+        self.swings.append((kind, older[1], older[2], time))
+        self.version += 1
+        self.direction = -kind
+        self.first_high = self.first_low = None
+        return 1
+
+    # Queries
+    def last(self, kind: Optional[int] = None) -> Optional[Tuple[int, int, float, int]]:
+        """Most recent confirmed swing, optionally of one kind"""
+        with self.lock:
+            for swing in reversed(self.swings):
+                if kind is None or swing[0] == kind:
+                    return swing
+        return None
+
+    def anchors(self) -> Optional[Tuple[float, float]]:
+        """(high, low) of the latest confirmed swing high and swing low"""
+        high = self.last(HIGH)
+        low = self.last(LOW)
+        if high is None or low is None:
+            return None
+        return high[2], low[2]
+
+    def legs(self, count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """High, low and direction (True for up) of the last ``count`` legs, newest first"""
+        with self.lock:
+            swings = list(self.swings)[-(count + 1):]
+        kind = np.array([swing[0] for swing in swings], dtype=np.int8)
+        price = np.array([swing[2] for swing in swings])
+        start, end = price[-2::-1], price[:0:-1]
+        return np.maximum(start, end), np.minimum(start, end), kind[:0:-1] == HIGH
+
+    def to_array(self) -> np.ndarray:
+        with self.lock:
+            return np.array(list(self.swings), dtype=SWING_DTYPE)
+
+
+def find_swings(time: np.ndarray, high: np.ndarray, low: np.ndarray, point: float = 1.0,
+                depth: int = SWINGS['DEPTH'], deviation: float = SWINGS['DEVIATION'],
+                backstep: int = SWINGS['BACKSTEP']) -> np.ndarray:
+    """Every confirmed swing of a bar history (SWING_DTYPE array)
+
+    Gives the same swings, with the same confirmation times, as feeding the
+    bars to a SwingDetector live, so a backtest can look up with
+    ``np.searchsorted(time, swings['confirmed'])`` which anchors were known
+    at each bar.
+    """
+    detector = SwingDetector(point, depth, deviation, backstep, history=None)
+    detector.update_arrays(time, high, low)
+    return detector.to_array()
+
+
+class SwingTracker:
+    """One SwingDetector per symbol and timeframe, shared by the strategies using it"""
+
+    def __init__(self, depth: int = SWINGS['DEPTH'], deviation: float = SWINGS['DEVIATION'],
+                 backstep: int = SWINGS['BACKSTEP'], history: int = SWINGS['HISTORY']):
+        self.params = (depth, deviation, backstep, history)
+        self.detectors: Dict[Tuple[str, str], SwingDetector] = {}
+        self.lock = threading.Lock()
+
+    def detector(self, symbol: str, timeframe: str, point: float) -> SwingDetector:
+        with self.lock:
+            detector = self.detectors.get((symbol, timeframe))
+            if detector is None:
+                detector = SwingDetector(point, *self.params)
+                self.detectors[(symbol, timeframe)] = detector
+            return detector
+
+
+# Global tracker shared by every strategy in the process
+swing_tracker = SwingTracker()
+
+__all__ = ['swing_tracker', 'SwingTracker', 'SwingDetector', 'find_swings', 'SWING_DTYPE', 'HIGH', 'LOW']
@@ -2,12 +2,44 @@
 Unit tests for trading functionality
 """
 
+import os
+import csv
+import json
+import math
 import unittest
+import tempfile
 import numpy as np
+from datetime import datetime
 from unittest.mock import Mock, patch
 import MetaTrader5 as mt5
 
+from backtest import Indicators, first_exit, EXIT_SL, EXIT_TP
+from bar_aggregator import BarAggregator, BarFeed, aggregate_bars
+from bar_window import BarWindow, BarView, bar_windows
+from chart import CandleChart, moving_average
+from config_service import ConfigService
+from correlation import RollingCorrelation, CorrelationService
+from daemon import StrategyDaemon
 from estrategia import EstrategiaTrading
+from event_bus import EventBus, FeedPoller, TickEvent, LATEST, DROP_OLDEST, event_bus
+from exporter import ExportJob
+from fib_levels import FibonacciLevels
+from log_archive import LogArchive
+from log_files import LogFileManager, compress_file, open_segment, parse_segment_name
+from log_search import parse_time
+from log_view import LogBuffer
+from monte_carlo import MonteCarlo, resample_indices, BLOCK_BOOTSTRAP
+from mt5_connection import ConnectionManager, CONNECTED
+from paper_trading import PaperBroker, FillModel
+from position_manager import PositionManager
+from risk_service import risk_service
+from shared_feed import BAR_DTYPE
+from snapshots import SnapshotStore
+from swings import SwingDetector, find_swings, HIGH, LOW
+from tick_stats import TickStats
+from trade_history import TradeHistory, build_trades, excursions, summarize, DEAL_DTYPE, ORDER_DTYPE
+from ui_refresh import UIRefresher
+from walk_forward import make_windows, parameter_grid
 
 class TestEstrategiaTrading(unittest.TestCase):
     def setUp(self):
@@ -37,6 +69,22 @@ class TestEstrategiaTrading(unittest.TestCase):
         self.assertAlmostEqual(levels[0.5], 1.1500, places=4)
         self.assertAlmostEqual(levels[0.618], 1.1618, places=4)
         
+    def test_level_index(self):
+        """Test multi-anchor level lookup and confluence"""
+        # Two up legs whose 50% retracements coincide at 1.1500
+        levels = FibonacciLevels([1.2000, 1.1800], [1.1000, 1.1200], [True, True], [0.382, 0.5, 0.618, 1.272])
+        self.assertEqual(levels.levels(1)[0.5], 1.15)
+
+        price, anchor, ratio = levels.level(levels.nearest(1.1390))
+        self.assertAlmostEqual(price, 1.1382, places=4)
+        self.assertEqual((anchor, ratio), (0, 0.618))
+        self.assertEqual(levels.within(1.1390, 0.01), [])
+        self.assertEqual([l[1:] for l in levels.within(1.1501, 0.1, ratios=[0.5])], [(0, 0.5), (1, 0.5)])
+
+        zone = levels.zone_at(1.1500, tolerance_percent=0.01)
+        self.assertEqual((zone['levels'], zone['anchors']), (2, 2))
+        self.assertIsNone(levels.zone_at(1.1382, tolerance_percent=0.01))
+
     def test_trend_identification(self):
         """Test trend identification"""
         # Create mock data
@@ -71,16 +119,29 @@ class TestEstrategiaTrading(unittest.TestCase):
         self.assertGreaterEqual(rsi[-1], 0)
         self.assertLessEqual(rsi[-1], 100)
         
-    @patch('MetaTrader5.positions_total')
-    def test_risk_position(self, mock_positions):
+    @patch('MetaTrader5.order_calc_margin')
+    @patch('MetaTrader5.orders_get')
+    @patch('MetaTrader5.positions_get')
+    def test_risk_position(self, mock_positions, mock_orders, mock_margin):
         """Test risk position verification"""
+        def position(ticket, symbol, magic=123456):
+            return Mock(ticket=ticket, symbol=symbol, magic=magic, type=mt5.POSITION_TYPE_BUY,
+                        volume=0.1, price_open=1.1, profit=0.0)
+
+        mock_orders.return_value = ()
+        mock_margin.return_value = 100.0
+
         # Test max positions limit
-        mock_positions.return_value = 5
+        mock_positions.return_value = (position(1, "EURUSD"),)
+        risk_service.invalidate()
         self.assertFalse(self.strategy.verificar_risco_posicao())
         
-        # Test within limits
-        mock_positions.return_value = 1
+        # Positions of other symbols or strategies do not count
+        mock_positions.return_value = (position(2, "GBPUSD"), position(3, "EURUSD", magic=1))
+        risk_service.invalidate()
         self.assertTrue(self.strategy.verificar_risco_posicao())
+        self.assertEqual(risk_service.position_count(), 2)
+        self.assertEqual(risk_service.margin(symbol="EURUSD"), 100.0)
         
     @patch('MetaTrader5.symbol_info_tick')
     @patch('MetaTrader5.symbol_info')
@@ -102,5 +163,1018 @@ class TestEstrategiaTrading(unittest.TestCase):
         self.assertEqual(args['type'], mt5.ORDER_TYPE_BUY)
         self.assertGreater(args['volume'], 0)
 
+    def test_snapshot_restore(self):
+        """Test warm restart from a snapshot"""
+        bars = np.zeros(210, dtype=[('time', '<i8'), ('close', '<f8')])
+        bars['time'] = np.arange(210) * 60
+        bars['close'] = 1.1 + np.arange(210) * 0.0001
+
+        self.strategy.barras = bars[:200]
+        self.strategy.saldo_inicial = 12345.0
+        self.strategy.current_fib_levels = {0.382: 1.1618, 0.5: 1.15}
+
+        with tempfile.TemporaryDirectory() as directory:
+            store = SnapshotStore(directory)
+            self.strategy.snapshots = store
+            self.strategy.salvar_snapshot()
+
+            restored = EstrategiaTrading("EURUSD", "M15", 0.1, self.logger_mock, snapshots=store)
+            self.assertEqual(restored.saldo_inicial, 12345.0)
+            self.assertEqual(restored.current_fib_levels, {0.382: 1.1618, 0.5: 1.15})
+            self.assertEqual(len(restored.barras), 200)
+
+            # Only the delta is requested once the buffer is restored
+            restored.obter_barras = Mock(return_value=bars[197:])
+            barras = restored.atualizar_barras()
+            restored.obter_barras.assert_called_once_with(restored.barras_delta)
+            self.assertEqual(barras['time'][-1], bars['time'][-1])
+            self.assertEqual(len(barras), 200)
+
+    def test_swing_anchors(self):
+        """Test swing confirmation and Fibonacci anchors"""
+        # Up to 1.1100, down to 1.0950, up to 1.1200
+        close = np.concatenate([np.linspace(1.1000, 1.1100, 20),
+                                np.linspace(1.1100, 1.0950, 20)[1:],
+                                np.linspace(1.0950, 1.1200, 20)[1:]])
+        bars = np.zeros(len(close), dtype=[('time', '<i8'), ('high', '<f8'), ('low', '<f8')])
+        bars['time'] = np.arange(len(close)) * 60
+        bars['high'] = close + 0.0001
+        bars['low'] = close - 0.0001
+
+        detector = SwingDetector(point=0.00001, depth=5, deviation=50, backstep=3)
+        for start in range(0, len(bars), 7):
+            detector.update(bars[:start + 7])
+        swings = detector.to_array()
+        self.assertEqual(swings['kind'].tolist(), [LOW, HIGH, LOW])
+        self.assertAlmostEqual(swings['price'][-1], 1.0949, places=4)
+        # Confirmed after the backstep, never on the swing bar itself
+        self.assertTrue((swings['confirmed'] > swings['time']).all())
+        # The last leg up is still open, so the anchors stay on confirmed swings
+        self.assertEqual(detector.anchors(), (swings['price'][1], swings['price'][2]))
+        self.assertTrue(np.array_equal(
+            find_swings(bars['time'], bars['high'], bars['low'], 0.00001, 5, 50, 3), swings))
+
+        # Threads feeding overlapping windows process every bar exactly once
+        import threading
+        shared = SwingDetector(point=0.00001, depth=5, deviation=50, backstep=3)
+        threads = [threading.Thread(target=lambda: [shared.update(bars[:end]) for end in range(1, len(bars) + 1)])
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(shared.count, len(bars))
+        self.assertTrue(np.array_equal(shared.to_array(), swings))
+
+        self.strategy.swings = detector
+        data = {'close': close[-19:], 'high': bars['high'][-19:], 'low': bars['low'][-19:]}
+        trend, high, low = self.strategy.identificar_tendencia(data)
+        self.assertEqual(trend, "ALTA")
+        self.assertAlmostEqual(high, 1.1101, places=4)
+        self.assertAlmostEqual(low, 1.0949, places=4)
+
+    @patch('MetaTrader5.symbol_info_tick')
+    def test_event_bus(self, mock_tick):
+        """Test tick events are published on change and coalesced"""
+        bus = EventBus()
+        latest = bus.subscribe(TickEvent, symbols=["EURUSD"], maxsize=1, policy=LATEST)
+        queued = bus.subscribe(TickEvent, maxsize=2, policy=DROP_OLDEST)
+        poller = FeedPoller(bus)
+
+        for time_msc in (1000, 1000, 2000, 3000):
+            mock_tick.return_value = Mock(time_msc=time_msc, bid=1.1, ask=1.1001, last=0.0, volume=0)
+            poller.poll_once()
+        # The unchanged tick is not republished; only EURUSD was polled
+        self.assertEqual(mock_tick.call_count, 4)
+        mock_tick.assert_called_with("EURUSD")
+        self.assertEqual(latest.get(timeout=0).time_msc, 3000)
+        self.assertIsNone(latest.get(timeout=0))
+        self.assertEqual([queued.get(timeout=0).time_msc for _ in range(2)], [2000, 3000])
+        self.assertEqual(queued.dropped, 1)
+
+        bus.unsubscribe(latest)
+        self.assertIsNone(latest.get())
+        self.assertEqual(bus.symbols(TickEvent), set())
+
+    def test_ui_refresh(self):
+        """Test widget updates are coalesced and unchanged values skipped"""
+        root = Mock()
+        label = Mock()
+        ui = UIRefresher(root, max_fps=20)
+        ui.start()
+        root.after.assert_called_once_with(50, ui.flush)
+
+        for balance in ("1,000.00", "1,000.50", "1,001.00"):
+            ui.update(label, text=balance, fg="green")
+        label.config.assert_not_called()
+        ui.flush()
+        label.config.assert_called_once_with(text="1,001.00", fg="green")
+
+        ui.update(label, text="1,001.00", fg="red")
+        ui.flush()
+        label.config.assert_called_with(fg="red")
+        ui.update(label, text="1,001.00")
+        ui.flush()
+        self.assertEqual(label.config.call_count, 2)
+        self.assertEqual(ui.skipped, 2)
+
+    def test_config_reload(self):
+        """Test config snapshots swap and reset only the affected indicator state"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'user_config.json')
+            with open(path, 'w') as f:
+                json.dump({'analysis': {'RSI_OVERBOUGHT': 75.0}}, f)
+            service = ConfigService(path)
+            snapshot = service.current
+            self.assertEqual(snapshot.value('analysis', 'RSI_OVERBOUGHT'), 75)
+            with self.assertRaises(TypeError):
+                snapshot.sections['analysis']['RSI_OVERBOUGHT'] = 80
+
+            self.strategy.rsi_estado = {'time': 0}
+            mudancas = self.strategy.aplicar_config(snapshot)
+            self.assertEqual(mudancas, [('rsi_sobrecomprado', 70, 75)])
+            self.assertIsNotNone(self.strategy.rsi_estado)
+
+            # Override for another symbol: nothing to do for EURUSD
+            service.save({'analysis': {'RSI_OVERBOUGHT': 75},
+                          'symbols': {'GBPUSD': {'analysis': {'RSI_PERIOD': 21}}}})
+            self.assertEqual(service.current.version, snapshot.version + 1)
+            self.assertEqual(self.strategy.aplicar_config(service.current), [])
+
+            service.save({'analysis': {'RSI_OVERBOUGHT': 75},
+                          'symbols': {'EURUSD': {'analysis': {'RSI_PERIOD': 21}}}})
+            self.assertEqual(self.strategy.aplicar_config(service.current), [('rsi_period', 14, 21)])
+            self.assertIsNone(self.strategy.rsi_estado)
+
+    @patch('MetaTrader5.account_info', create=True)
+    @patch('MetaTrader5.login', create=True)
+    @patch('MetaTrader5.initialize')
+    @patch('MetaTrader5.terminal_info', create=True)
+    def test_connection_recovery(self, mock_terminal, mock_init, mock_login, mock_account):
+        """Test reconnection reuses the credentials and records the outage"""
+        mock_init.return_value = True
+        mock_login.return_value = True
+        mock_account.return_value = Mock()
+        manager = ConnectionManager(backoff_initial=0, backoff_max=0)
+        self.assertEqual(manager.connect(123, "secret", "Broker-Demo")[0], True)
+        self.assertEqual(manager.state, CONNECTED)
+
+        # Terminal gone for two attempts, then back
+        mock_terminal.side_effect = [None, None, Mock(connected=True), Mock(connected=True)]
+        manager.recover()
+        self.assertEqual(manager.state, CONNECTED)
+        self.assertTrue(manager.wait_connected(timeout=0))
+        mock_login.assert_called_with(123, "secret", "Broker-Demo")
+        self.assertEqual(len(manager.outages), 1)
+        self.assertEqual(manager.outages[0].attempts, 2)
+        self.assertEqual(manager.summary()['reconnects'], 1)
+
+    def test_bar_window(self):
+        """Test the bar window overwrites the forming bar in place and views without copying"""
+        dtype = [('time', 'i8'), ('close', 'f8')]
+        bars = np.zeros(10, dtype=dtype)
+        bars['time'] = np.arange(10) * 60
+        bars['close'] = np.arange(10)
+        window = BarWindow(capacity=8, dtype=dtype)
+        window.load(bars, requested=8)
+        self.assertEqual(len(window), 8)
+
+        # Forming bar revised and one new bar
+        delta = np.array([(540, 9.5), (600, 10.0)], dtype=dtype)
+        self.assertTrue(window.update(delta))
+        view = window.latest(4)
+        self.assertIsInstance(view[1:], BarView)
+        np.testing.assert_array_equal(view['close'], [7, 8, 9.5, 10])
+        self.assertTrue(np.shares_memory(view['close'], window.columns['close']))
+
+        # A delta that does not reach the last held bar leaves a gap
+        self.assertFalse(window.update(np.array([(900, 15.0)], dtype=dtype)))
+
+    @patch('MetaTrader5.symbol_info_tick')
+    @patch('MetaTrader5.symbol_info')
+    def test_paper_fills(self, mock_info, mock_tick):
+        """Test paper accounts fill partially, close on SL/TP and track equity"""
+        mock_info.return_value = Mock(point=0.00001, trade_tick_size=0.00001, trade_tick_value=1.0)
+        mock_tick.return_value = Mock(bid=1.1000, ask=1.1002)
+        broker = PaperBroker(FillModel(slippage=0, liquidity=1.0))
+        broker.start()
+        self.addCleanup(broker.stop)
+        # Ticks are only requested for symbols with open paper positions
+        self.assertEqual(broker.subscription.symbols, set())
+        request = {'action': mt5.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'volume': 1.5,
+                   'type': mt5.ORDER_TYPE_BUY, 'sl': 1.0990, 'tp': 1.1020, 'deviation': 10}
+        accounts = [broker.account(f"v{i}") for i in range(3)]
+        for account in accounts:
+            result = account.order_send(request)
+            self.assertEqual(result.retcode, mt5.TRADE_RETCODE_DONE_PARTIAL)
+            self.assertEqual(result.volume, 1.0)
+            self.assertEqual(result.price, 1.1002)
+        self.assertEqual(broker.subscription.symbols, {'EURUSD'})
+        self.assertIn('EURUSD', event_bus.symbols(TickEvent))
+
+        broker.on_tick('EURUSD', 1.1010, 1.1012)
+        self.assertAlmostEqual(accounts[0].equity, 10080.0)
+        self.assertEqual(accounts[0].positions_total('EURUSD'), 1)
+
+        fills = []
+        broker.subscribe(fills.append)
+        broker.on_tick('EURUSD', 1.1021, 1.1023)
+        self.assertEqual([f.reason for f in fills], ['tp'] * 3)
+        summary = accounts[0].summary()
+        self.assertAlmostEqual(summary['balance'], 10190.0)
+        self.assertEqual(summary['positions'], 0)
+        self.assertEqual(summary['win_rate'], 100.0)
+        self.assertEqual(broker.subscription.symbols, set())
+
+    def test_walk_forward_windows(self):
+        """Test rolling windows tile the out-of-sample periods and exits replay SL/TP"""
+        times = np.arange(0, 400 * 86400, 3600)
+        windows = make_windows(times, 100, 50)
+        self.assertEqual(len(windows), 5)
+        for (start, middle, end), following in zip(windows, windows[1:]):
+            self.assertEqual(times[middle] - times[start], 100 * 86400)
+            self.assertEqual(following[1], end)
+        self.assertEqual(len(parameter_grid({'fib_period': [20, 30], 'min_rr_ratio': [1.5, 2.0, 3.0]})), 6)
+
+        bars = np.zeros(5, dtype=[('time', 'i8'), ('open', 'f8'), ('high', 'f8'), ('low', 'f8'), ('close', 'f8')])
+        bars['time'] = np.arange(5) * 60
+        bars['open'] = bars['close'] = [1.0, 1.0, 1.01, 1.02, 0.95]
+        bars['high'] = bars['close'] + 0.005
+        bars['low'] = bars['close'] - 0.005
+        ind = Indicators(bars, 0.00001)
+        self.assertEqual(first_exit(ind, 0, 5, True, 0.98, 1.02), (3, 1.02, EXIT_TP))
+        # Gapped through the stop: filled at the open
+        self.assertEqual(first_exit(ind, 0, 5, True, 0.97, 1.10), (4, 0.95, EXIT_SL))
+        # The price columns read the bars in place instead of copying them
+        self.assertTrue(np.shares_memory(ind.close, bars))
+
+    def test_monte_carlo(self):
+        """Test block resampling keeps runs and drawdowns compound the risk per trade"""
+        indices = resample_indices(np.random.default_rng(0), 10, 100, 12, BLOCK_BOOTSTRAP, block=4)
+        self.assertEqual(indices.shape, (100, 12))
+        self.assertTrue(np.all((indices[:, 1:4] - indices[:, :3]) % 10 == 1))
+
+        losing = MonteCarlo([-1.0], paths=1000, trades=5, chunk=300, seed=1).report(10.0)
+        self.assertAlmostEqual(losing['max_drawdown']['p50'], 40.95, places=2)
+        self.assertEqual(losing['paths'], 1000)
+        self.assertEqual(losing['drawdown_probability']['30%'], 1.0)
+
+        mc = MonteCarlo([2.0, -1.0, 2.0, -1.0, -1.0], paths=2000, seed=1)
+        sizing = mc.size_risk(max_drawdown=20, probability=0.05, steps=[0.5, 1.0, 2.0, 5.0, 10.0])
+        self.assertIn(sizing['risk_percent'], [0.5, 1.0, 2.0, 5.0])
+
+        # History without its meta file: reported instead of simulated with no point
+        import walk_forward
+        from monte_carlo import main
+        with patch.object(walk_forward.HistoryStore, 'load', return_value=np.zeros(10, dtype=BAR_DTYPE)), \
+                patch.object(walk_forward.HistoryStore, 'point', return_value=None):
+            self.assertEqual(main(['--backtest', 'EURUSD']), 1)
+
+    def test_correlation(self):
+        """Test the incremental matrix matches a full recompute and limits correlated exposure"""
+        rng = np.random.default_rng(0)
+        base = rng.normal(size=(130, 1))
+        returns = np.hstack([base, base + rng.normal(scale=0.3, size=(130, 1)),
+                             -base + rng.normal(scale=0.3, size=(130, 1)), rng.normal(size=(130, 1))])
+        matrix = RollingCorrelation(window=50)
+        matrix.load(np.arange(20), returns[:20], ['EURUSD', 'GBPUSD', 'USDCHF', 'USDJPY'])
+        for t in range(20, 130):
+            matrix.update(t, returns[t])
+        np.testing.assert_allclose(matrix.correlation_matrix(), np.corrcoef(returns[-50:].T), atol=1e-9)
+        self.assertAlmostEqual(matrix.correlations('EURUSD')['USDCHF'],
+                               np.corrcoef(returns[-50:, 0], returns[-50:, 2])[0, 1], places=9)
+
+        service = CorrelationService(window=50, threshold=0.7, max_correlated=1)
+        service.matrix = matrix
+        self.assertFalse(service.allows('EURUSD', True, [('GBPUSD', True)])[0])
+        self.assertFalse(service.allows('EURUSD', True, [('USDCHF', False)])[0])
+        self.assertTrue(service.allows('EURUSD', True, [('GBPUSD', False), ('USDJPY', True)])[0])
+
+    def test_trade_history(self):
+        """Test deals are rebuilt into closed trades with net P&L, MAE/MFE and statistics"""
+        deals = np.zeros(6, dtype=DEAL_DTYPE)
+        rows = [(1, 60, 0, 0, 0.2, 1.1000, 0.0), (1, 120, 1, 1, 0.1, 1.1010, 10.0),
+                (1, 180, 1, 1, 0.1, 1.1020, 20.0), (2, 60, 1, 0, 0.1, 1.1000, 0.0),
+                (2, 240, 0, 1, 0.1, 1.1030, -30.0), (3, 300, 0, 0, 0.1, 1.1000, 0.0)]
+        for name, column in zip(('position_id', 'time_msc', 'type', 'entry', 'volume', 'price', 'profit'),
+                                zip(*rows)):
+            deals[name] = column
+        deals['time_msc'] *= 1000
+        deals['commission'] = -1.0
+        deals['magic'] = 123456
+        deals['symbol'] = 'EURUSD'
+        orders = np.zeros(1, dtype=ORDER_DTYPE)
+        orders['position_id'], orders['sl'], orders['tp'] = 1, 1.0950, 1.1100
+
+        trades = build_trades(deals, orders)
+        self.assertEqual(list(trades['position_id']), [1, 2])  # position 3 is still open
+        self.assertAlmostEqual(trades['close_price'][0], 1.1015)
+        self.assertEqual(list(trades['profit']), [27.0, -32.0])
+        self.assertEqual(trades['sl'][0], 1.0950)
+
+        times = np.arange(0, 300, 60)
+        high = np.array([1.1005, 1.1012, 1.1025, 1.1022, 1.1040])
+        low = np.array([1.0990, 1.0980, 1.1000, 1.1005, 1.1010])
+        trades = excursions(trades, times, high, low, point=0.0001, value=100000)
+        np.testing.assert_allclose(trades['mfe_points'], [25, 20])
+        np.testing.assert_allclose(trades['mae_points'], [-20, -40])
+
+        stats = summarize(trades, trades['symbol'])[0]
+        self.assertEqual((stats['trades'], stats['win_rate'], stats['expectancy']), (2, 0.5, -2.5))
+
+    def test_export(self):
+        """Test logs stream to CSV in chunks with symbol and time filters"""
+        with tempfile.TemporaryDirectory() as directory:
+            for name, day in (('EURUSD_20240102_000000000000.log', 1), ('EURUSD.log', 2), ('GBPUSD.log', 2)):
+                with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+                    for second in range(10):
+                        f.write(f"2024-01-0{day} 12:00:{second:02d}.000 - INFO - ✅ linha {second}\n")
+                    f.write("continuação\n")
+
+            progress = []
+            output = os.path.join(directory, 'logs.csv')
+            job = ExportJob('logs', output, symbols=['EURUSD'], end=datetime(2024, 1, 2, 12, 0, 4),
+                            chunk_rows=3, log_dir=directory, progress=lambda *args: progress.append(args))
+            job.start()
+            self.assertTrue(job.wait(5))
+            self.assertIsNone(job.error)
+            with open(output, encoding='utf-8', newline='') as f:
+                rows = list(csv.reader(f))
+            self.assertEqual(rows[0], ['time', 'asset', 'type', 'level', 'message'])
+            self.assertEqual(len(rows) - 1, 15)
+            self.assertEqual(rows[10][4], '✅ linha 9\ncontinuação')
+            self.assertEqual(progress[-1], (15, 1.0))
+            self.assertFalse(os.path.exists(output + '.part'))
+
+    def test_chart_moving_average(self):
+        """Test the chart MA is aligned to the last candles and blank without history"""
+        close = np.arange(10, dtype=float)
+        np.testing.assert_allclose(moving_average(close, 3, 4), [5.0, 6.0, 7.0, 8.0])
+        ma = moving_average(close[:5], 3, 5)
+        self.assertTrue(np.isnan(ma[:2]).all())
+        np.testing.assert_allclose(ma[2:], [1.0, 2.0, 3.0])
+        self.assertTrue(np.isnan(moving_average(close[:2], 3, 2)).all())
+
+    def test_daemon_commands(self):
+        """Test control command dispatch and that status opens no paper accounts"""
+        from paper_trading import paper_broker
+
+        portfolio = [
+            {'key': 'EURUSD_M15', 'symbol': 'EURUSD', 'timeframe': 'M15', 'lot': 0.1},
+            {'key': 'EURUSD_M15_fast', 'symbol': 'EURUSD', 'timeframe': 'M15', 'lot': 0.1,
+             'paper': True, 'params': {}, 'balance': None}
+        ]
+        daemon = StrategyDaemon(portfolio, Mock())
+
+        reply = daemon.handle_command('status\n')
+        self.assertTrue(reply['ok'])
+        self.assertFalse(reply['strategies']['EURUSD_M15']['running'])
+        self.assertIsNone(reply['strategies']['EURUSD_M15_fast']['paper'])
+        self.assertNotIn('EURUSD_M15_fast', paper_broker.names)
+
+        self.assertEqual(daemon.handle_command('STOP EURUSD_M15'), {'ok': True, 'stopped': []})
+        self.assertEqual(daemon.handle_command('stop GBPUSD_M15'),
+                         {'ok': False, 'error': "'Unknown strategy GBPUSD_M15'"})
+        self.assertEqual(daemon.handle_command('restart'), {'ok': False, 'error': 'unknown command restart'})
+        self.assertEqual(daemon.handle_command(''), {'ok': False, 'error': 'empty command'})
+
+        # Stop waits for the loop to exit; one that outlives the timeout is reported, not restarted silently
+        import threading
+        stopped, release = threading.Event(), threading.Event()
+        for key, target in (('EURUSD_M15', stopped.wait), ('EURUSD_M15_fast', release.wait)):
+            daemon.strategies[key] = Mock(parar=stopped.set)
+            daemon.threads[key] = threading.Thread(target=target, args=(5,), daemon=True)
+            daemon.started_at[key] = datetime.now()
+            daemon.threads[key].start()
+        self.assertEqual(daemon.stop('EURUSD_M15'), ['EURUSD_M15'])
+        self.assertFalse(daemon.threads['EURUSD_M15'].is_alive())
+        try:
+            self.assertEqual(daemon.stop('EURUSD_M15_fast', timeout=0.05), ['EURUSD_M15_fast'])
+            self.assertTrue(daemon.status()['EURUSD_M15_fast']['stopping'])
+            self.assertEqual(daemon.handle_command('start EURUSD_M15_fast'),
+                             {'ok': True, 'started': [], 'stopping': ['EURUSD_M15_fast']})
+            self.assertIn('ainda está parando', daemon.log_system.logar.call_args[0][0])
+        finally:
+            release.set()
+            daemon.threads['EURUSD_M15_fast'].join(5)
+
+    def test_feed_gaps_and_expired_orders(self):
+        """Test the feed fills bar gaps after a stall and drops expired order intents"""
+        import queue
+        import time
+        from shared_feed import SharedRing, DataFeed, BAR_DTYPE
+
+        history = np.zeros(50, dtype=BAR_DTYPE)
+        history['time'] = np.arange(50) * 60
+        history['close'] = np.arange(50)
+        terminal = Mock()
+        terminal.copy_rates_from_pos.side_effect = lambda symbol, timeframe, start, count: history[max(0, visible - count):visible]
+
+        results = queue.Queue()
+        feed = DataFeed([{'key': 'EURUSD_M1', 'symbol': 'EURUSD', 'timeframe': 'M1', 'capacity': 32}],
+                        {}, queue.Queue(), {'w': results}, Mock(), None)
+        feed.bar_feed = Mock(bars=Mock(return_value=None))
+        ring = SharedRing(f"test_gap_{os.getpid()}", BAR_DTYPE, 32, create=True)
+        try:
+            feed.bar_rings['EURUSD_M1'] = ring
+            visible = 10
+            feed.publish_bars(terminal, full=True)
+            visible = 25  # 15 bars while the feed was stalled
+            feed.publish_bars(terminal)
+            bars = ring.snapshot(32)
+            self.assertEqual(len(bars), 25)
+            self.assertTrue((np.diff(bars['time']) == 60).all())
+        finally:
+            ring.close()
+
+        feed.order_queue.put({'worker': 'w', 'id': 1, 'request': {}, 'deadline': time.time() - 1})
+        feed.execute_orders(terminal)
+        terminal.order_send.assert_not_called()
+        self.assertEqual(results.get_nowait()['retcode'], -1)
+
+    def test_log_spill(self):
+        """Test the log buffer spills only evicted records, lazily, with rotation and stale cleanup"""
+        with tempfile.TemporaryDirectory() as directory:
+            stale = os.path.join(directory, 'trading_20240101_000000_4206649.jsonl')
+            open(stale, 'w').close()
+            path = os.path.join(directory, f'trading_20240102_000000_{os.getpid()}.jsonl')
+            buffer = LogBuffer(capacity=4, spill_path=path, index_every=2, spill_bytes=200)
+            self.assertFalse(os.path.exists(stale))
+
+            for i in range(4):
+                buffer.append(f"linha {i}", 'EURUSD', timestamp=1000.0 + i)
+            self.assertFalse(os.path.exists(path))
+
+            for i in range(4, 40):
+                buffer.append(f"linha {i}", 'EURUSD', timestamp=1000.0 + i)
+            self.assertTrue(os.path.exists(path + '.1'))
+            self.assertLess(os.path.getsize(path + '.1'), 300)
+
+            records = buffer.read_history(0, 1000)
+            self.assertEqual([r.seq for r in records], list(range(records[0].seq, 40)))
+            self.assertEqual([r.seq for r in buffer.read_history(1030.0, 5)], [30, 31, 32, 33, 34])
+            buffer.close()
+            self.assertEqual(os.listdir(directory), [])
+
+    def test_log_rotation(self):
+        """Test size rotation, segment naming, compression and pruning of asset log files"""
+        with tempfile.TemporaryDirectory() as directory:
+            files = LogFileManager(directory, flush_interval=0.05, retention_days=30, compression='gzip')
+            file_logger = files.get_logger('EURUSD')
+            self.assertIs(files.get_logger('EURUSD', prefix='headless').handlers[0], files.handlers['EURUSD'])
+            files.handlers['EURUSD'].max_bytes = 200
+            for i in range(20):
+                file_logger.info(f"linha {i}")
+            files.close()
+
+            names = sorted(os.listdir(directory))
+            self.assertIn('EURUSD.log', names)
+            segments = [name for name in names if name != 'EURUSD.log']
+            self.assertTrue(segments)
+            self.assertTrue(all(name.endswith('.log.gz') for name in segments))
+            for name in segments:
+                asset, closed_at = parse_segment_name(name)
+                self.assertEqual(asset, 'EURUSD')
+                self.assertIsInstance(closed_at, datetime)
+
+            lines = []
+            for name in segments + ['EURUSD.log']:
+                with open_segment(os.path.join(directory, name)) as f:
+                    lines.extend(line.rstrip('\n').split(' - ')[-1] for line in f)
+            self.assertEqual(lines, [f"linha {i}" for i in range(20)])
+
+            self.assertEqual(parse_segment_name('GBP_USD.log'), ('GBP_USD', None))
+            self.assertIsNone(parse_segment_name('EURUSD.txt'))
+            old = os.path.join(directory, 'EURUSD_20000101_000000000000.log.gz')
+            open(old, 'wb').close()
+            files.prune()
+            self.assertFalse(os.path.exists(old))
+
+    def test_log_archive(self):
+        """Test incremental indexing across a rotation and full-text search of the log archive"""
+        with tempfile.TemporaryDirectory() as directory:
+            log_dir = os.path.join(directory, 'logs')
+            os.makedirs(log_dir)
+            active = os.path.join(log_dir, 'EURUSD.log')
+            with open(active, 'w', encoding='utf-8') as f:
+                f.write("2024-01-02 12:00:00.000 - INFO - ✅ Ordem executada ticket 1\n")
+                f.write("2024-01-02 12:00:01.000 - ERROR - ❌ Erro ao enviar ordem\n")
+                f.write("detalhe da falha\n")
+            archive = LogArchive(log_dir, os.path.join(directory, 'archive.sqlite'))
+            try:
+                self.assertEqual(archive.update(), 2)
+                self.assertEqual(archive.update(), 0)
+
+                # Rotation: the indexed active file becomes a compressed segment
+                segment = os.path.join(log_dir, 'EURUSD_20240102_120100000000.log')
+                os.replace(active, segment)
+                compress_file(segment, 'gzip')
+                with open(active, 'w', encoding='utf-8') as f:
+                    f.write("2024-01-02 12:02:00.000 - WARNING - ⚠️ Spread alto\n")
+                self.assertEqual(archive.update(), 1)
+
+                results = archive.search('ordem')
+                self.assertEqual([r['type'] for r in results], ['error', 'success'])
+                self.assertEqual(results[0]['message'], "❌ Erro ao enviar ordem\ndetalhe da falha")
+                self.assertEqual(len(archive.search('ord*')), 2)
+                self.assertEqual(len(archive.search('falha ordem')), 1)
+                self.assertEqual([r['type'] for r in archive.search(types=['warning'])], ['warning'])
+                self.assertEqual(archive.search('ordem', assets=['GBPUSD']), [])
+                self.assertEqual(len(archive.search(start=parse_time('2024-01-02 12:00:30'))), 1)
+                context = archive.context('EURUSD', datetime(2024, 1, 2, 12, 0, 1), before=1, after=1)
+                self.assertEqual([r['level'] for r in context], ['INFO', 'ERROR'])
+            finally:
+                archive.close()
+
+    def test_warmup_failures(self):
+        """Test warm-up failures skip dependants and a hung task leaves the others usable"""
+        import threading
+        from startup import Warmup, WarmupTask, StartupTimer
+
+        release = threading.Event()
+
+        def fail(_):
+            raise RuntimeError("terminal not found")
+
+        tasks = [
+            WarmupTask('config', "Loading configurations...", lambda _: 'config'),
+            WarmupTask('mt5', "Connecting to MetaTrader 5...", fail),
+            WarmupTask('symbols', "Loading symbol catalogue...", lambda r: ['EURUSD'], ('mt5',)),
+            WarmupTask('history', "Loading market data...", lambda r: {}, ('symbols',)),
+            WarmupTask('orphan', "Waiting...", lambda r: None, ('missing',)),
+            WarmupTask('interface', "Preparing trading environment...", lambda _: release.wait(5), weight=2)
+        ]
+        warmup = Warmup(tasks, timer=StartupTimer(), workers=2)
+        warmup.start()
+
+        # The splash gives up waiting after its timeout while a task still runs
+        self.assertFalse(warmup.done.wait(0.2))
+        progress, message = warmup.progress()
+        self.assertEqual(message, "Preparing trading environment...")
+        self.assertLess(progress, 100)
+        self.assertTrue(warmup.ok('config'))
+        self.assertEqual(warmup.errors['mt5'], "terminal not found")
+        self.assertEqual(warmup.errors['symbols'], "skipped: mt5 failed")
+        self.assertEqual(warmup.errors['history'], "skipped: symbols failed")
+
+        release.set()
+        self.assertTrue(warmup.done.wait(5))
+        self.assertTrue(warmup.ok('interface'))
+        self.assertEqual(warmup.errors['orphan'], "skipped: unknown requirement")
+        self.assertEqual(warmup.progress(), (100.0, "Ready to launch..."))
+
+    def test_worker_position_counts(self):
+        """Test workers count only their own symbol and magic among the published positions"""
+        from types import SimpleNamespace
+        from shared_feed import SharedRing, DataFeed, BAR_DTYPE, TICK_DTYPE, ACCOUNT_DTYPE, POSITIONS_DTYPE
+        from process_workers import create_worker_strategy
+
+        prefix = f"tp{os.getpid()}"
+        names = {'bars': {'EURUSD_M15': f"{prefix}_b"}, 'ticks': {'EURUSD': f"{prefix}_t"},
+                 'tick_capacity': 16, 'account': f"{prefix}_a", 'positions': f"{prefix}_p"}
+        rings = [SharedRing(names['bars']['EURUSD_M15'], BAR_DTYPE, 1024, create=True),
+                 SharedRing(names['ticks']['EURUSD'], TICK_DTYPE, 4096, create=True),
+                 SharedRing(names['account'], ACCOUNT_DTYPE, 1, create=True),
+                 SharedRing(names['positions'], POSITIONS_DTYPE, 1, create=True)]
+        try:
+            feed = DataFeed([], names, None, {}, Mock(), None)
+            rings[2].append(np.array([(0.0, 1000.0, 1000.0, 0.0, 1000.0, 0.0, 3)], dtype=ACCOUNT_DTYPE))
+            feed.positions_ring = rings[3]
+            feed.publish_positions(mt5, [
+                SimpleNamespace(symbol='GBPUSD', magic=123456, type=mt5.POSITION_TYPE_BUY),
+                SimpleNamespace(symbol='EURUSD', magic=1, type=mt5.POSITION_TYPE_SELL),
+                SimpleNamespace(symbol='EURUSD', magic=123456, type=mt5.POSITION_TYPE_SELL)
+            ], 0.0)
+
+            estrategia = create_worker_strategy('EURUSD_M15', 'EURUSD', 'M15', 0.1, names,
+                                                {'point': 0.00001}, None, None, Mock())
+            self.assertEqual(estrategia.obter_total_posicoes(), 1)
+            self.assertEqual(estrategia.obter_posicoes_abertas(),
+                             [('GBPUSD', True), ('EURUSD', False), ('EURUSD', False)])
+
+            # Services that pull bars from MT5 are not started in the worker
+            with patch('estrategia.correlation_service') as correlation, \
+                    patch('config_service.config_service.start') as config_start:
+                estrategia.iniciar_servicos()
+                self.assertEqual(estrategia.verificar_correlacao("COMPRA"), (True, []))
+            correlation.start.assert_not_called()
+            correlation.watch.assert_not_called()
+            correlation.allows.assert_not_called()
+            config_start.assert_called_once()
+
+            # Tick statistics are fed only the ticks published since the last query
+            tick_records = np.zeros(30, dtype=TICK_DTYPE)
+            tick_records['time_msc'] = 1_700_000_000_000 + np.arange(30) * 100
+            tick_records['bid'], tick_records['ask'] = 1.1, 1.10002
+            rings[1].append(tick_records[:20])
+            stats = estrategia.obter_estatisticas_ticks()
+            self.assertEqual(stats.ticks, 20)
+            with patch.object(stats, 'update_batch', wraps=stats.update_batch) as update_batch:
+                self.assertIs(estrategia.obter_estatisticas_ticks(), stats)
+                update_batch.assert_not_called()
+                rings[1].append(tick_records[20:])
+                estrategia.obter_estatisticas_ticks()
+                self.assertEqual(len(update_batch.call_args[0][0]), 10)
+            self.assertEqual(stats.ticks, 30)
+            estrategia.liberar()
+        finally:
+            for ring in rings:
+                ring.close()
+
+    def position_manager(self, positions):
+        """PositionManager over a fixed risk snapshot of (symbol, buy, open, sl) positions"""
+        import threading
+        from types import SimpleNamespace
+
+        risk = Mock(synced_at=1.0, lock=threading.Lock())
+        risk.positions = {
+            ticket: SimpleNamespace(ticket=ticket, symbol=symbol, magic=123456, price_open=price_open,
+                                    type=mt5.POSITION_TYPE_BUY if buy else mt5.POSITION_TYPE_SELL,
+                                    sl=sl, tp=0.0)
+            for ticket, (symbol, buy, price_open, sl) in enumerate(positions, 1)
+        }
+        manager = PositionManager(risk, trailing_points=30, break_even_points=20, min_step=5,
+                                  max_rate=100, magic=123456, retry_backoff=5.0)
+        manager.refresh_positions()
+        return manager
+
+    def test_stop_targets(self):
+        """Test break-even, trailing, minimum step and stops level of the stop loss targets"""
+        manager = self.position_manager([
+            ('S1', True, 1.10000, 0.0),  # 25 points: break-even
+            ('S2', True, 1.10000, 0.0),  # 50 points: trailing 30 behind bid
+            ('S3', False, 1.10000, 1.10100),  # sell, 50 points: trailing 30 above ask
+            ('S4', True, 1.10000, 1.10018),  # trailing would gain only 2 points
+            ('S5', True, 1.10000, 0.0)  # break-even inside a 30-point stops level
+        ])
+        bid = np.array([1.10025, 1.10050, 1.09948, 1.10050, 1.10025])
+        ask = bid + 0.00002
+        point = np.full(5, 0.00001)
+        stops = np.array([0, 0, 0, 0, 30])
+        targets = manager.compute(bid, ask, point, stops)
+        np.testing.assert_allclose(targets[:3], [1.10000, 1.10020, 1.09980])
+        self.assertTrue(np.isnan(targets[3:]).all())
+
+    @patch('MetaTrader5.order_send')
+    @patch('MetaTrader5.symbol_info_tick')
+    @patch('MetaTrader5.symbol_info')
+    def test_stop_modification_backoff(self, mock_info, mock_tick, mock_order):
+        """Test a rejected stop is not resent until its backoff expires or the target changes"""
+        from types import SimpleNamespace
+
+        manager = self.position_manager([('EURUSD', True, 1.10000, 0.0)])
+        mock_info.return_value = SimpleNamespace(point=0.00001, digits=5, trade_stops_level=0)
+        mock_tick.return_value = SimpleNamespace(bid=1.10050, ask=1.10052)
+        mock_order.return_value = SimpleNamespace(retcode=10016, comment='Invalid stops')
+
+        self.assertEqual(manager.run_once(), 0)
+        self.assertEqual(manager.run_once(), 0)
+        self.assertEqual(mock_order.call_count, 1)
+        self.assertEqual(mock_order.call_args[0][0]['sl'], 1.1002)
+
+        # Backoff expired: same stop resent, and the next wait doubles
+        sl, retry_at, rejections = manager.failed[1]
+        manager.failed[1] = (sl, retry_at - 5.0, rejections)
+        manager.run_once()
+        self.assertEqual(mock_order.call_count, 2)
+        self.assertEqual(manager.failed[1][2], 2)
+
+        # A new target is tried right away and succeeds
+        mock_tick.return_value = SimpleNamespace(bid=1.10060, ask=1.10062)
+        mock_order.return_value = SimpleNamespace(retcode=mt5.TRADE_RETCODE_DONE, comment='')
+        self.assertEqual(manager.run_once(), 1)
+        self.assertEqual(mock_order.call_args[0][0]['sl'], 1.1003)
+        self.assertNotIn(1, manager.failed)
+        self.assertEqual(manager.run_once(), 0)
+        self.assertEqual(mock_order.call_count, 3)
+
+    def test_tick_stats_gap(self):
+        """Test tick statistics stay finite and forget old ticks across a multi-day gap"""
+        stats = TickStats(point=0.00001, half_life=60.0)
+        start = 1_700_000_000_000
+        times = start + np.arange(100) * 500
+        stats.update_batch(times, np.full(100, 1.10000), np.full(100, 1.10002))
+        self.assertEqual(stats.spread_quantile(0.5), 2.0)
+
+        # Three days later (about 4300 half-lives) spreads are 7 points
+        times = times[-1] + 3 * 86400 * 1000 + np.arange(100) * 500
+        stats.update_batch(times, np.full(100, 1.10000), np.full(100, 1.10007))
+        self.assertTrue(np.isfinite(stats.hist).all())
+        self.assertEqual(stats.spread_quantile(0.5), 7.0)
+        self.assertEqual(stats.spread_quantile(0.99), 7.0)
+        self.assertTrue(math.isfinite(stats.tick_rate()) and stats.tick_rate() > 0)
+        self.assertTrue(math.isfinite(stats.volatility()))
+        self.assertTrue(stats.is_blowout(30.0))
+
+    def minute_bars(self, minutes, close):
+        """M1 bars at the given minutes, each spanning close +/- 1 point"""
+        bars = np.zeros(len(minutes), dtype=BAR_DTYPE)
+        bars['time'] = np.asarray(minutes) * 60
+        bars['open'] = bars['close'] = close
+        bars['high'] = np.asarray(close) + 0.00001
+        bars['low'] = np.asarray(close) - 0.00001
+        bars['tick_volume'] = 10
+        bars['spread'] = np.arange(len(minutes)) + 1
+        return bars
+
+    def test_aggregate_bars(self):
+        """Test M5 buckets from M1 bars with missing minutes and a gap"""
+        self.assertEqual(len(aggregate_bars(np.zeros(0, dtype=BAR_DTYPE), 300)), 0)
+        close = [1.1000, 1.1003, 1.0998, 1.1001, 1.1002, 1.1004, 1.1010]
+        m5 = aggregate_bars(self.minute_bars([0, 1, 2, 4, 5, 6, 20], close), 300)
+        # Minute 3 is missing inside a bucket; minutes 7-19 leave no buckets at all
+        self.assertEqual(m5['time'].tolist(), [0, 300, 1200])
+        np.testing.assert_allclose(m5['open'], [1.1000, 1.1002, 1.1010])
+        np.testing.assert_allclose(m5['close'], [1.1001, 1.1004, 1.1010])
+        np.testing.assert_allclose(m5['high'], [1.10031, 1.10041, 1.10101])
+        np.testing.assert_allclose(m5['low'], [1.09979, 1.10019, 1.10099])
+        self.assertEqual(m5['tick_volume'].tolist(), [40, 20, 10])
+        self.assertEqual(m5['spread'].tolist(), [1, 5, 7])
+        # Session offset shifts the bucket boundaries
+        shifted = aggregate_bars(self.minute_bars([0, 1, 2, 4, 5, 6, 20], close), 300, offset=120)
+        self.assertEqual(shifted['time'].tolist(), [-180, 120, 1020])
+
+    def test_update_m1(self):
+        """Test revised and new M1 bars rebuild their buckets and gaps are refused"""
+        aggregator = BarAggregator('EURUSD')
+        seed = self.minute_bars(range(7), np.linspace(1.1000, 1.1006, 7))
+        aggregator.add_timeframe('M5', aggregate_bars(seed, 300))
+        aggregator.seed_m1(seed)
+        self.assertEqual(aggregator.bars('M5', 10)['time'].tolist(), [0, 300])
+        m5 = aggregator.bars('M5', 10)
+
+        # The forming minute 6 is revised and minute 7 opens
+        revised = self.minute_bars([6, 7], [1.1020, 1.1015])
+        self.assertTrue(aggregator.update_m1(revised))
+        self.assertEqual(len(aggregator.m1), 8)
+        forming = aggregator.bars('M5', 1)[0]
+        self.assertAlmostEqual(forming['high'], 1.10201)
+        self.assertAlmostEqual(forming['close'], 1.1015)
+        self.assertEqual(forming['tick_volume'], 30)
+        # Views handed out earlier are not rewritten
+        self.assertAlmostEqual(m5[-1]['close'], 1.1006)
+
+        # Bars from minute 12 on leave minutes 8-11 unknown
+        m1 = aggregator.m1
+        self.assertFalse(aggregator.update_m1(self.minute_bars([12, 13], [1.1, 1.1])))
+        self.assertIs(aggregator.m1, m1)
+        self.assertTrue(aggregator.update_m1(self.minute_bars([7, 8, 9, 10], np.full(4, 1.1016))))
+        self.assertEqual(aggregator.bars('M5', 10)['time'].tolist(), [0, 300, 600])
+        self.assertEqual(aggregator.bars('M1', 1)['time'][0], 600)
+
+    @patch('MetaTrader5.copy_rates_from_pos')
+    def test_bar_feed_seeding(self, mock_rates):
+        """Test seeding a slow symbol does not block subscriptions to others"""
+        import threading
+        started, release = threading.Event(), threading.Event()
+        bars = self.minute_bars(range(10), np.full(10, 1.1))
+
+        def rates(symbol, timeframe, start, count):
+            if symbol == 'SLOW':
+                started.set()
+                release.wait(5)
+            return bars if timeframe == mt5.TIMEFRAME_M1 else aggregate_bars(bars, 300)
+
+        mock_rates.side_effect = rates
+        feed = BarFeed(capacity=100)
+        slow = []
+        thread = threading.Thread(target=lambda: slow.append(feed.subscribe('SLOW', 'M5')))
+        thread.start()
+        self.assertTrue(started.wait(5))
+        try:
+            fast = []
+            other = threading.Thread(target=lambda: fast.append(feed.subscribe('FAST', 'M5')))
+            other.start()
+            other.join(2)
+            self.assertFalse(other.is_alive())
+            self.assertIsNotNone(fast[0])
+        finally:
+            release.set()
+            thread.join(5)
+        self.assertIsNotNone(slow[0])
+        self.assertEqual(feed.bars('SLOW', 'M5', 5)['time'].tolist(), [0, 300])
+
+    def test_shared_window_detach(self):
+        """Test strategies sharing a bar window get copies and detach without clearing it"""
+        bars = np.zeros(210, dtype=[('time', '<i8'), ('close', '<f8')])
+        bars['time'] = np.arange(210) * 60
+        bars['close'] = 1.1 + np.arange(210) * 0.0001
+        other = EstrategiaTrading("EURUSD", "M15", 0.1, self.logger_mock)
+        self.strategy.barras = bars[:200]
+        self.assertIs(other.obter_janela(200), self.strategy.janela)
+
+        barras = self.strategy.barras
+        self.assertIsInstance(barras, BarView)
+        self.assertFalse(np.shares_memory(barras['close'], other.janela.columns['close']))
+        other.janela.update(bars[199:])
+        # The copy taken before the other strategy's update does not move
+        self.assertEqual(barras['time'][-1], bars['time'][199])
+        # The next cycle reuses the strategy's own buffers
+        atual = self.strategy.barras
+        self.assertEqual(atual['time'][-1], bars['time'][-1])
+        self.assertTrue(np.shares_memory(atual['close'], barras['close']))
+
+        self.strategy.barras = None
+        self.assertIsNone(self.strategy.barras)
+        self.assertEqual(len(other.barras), 200)
+
+    @patch('MetaTrader5.history_orders_get')
+    @patch('MetaTrader5.history_deals_get')
+    def test_trade_history_sync(self, mock_deals, mock_orders):
+        """Test a sync only writes the history when deals are new or orders changed"""
+        from types import SimpleNamespace
+
+        def records(array):
+            return [SimpleNamespace(**{name: row[name].item() for name in array.dtype.names}) for row in array]
+
+        deals = np.zeros(2, dtype=DEAL_DTYPE)
+        deals['ticket'], deals['position_id'], deals['entry'] = [1, 2], 7, [0, 1]
+        deals['time_msc'], deals['type'] = [60000, 120000], [0, 1]
+        deals['volume'], deals['price'], deals['profit'] = 0.1, [1.1000, 1.1010], 10.0
+        deals['magic'], deals['symbol'] = 123456, 'EURUSD'
+        orders = np.zeros(1, dtype=ORDER_DTYPE)
+        orders['ticket'], orders['position_id'], orders['sl'] = 5, 7, 1.0950
+        mock_deals.return_value = records(deals)
+        mock_orders.return_value = records(orders)
+
+        with tempfile.TemporaryDirectory() as directory:
+            history = TradeHistory(directory, magic=123456)
+            with patch.object(history, 'save', wraps=history.save) as save:
+                self.assertEqual(history.sync(), 1)
+                version = history.version
+                # The overlap returns the same rows again: nothing is rewritten
+                self.assertEqual(history.sync(), 0)
+                self.assertEqual((history.version, save.call_count), (version, 1))
+
+                orders['sl'] = 1.0960
+                mock_orders.return_value = records(orders)
+                self.assertEqual(history.sync(), 0)
+                self.assertEqual((history.version, save.call_count), (version + 1, 2))
+                self.assertEqual(history.orders['sl'].tolist(), [1.0960])
+            self.assertEqual(len(history.closed_trades()), 1)
+
+    def test_chart_refresh(self):
+        """Test chart refreshes move the last candle, recycle items for new bars and redraw on range exit"""
+        from config import config
+        from shared_feed import BAR_DTYPE
+
+        class Canvas:
+            """Canvas stub keeping each item's coordinates and tags"""
+
+            def __init__(self, *args, **kwargs):
+                self.items = {}
+                self.next_item = 1
+
+            def winfo_width(self):
+                return 600
+
+            def winfo_height(self):
+                return 260
+
+            def bind(self, *args):
+                pass
+
+            def tag_lower(self, *args):
+                pass
+
+            def itemconfigure(self, *args, **kwargs):
+                pass
+
+            def create(self, *coords, tags=(), **kwargs):
+                item, self.next_item = self.next_item, self.next_item + 1
+                self.items[item] = (list(coords), set(tags))
+                return item
+
+            create_line = create_rectangle = create_text = create_polygon = create
+
+            def find(self, tag):
+                return [item for item, (_, tags) in self.items.items() if tag in ('all', item) or tag in tags]
+
+            def delete(self, tag):
+                for item in self.find(tag):
+                    del self.items[item]
+
+            def coords(self, tag, *coords):
+                for item in self.find(tag):
+                    self.items[item] = (list(coords), self.items[item][1])
+
+            def move(self, tag, dx, dy):
+                for item in self.find(tag):
+                    coords, tags = self.items[item]
+                    self.items[item] = ([v + (dx if i % 2 == 0 else dy) for i, v in enumerate(coords)], tags)
+
+        bars = np.zeros(40, dtype=BAR_DTYPE)
+        bars['time'] = np.arange(40) * 60
+        bars['open'] = bars['close'] = 1.1 + np.sin(np.arange(40)) * 0.001
+        bars['high'], bars['low'] = bars['close'] + 0.0002, bars['close'] - 0.0002
+        window = bar_windows.window('CHART', 'M1', 64)
+        window.load(bars)
+
+        colors = {name.lower(): value for name, value in config.COLORS.items()}
+        with patch('chart.tk.Canvas', Canvas), patch.dict(config.COLORS, colors):
+            chart = CandleChart(None, 'CHART', 'M1', entries=None, bars=20, ma_period=5)
+            chart.refresh()
+            self.assertEqual((chart.redraws, chart.updates), (1, 0))
+            candles = list(chart.candles)
+            self.assertEqual(len(chart.canvas.find('candle')), 40)
+            chart.refresh()
+            self.assertEqual((chart.redraws, chart.updates), (1, 0))
+
+            # A tick inside the range only moves the forming candle's wick and body
+            forming = bars[-1:].copy()
+            forming['close'] += 0.0001
+            forming['high'] += 0.0001
+            window.update(forming)
+            chart.refresh()
+            self.assertEqual((chart.redraws, chart.updates), (1, 1))
+            wick = chart.canvas.items[chart.candles[-1][0]][0]
+            self.assertAlmostEqual(wick[1], chart.y(float(forming['high'][0])))
+
+            # A new bar shifts every candle one slot and reuses the oldest candle's items
+            x = {wick: chart.canvas.items[wick][0][0] for wick, _ in candles[1:]}
+            new = forming.copy()
+            new['time'] += 60
+            self.assertTrue(window.update(np.concatenate([forming, new])))
+            chart.refresh()
+            self.assertEqual(chart.redraws, 1)
+            self.assertEqual(list(chart.candles), candles[1:] + candles[:1])
+            self.assertEqual(len(chart.canvas.find('candle')), 40)
+            self.assertEqual(chart.times[-1], new['time'][0])
+            for wick, before in x.items():
+                self.assertAlmostEqual(chart.canvas.items[wick][0][0], before - chart.step())
+            self.assertAlmostEqual(chart.canvas.items[candles[0][0]][0][0], chart.x(19))
+
+            # A price outside the vertical range redraws everything
+            new['high'] = chart.high + 0.01
+            window.update(new)
+            chart.refresh()
+            self.assertEqual((chart.redraws, chart.updates), (2, 1))
+            self.assertGreater(chart.high, float(new['high'][0]))
+
+    @patch('MetaTrader5.account_info', create=True)
+    @patch('MetaTrader5.login', create=True)
+    @patch('MetaTrader5.initialize')
+    def test_connect_before_login(self, mock_init, mock_login, mock_account):
+        """Test the terminal initializes without an account until credentials are given"""
+        mock_init.return_value = True
+        mock_login.return_value = True
+        mock_account.return_value = None
+        manager = ConnectionManager()
+        self.assertTrue(manager.connect()[0])
+        self.assertEqual(manager.state, CONNECTED)
+        mock_account.assert_not_called()
+
+        success, message = manager.connect(123, "secret", "Broker-Demo")
+        self.assertFalse(success)
+        self.assertIsNone(manager.credentials)
+        self.assertEqual(message, manager.last_error)
+
+    def test_logger_files(self):
+        """Test messages reach the asset's log file without a registered log view"""
+        from logger import TradingLogger
+
+        with tempfile.TemporaryDirectory() as directory:
+            files = LogFileManager(directory, flush_interval=0.05)
+            trading_logger = TradingLogger(files)
+            trading_logger.logar("✅ Ordem executada", "EURUSD")
+            trading_logger.log("Sistema iniciado")
+            files.close()
+
+            for name, message in (('EURUSD.log', "✅ Ordem executada"), ('main.log', "Sistema iniciado")):
+                with open(os.path.join(directory, name), encoding='utf-8') as f:
+                    self.assertEqual([line.rstrip('\n').split(' - ')[-1] for line in f], [message])
+
+    @patch('MetaTrader5.account_info')
+    def test_account_unavailable(self, mock_account):
+        """Test strategies start without an account and the risk service backs off failed syncs"""
+        from risk_service import RiskService
+
+        mock_account.return_value = None
+        service = RiskService(retry_backoff=60.0)
+        self.assertIsNone(service.account())
+        self.assertIsNone(service.account())
+        self.assertEqual(mock_account.call_count, 1)
+
+        with patch('estrategia.risk_service', service):
+            estrategia = EstrategiaTrading("EURUSD", "M15", 0.1, self.logger_mock)
+            self.assertIsNone(estrategia.saldo_inicial)
+            self.assertFalse(estrategia.verificar_risco_posicao())
+
+            # The first account seen after the backoff sets the initial balance
+            mock_account.return_value = Mock(balance=10000.0, equity=9990.0)
+            service.retry_at = 0.0
+            self.assertTrue(estrategia.verificar_risco_posicao())
+            self.assertEqual(estrategia.saldo_inicial, 10000.0)
+
+    def test_snapshot_directory(self):
+        """Test the snapshot directory is only created by the first save"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data', 'snapshots')
+            store = SnapshotStore(path)
+            self.assertIsNone(store.load('EURUSD_M15'))
+            self.assertFalse(os.path.exists(path))
+            store.save('EURUSD_M15', {'saldo_inicial': 1.0})
+            self.assertEqual(store.load('EURUSD_M15')['saldo_inicial'], 1.0)
+
 if __name__ == '__main__':
     unittest.main()
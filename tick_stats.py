@@ -0,0 +1,238 @@
+"""
+Tick statistics for Future MT5 Pro Trading System
+Streaming per-symbol spread distribution, tick rate and volatility in
+constant memory, fed in batches from copy_ticks_from
+"""
+
+import os
+import sys
+import math
+import time
+import threading
+from typing import Dict, Any, Optional
+
+import numpy as np
+import MetaTrader5 as mt5
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import TICK_STATS
+except ImportError:
+    TICK_STATS = {
+        'HALF_LIFE': 60.0,
+        'SPREAD_BINS': 1024,
+        'BLOWOUT_FACTOR': 3.0,
+        'MIN_TICKS': 50,
+        'POLL_INTERVAL': 0.25
+    }
+
+# Weights grow instead of old data decaying; rescale before overflow
+RESCALE_AT = 1e150
+MAX_EXPONENT = math.log(RESCALE_AT)
+
+
+class TickStats:
+    """Exponentially decayed statistics of one symbol's ticks
+
+    The spread sketch is a histogram over whole spread points (the last bin
+    collects everything wider) whose contents decay with ``half_life``. Decay
+    is applied by giving each new tick a growing weight rather than shrinking
+    all bins, so an update is O(1) and a batch is a single ``bincount``.
+    Quantiles are recomputed at most once per batch and then read in O(1).
+    """
+
+    QUANTILES = (0.5, 0.9, 0.99)
+
+    def __init__(self, point: float, half_life: float = TICK_STATS['HALF_LIFE'],
+                 bins: int = TICK_STATS['SPREAD_BINS']):
+        self.point = point
+        self.rate = math.log(2) / half_life
+        self.hist = np.zeros(bins)
+        self.origin: Optional[float] = None  # time (s) where weights equal 1
+        self.weight_sum = 0.0  # decayed tick count
+        self.return_sum = 0.0  # decayed sum of squared mid log returns
+        self.ticks = 0
+        self.last_time_msc = 0
+        self.last_mid: Optional[float] = None
+        self.last_spread: Optional[float] = None
+        self.quantiles: Optional[Dict[float, float]] = None
+        self.lock = threading.Lock()
+
+    def _weights(self, seconds: np.ndarray) -> np.ndarray:
+        if self.origin is None:
+            self.origin = float(seconds[0])
+        # Rebase in log space so a long gap cannot overflow exp(); after one
+        # the scale underflows to 0, which is the decay the old ticks are due
+        exponent = (seconds - self.origin) * self.rate
+        if exponent[-1] > MAX_EXPONENT:
+            scale = math.exp(-float(exponent[-1]))
+            self.hist *= scale
+            self.weight_sum *= scale
+            self.return_sum *= scale
+            self.origin = float(seconds[-1])
+            exponent = exponent - exponent[-1]
+        return np.exp(exponent)
+
+    def update_batch(self, time_msc: np.ndarray, bid: np.ndarray, ask: np.ndarray):
+        """Add ticks in time order (arrays as returned by copy_ticks_from)"""
+        keep = (time_msc > self.last_time_msc) & (bid > 0) & (ask > 0)
+        if not keep.all():
+            time_msc, bid, ask = time_msc[keep], bid[keep], ask[keep]
+        if not len(time_msc):
+            return
+
+        with self.lock:
+            weights = self._weights(time_msc / 1000.0)
+
+            spread = (ask - bid) / self.point
+            bins = np.clip(np.rint(spread).astype(np.int64), 0, len(self.hist) - 1)
+            self.hist += np.bincount(bins, weights=weights, minlength=len(self.hist))
+
+            mid = (ask + bid) * 0.5
+            previous = np.concatenate(([self.last_mid if self.last_mid else mid[0]], mid[:-1]))
+            returns = np.log(mid / previous)
+            self.return_sum += float(np.dot(weights, returns * returns))
+            self.weight_sum += float(weights.sum())
+
+            self.ticks += len(time_msc)
+            self.last_time_msc = int(time_msc[-1])
+            self.last_mid = float(mid[-1])
+            self.last_spread = float(spread[-1])
+            self.quantiles = None
+
+    def update(self, time_msc: int, bid: float, ask: float):
+        self.update_batch(np.array([time_msc]), np.array([bid]), np.array([ask]))
+
+    def _decay_now(self, now: Optional[float] = None) -> float:
+        """Factor turning stored weights into weights as of ``now``"""
+        if self.origin is None:
+            return 0.0
+        now = self.last_time_msc / 1000.0 if now is None else now
+        return math.exp(-(now - self.origin) * self.rate)
+
+    def spread_quantile(self, q: float) -> Optional[float]:
+        """Spread (points) below which a fraction ``q`` of recent ticks fell"""
+        with self.lock:
+            if self.quantiles is None:
+                total = self.hist.sum()
+                if not total:
+                    return None
+                cdf = np.cumsum(self.hist) / total
+                self.quantiles = {
+                    level: float(np.searchsorted(cdf, level)) for level in self.QUANTILES
+                }
+            if q in self.quantiles:
+                return self.quantiles[q]
+            cdf = np.cumsum(self.hist) / self.hist.sum()
+            return float(np.searchsorted(cdf, q))
+
+    def tick_rate(self, now: Optional[float] = None) -> float:
+        """Recent ticks per second"""
+        return self.weight_sum * self._decay_now(now) * self.rate
+
+    def volatility(self) -> float:
+        """Recent standard deviation of mid-price log returns per tick"""
+        if not self.weight_sum:
+            return 0.0
+        return math.sqrt(self.return_sum / self.weight_sum)
+
+    def is_blowout(self, spread: float, factor: float = TICK_STATS['BLOWOUT_FACTOR'],
+                   min_ticks: int = TICK_STATS['MIN_TICKS']) -> bool:
+        """Whether ``spread`` is far above the recent median spread"""
+        if self.ticks < min_ticks:
+            return False
+        median = self.spread_quantile(0.5)
+        return median is not None and spread > factor * max(median, 1.0)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'ticks': self.ticks,
+            'spread': self.last_spread,
+            'p50': self.spread_quantile(0.5),
+            'p90': self.spread_quantile(0.9),
+            'p99': self.spread_quantile(0.99),
+            'tick_rate': self.tick_rate(),
+            'volatility': self.volatility()
+        }
+
+
+class TickMonitor:
+    """Keeps TickStats for subscribed symbols fed from the terminal
+
+    A background thread pulls every tick since the last one seen with
+    ``copy_ticks_from`` and feeds each symbol's batch in one call.
+    """
+
+    def __init__(self, interval: float = TICK_STATS['POLL_INTERVAL'],
+                 half_life: float = TICK_STATS['HALF_LIFE']):
+        self.interval = interval
+        self.half_life = half_life
+        self.symbols: Dict[str, Optional[TickStats]] = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def subscribe(self, symbol: str):
+        with self.lock:
+            self.symbols.setdefault(symbol, None)
+
+    def stats(self, symbol: str) -> Optional[TickStats]:
+        """Statistics of a symbol, subscribing to it on first use"""
+        with self.lock:
+            return self.symbols.setdefault(symbol, None)
+
+    def poll(self, symbol: str):
+        stats = self.symbols.get(symbol)
+        if stats is None:
+            info = mt5.symbol_info(symbol)
+            if info is None:
+                return
+            stats = TickStats(info.point, self.half_life)
+            with self.lock:
+                self.symbols[symbol] = stats
+            # Warm up with a few half-lives of history
+            start = int(time.time() - 4 * self.half_life)
+        else:
+            start = stats.last_time_msc // 1000
+
+        ticks = mt5.copy_ticks_from(symbol, start, 100000, mt5.COPY_TICKS_INFO)
+        if ticks is not None and len(ticks):
+            stats.update_batch(ticks['time_msc'], ticks['bid'], ticks['ask'])
+
+    def poll_all(self):
+        with self.lock:
+            symbols = list(self.symbols)
+        for symbol in symbols:
+            self.poll(symbol)
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+
+        def run():
+            while not self.stop_event.is_set():
+                try:
+                    self.poll_all()
+                except Exception:
+                    pass
+                self.stop_event.wait(self.interval)
+
+        self.thread = threading.Thread(target=run, name='tick-monitor', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
+
+
+# Global monitor shared by every strategy in the process
+tick_monitor = TickMonitor()
+
+__all__ = ['tick_monitor', 'TickMonitor', 'TickStats']
@@ -0,0 +1,475 @@
+"""
+Trade history for Future MT5 Pro Trading System
+Incremental sync of the strategies' deals and orders from the terminal into
+a local store keyed by ticket, closed trades rebuilt per position with their
+MAE/MFE, and per-strategy and per-symbol statistics answered from memory
+"""
+
+import os
+import sys
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List, Tuple
+
+import numpy as np
+import MetaTrader5 as mt5
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import PATHS, HISTORY
+except ImportError:
+    PATHS = {
+        'DATA': 'data/'
+    }
+    HISTORY = {
+        'MAGIC': 123456,
+        'DAYS': 365,
+        'OVERLAP': 86400,
+        'INTERVAL': 60.0
+    }
+
+HISTORY_DIR = os.path.join(PATHS['DATA'], 'trades')
+
+DEAL_DTYPE = np.dtype([
+    ('ticket', '<i8'),
+    ('order', '<i8'),
+    ('position_id', '<i8'),
+    ('time_msc', '<i8'),
+    ('type', '<i2'),
+    ('entry', '<i2'),
+    ('reason', '<i2'),
+    ('magic', '<i8'),
+    ('symbol', '<U32'),
+    ('volume', '<f8'),
+    ('price', '<f8'),
+    ('profit', '<f8'),
+    ('commission', '<f8'),
+    ('swap', '<f8'),
+    ('fee', '<f8'),
+])
+
+ORDER_DTYPE = np.dtype([
+    ('ticket', '<i8'),
+    ('position_id', '<i8'),
+    ('time_setup_msc', '<i8'),
+    ('time_done_msc', '<i8'),
+    ('type', '<i2'),
+    ('state', '<i2'),
+    ('magic', '<i8'),
+    ('symbol', '<U32'),
+    ('volume_initial', '<f8'),
+    ('price_open', '<f8'),
+    ('sl', '<f8'),
+    ('tp', '<f8'),
+])
+
+# One closed position; mae/mfe in account currency (mae <= 0 <= mfe), *_points in points
+TRADE_DTYPE = np.dtype([
+    ('position_id', '<i8'),
+    ('magic', '<i8'),
+    ('symbol', '<U32'),
+    ('buy', '?'),
+    ('volume', '<f8'),
+    ('open_time_msc', '<i8'),
+    ('close_time_msc', '<i8'),
+    ('open_price', '<f8'),
+    ('close_price', '<f8'),
+    ('sl', '<f8'),
+    ('tp', '<f8'),
+    ('profit', '<f8'),
+    ('mae', '<f8'),
+    ('mfe', '<f8'),
+    ('mae_points', '<f8'),
+    ('mfe_points', '<f8'),
+])
+
+GROUPS = ('strategy', 'symbol', 'magic')
+
+
+def to_records(items, dtype: np.dtype) -> np.ndarray:
+    """Structured array from ``history_*_get`` results (named tuples)"""
+    if not items:
+        return np.zeros(0, dtype=dtype)
+    return np.array([tuple(getattr(item, name) for name in dtype.names) for item in items], dtype=dtype)
+
+
+def upsert(stored: np.ndarray, new: np.ndarray, key: str = 'ticket') -> np.ndarray:
+    """Merge ``new`` rows into ``stored``, replacing equal keys; sorted by key"""
+    if not len(new):
+        return stored
+    merged = np.concatenate([stored[~np.isin(stored[key], new[key])], new])
+    return merged[np.argsort(merged[key], kind='stable')]
+
+
+def changed_rows(stored: np.ndarray, new: np.ndarray, key: str = 'ticket') -> np.ndarray:
+    """Rows of ``new`` that are missing from ``stored`` (sorted by key) or differ from it"""
+    if not len(stored) or not len(new):
+        return new
+    index = np.minimum(np.searchsorted(stored[key], new[key]), len(stored) - 1)
+    same = (stored[key][index] == new[key]) & (stored[index] == new)
+    return new[~same]
+
+
+def build_trades(deals: np.ndarray, orders: np.ndarray) -> np.ndarray:
+    """Closed trades of the positions in ``deals``, MAE/MFE left at zero
+
+    Deals are grouped by position; volumes and prices of entries and exits are
+    volume-weighted with one ``bincount`` each and P&L includes commission,
+    swap and fees. Positions whose exits do not cover their entries yet are
+    still open and left out. SL/TP come from the position's first order.
+    """
+    deals = deals[np.lexsort((deals['time_msc'], deals['position_id']))]
+    if not len(deals):
+        return np.zeros(0, dtype=TRADE_DTYPE)
+    ids, starts, group = np.unique(deals['position_id'], return_index=True, return_inverse=True)
+    entry = deals['entry'] == mt5.DEAL_ENTRY_IN
+    exit_ = ~entry
+    volume, price = deals['volume'], deals['price']
+
+    in_volume = np.bincount(group, volume * entry, len(ids))
+    out_volume = np.bincount(group, volume * exit_, len(ids))
+    closed = (in_volume > 0) & (out_volume >= in_volume - 1e-9)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        open_price = np.bincount(group, volume * price * entry, len(ids)) / in_volume
+        close_price = np.bincount(group, volume * price * exit_, len(ids)) / out_volume
+
+    trades = np.zeros(len(ids), dtype=TRADE_DTYPE)
+    trades['position_id'] = ids
+    trades['symbol'] = deals['symbol'][starts]
+    trades['magic'] = np.maximum.reduceat(np.where(entry, deals['magic'], 0), starts)
+    trades['buy'] = np.maximum.reduceat(entry & (deals['type'] == mt5.DEAL_TYPE_BUY), starts)
+    trades['volume'] = in_volume
+    trades['open_time_msc'] = np.minimum.reduceat(
+        np.where(entry, deals['time_msc'], np.iinfo(np.int64).max), starts)
+    trades['close_time_msc'] = np.maximum.reduceat(np.where(exit_, deals['time_msc'], 0), starts)
+    trades['open_price'] = open_price
+    trades['close_price'] = close_price
+    trades['profit'] = np.bincount(
+        group, deals['profit'] + deals['commission'] + deals['swap'] + deals['fee'], len(ids))
+
+    if len(orders):
+        orders = orders[np.lexsort((orders['time_setup_msc'], orders['position_id']))]
+        order_ids, first = np.unique(orders['position_id'], return_index=True)
+        position = np.clip(np.searchsorted(order_ids, ids), 0, len(order_ids) - 1)
+        found = order_ids[position] == ids
+        trades['sl'] = np.where(found, orders['sl'][first][position], 0.0)
+        trades['tp'] = np.where(found, orders['tp'][first][position], 0.0)
+    return trades[closed]
+
+
+def segment_extremes(high: np.ndarray, low: np.ndarray, start: np.ndarray,
+                     end: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Max of ``high`` and min of ``low`` over each [start, end) bar range
+
+    ``reduceat`` over interleaved (start, end) indices reduces every range in
+    one call; the even results are the ranges, whatever their order or overlap.
+    Ranges must hold at least one bar.
+    """
+    high = np.append(high, high[-1])
+    low = np.append(low, low[-1])
+    bounds = np.column_stack([start, end]).ravel()
+    return np.maximum.reduceat(high, bounds)[::2], np.minimum.reduceat(low, bounds)[::2]
+
+
+def excursions(trades: np.ndarray, times: np.ndarray, high: np.ndarray, low: np.ndarray,
+               point: float, value: float) -> np.ndarray:
+    """Fill mae/mfe of one symbol's trades from its M1 bars
+
+    Every bar from the one holding the open to the one holding the close is
+    used, so the open and close minutes count in full.
+    """
+    opened = trades['open_time_msc'] // 1000
+    closed = trades['close_time_msc'] // 1000
+    start = np.clip(np.searchsorted(times, opened, 'right') - 1, 0, len(times) - 1)
+    end = np.maximum(np.searchsorted(times, closed, 'right'), start + 1)
+    highest, lowest = segment_extremes(high, low, start, end)
+    direction = np.where(trades['buy'], 1.0, -1.0)
+    favorable = np.where(trades['buy'], highest - trades['open_price'], trades['open_price'] - lowest)
+    adverse = np.where(trades['buy'], lowest - trades['open_price'], trades['open_price'] - highest)
+    # The fills themselves bound the excursions when bars are missing or coarse
+    realized = (trades['close_price'] - trades['open_price']) * direction
+    trades['mfe_points'] = np.maximum(np.maximum(favorable, realized), 0.0) / point
+    trades['mae_points'] = np.minimum(np.minimum(adverse, realized), 0.0) / point
+    trades['mfe'] = trades['mfe_points'] * point * value * trades['volume']
+    trades['mae'] = trades['mae_points'] * point * value * trades['volume']
+    return trades
+
+
+def summarize(trades: np.ndarray, keys: np.ndarray) -> List[Dict[str, Any]]:
+    """P&L, win rate, expectancy, profit factor and MAE/MFE per key"""
+    if not len(trades):
+        return []
+    names, group = np.unique(keys, return_inverse=True)
+    n = len(names)
+    profit = trades['profit']
+    win = profit > 0
+    count = np.bincount(group, minlength=n)
+    wins = np.bincount(group, win, n)
+    total = np.bincount(group, profit, n)
+    gross_win = np.bincount(group, np.where(win, profit, 0.0), n)
+    gross_loss = -np.bincount(group, np.where(win, 0.0, profit), n)
+    mae = np.bincount(group, trades['mae'], n)
+    mfe = np.bincount(group, trades['mfe'], n)
+    volume = np.bincount(group, trades['volume'], n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rows = np.column_stack([
+            total, wins / count, total / count, gross_win / np.maximum(wins, 1),
+            -gross_loss / np.maximum(count - wins, 1),
+            np.where(gross_loss > 0, gross_win / gross_loss, np.inf), mae / count, mfe / count, volume
+        ])
+    return [{
+        'key': str(name),
+        'trades': int(count[i]),
+        'profit': round(float(rows[i, 0]), 2),
+        'win_rate': round(float(rows[i, 1]), 4),
+        'expectancy': round(float(rows[i, 2]), 2),
+        'average_win': round(float(rows[i, 3]), 2),
+        'average_loss': round(float(rows[i, 4]), 2),
+        'profit_factor': round(float(rows[i, 5]), 2) if np.isfinite(rows[i, 5]) else None,
+        'average_mae': round(float(rows[i, 6]), 2),
+        'average_mfe': round(float(rows[i, 7]), 2),
+        'volume': round(float(rows[i, 8]), 2)
+    } for i, name in enumerate(names)]
+
+
+class TradeHistory:
+    """Local copy of the strategies' deal and order history with trade analytics
+
+    Deals, orders and closed trades are sorted structured arrays kept in memory
+    and saved as ``.npy`` files in ``directory``. ``sync`` asks the terminal
+    only for the period since the last deal (less ``overlap`` for late
+    updates), keeps the deals of positions opened with ``magic``, and rebuilds
+    the trades of the positions it touched. Statistics are computed from the
+    in-memory trades and cached until the next change, so dashboards never
+    query the terminal.
+    """
+
+    def __init__(self, directory: str = HISTORY_DIR, magic: Optional[int] = HISTORY['MAGIC'],
+                 days: int = HISTORY['DAYS'], overlap: int = HISTORY['OVERLAP'],
+                 interval: float = HISTORY['INTERVAL']):
+        self.directory = directory
+        self.magic = magic
+        self.days = days
+        self.overlap = overlap
+        self.interval = interval
+        self.lock = threading.RLock()
+        self.deals = np.zeros(0, dtype=DEAL_DTYPE)
+        self.orders = np.zeros(0, dtype=ORDER_DTYPE)
+        self.trades = np.zeros(0, dtype=TRADE_DTYPE)
+        self.synced_to: Optional[int] = None  # server time of the last deal, seconds
+        self.version = 0
+        self.cache: Dict[Tuple, List[Dict[str, Any]]] = {}
+        self.specs: Dict[str, Tuple[float, float]] = {}
+        self.loaded = False
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    # Storage
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.npy")
+
+    def load(self):
+        """Read the stored history once; later calls are no-ops"""
+        with self.lock:
+            if self.loaded:
+                return
+            self.loaded = True
+            for name, dtype in (('deals', DEAL_DTYPE), ('orders', ORDER_DTYPE), ('trades', TRADE_DTYPE)):
+                try:
+                    stored = np.load(self.path(name))
+                except (OSError, ValueError):
+                    continue
+                if stored.dtype == dtype:
+                    setattr(self, name, stored)
+            try:
+                with open(os.path.join(self.directory, 'meta.json'), 'r') as f:
+                    self.synced_to = json.load(f).get('synced_to')
+            except (OSError, ValueError):
+                self.synced_to = None
+            self.version += 1
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        for name in ('deals', 'orders', 'trades'):
+            path = self.path(name)
+            temp = f"{path}.tmp.npy"
+            np.save(temp, getattr(self, name))
+            os.replace(temp, path)
+        with open(os.path.join(self.directory, 'meta.json'), 'w') as f:
+            json.dump({'synced_to': self.synced_to, 'deals': len(self.deals),
+                       'trades': len(self.trades)}, f)
+
+    # Sync
+    def spec(self, symbol: str) -> Optional[Tuple[float, float]]:
+        """(point, account currency per price unit and lot) of a symbol"""
+        spec = self.specs.get(symbol)
+        if spec is None:
+            info = mt5.symbol_info(symbol)
+            if info is None:
+                return None
+            tick_size = getattr(info, 'trade_tick_size', 0) or 0
+            tick_value = getattr(info, 'trade_tick_value', 0) or 0
+            value = tick_value / tick_size if tick_size and tick_value else getattr(info, 'trade_contract_size', 100000)
+            spec = self.specs[symbol] = (info.point, value)
+        return spec
+
+    def add_excursions(self, trades: np.ndarray) -> np.ndarray:
+        """MAE/MFE of new trades, one M1 request per symbol over their span"""
+        for symbol in np.unique(trades['symbol']):
+            rows = np.flatnonzero(trades['symbol'] == symbol)
+            spec = self.spec(str(symbol))
+            if spec is None:
+                continue
+            start = datetime.fromtimestamp(int(trades['open_time_msc'][rows].min() // 1000) - 60)
+            end = datetime.fromtimestamp(int(trades['close_time_msc'][rows].max() // 1000) + 60)
+            bars = mt5.copy_rates_range(str(symbol), mt5.TIMEFRAME_M1, start, end)
+            if bars is None or not len(bars):
+                # Without bars the fills alone bound the excursions
+                times, high, low = np.zeros(1, dtype=np.int64), np.full(1, -np.inf), np.full(1, np.inf)
+            else:
+                times, high, low = np.asarray(bars['time'], dtype=np.int64), bars['high'], bars['low']
+            trades[rows] = excursions(trades[rows], times, high, low, *spec)
+        return trades
+
+    def sync(self) -> int:
+        """Fetch deals and orders since the last sync; returns the number of new trades
+
+        Returns -1 when the terminal did not answer.
+        """
+        self.load()
+        now = datetime.now()
+        if self.synced_to is None:
+            since = now - timedelta(days=self.days)
+        else:
+            since = datetime.fromtimestamp(self.synced_to - self.overlap)
+        # Server time may run ahead of local time
+        until = now + timedelta(days=1)
+        deals = mt5.history_deals_get(since, until)
+        orders = mt5.history_orders_get(since, until)
+        if deals is None or orders is None:
+            return -1
+        deals = to_records(deals, DEAL_DTYPE)
+        orders = to_records(orders, ORDER_DTYPE)
+
+        with self.lock:
+            # Balance and credit operations have no position
+            entries = deals[(deals['entry'] == mt5.DEAL_ENTRY_IN) & (deals['position_id'] > 0)]
+            if self.magic is not None:
+                entries = entries[entries['magic'] == self.magic]
+            positions = np.union1d(self.deals['position_id'], entries['position_id'])
+            deals = deals[np.isin(deals['position_id'], positions)]
+            orders = orders[np.isin(orders['position_id'], positions)]
+            if len(deals):
+                self.synced_to = max(self.synced_to or 0, int(deals['time_msc'].max() // 1000))
+
+            # The overlap window returns stored rows again: only write when something changed
+            new_deals = deals[~np.isin(deals['ticket'], self.deals['ticket'])]
+            orders = changed_rows(self.orders, orders)
+            if not len(new_deals) and not len(orders):
+                return 0
+            self.deals = upsert(self.deals, new_deals)
+            self.orders = upsert(self.orders, orders)
+            touched = np.unique(new_deals['position_id'])
+            touched = touched[~np.isin(touched, self.trades['position_id'])]
+            trades = build_trades(self.deals[np.isin(self.deals['position_id'], touched)],
+                                  self.orders[np.isin(self.orders['position_id'], touched)])
+            if len(trades):
+                self.trades = upsert(self.trades, self.add_excursions(trades), 'position_id')
+            self.version += 1
+            self.cache.clear()
+            self.save()
+            return len(trades)
+
+    # Queries
+    def closed_trades(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      symbol: Optional[str] = None) -> np.ndarray:
+        """Closed trades by close time, optionally in [start, end) and of one symbol"""
+        self.load()
+        trades = self.trades
+        mask = np.ones(len(trades), dtype=bool)
+        if start is not None:
+            mask &= trades['close_time_msc'] >= start.timestamp() * 1000
+        if end is not None:
+            mask &= trades['close_time_msc'] < end.timestamp() * 1000
+        if symbol is not None:
+            mask &= trades['symbol'] == symbol
+        trades = trades[mask]
+        return trades[np.argsort(trades['close_time_msc'], kind='stable')]
+
+    def stats(self, by: str = 'strategy', start: Optional[datetime] = None,
+              end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Statistics per strategy (symbol and magic), symbol or magic number"""
+        if by not in GROUPS:
+            raise ValueError(f"Unknown grouping {by}; use one of {', '.join(GROUPS)}")
+        self.load()
+        with self.lock:
+            key = (self.version, by, start, end)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            trades = self.closed_trades(start, end)
+            if by == 'symbol':
+                keys = trades['symbol']
+            elif by == 'magic':
+                keys = trades['magic']
+            else:
+                keys = np.char.add(np.char.add(trades['symbol'], '_'), trades['magic'].astype(str))
+            result = self.cache[key] = summarize(trades, keys)
+            return result
+
+    def equity_curve(self, symbol: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(close time in seconds, cumulative profit) of the closed trades"""
+        trades = self.closed_trades(symbol=symbol)
+        return trades['close_time_msc'] // 1000, np.cumsum(trades['profit'])
+
+    def summary(self) -> Dict[str, Any]:
+        self.load()
+        return {
+            'deals': len(self.deals),
+            'trades': len(self.trades),
+            'profit': round(float(self.trades['profit'].sum()), 2),
+            'synced_to': self.synced_to
+        }
+
+    # Background sync
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+
+        def run():
+            while not self.stop_event.is_set():
+                try:
+                    self.sync()
+                except Exception:
+                    pass
+                self.stop_event.wait(self.interval)
+
+        self.thread = threading.Thread(target=run, name='trade-history', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
+
+
+# Global history of the strategies' trades
+trade_history = TradeHistory()
+
+__all__ = [
+    'trade_history',
+    'TradeHistory',
+    'build_trades',
+    'summarize',
+    'excursions',
+    'DEAL_DTYPE',
+    'ORDER_DTYPE',
+    'TRADE_DTYPE'
+]
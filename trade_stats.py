@@ -0,0 +1,159 @@
+"""
+Trade statistics dialog for Future MT5 Pro Trading System
+Per-strategy, per-symbol or per-magic P&L, win rate, expectancy and MAE/MFE of
+the closed trades held by the trade history store
+"""
+
+import time
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from config import config
+from log_search import parse_time
+from trade_history import TradeHistory, GROUPS
+
+COLUMNS = (
+    ("key", "Key", 160),
+    ("trades", "Trades", 60),
+    ("profit", "P&L", 90),
+    ("win_rate", "Win rate", 70),
+    ("expectancy", "Expectancy", 80),
+    ("profit_factor", "PF", 50),
+    ("average_win", "Avg win", 70),
+    ("average_loss", "Avg loss", 70),
+    ("average_mae", "Avg MAE", 70),
+    ("average_mfe", "Avg MFE", 70)
+)
+
+
+class TradeStatsDialog:
+    def __init__(self, parent: tk.Tk, history: TradeHistory):
+        self.history = history
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Trade Statistics")
+        self.dialog.transient(parent)
+
+        # Configure window
+        self.dialog.configure(bg=config.COLORS['bg_dark'])
+
+        # Center dialog
+        width = 900
+        height = 450
+        x = parent.winfo_x() + (parent.winfo_width() - width) // 2
+        y = parent.winfo_y() + (parent.winfo_height() - height) // 2
+        self.dialog.geometry(f"{width}x{height}+{x}+{y}")
+
+        # Filter variables
+        self.group_var = tk.StringVar(value=GROUPS[0])
+        self.start_var = tk.StringVar()
+        self.end_var = tk.StringVar()
+        self.status_var = tk.StringVar()
+
+        self.setup_ui()
+        self.refresh()
+
+    def setup_ui(self):
+        """Setup the statistics dialog UI"""
+        main_frame = tk.Frame(
+            self.dialog,
+            bg=config.COLORS['bg_dark'],
+            highlightbackground=config.COLORS['accent'],
+            highlightthickness=1
+        )
+        main_frame.pack(expand=True, fill="both", padx=2, pady=2)
+
+        # Filters
+        filter_frame = tk.Frame(main_frame, bg=config.COLORS['bg_dark'])
+        filter_frame.pack(fill="x", padx=10, pady=10)
+
+        group = ttk.Combobox(filter_frame, textvariable=self.group_var, width=10,
+                             values=GROUPS, state="readonly")
+        group.bind('<<ComboboxSelected>>', lambda e: self.refresh())
+        fields = [
+            ("Group by:", group),
+            ("From:", ttk.Entry(filter_frame, textvariable=self.start_var, width=17)),
+            ("To:", ttk.Entry(filter_frame, textvariable=self.end_var, width=17))
+        ]
+        for label, widget in fields:
+            tk.Label(
+                filter_frame,
+                text=label,
+                bg=config.COLORS['bg_dark'],
+                fg=config.COLORS['text']
+            ).pack(side="left", padx=(5, 2))
+            widget.pack(side="left")
+            if isinstance(widget, ttk.Entry):
+                widget.bind('<Return>', lambda e: self.refresh())
+
+        tk.Button(
+            filter_frame,
+            text="Refresh",
+            command=self.refresh,
+            bg=config.COLORS['accent'],
+            fg=config.COLORS['text'],
+            font=(config.UI['FONTS']['FAMILY'], 10, "bold"),
+            cursor="hand2"
+        ).pack(side="right", padx=5)
+
+        # Results
+        tree_frame = tk.Frame(main_frame, bg=config.COLORS['bg_dark'])
+        tree_frame.pack(expand=True, fill="both", padx=10)
+
+        self.tree = ttk.Treeview(tree_frame, columns=[c[0] for c in COLUMNS], show="headings")
+        for column, title, width in COLUMNS:
+            self.tree.heading(column, text=title)
+            self.tree.column(column, width=width, stretch=(column == "key"),
+                             anchor="w" if column == "key" else "e")
+        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side="left", expand=True, fill="both")
+        scrollbar.pack(side="right", fill="y")
+
+        # Status
+        tk.Label(
+            main_frame,
+            textvariable=self.status_var,
+            bg=config.COLORS['bg_dark'],
+            fg=config.COLORS['text'],
+            anchor="w"
+        ).pack(fill="x", padx=10, pady=5)
+
+    def refresh(self):
+        """Show the statistics of the stored trades; the terminal is not queried"""
+        try:
+            start = parse_time(self.start_var.get())
+            end = parse_time(self.end_var.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e), parent=self.dialog)
+            return
+
+        started = time.perf_counter()
+        rows = self.history.stats(self.group_var.get(), start, end)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        self.tree.delete(*self.tree.get_children())
+        for row in rows:
+            self.tree.insert('', 'end', values=(
+                row['key'],
+                row['trades'],
+                f"{row['profit']:.2f}",
+                f"{row['win_rate'] * 100:.1f}%",
+                f"{row['expectancy']:.2f}",
+                '-' if row['profit_factor'] is None else f"{row['profit_factor']:.2f}",
+                f"{row['average_win']:.2f}",
+                f"{row['average_loss']:.2f}",
+                f"{row['average_mae']:.2f}",
+                f"{row['average_mfe']:.2f}"
+            ))
+        summary = self.history.summary()
+        synced = summary['synced_to']
+        synced = time.strftime('%Y-%m-%d %H:%M', time.localtime(synced)) if synced else 'never'
+        self.status_var.set(f"{sum(row['trades'] for row in rows)} trades in {elapsed:.1f} ms"
+                            f" - last deal {synced}")
+
+
+def show_trade_stats(parent: tk.Tk, history: TradeHistory):
+    """Show trade statistics dialog"""
+    dialog = TradeStatsDialog(parent, history)
+    return dialog
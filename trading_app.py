@@ -8,19 +8,37 @@ import MetaTrader5 as mt5
 from datetime import datetime
 import threading
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 
 # Import local modules
 from config import config
 from logger import logger
+from log_view import VirtualLogView
+from log_files import log_files
+from log_archive import LogArchive
+from log_search import show_log_search
+from export_dialog import show_export
+from trade_history import trade_history
+from trade_stats import show_trade_stats
+from chart import ChartPanel
 from utils import (
-    get_account_info, format_currency, check_market_hours,
-    get_symbol_info, calculate_position_size
+    format_currency, get_symbol_info, calculate_position_size
 )
 from estrategia import EstrategiaTrading
+from snapshots import snapshot_store
+from risk_service import risk_service
+from position_manager import PositionManager
+from tick_stats import tick_monitor
+from config_service import config_service
+from correlation import correlation_service
+from mt5_connection import connection_manager, CONNECTED, RECONNECTING
+from ui_refresh import UIRefresher
+from event_bus import (
+    event_bus, feed_poller, AccountEvent, ConnectionEvent, MarketHoursEvent, LATEST
+)
 
 class TradingApp:
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, symbols: Optional[List[str]] = None):
         self.root = root
         self.root.title(f"{config.APP_NAME} v{config.VERSION} - Fibonacci Trading")
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -37,9 +55,16 @@ class TradingApp:
         # State variables
         self.operando = False
         self.estrategia = None
+        self.symbols = symbols  # catalogue loaded during startup, if any
+        self.log_archive = LogArchive()
+        self.position_manager = PositionManager(log_system=logger)
+        # Worker threads post widget changes here; only the main loop applies them
+        self.ui = UIRefresher(root, config.UI['MAX_FPS'])
         
         # Setup UI
         self.setup_ui()
+        self.ui.start()
+        self.charts.start()
         self.start_update_threads()
 
     def setup_window_size(self):
@@ -105,7 +130,9 @@ class TradingApp:
         view_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="View", menu=view_menu)
         view_menu.add_command(label="Clear Logs", command=self.clear_logs)
-        view_menu.add_command(label="Export Logs", command=self.export_logs)
+        view_menu.add_command(label="Export...", command=self.export_logs)
+        view_menu.add_command(label="Search Logs", command=self.search_logs)
+        view_menu.add_command(label="Trade Statistics", command=self.show_trade_stats)
 
         # Help menu
         help_menu = tk.Menu(menubar, tearoff=0)
@@ -296,21 +323,13 @@ class TradingApp:
         )
         log_frame.pack(fill="both", expand=True, padx=10, pady=10)
 
-        self.text_log = tk.Text(
+        self.text_log = VirtualLogView(
             log_frame,
-            height=20,
-            width=60,
             bg=config.COLORS['bg_dark'],
             fg=config.COLORS['text'],
-            font=("Consolas", config.UI['FONTS']['SIZES']['NORMAL']),
-            padx=10,
-            pady=10
+            font=("Consolas", config.UI['FONTS']['SIZES']['NORMAL'])
         )
-        self.text_log.pack(side="left", fill="both", expand=True, padx=10, pady=10)
-
-        scrollbar = ttk.Scrollbar(log_frame, command=self.text_log.yview)
-        scrollbar.pack(side="right", fill="y", padx=(0, 10), pady=10)
-        self.text_log.config(yscrollcommand=scrollbar.set)
+        self.text_log.pack(fill="both", expand=True, padx=10, pady=10)
 
         # Add log widget to logger
         logger.add_log_widget("main", self.text_log)
@@ -320,6 +339,19 @@ class TradingApp:
     def setup_right_panel(self, parent: tk.Widget):
         """Setup the right panel with market analysis"""
         panel = tk.Frame(parent, bg=config.COLORS['bg_medium'])
+
+        # Chart of the running strategy's symbol
+        chart_frame = tk.LabelFrame(
+            panel,
+            text=" Chart ",
+            font=(config.UI['FONTS']['FAMILY'], config.UI['FONTS']['SIZES']['SMALL'], "bold"),
+            fg=config.COLORS['text'],
+            bg=config.COLORS['bg_medium']
+        )
+        chart_frame.pack(fill="x", padx=10, pady=(10, 0))
+
+        self.charts = ChartPanel(chart_frame)
+        self.charts.frame.pack(fill="both", expand=True, padx=5, pady=5)
         
         # Market Analysis
         analysis = tk.LabelFrame(
@@ -446,62 +478,95 @@ class TradingApp:
 
     def start_update_threads(self):
         """Start update threads"""
+        self.account_events = event_bus.subscribe(AccountEvent, ConnectionEvent, policy=LATEST)
+        self.market_events = event_bus.subscribe(MarketHoursEvent, policy=LATEST)
         threading.Thread(target=self.update_account_info, daemon=True).start()
         threading.Thread(target=self.update_market_status, daemon=True).start()
         threading.Thread(target=self.carregar_ativos, daemon=True).start()
+        self.log_archive.start()
+        risk_service.start()
+        tick_monitor.start()
+        feed_poller.start()
+        trade_history.start()
+        connection_manager.subscribe(self.on_connection)
+        connection_manager.start()
+        self.position_manager.start()
 
     def update_account_info(self):
-        """Update account information"""
+        """Update account information whenever it changes"""
         while True:
+            event = self.account_events.get()
+            if event is None:
+                return
             try:
-                account_info = get_account_info()
-                if account_info:
-                    self.balance_label.config(
-                        text=format_currency(account_info['balance'])
+                if isinstance(event, AccountEvent):
+                    self.ui.update(
+                        self.balance_label,
+                        text=format_currency(event.balance)
                     )
-                    self.equity_label.config(
-                        text=format_currency(account_info['equity'])
+                    self.ui.update(
+                        self.equity_label,
+                        text=format_currency(event.equity)
                     )
-                    
-                    # Update connection status
-                    self.connection_status.config(
+                elif event.connected:
+                    self.ui.update(
+                        self.connection_status,
                         text="MT5: Connected",
                         fg=config.COLORS['success']
                     )
                 else:
-                    self.connection_status.config(
+                    self.ui.update(
+                        self.connection_status,
                         text="MT5: Disconnected",
                         fg=config.COLORS['danger']
                     )
             except:
-                self.connection_status.config(
+                self.ui.update(
+                    self.connection_status,
                     text="MT5: Error",
                     fg=config.COLORS['danger']
                 )
-            time.sleep(1)
+
+    def on_connection(self, state: str, outage=None):
+        """Show reconnections (called from the connection monitor thread)"""
+        if state == RECONNECTING:
+            self.ui.update(self.connection_status, text="MT5: Reconnecting...", fg=config.COLORS['warning'])
+            logger.log("⚠️ MT5 connection lost, reconnecting", level='WARNING')
+        elif state == CONNECTED and outage is not None:
+            self.ui.update(self.connection_status, text="MT5: Connected", fg=config.COLORS['success'])
+            logger.log(f"✅ MT5 reconnected in {outage.downtime:.1f}s ({outage.attempts} attempts)")
 
     def update_market_status(self):
-        """Update market status"""
+        """Update market status whenever the market opens or closes"""
         while True:
-            is_open = check_market_hours()
-            self.market_status.config(
-                text=f"Market: {'Open' if is_open else 'Closed'}",
-                fg=config.COLORS['success'] if is_open else config.COLORS['danger']
+            event = self.market_events.get()
+            if event is None:
+                return
+            self.ui.update(
+                self.market_status,
+                text=f"Market: {'Open' if event.open else 'Closed'}",
+                fg=config.COLORS['success'] if event.open else config.COLORS['danger']
             )
-            time.sleep(1)
 
     def carregar_ativos(self):
         """Load available assets"""
         try:
-            symbols = mt5.symbols_get()
-            lista_ativos = [symbol.name for symbol in symbols if symbol.visible]
-            self.combo_ativo['values'] = lista_ativos
-            if lista_ativos:
-                self.combo_ativo.current(0)
+            if self.symbols is not None:
+                lista_ativos = list(self.symbols)
+            else:
+                symbols = mt5.symbols_get()
+                lista_ativos = [symbol.name for symbol in symbols if symbol.visible]
+            self.ui.call('ativos', self.show_assets, lista_ativos)
             logger.log(f"✅ {len(lista_ativos)} assets loaded")
         except Exception as e:
             logger.log(f"❌ Error loading assets: {str(e)}")
 
+    def show_assets(self, lista_ativos: List[str]):
+        """Fill the asset selector (main thread)"""
+        self.combo_ativo['values'] = lista_ativos
+        if lista_ativos:
+            self.combo_ativo.current(0)
+
     def iniciar_robo(self):
         """Start the trading robot"""
         ativo = self.ativo_selecionado.get().strip()
@@ -535,9 +600,14 @@ class TradingApp:
         self.entry_lote.config(state="disabled")
 
         # Create and start strategy
-        self.estrategia = EstrategiaTrading(ativo, timeframe, lote_float, logger)
+        self.estrategia = EstrategiaTrading(ativo, timeframe, lote_float, logger,
+                                            snapshots=snapshot_store)
         threading.Thread(target=self.estrategia.executar, daemon=True).start()
 
+        # Chart the strategy's bars; its Fibonacci levels disappear once it stops
+        self.charts.clear()
+        self.charts.add(ativo, timeframe, levels=lambda: getattr(self.estrategia, 'current_fib_levels', None))
+
     def parar_robo(self):
         """Stop the trading robot"""
         if self.estrategia:
@@ -570,27 +640,47 @@ class TradingApp:
         logger.clear_logs()
 
     def export_logs(self):
-        """Export logs to file"""
-        from tkinter import filedialog
-        filepath = filedialog.asksaveasfilename(
-            defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
-        )
-        if filepath:
-            if logger.export_logs("main", filepath):
-                messagebox.showinfo("Success", "Logs exported successfully!")
-            else:
-                messagebox.showerror("Error", "Failed to export logs!")
+        """Export logs, journal or trades of any symbol in the background"""
+        show_export(self.root, self.ui, list(self.combo_ativo['values']))
+
+    def search_logs(self):
+        """Show log search dialog"""
+        log_files.flush()
+        self.log_archive.update()
+        show_log_search(self.root, self.log_archive)
+
+    def show_trade_stats(self):
+        """Show closed-trade statistics"""
+        show_trade_stats(self.root, trade_history)
 
     def on_closing(self):
         """Handle window closing"""
         if self.operando:
             if messagebox.askokcancel("Exit", "The robot is running. Do you really want to exit?"):
                 self.parar_robo()
+                self.stop_services()
                 self.root.destroy()
         else:
+            self.stop_services()
             self.root.destroy()
 
+    def stop_services(self):
+        """Stop the background services started with the window"""
+        self.position_manager.stop()
+        self.ui.stop()
+        self.charts.stop()
+        event_bus.unsubscribe(self.account_events)
+        event_bus.unsubscribe(self.market_events)
+        feed_poller.stop()
+        config_service.stop()
+        correlation_service.stop()
+        trade_history.stop()
+        connection_manager.unsubscribe(self.on_connection)
+        connection_manager.stop()
+        tick_monitor.stop()
+        risk_service.stop()
+        self.log_archive.close()
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = TradingApp(root)
@@ -0,0 +1,113 @@
+"""
+UI refresh coordinator for Future MT5 Pro Trading System
+Widget updates posted from any thread are coalesced per widget and applied
+from the Tk main loop at a capped frame rate, skipping unchanged values
+"""
+
+import os
+import sys
+import threading
+import tkinter as tk
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import UI
+except ImportError:
+    UI = {
+        'MAX_FPS': 20
+    }
+
+_MISSING = object()
+
+
+class UIRefresher:
+    """Queue of widget updates drained by the Tk main loop
+
+    ``update`` and ``call`` only touch a dict under a lock, so they are safe
+    from any thread. Once per frame the main loop takes everything pending:
+    for each widget only the last value of each option is kept, and options
+    already showing that value are not reconfigured, so a label fed the same
+    balance every tick is never redrawn. Widgets updated through the
+    refresher should not also be configured directly, or the skip check
+    would compare against a stale value.
+    """
+
+    def __init__(self, root: tk.Misc, max_fps: float = UI['MAX_FPS']):
+        self.root = root
+        self.interval_ms = max(1, int(1000 / max_fps))
+        self.pending: Dict[Any, Dict[str, Any]] = {}
+        self.calls: Dict[Any, tuple] = OrderedDict()
+        self.applied: Dict[Any, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.after_id: Optional[str] = None
+        self.frames = 0  # frames that configured at least one widget
+        self.skipped = 0  # option writes avoided because the value was unchanged
+
+    def update(self, widget: tk.Misc, **options):
+        """Set widget options on the next frame (latest value per option wins)"""
+        with self.lock:
+            self.pending.setdefault(widget, {}).update(options)
+
+    def call(self, key, func: Callable, *args):
+        """Run ``func(*args)`` on the next frame; a later call with the same key replaces it"""
+        with self.lock:
+            self.calls.pop(key, None)
+            self.calls[key] = (func, args)
+
+    def start(self):
+        """Start the frame loop; must be called from the Tk main thread"""
+        if self.after_id is None:
+            self.after_id = self.root.after(self.interval_ms, self.flush)
+
+    def stop(self):
+        if self.after_id is not None:
+            try:
+                self.root.after_cancel(self.after_id)
+            except tk.TclError:
+                pass  # application destroyed
+            self.after_id = None
+
+    def flush(self):
+        """Apply everything pending (runs on the Tk main thread)"""
+        try:
+            with self.lock:
+                pending, self.pending = self.pending, {}
+                calls, self.calls = self.calls, OrderedDict()
+
+            configured = False
+            for widget, options in pending.items():
+                applied = self.applied.setdefault(widget, {})
+                changed = {k: v for k, v in options.items() if applied.get(k, _MISSING) != v}
+                self.skipped += len(options) - len(changed)
+                if not changed:
+                    continue
+                try:
+                    widget.config(**changed)
+                except tk.TclError:
+                    self.applied.pop(widget, None)  # widget destroyed
+                    continue
+                applied.update(changed)
+                configured = True
+            if configured:
+                self.frames += 1
+
+            for func, args in calls.values():
+                try:
+                    func(*args)
+                except tk.TclError:
+                    pass
+        finally:
+            if self.after_id is not None:
+                try:
+                    self.after_id = self.root.after(self.interval_ms, self.flush)
+                except tk.TclError:
+                    self.after_id = None  # application destroyed
+
+
+__all__ = ['UIRefresher']
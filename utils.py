@@ -24,33 +24,18 @@ except ImportError:
 
 def initialize_mt5():
     """Initialize MT5 and return status and message"""
-    try:
-        if not mt5.initialize():
-            return False, "MetaTrader 5 initialization failed"
-        return True, "MetaTrader 5 initialized successfully"
-    except Exception as e:
-        return False, f"Error initializing MetaTrader 5: {str(e)}"
+    from mt5_connection import connection_manager
+    return connection_manager.connect()
 
 def verify_mt5_connection():
-    """Verify MT5 connection and return status and message"""
+    """Verify MT5 connection and return status and message
+
+    Probes the running connection and only re-initializes (with the
+    credentials of the last login) when the probe fails.
+    """
+    from mt5_connection import connection_manager
     try:
-        # Check if MT5 is initialized
-        if not mt5.initialize():
-            return False, "MetaTrader 5 is not initialized"
-        
-        # Check if logged in
-        if not mt5.login():
-            mt5.shutdown()
-            return False, "Not logged in to MetaTrader 5"
-        
-        # Check account info
-        account_info = mt5.account_info()
-        if account_info is None:
-            mt5.shutdown()
-            return False, "Could not get account information"
-        
-        return True, "Connected to MetaTrader 5"
-        
+        return connection_manager.verify()
     except Exception as e:
         return False, f"Error checking MT5 connection: {str(e)}"
 
@@ -222,7 +207,8 @@ def log_trade_result(result):
 
 def cleanup_mt5():
     """Safely cleanup MT5 connection"""
+    from mt5_connection import connection_manager
     try:
-        mt5.shutdown()
+        connection_manager.disconnect()
     except:
         pass
@@ -0,0 +1,369 @@
+"""
+Walk-forward analysis for Future MT5 Pro Trading System
+Rolling in-sample optimization and out-of-sample validation of the Fibonacci
+strategy's parameters over years of bar history for many symbols, sharded
+across a process pool with results streamed to disk
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import itertools
+import multiprocessing as mp
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List, Tuple, Callable
+
+import numpy as np
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from constants import PATHS, TIMEFRAMES, WALK_FORWARD
+except ImportError:
+    PATHS = {
+        'DATA': 'data/'
+    }
+    TIMEFRAMES = {}
+    WALK_FORWARD = {
+        'IN_SAMPLE_DAYS': 365,
+        'OUT_SAMPLE_DAYS': 90,
+        'WINDOWS_PER_TASK': 4,
+        'MIN_TRADES': 20,
+        'YEARS': 5,
+        'GRID': {
+            'fib_period': [20, 30, 50],
+            'min_trend_percent': [1.0, 2.0, 3.0],
+            'rsi_sobrecomprado': [65, 70, 75],
+            'rsi_sobrevendido': [25, 30, 35],
+            'min_rr_ratio': [1.5, 2.0, 3.0]
+        }
+    }
+
+from backtest import Indicators, simulate, trade_metrics
+from shared_feed import BAR_DTYPE
+
+HISTORY_DIR = os.path.join(PATHS['DATA'], 'history')
+RESULTS_DIR = os.path.join(PATHS['DATA'], 'walk_forward')
+
+
+class HistoryStore:
+    """Bar histories as ``.npy`` files, one per symbol and timeframe
+
+    Workers open them memory-mapped, so a history is read from disk once and
+    shared by every process through the page cache instead of being pickled
+    into each task. ``sync`` fetches only the bars after the last stored one.
+    """
+
+    def __init__(self, directory: str = HISTORY_DIR):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.directory, f"{symbol}_{timeframe}.npy")
+
+    def meta_path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.directory, f"{symbol}_{timeframe}.json")
+
+    def load(self, symbol: str, timeframe: str) -> Optional[np.ndarray]:
+        path = self.path(symbol, timeframe)
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode='r')
+
+    def point(self, symbol: str, timeframe: str) -> Optional[float]:
+        try:
+            with open(self.meta_path(symbol, timeframe), 'r') as f:
+                return json.load(f)['point']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, symbol: str, timeframe: str, bars: np.ndarray, point: float):
+        path = self.path(symbol, timeframe)
+        temp = f"{path}.tmp.npy"
+        np.save(temp, bars)
+        os.replace(temp, path)
+        with open(self.meta_path(symbol, timeframe), 'w') as f:
+            json.dump({'point': point, 'bars': len(bars)}, f)
+
+    def sync(self, symbol: str, timeframe: str, start: datetime) -> int:
+        """Bring the stored history up to date from the terminal; returns bars held"""
+        import MetaTrader5 as mt5
+
+        info = mt5.symbol_info(symbol)
+        if info is None:
+            raise ValueError(f"Unknown symbol {symbol}")
+        stored = self.load(symbol, timeframe)
+        tf = getattr(mt5, f"TIMEFRAME_{timeframe}")
+        since = start
+        if stored is not None and len(stored) and stored['time'][0] <= start.timestamp():
+            since = datetime.fromtimestamp(int(stored['time'][-1]))
+        else:
+            stored = None
+        rates = mt5.copy_rates_range(symbol, tf, since, datetime.now())
+        if rates is None or not len(rates):
+            return 0 if stored is None else len(stored)
+
+        rates = np.asarray(rates).astype(BAR_DTYPE)
+        if stored is not None:
+            # The last stored bar may have been forming: replace it
+            stored = np.asarray(stored)
+            rates = np.concatenate([stored[stored['time'] < rates['time'][0]], rates])
+        self.save(symbol, timeframe, rates, info.point)
+        return len(rates)
+
+
+def parameter_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Every combination of the grid's values"""
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def make_windows(times: np.ndarray, in_sample_days: float,
+                 out_sample_days: float) -> List[Tuple[int, int, int]]:
+    """Rolling (in-sample start, out-of-sample start, out-of-sample end) bar indices
+
+    Windows advance by the out-of-sample length, so the out-of-sample
+    periods tile the history without overlapping.
+    """
+    if not len(times):
+        return []
+    in_sample = int(in_sample_days * 86400)
+    out_sample = int(out_sample_days * 86400)
+    starts = np.arange(int(times[0]), int(times[-1]) - in_sample - out_sample + 1, out_sample)
+    edges = np.searchsorted(times, np.stack([starts, starts + in_sample, starts + in_sample + out_sample]))
+    return [tuple(int(x) for x in column) for column in edges.T if column[1] > column[0] and column[2] > column[1]]
+
+
+# Indicator caches of the last histories this worker process has opened
+CACHED_HISTORIES = 2
+_indicators: 'OrderedDict[Tuple[str, float], Tuple[Any, Indicators]]' = OrderedDict()
+
+
+def indicators_for(path: str, point: float) -> Indicators:
+    """Indicators of a history file, reused by every task of this process on it"""
+    signature = os.stat(path).st_mtime_ns
+    cached = _indicators.pop((path, point), None)
+    if cached is None or cached[0] != signature:
+        cached = (signature, Indicators(np.load(path, mmap_mode='r'), point))
+    _indicators[(path, point)] = cached
+    while len(_indicators) > CACHED_HISTORIES:
+        _indicators.popitem(last=False)
+    return cached[1]
+
+
+def score(metrics: Dict[str, Any], min_trades: int) -> float:
+    """In-sample objective: expectancy per trade, given enough trades"""
+    if metrics['trades'] < min_trades or metrics['expectancy'] is None:
+        return float('-inf')
+    return metrics['expectancy']
+
+
+def run_task(task: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Optimize on each in-sample window of a task and validate out of sample
+
+    Runs in a pool worker; returns one result row per window.
+    """
+    ind = indicators_for(task['path'], task['point'])
+    rows = []
+    for window, (start, middle, end) in task['windows']:
+        best, best_score, best_metrics = None, float('-inf'), None
+        for combo in task['combos']:
+            params = {**task['base'], **combo}
+            metrics = trade_metrics(simulate(ind, params, start, middle)['r'])
+            value = score(metrics, task['min_trades'])
+            if value > best_score:
+                best, best_score, best_metrics = combo, value, metrics
+
+        row = {
+            'symbol': task['symbol'],
+            'timeframe': task['timeframe'],
+            'window': window,
+            'in_sample': [int(ind.time[start]), int(ind.time[middle - 1])],
+            'out_sample': [int(ind.time[middle]), int(ind.time[end - 1])],
+            'params': best,
+            'in_sample_metrics': best_metrics,
+            'out_sample_metrics': None
+        }
+        if best is not None:
+            trades = simulate(ind, {**task['base'], **best}, middle, end)
+            row['out_sample_metrics'] = trade_metrics(trades['r'])
+            row['out_sample_r'] = trades['r'].round(4).tolist()
+        rows.append(row)
+    return rows
+
+
+class WalkForward:
+    """Walk-forward run over symbols of one timeframe
+
+    Each symbol's windows are split into tasks of ``windows_per_task``; a
+    worker keeps the indicator arrays of the histories it has opened, so
+    overlapping in-sample windows and every grid combination share one RSI,
+    trend and signal computation per parameter value. Rows are appended to
+    the output JSONL file as tasks finish, so memory does not grow with the
+    number of windows and an interrupted run keeps what it finished.
+    """
+
+    def __init__(self, symbols: List[str], timeframe: str = 'M15',
+                 grid: Optional[Dict[str, List[Any]]] = None,
+                 in_sample_days: float = WALK_FORWARD['IN_SAMPLE_DAYS'],
+                 out_sample_days: float = WALK_FORWARD['OUT_SAMPLE_DAYS'],
+                 windows_per_task: int = WALK_FORWARD['WINDOWS_PER_TASK'],
+                 min_trades: int = WALK_FORWARD['MIN_TRADES'],
+                 processes: Optional[int] = None,
+                 base: Optional[Dict[str, Any]] = None,
+                 store: Optional[HistoryStore] = None,
+                 output: Optional[str] = None):
+        self.symbols = symbols
+        self.timeframe = timeframe
+        self.grid = grid or WALK_FORWARD['GRID']
+        self.in_sample_days = in_sample_days
+        self.out_sample_days = out_sample_days
+        self.windows_per_task = windows_per_task
+        self.min_trades = min_trades
+        self.processes = processes or os.cpu_count() or 1
+        self.base = base if base is not None else strategy_defaults()
+        self.store = store or HistoryStore()
+        self.output = output or os.path.join(
+            RESULTS_DIR, f"{timeframe}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+
+    def tasks(self) -> List[Dict[str, Any]]:
+        combos = parameter_grid(self.grid)
+        tasks = []
+        for symbol in self.symbols:
+            history = self.store.load(symbol, self.timeframe)
+            point = self.store.point(symbol, self.timeframe)
+            if history is None or point is None:
+                continue
+            windows = list(enumerate(make_windows(history['time'], self.in_sample_days, self.out_sample_days)))
+            for i in range(0, len(windows), self.windows_per_task):
+                tasks.append({
+                    'symbol': symbol,
+                    'timeframe': self.timeframe,
+                    'path': self.store.path(symbol, self.timeframe),
+                    'point': point,
+                    'windows': windows[i:i + self.windows_per_task],
+                    'combos': combos,
+                    'base': self.base,
+                    'min_trades': self.min_trades
+                })
+        # A symbol's tasks stay adjacent: the pool hands them out in order, so
+        # each worker mostly sees one or two histories and keeps their indicators
+        return tasks
+
+    def run(self, progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """Run every task and stream the rows; returns the aggregate summary"""
+        tasks = self.tasks()
+        os.makedirs(os.path.dirname(os.path.abspath(self.output)), exist_ok=True)
+        started = time.monotonic()
+        windows = 0
+        in_sample_r, out_sample_r, out_sample_trades = 0.0, 0.0, 0
+        in_sample_trades = 0
+
+        ctx = mp.get_context('spawn')
+        with open(self.output, 'w', encoding='utf-8') as f, \
+                ctx.Pool(min(self.processes, max(1, len(tasks)))) as pool:
+            for done, rows in enumerate(pool.imap_unordered(run_task, tasks), 1):
+                for row in rows:
+                    f.write(json.dumps(row) + '\n')
+                    windows += 1
+                    if row['out_sample_metrics'] is not None:
+                        in_sample_r += row['in_sample_metrics']['total_r']
+                        in_sample_trades += row['in_sample_metrics']['trades']
+                        out_sample_r += row['out_sample_metrics']['total_r']
+                        out_sample_trades += row['out_sample_metrics']['trades']
+                f.flush()
+                if progress is not None:
+                    progress(done, len(tasks))
+
+        in_expectancy = in_sample_r / in_sample_trades if in_sample_trades else None
+        out_expectancy = out_sample_r / out_sample_trades if out_sample_trades else None
+        return {
+            'output': self.output,
+            'symbols': len({t['symbol'] for t in tasks}),
+            'windows': windows,
+            'combinations': len(parameter_grid(self.grid)),
+            'in_sample_expectancy': in_expectancy,
+            'out_sample_expectancy': out_expectancy,
+            # Out-of-sample over in-sample expectancy: near 1 is robust, near 0 or below is curve fitting
+            'efficiency': out_expectancy / in_expectancy if in_expectancy and out_expectancy is not None else None,
+            'out_sample_trades': out_sample_trades,
+            'seconds': round(time.monotonic() - started, 1)
+        }
+
+
+def strategy_defaults() -> Dict[str, Any]:
+    """The strategy's parameters from the current configuration snapshot"""
+    from config_service import config_service, thaw
+    from estrategia import EstrategiaTrading
+
+    snapshot = config_service.current
+    return {attribute: thaw(snapshot.value(section, key))
+            for attribute, (section, key) in EstrategiaTrading.parametros_config.items()}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        prog='future-mt5-walk-forward',
+        description='Walk-forward optimization of the Fibonacci strategy'
+    )
+    parser.add_argument('symbols', nargs='+')
+    parser.add_argument('--timeframe', default='M15', choices=sorted(TIMEFRAMES))
+    parser.add_argument('--years', type=float, default=WALK_FORWARD['YEARS'],
+                        help='history to sync from the terminal')
+    parser.add_argument('--in-sample-days', type=float, default=WALK_FORWARD['IN_SAMPLE_DAYS'])
+    parser.add_argument('--out-sample-days', type=float, default=WALK_FORWARD['OUT_SAMPLE_DAYS'])
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--grid', help='JSON file with parameter -> list of values')
+    parser.add_argument('--output', help='JSONL file for the per-window results')
+    parser.add_argument('--no-sync', action='store_true', help='use the stored history as is')
+    args = parser.parse_args(argv)
+
+    store = HistoryStore()
+    if not args.no_sync:
+        from utils import initialize_mt5, cleanup_mt5
+        success, message = initialize_mt5()
+        if not success:
+            print(f"❌ {message}")
+            return 1
+        try:
+            start = datetime.now() - timedelta(days=365 * args.years)
+            for symbol in args.symbols:
+                try:
+                    print(f"ℹ️ {symbol}: {store.sync(symbol, args.timeframe, start)} bars")
+                except ValueError as e:
+                    print(f"❌ {e}")
+        finally:
+            cleanup_mt5()
+
+    grid = None
+    if args.grid:
+        with open(args.grid, 'r', encoding='utf-8') as f:
+            grid = json.load(f)
+
+    run = WalkForward(args.symbols, args.timeframe, grid, args.in_sample_days, args.out_sample_days,
+                      processes=args.processes, store=store, output=args.output)
+    summary = run.run(lambda done, total: print(f"\rℹ️ {done}/{total} tasks", end='', flush=True))
+    print()
+    print(json.dumps(summary, indent=4))
+    return 0
+
+
+__all__ = [
+    'WalkForward',
+    'HistoryStore',
+    'parameter_grid',
+    'make_windows',
+    'run_task',
+    'strategy_defaults',
+    'main'
+]
+
+if __name__ == "__main__":
+    sys.exit(main())